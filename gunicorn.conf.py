@@ -0,0 +1,53 @@
+"""
+Gunicorn configuration, read automatically from the working directory
+The app is preloaded in the master, so workers fork with it already imported;
+set STARTUP_PRELOAD_MODULES (e.g. "tensorflow,sklearn") to also warm heavy
+libraries before fork instead of on each worker's first request.
+Workers are threaded (gthread) because /api/stream server-sent events hold a
+thread for as long as a dashboard is open; the push channel sizes itself to
+the worker's threads and is switched off if a sync worker is forced.
+The scheduler's feed jobs run in the master, so the master relays what they
+publish to every worker's push hub over a local socket.
+Command-line flags still override these settings.
+"""
+
+import os
+import time
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 64))
+timeout = 120
+preload_app = True
+
+
+def when_ready(server):
+    """Master is listening and about to fork the first workers"""
+    from src.core.push import push_relay
+    from src.core.startup import warm_up
+    push_relay.start()
+    warm_up()
+
+
+def post_fork(server, worker):
+    worker.forked_at = time.perf_counter()
+
+
+# Concurrency model of each worker type, for sizing the push channel
+_WORKER_KINDS = {'ThreadWorker': 'gthread', 'GeventWorker': 'gevent', 'EventletWorker': 'eventlet'}
+
+
+def post_worker_init(worker):
+    from src.core.push import push_hub, push_relay
+    from src.core.startup import record_worker_boot
+    kind = next((_WORKER_KINDS[cls.__name__] for cls in type(worker).__mro__ if cls.__name__ in _WORKER_KINDS),
+                'sync')
+    push_hub.fit_worker(kind, worker.cfg.threads)
+    push_relay.attach(push_hub)
+    record_worker_boot((time.perf_counter() - worker.forked_at) * 1000)
+
+
+def on_exit(server):
+    from src.core.push import push_relay
+    push_relay.stop()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: imports the Flask app in fresh `python -X importtime`
+interpreters and checks wall time, peak RSS and eager heavy imports against
+STARTUP_BUDGET_SEC / STARTUP_RSS_BUDGET_MB. Exits 1 when over budget.
+
+    python scripts/startup_benchmark.py [--runs 5] [--json]
+"""
+
+import os
+import sys
+import json
+import argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from src.common_repository.config.runtime import STARTUP_BUDGET_SEC, STARTUP_RSS_BUDGET_MB
+from src.core.startup import STARTUP_TARGET, check_budget, measure_cold_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--target', default=STARTUP_TARGET, help='module to import (default: %(default)s)')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=15, help='slowest imports to list')
+    parser.add_argument('--budget-sec', type=float, default=STARTUP_BUDGET_SEC)
+    parser.add_argument('--rss-budget-mb', type=float, default=STARTUP_RSS_BUDGET_MB)
+    parser.add_argument('--json', action='store_true', help='print the raw result as JSON')
+    args = parser.parse_args()
+
+    result = measure_cold_start(args.target, runs=args.runs, top=args.top, cwd=ROOT)
+    violations = check_budget(result, args.budget_sec, args.rss_budget_mb)
+
+    if args.json:
+        print(json.dumps(dict(result, violations=violations), indent=2))
+    else:
+        print(f"⏱️  {result['target']}: {result['wall_ms']:.0f}ms median over {result['runs']} runs "
+              f"(budget {args.budget_sec * 1000:.0f}ms)")
+        print(f"💾 Peak RSS: {result['rss_mb']:.0f}MB (budget {args.rss_budget_mb:.0f}MB), "
+              f"{result['modules']} modules loaded")
+        print("🐢 Slowest imports (cumulative):")
+        for entry in result['top_imports']:
+            print(f"   {entry['cumulative_ms']:8.1f}ms  {entry['module']}")
+        for violation in violations:
+            print(f"❌ {violation}")
+        if not violations:
+            print("✅ Within startup budget")
+
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
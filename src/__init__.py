@@ -5,14 +5,19 @@ __version__ = "1.7.4"
 __title__ = "Stock Market Analyst"
 __description__ = "Advanced AI-powered stock analysis and prediction platform"
 
-# Core modules
-from .core import *
-from .analyzers import *
-from .agents import *
-from .managers import *
-from .strategies import *
-from .orchestrators import *
-from .reporters import *
-from .utils import *
-# src package initialization
-# src package initialization
+import importlib
+
+# Core modules: their public names are re-exported on first access instead of
+# importing every subpackage (and numpy/pandas with them) whenever src is imported
+_SUBPACKAGES = ('core', 'analyzers', 'agents', 'managers', 'strategies', 'orchestrators', 'reporters', 'utils')
+
+
+def __getattr__(name):
+    if not name.startswith('_'):
+        for package in _SUBPACKAGES:
+            module = importlib.import_module(f'{__name__}.{package}')
+            if name in vars(module) and not name.startswith('_'):
+                value = vars(module)[name]
+                globals()[name] = value
+                return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
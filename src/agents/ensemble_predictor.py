@@ -17,7 +17,6 @@ import json
 import os
 from typing import Dict, List, Tuple
 from datetime import datetime, timedelta
-import yfinance as yf
 
 logger = logging.getLogger(__name__)
 
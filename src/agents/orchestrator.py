@@ -1,13 +1,21 @@
-
 """
 Agent Orchestrator - Manages agent execution, scheduling, and event handling
+
+Jobs run on a pool of worker threads (started with the scheduler) in priority
+order (KPI breaches ahead of events ahead of periodic runs). A job enqueued
+while another for the same agent and scope is still pending is merged into it.
+While one is running, the same input is merged into the running job and a
+changed input waits as a single follow-up until it finishes, so an agent and
+scope never run twice at once. A run whose input hash matches a recent
+successful run reuses that output instead of calling the LLM again.
 """
 
+import itertools
 import logging
 import threading
 import time
-from typing import Dict, Any, List, Optional
-from queue import Queue, Empty
+from typing import Dict, Any, List, Optional, Tuple
+from queue import PriorityQueue, Empty
 from datetime import datetime, timedelta
 
 from .core.runner import agent_runner
@@ -15,56 +23,132 @@ from .core.registry import agent_registry
 from .core.contracts import AgentInput, AgentOutput, AgentError
 from .store.agent_outputs_repo import agent_outputs_repo
 from ..common_repository.config.feature_flags import feature_flags
+from ..common_repository.config.runtime import AGENT_WORKERS, AGENT_QUEUE_MAX, AGENT_RESULT_TTL_SEC
+from ..common_repository.utils.telemetry import telemetry
 
 logger = logging.getLogger(__name__)
 
+# Job priorities (lower runs first)
+PRIORITY_KPI_BREACH = 0
+PRIORITY_EVENT = 1
+PRIORITY_PERIODIC = 2
+
+# Context keys that change on every enqueue and so are left out of the input hash
+VOLATILE_CONTEXT_KEYS = {'timestamp'}
+
 class AgentOrchestrator:
     """Orchestrates agent execution with scheduling and event handling"""
     
-    def __init__(self):
-        self.execution_queue = Queue()
+    def __init__(self, workers: int = AGENT_WORKERS, max_pending: int = AGENT_QUEUE_MAX,
+                 result_ttl: float = AGENT_RESULT_TTL_SEC, runner=None):
+        self.execution_queue = PriorityQueue()
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.runner = runner or agent_runner
         self.is_running = False
-        self.worker_thread = None
+        self.worker_threads: List[threading.Thread] = []
+        self.pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.running: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.result_cache: Dict[str, Tuple[float, AgentOutput]] = {}
+        self.busy_workers = 0
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
         self.metrics = {
             'total_runs': 0,
             'successful_runs': 0,
             'failed_runs': 0,
+            'coalesced_jobs': 0,
+            'cache_hits': 0,
+            'rejected_jobs': 0,
+            'max_queue_depth': 0,
             'last_activity': None
         }
         self.last_agent_activity = {}
         
     def start(self):
-        """Start the orchestrator worker thread"""
+        """Start the orchestrator worker threads"""
         if not self.is_running:
             self.is_running = True
-            self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
-            self.worker_thread.start()
-            logger.info("Agent orchestrator started")
+            self.worker_threads = [
+                threading.Thread(target=self._worker_loop, name=f'agent-worker-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self.worker_threads:
+                thread.start()
+            logger.info(f"Agent orchestrator started with {self.workers} workers")
     
     def stop(self):
         """Stop the orchestrator"""
         self.is_running = False
-        if self.worker_thread:
-            self.worker_thread.join(timeout=5)
+        for thread in self.worker_threads:
+            thread.join(timeout=5)
         logger.info("Agent orchestrator stopped")
     
     def _worker_loop(self):
-        """Main worker loop for processing agent execution queue"""
+        """Worker loop: pull the highest-priority pending job and run it"""
         logger.info("Agent orchestrator worker loop started")
         
         while self.is_running:
             try:
-                # Process queued executions
                 try:
-                    job = self.execution_queue.get(timeout=1)
-                    self._execute_agent_job(job)
-                    self.execution_queue.task_done()
+                    _, sequence, key = self.execution_queue.get(timeout=1)
                 except Empty:
                     continue
+
+                try:
+                    with self._lock:
+                        job = self.pending.get(key)
+                        # Entries left behind when a coalesced job was re-prioritized are skipped
+                        if job is None or job['sequence'] != sequence:
+                            continue
+                        del self.pending[key]
+                        self.running[key] = job
+                        self.busy_workers += 1
+                    try:
+                        self._execute_agent_job(job)
+                    finally:
+                        self._finish(key)
+                finally:
+                    self.execution_queue.task_done()
                     
             except Exception as e:
                 logger.error(f"Error in orchestrator worker loop: {e}")
                 time.sleep(1)
+
+    def _finish(self, key: Tuple[str, str]):
+        """Release a finished job's key and dispatch the follow-up that waited for it"""
+        with self._lock:
+            self.busy_workers -= 1
+            del self.running[key]
+            follow_up = self.pending.get(key)
+            if follow_up is None or not follow_up['deferred']:
+                return
+            follow_up['deferred'] = False
+        self.execution_queue.put((follow_up['priority'], follow_up['sequence'], key))
+
+    def _input_hash(self, agent_name: str, agent_input: AgentInput) -> str:
+        """Runner input hash, ignoring per-enqueue timestamps"""
+        context = {k: v for k, v in agent_input.context.items() if k not in VOLATILE_CONTEXT_KEYS}
+        stable_input = AgentInput(**{**agent_input.to_dict(), 'context': context})
+        return f"{agent_name}:{self.runner._hash_input(stable_input)}"
+
+    def _cached_output(self, input_hash: str) -> Optional[AgentOutput]:
+        with self._lock:
+            entry = self.result_cache.get(input_hash)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.result_ttl:
+                del self.result_cache[input_hash]
+                return None
+            return entry[1]
+
+    def _store_output(self, input_hash: str, output: AgentOutput):
+        now = time.time()
+        with self._lock:
+            for stale in [k for k, (stored_at, _) in self.result_cache.items() if now - stored_at > self.result_ttl]:
+                del self.result_cache[stale]
+            self.result_cache[input_hash] = (now, output)
     
     def _execute_agent_job(self, job: Dict[str, Any]):
         """Execute a single agent job"""
@@ -72,35 +156,55 @@ class AgentOrchestrator:
             agent_name = job['agent']
             scope = job.get('scope', 'default')
             agent_input = job['input']
-            
+
+            telemetry.record_histogram('agents.queue_wait_sec', time.time() - job['enqueued_ts'])
             logger.info(f"Executing agent job: {agent_name}/{scope}")
             
-            # Run the agent
+            # Run the agent, or reuse a recent output for identical input
             start_time = time.time()
-            output = agent_runner.run_agent(agent_name, agent_input)
+            input_hash = self._input_hash(agent_name, agent_input)
+            output = self._cached_output(input_hash)
+            cached = output is not None
+            if not cached:
+                output = self.runner.run_agent(agent_name, agent_input)
+                if output.verdict != 'ERROR':
+                    self._store_output(input_hash, output)
             execution_time = time.time() - start_time
+            outcome = 'cached' if cached else ('error' if output.verdict == 'ERROR' else 'success')
+            telemetry.record_histogram('agents.run_ms', execution_time * 1000, {'agent': agent_name})
+            telemetry.increment('agents.runs', 1, {'agent': agent_name, 'outcome': outcome})
             
             # Save output
-            agent_outputs_repo.save_output(agent_name, scope, output.to_dict())
+            output_data = output.to_dict()
+            if cached:
+                output_data['metadata'] = {**(output_data.get('metadata') or {}), 'cached': True}
+            agent_outputs_repo.save_output(agent_name, scope, output_data)
             
             # Update metrics
-            self.metrics['total_runs'] += 1
-            if output.verdict != 'ERROR':
-                self.metrics['successful_runs'] += 1
-            else:
-                self.metrics['failed_runs'] += 1
-                
-            self.metrics['last_activity'] = datetime.now().isoformat()
-            self.last_agent_activity[agent_name] = datetime.now().isoformat()
+            with self._lock:
+                self.metrics['total_runs'] += 1
+                if cached:
+                    self.metrics['cache_hits'] += 1
+                if output.verdict != 'ERROR':
+                    self.metrics['successful_runs'] += 1
+                else:
+                    self.metrics['failed_runs'] += 1
+                    
+                self.metrics['last_activity'] = datetime.now().isoformat()
+                self.last_agent_activity[agent_name] = datetime.now().isoformat()
             
-            logger.info(f"Completed agent job: {agent_name}/{scope} in {execution_time:.2f}s")
+            logger.info(f"Completed agent job: {agent_name}/{scope} in {execution_time:.2f}s"
+                        + (" (cached)" if cached else ""))
             
         except Exception as e:
             logger.error(f"Error executing agent job: {e}")
-            self.metrics['failed_runs'] += 1
+            telemetry.increment('agents.runs', 1, {'agent': job.get('agent', 'unknown'), 'outcome': 'exception'})
+            with self._lock:
+                self.metrics['failed_runs'] += 1
     
-    def enqueue_agent_run(self, agent: str, context: Dict[str, Any], scope: str = 'default') -> str:
-        """Enqueue an agent run"""
+    def enqueue_agent_run(self, agent: str, context: Dict[str, Any], scope: str = 'default',
+                          priority: int = PRIORITY_EVENT) -> str:
+        """Enqueue an agent run; returns the id of the pending job it was merged into, if any"""
         try:
             if not feature_flags.is_enabled('enable_agents_framework'):
                 raise AgentError("Agents framework is disabled")
@@ -110,20 +214,65 @@ class AgentOrchestrator:
             
             # Create agent input
             agent_input = AgentInput(context=context)
-            
-            # Create job
-            job_id = f"{agent}_{scope}_{int(time.time())}"
-            job = {
-                'id': job_id,
-                'agent': agent,
-                'scope': scope,
-                'input': agent_input,
-                'queued_at': datetime.now().isoformat()
-            }
+            key = (agent, scope)
+
+            with self._lock:
+                job = self.pending.get(key)
+                if job is not None:
+                    # Same agent and scope still waiting: run once, on the newest input
+                    job['input'] = agent_input
+                    job['coalesced'] += 1
+                    self.metrics['coalesced_jobs'] += 1
+                    telemetry.increment('agents.coalesced_jobs')
+                    if priority < job['priority']:
+                        job['priority'] = priority
+                        job['sequence'] = next(self._sequence)
+                        if not job['deferred']:
+                            self.execution_queue.put((priority, job['sequence'], key))
+                    logger.info(f"Coalesced agent run into pending job: {job['id']}")
+                    return job['id']
+
+                active = self.running.get(key)
+                if active is not None and (self._input_hash(agent, agent_input)
+                                           == self._input_hash(agent, active['input'])):
+                    # The running job is already working on this input
+                    active['coalesced'] += 1
+                    self.metrics['coalesced_jobs'] += 1
+                    telemetry.increment('agents.coalesced_jobs')
+                    logger.info(f"Coalesced agent run into running job: {active['id']}")
+                    return active['id']
+
+                if len(self.pending) >= self.max_pending:
+                    self.metrics['rejected_jobs'] += 1
+                    telemetry.increment('agents.rejected_jobs')
+                    raise AgentError(f"Agent queue full ({self.max_pending} pending jobs)")
+
+                # Create job
+                sequence = next(self._sequence)
+                job_id = f"{agent}_{scope}_{int(time.time())}_{sequence}"
+                job = {
+                    'id': job_id,
+                    'agent': agent,
+                    'scope': scope,
+                    'input': agent_input,
+                    'priority': priority,
+                    'sequence': sequence,
+                    'coalesced': 0,
+                    # Held back until the running job for this key finishes (see _finish)
+                    'deferred': active is not None,
+                    'queued_at': datetime.now().isoformat(),
+                    'enqueued_ts': time.time()
+                }
+                self.pending[key] = job
+                self.metrics['max_queue_depth'] = max(self.metrics['max_queue_depth'], len(self.pending))
+                telemetry.set_gauge('agents.queue_depth', len(self.pending))
             
             # Add to queue
-            self.execution_queue.put(job)
-            logger.info(f"Enqueued agent job: {job_id}")
+            if job['deferred']:
+                logger.info(f"Enqueued agent job after the running one: {job_id}")
+            else:
+                self.execution_queue.put((priority, job['sequence'], key))
+                logger.info(f"Enqueued agent job: {job_id}")
             
             return job_id
             
@@ -143,7 +292,7 @@ class AgentOrchestrator:
                 'timestamp': datetime.now().isoformat()
             }
             
-            self.enqueue_agent_run('trainer', trainer_context, 'kpi_change')
+            self.enqueue_agent_run('trainer', trainer_context, 'kpi_change', PRIORITY_KPI_BREACH)
             
             # Enqueue relevant product agents based on KPI data
             affected_products = kpi_data.get('affected_products', ['equity'])
@@ -154,7 +303,7 @@ class AgentOrchestrator:
                         'event_type': 'kpi_change',
                         'product': product
                     }
-                    self.enqueue_agent_run(product, product_context, f'kpi_change_{product}')
+                    self.enqueue_agent_run(product, product_context, f'kpi_change_{product}', PRIORITY_KPI_BREACH)
                     
         except Exception as e:
             logger.error(f"Error handling KPI change event: {e}")
@@ -192,7 +341,7 @@ class AgentOrchestrator:
                     'event_type': 'scheduled_daily',
                     'timestamp': now.isoformat()
                 }
-                self.enqueue_agent_run('trainer', context, 'daily_scheduled')
+                self.enqueue_agent_run('trainer', context, 'daily_scheduled', PRIORITY_PERIODIC)
             
             # Hourly sentiment during market hours (9-15:30 IST)
             if 9 <= now.hour <= 15 and now.minute == 0:
@@ -200,27 +349,40 @@ class AgentOrchestrator:
                     'event_type': 'scheduled_hourly',
                     'timestamp': now.isoformat()
                 }
-                self.enqueue_agent_run('sentiment', context, 'hourly_scheduled')
+                self.enqueue_agent_run('sentiment', context, 'hourly_scheduled', PRIORITY_PERIODIC)
                 
         except Exception as e:
             logger.error(f"Error in periodic scheduling: {e}")
     
     def get_metrics(self) -> Dict[str, Any]:
-        """Get orchestrator metrics"""
-        return {
-            **self.metrics,
-            'queue_size': self.execution_queue.qsize(),
-            'is_running': self.is_running,
-            'last_agent_activity': self.last_agent_activity
-        }
+        """Get orchestrator metrics, including backpressure (depth, oldest wait, busy workers)"""
+        with self._lock:
+            oldest = min((job['enqueued_ts'] for job in self.pending.values()), default=None)
+            return {
+                **self.metrics,
+                'queue_size': len(self.pending),
+                'max_pending': self.max_pending,
+                'oldest_pending_sec': round(time.time() - oldest, 3) if oldest else 0.0,
+                'workers': self.workers,
+                'busy_workers': self.busy_workers,
+                'cached_results': len(self.result_cache),
+                'is_running': self.is_running,
+                'last_agent_activity': dict(self.last_agent_activity)
+            }
     
     def get_queue_status(self) -> Dict[str, Any]:
         """Get current queue status"""
-        return {
-            'size': self.execution_queue.qsize(),
-            'is_running': self.is_running,
-            'worker_active': self.worker_thread.is_alive() if self.worker_thread else False
-        }
+        with self._lock:
+            by_priority: Dict[int, int] = {}
+            for job in self.pending.values():
+                by_priority[job['priority']] = by_priority.get(job['priority'], 0) + 1
+            return {
+                'size': len(self.pending),
+                'by_priority': by_priority,
+                'is_running': self.is_running,
+                'worker_active': any(thread.is_alive() for thread in self.worker_threads),
+                'workers_alive': sum(thread.is_alive() for thread in self.worker_threads)
+            }
 
 # Global orchestrator instance
 agent_orchestrator = AgentOrchestrator()
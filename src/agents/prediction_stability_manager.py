@@ -11,6 +11,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import os
 
+from src.common_repository.storage.prediction_log import prediction_log
+
 logger = logging.getLogger(__name__)
 
 class PredictionStabilityManager:
@@ -18,7 +20,6 @@ class PredictionStabilityManager:
         self.stable_predictions_file = 'stable_predictions.json'
         self.min_stability_hours = 24  # Minimum hours before prediction can change
         self.max_change_threshold = 5.0  # Maximum allowed % change in prediction
-        self.history_file = 'predictions_history.json'
 
     def load_stable_predictions(self) -> Dict:
         """Load stable predictions from file"""
@@ -151,7 +152,7 @@ class PredictionStabilityManager:
         return stabilized
 
     def save_prediction_history(self, predictions: List[Dict]):
-        """Save prediction history with timestamp"""
+        """Append this run's predictions to the shared prediction log"""
         try:
             # Ensure predictions is a list of dictionaries
             if not isinstance(predictions, list):
@@ -162,37 +163,12 @@ class PredictionStabilityManager:
             valid_predictions = []
             for pred in predictions:
                 if isinstance(pred, dict) and pred.get('symbol'):
-                    valid_predictions.append(pred)
+                    # Backtesting reads the 1-month call as predicted_1mo
+                    valid_predictions.append(dict(pred, predicted_1mo=pred.get('pred_1mo', 0)))
                 else:
                     logger.warning(f"Skipping invalid prediction: {type(pred)}")
 
-            history_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'predictions': valid_predictions,
-                'count': len(valid_predictions)
-            }
-
-            # Load existing history
-            existing_history = []
-            if os.path.exists(self.history_file):
-                try:
-                    with open(self.history_file, 'r') as f:
-                        existing_history = json.load(f)
-                    # Ensure existing_history is a list
-                    if not isinstance(existing_history, list):
-                        existing_history = []
-                except (json.JSONDecodeError, TypeError):
-                    existing_history = []
-
-            # Add new entry
-            existing_history.append(history_entry)
-
-            # Keep only last 50 entries
-            existing_history = existing_history[-50:]
-
-            # Save updated history
-            with open(self.history_file, 'w') as f:
-                json.dump(existing_history, f, indent=2)
+            prediction_log.append(valid_predictions)
 
         except Exception as e:
             logger.error(f"Error saving prediction history: {str(e)}")
@@ -0,0 +1,621 @@
+"""
+Batch Technical Indicator Engine
+
+Vectorized counterpart of DailyTechnicalAnalyzer.calculate_daily_technical_indicators:
+1. Aligns per-symbol daily OHLCV into a (dates x symbols) panel
+2. Computes every indicator family as 2-D NumPy operations over the panel
+3. Shares intermediates (returns, true range, typical price) across families
+4. Returns per-symbol dicts with the same output keys as the per-symbol path
+"""
+
+import logging
+import warnings
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+@dataclass
+class OHLCVPanel:
+    """Right-aligned OHLCV panel: row -1 is each symbol's latest bar"""
+    symbols: List[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    dates: np.ndarray  # datetime64[ns], NaT where a symbol has no history
+    lengths: np.ndarray  # number of valid bars per symbol
+
+
+def build_panel(frames: Dict[str, pd.DataFrame], max_rows: Optional[int] = None) -> OHLCVPanel:
+    """Stack per-symbol OHLCV frames into a right-aligned (rows x symbols) panel.
+
+    Each symbol's rows with missing values are dropped (as the per-symbol path
+    does) and the remainder is aligned so that the last row is its latest bar;
+    shorter histories are padded with NaN at the top.
+    """
+    symbols, cleaned = [], []
+    for symbol, frame in frames.items():
+        if frame is None or frame.empty:
+            continue
+        data = frame[list(OHLCV_COLUMNS)].dropna()
+        if data.empty:
+            continue
+        symbols.append(symbol)
+        cleaned.append(data)
+
+    rows = max((len(data) for data in cleaned), default=0)
+    if max_rows is not None:
+        rows = min(rows, max_rows)
+
+    shape = (rows, len(symbols))
+    arrays = {column: np.full(shape, np.nan) for column in OHLCV_COLUMNS}
+    dates = np.full(shape, np.datetime64('NaT'), dtype='datetime64[ns]')
+    lengths = np.zeros(len(symbols), dtype=int)
+
+    for j, data in enumerate(cleaned):
+        data = data.tail(rows)
+        n = len(data)
+        lengths[j] = n
+        for column in OHLCV_COLUMNS:
+            arrays[column][rows - n:, j] = data[column].to_numpy(dtype=float)
+        index = data.index
+        if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+            index = index.tz_localize(None)
+        dates[rows - n:, j] = pd.to_datetime(index).to_numpy(dtype='datetime64[ns]')
+
+    return OHLCVPanel(symbols=symbols, open=arrays['Open'], high=arrays['High'],
+                      low=arrays['Low'], close=arrays['Close'], volume=arrays['Volume'],
+                      dates=dates, lengths=lengths)
+
+
+# ---------------------------------------------------------------------------
+# 2-D primitives (axis 0 is time, axis 1 is symbol)
+# ---------------------------------------------------------------------------
+
+def _rolling(x: np.ndarray, window: int, func: Callable) -> np.ndarray:
+    """Apply func over trailing windows; rows without a full window are NaN"""
+    out = np.full(x.shape, np.nan)
+    if x.shape[0] >= window:
+        out[window - 1:] = func(sliding_window_view(x, window, axis=0), axis=-1)
+    return out
+
+
+def _rolling_mean(x, window):
+    return _rolling(x, window, np.mean)
+
+
+def _rolling_sum(x, window):
+    return _rolling(x, window, np.sum)
+
+
+def _rolling_max(x, window):
+    return _rolling(x, window, np.max)
+
+
+def _rolling_min(x, window):
+    return _rolling(x, window, np.min)
+
+
+def _rolling_std(x, window):
+    return _rolling(x, window, lambda v, axis: v.std(axis=axis, ddof=1))
+
+
+def _shift(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if periods < x.shape[0]:
+        out[periods:] = x[:-periods]
+    return out
+
+
+def _ema(x: np.ndarray, span: int) -> np.ndarray:
+    """Adjusted EMA matching pandas ewm(span=...).mean() for top-padded columns"""
+    decay = 1 - 2.0 / (span + 1)
+    out = np.full(x.shape, np.nan)
+    numerator = np.zeros(x.shape[1])
+    denominator = np.zeros(x.shape[1])
+    for t in range(x.shape[0]):
+        valid = ~np.isnan(x[t])
+        numerator = np.where(valid, numerator * decay + np.nan_to_num(x[t]), numerator)
+        denominator = np.where(valid, denominator * decay + 1, denominator)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[t] = numerator / denominator
+    return out
+
+
+def _masked_stats(values: np.ndarray, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Column-wise count, mean and sample std of values where mask is True"""
+    count = mask.sum(axis=0)
+    total = np.where(mask, values, 0.0).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        squares = np.where(mask, (values - mean) ** 2, 0.0).sum(axis=0)
+        std = np.where(count > 1, np.sqrt(squares / (count - 1)), np.nan)
+    return count, mean, std
+
+
+def _pairwise_corr(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Column-wise Pearson correlation over rows where neither is NaN (inf propagates, as in pandas)"""
+    mask = ~np.isnan(a) & ~np.isnan(b)
+    count = mask.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        a_mean = np.where(mask, a, 0.0).sum(axis=0) / count
+        b_mean = np.where(mask, b, 0.0).sum(axis=0) / count
+        a_dev = np.where(mask, a - a_mean, 0.0)
+        b_dev = np.where(mask, b - b_mean, 0.0)
+        corr = (a_dev * b_dev).sum(axis=0) / np.sqrt((a_dev ** 2).sum(axis=0) * (b_dev ** 2).sum(axis=0))
+    return np.where(count > 1, corr, np.nan)
+
+
+def _signal(values: np.ndarray, low: float, high: float) -> np.ndarray:
+    return np.where(values < low, 'oversold', np.where(values > high, 'overbought', 'neutral'))
+
+
+class BatchIndicatorEngine:
+    """Computes daily technical indicators for a whole panel in one pass"""
+
+    def __init__(self, min_history: int = 50):
+        self.min_history = min_history
+
+    def compute(self, panel: OHLCVPanel) -> Dict[str, Dict]:
+        """Return {symbol: indicators} with DailyTechnicalAnalyzer's output keys"""
+        if not panel.symbols or panel.close.shape[0] == 0:
+            return {}
+
+        self._columns: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._n = panel.lengths
+        self._all = np.ones(len(panel.symbols), dtype=bool)
+
+        with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+            # All-NaN columns (short histories) are expected; their keys are masked out
+            warnings.simplefilter('ignore', RuntimeWarning)
+            shared = self._shared_intermediates(panel)
+            self._put('current_price', panel.close[-1])
+            self._moving_averages(panel, shared)
+            self._trend_indicators(panel, shared)
+            self._momentum_indicators(panel, shared)
+            self._volatility_indicators(panel, shared)
+            self._volume_indicators(panel, shared)
+            self._support_resistance(panel)
+            self._chart_patterns(panel)
+            self._strength_indicators(panel, shared)
+            self._daily_momentum(panel, shared)
+            self._risk_metrics(panel, shared)
+            self._market_microstructure(panel, shared)
+            self._temporal_patterns(panel, shared)
+            self._market_regime()
+
+        self._put('data_quality', np.full(len(panel.symbols), 'daily_ohlc'))
+        self._put('timeframe', np.full(len(panel.symbols), 'daily'))
+        self._put('data_points', panel.lengths)
+
+        return self._assemble(panel)
+
+    # -- plumbing ----------------------------------------------------------
+
+    def _put(self, key: str, values, mask: Optional[np.ndarray] = None, decimals: Optional[int] = None):
+        values = np.asarray(values)
+        if decimals is not None:
+            values = np.round(values.astype(float), decimals)
+        self._columns[key] = (values, self._all if mask is None else mask)
+
+    def _get(self, key: str, default: float = np.nan) -> np.ndarray:
+        """Column values where present, default elsewhere"""
+        values, mask = self._columns[key]
+        return np.where(mask, values, default)
+
+    def _has(self, key: str) -> np.ndarray:
+        return self._columns[key][1] if key in self._columns else ~self._all
+
+    def _assemble(self, panel: OHLCVPanel) -> Dict[str, Dict]:
+        results = {}
+        columns = [(key, values.tolist(), mask) for key, (values, mask) in self._columns.items()]
+        for j, symbol in enumerate(panel.symbols):
+            if panel.lengths[j] < self.min_history:
+                results[symbol] = {}
+                continue
+            results[symbol] = {key: values[j] for key, values, mask in columns if mask[j]}
+        return results
+
+    # -- shared intermediates ----------------------------------------------
+
+    def _shared_intermediates(self, panel: OHLCVPanel) -> Dict[str, np.ndarray]:
+        close, high, low = panel.close, panel.high, panel.low
+        valid = ~np.isnan(close)
+        prev_close = _shift(close)
+        true_range = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+        typical_price = (high + low + close) / 3
+        delta = close - prev_close
+        return {
+            'valid': valid,
+            'delta': delta,
+            # diff() leaves NaN on the first bar; where() comparisons treat it as 0
+            'delta_filled': np.where(valid, np.nan_to_num(delta), np.nan),
+            'returns': close / prev_close - 1,
+            'true_range': true_range,
+            'typical_price': typical_price,
+            'sma_20': _rolling_mean(close, 20),
+        }
+
+    # -- indicator families ------------------------------------------------
+
+    def _moving_averages(self, panel, shared):
+        close, n = panel.close, self._n
+        last = close[-1]
+        for period in [5, 10, 20, 50, 100, 200]:
+            mask = n >= period
+            sma = (shared['sma_20'] if period == 20 else _rolling_mean(close, period))[-1]
+            self._put(f'sma_{period}', sma, mask)
+            self._put(f'price_vs_sma_{period}', (last - sma) / sma * 100, mask, 2)
+
+        for period in [12, 26, 50]:
+            ema = _ema(close, period)
+            shared[f'ema_{period}'] = ema
+            self._put(f'ema_{period}', ema[-1], n >= period)
+
+        cross = self._has('sma_50') & self._has('sma_200')
+        self._put('golden_cross', self._get('sma_50') > self._get('sma_200'), cross)
+        self._put('death_cross', self._get('sma_50') < self._get('sma_200'), cross)
+        for period in [20, 50, 200]:
+            self._put(f'above_sma_{period}', last > self._get(f'sma_{period}'), self._has(f'sma_{period}'))
+
+    def _trend_indicators(self, panel, shared):
+        close, high, low, n = panel.close, panel.high, panel.low, self._n
+
+        # ADX
+        period = 14
+        plus_dm = np.where(shared['valid'], np.nan_to_num(high - _shift(high)), np.nan)
+        minus_dm = np.where(shared['valid'], np.nan_to_num(_shift(low) - low), np.nan)
+        plus_dm = np.where((plus_dm > minus_dm) & (plus_dm > 0), plus_dm, np.where(shared['valid'], 0.0, np.nan))
+        minus_dm = np.where((minus_dm > plus_dm) & (minus_dm > 0), minus_dm, np.where(shared['valid'], 0.0, np.nan))
+        atr = _rolling_mean(shared['true_range'], period)
+        plus_di = 100 * (_rolling_mean(plus_dm, period) / atr)
+        minus_di = 100 * (_rolling_mean(minus_dm, period) / atr)
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+        adx = _rolling_mean(dx, period)[-1]
+        mask = n >= period + 1
+        self._put('adx', adx, mask, 2)
+        self._put('plus_di', plus_di[-1], mask, 2)
+        self._put('minus_di', minus_di[-1], mask, 2)
+        adx = self._get('adx')
+        self._put('trend_strength', np.where(adx > 25, 'strong', np.where(adx > 20, 'moderate', 'weak')), mask)
+
+        # Parabolic SAR (simplified, as in the per-symbol path)
+        mask = n >= 10
+        recent_high = np.nanmax(high[-10:], axis=0)
+        recent_low = np.nanmin(low[-10:], axis=0)
+        bullish = close[-1] > recent_low
+        sar = np.where(bullish, recent_low, recent_high)
+        self._put('parabolic_sar', sar, mask, 2)
+        self._put('sar_trend', np.where(bullish, 'bullish', 'bearish'), mask)
+        self._put('price_above_sar', close[-1] > sar, mask)
+
+        # Ichimoku
+        mask = n >= 52
+        tenkan = (_rolling_max(high, 9) + _rolling_min(low, 9)) / 2
+        kijun = (_rolling_max(high, 26) + _rolling_min(low, 26)) / 2
+        span_a = np.round((tenkan[-1] + kijun[-1]) / 2, 2)
+        span_b = np.round((_rolling_max(high, 52)[-1] + _rolling_min(low, 52)[-1]) / 2, 2)
+        self._put('tenkan_sen', tenkan[-1], mask, 2)
+        self._put('kijun_sen', kijun[-1], mask, 2)
+        self._put('senkou_span_a', span_a, mask)
+        self._put('senkou_span_b', span_b, mask)
+        cloud_top, cloud_bottom = np.maximum(span_a, span_b), np.minimum(span_a, span_b)
+        self._put('ichimoku_signal', np.where(close[-1] > cloud_top, 'above_cloud',
+                                              np.where(close[-1] < cloud_bottom, 'below_cloud', 'in_cloud')), mask)
+        self._put('tk_cross_bullish', (tenkan[-1] > kijun[-1]) & (tenkan[-2] <= kijun[-2]), mask)
+        self._put('tk_cross_bearish', (tenkan[-1] < kijun[-1]) & (tenkan[-2] >= kijun[-2]), mask)
+
+        # Trend strength score
+        sma_20 = shared['sma_20']
+        score = np.zeros(len(n), dtype=int)
+        has_20 = n >= 20
+        score += np.where(has_20 & (close[-1] > sma_20[-1]), 2, 0)
+        score += np.where(has_20 & (sma_20[-1] > sma_20[-5]), 1, 0)
+        score -= np.where(has_20 & (sma_20[-1] < sma_20[-5]), 1, 0)
+
+        recent = np.nanmax(high[-10:], axis=0)
+        first_high = high[np.clip(high.shape[0] - n, 0, high.shape[0] - 1), np.arange(len(n))]
+        previous = np.where(has_20, np.nanmax(high[-20:-10], axis=0) if high.shape[0] >= 20 else np.nan, first_high)
+        has_10 = n >= 10
+        score += np.where(has_10 & (recent > previous), 1, 0)
+        score -= np.where(has_10 & (recent < previous), 1, 0)
+
+        self._put('trend_strength_score', score)
+        self._put('trend_direction', np.select(
+            [score >= 3, score >= 1, score <= -3, score <= -1],
+            ['strong_uptrend', 'uptrend', 'strong_downtrend', 'downtrend'], 'sideways'))
+
+    def _momentum_indicators(self, panel, shared):
+        close, high, low, n = panel.close, panel.high, panel.low, self._n
+
+        # RSI
+        delta = shared['delta_filled']
+        gain = np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0))
+        loss = np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0))
+        rs = _rolling_mean(gain, 14)[-1] / (_rolling_mean(loss, 14)[-1] + 1e-10)
+        mask = n >= 15
+        self._put('rsi_14', 100 - (100 / (1 + rs)), mask)
+        self._put('rsi_signal', _signal(self._get('rsi_14'), 30, 70), mask)
+
+        # Stochastic
+        lowest_low, highest_high = _rolling_min(low, 14), _rolling_max(high, 14)
+        shared['lowest_low_14'], shared['highest_high_14'] = lowest_low, highest_high
+        k_percent = 100 * ((close - lowest_low) / (highest_high - lowest_low))
+        mask = n >= 14
+        self._put('stoch_k', k_percent[-1], mask)
+        self._put('stoch_d', _rolling_mean(k_percent, 3)[-1], mask)
+        self._put('stoch_signal', _signal(self._get('stoch_k'), 20, 80), mask)
+
+        # MACD
+        macd_line = shared['ema_12'] - shared['ema_26']
+        signal_line = _ema(macd_line, 9)
+        mask = n >= 26
+        self._put('macd', macd_line[-1], mask)
+        self._put('macd_signal', signal_line[-1], mask)
+        self._put('macd_histogram', macd_line[-1] - signal_line[-1], mask)
+        self._put('macd_bullish', macd_line[-1] > signal_line[-1], mask)
+
+        # Rate of change
+        for period in [5, 10, 20]:
+            if close.shape[0] > period:
+                base = close[-period - 1]
+                self._put(f'roc_{period}', (close[-1] - base) / base * 100, n > period, 2)
+
+        # Williams %R
+        williams = -100 * ((highest_high[-1] - close[-1]) / (highest_high[-1] - lowest_low[-1]))
+        self._put('williams_r', williams, n >= 14, 2)
+
+    def _volatility_indicators(self, panel, shared):
+        close, high, low, n = panel.close, panel.high, panel.low, self._n
+
+        # ATR
+        mask = n >= 15
+        for period in [14, 21]:
+            self._put(f'atr_{period}', _rolling_mean(shared['true_range'], period)[-1], mask)
+        self._put('atr_volatility_pct', self._get('atr_14') / close[-1] * 100, mask, 2)
+
+        # Bollinger Bands
+        mask = n >= 20
+        sma_20 = shared['sma_20'][-1]
+        std_20 = _rolling_std(close, 20)[-1]
+        bb_upper, bb_lower = sma_20 + std_20 * 2, sma_20 - std_20 * 2
+        bb_width = (bb_upper - bb_lower) / sma_20 * 100
+        self._put('bb_upper', bb_upper, mask)
+        self._put('bb_middle', sma_20, mask)
+        self._put('bb_lower', bb_lower, mask)
+        self._put('bb_position', (close[-1] - bb_lower) / (bb_upper - bb_lower) * 100, mask, 1)
+        self._put('bb_width', bb_width, mask, 2)
+        self._put('bb_squeeze', np.round(bb_width, 2) < 10, mask)
+
+        # Historical volatility and regimes
+        mask = n >= 21
+        hist_vol = np.round(_rolling_std(shared['returns'], 20)[-1] * np.sqrt(252) * 100, 2)
+        self._put('historical_volatility_20', hist_vol, mask)
+        atr_volatility = np.where(self._has('atr_volatility_pct'), self._get('atr_volatility_pct'), 2.5)
+        self._put('volatility_regime', np.where(atr_volatility < 1.5, 'low',
+                                                np.where(atr_volatility <= 3.0, 'medium', 'high')), mask)
+        self._put('hist_vol_regime', np.where(hist_vol < 15, 'low',
+                                              np.where(hist_vol > 35, 'high', 'medium')), mask)
+
+        daily_range = (high - low) / close * 100
+        self._put('avg_daily_range_pct', _rolling_mean(daily_range, 20)[-1], decimals=2)
+
+    def _volume_indicators(self, panel, shared):
+        close, volume, n = panel.close, panel.volume, self._n
+
+        for period in [10, 20, 50]:
+            vol_ma = _rolling_mean(volume, period)[-1]
+            mask = n >= period
+            self._put(f'volume_ma_{period}', vol_ma, mask)
+            self._put(f'volume_ratio_{period}', volume[-1] / vol_ma, mask, 2)
+
+        # On-Balance Volume
+        delta = shared['delta']
+        direction = np.where(delta > 0, volume, np.where(delta < 0, -volume, 0.0))
+        obv = np.cumsum(np.nan_to_num(direction), axis=0)
+        self._put('obv', obv[-1], n >= 2)
+        if obv.shape[0] >= 10:
+            self._put('obv_trend', np.where(obv[-1] - obv[-10] > 0, 'rising', 'falling'), n >= 10)
+            self._put('volume_roc_10', (volume[-1] - volume[-10]) / volume[-10] * 100, n >= 10, 2)
+
+        # Price-Volume Trend
+        self._put('pvt', np.nansum(shared['returns'] * volume, axis=0), n >= 2)
+
+        if 'volume_ma_20' in self._columns:
+            vol_ma_20 = self._get('volume_ma_20')
+            self._put('volume_classification', np.where(
+                volume[-1] > vol_ma_20 * 1.5, 'high',
+                np.where(volume[-1] < vol_ma_20 * 0.7, 'low', 'normal')), self._has('volume_ma_20'))
+
+    def _support_resistance(self, panel):
+        close, high, low, n = panel.close, panel.high, panel.low, self._n
+
+        pivot = (high[-1] + low[-1] + close[-1]) / 3
+        support_1 = np.round(2 * pivot - high[-1], 2)
+        resistance_1 = np.round(2 * pivot - low[-1], 2)
+        self._put('pivot_point', pivot, decimals=2)
+        self._put('resistance_1', resistance_1)
+        self._put('support_1', support_1)
+        self._put('resistance_2', pivot + (high[-1] - low[-1]), decimals=2)
+        self._put('support_2', pivot - (high[-1] - low[-1]), decimals=2)
+
+        for period in [20, 50]:
+            mask = n >= period
+            self._put(f'resistance_{period}d', _rolling_max(high, period)[-1], mask, 2)
+            self._put(f'support_{period}d', _rolling_min(low, period)[-1], mask, 2)
+
+        sr_range = resistance_1 - support_1
+        self._put('price_position_sr', (close[-1] - support_1) / sr_range * 100, sr_range > 0, 1)
+
+    def _chart_patterns(self, panel):
+        close, high, low, open_price, n = panel.close, panel.high, panel.low, panel.open, self._n
+        if close.shape[0] < 2:
+            return
+
+        mask = n >= 2
+        body_size = np.abs(close[-1] - open_price[-1])
+        total_range = high[-1] - low[-1]
+        self._put('doji_pattern', (total_range > 0) & (body_size / total_range < 0.1), mask)
+        upper_shadow = high[-1] - np.maximum(close[-1], open_price[-1])
+        lower_shadow = np.minimum(close[-1], open_price[-1]) - low[-1]
+        self._put('hammer_pattern', (lower_shadow > 2 * body_size) & (upper_shadow < body_size) & (total_range > 0), mask)
+
+        gap_up = low[-1] > high[-2]
+        gap_down = high[-1] < low[-2]
+        self._put('gap_up', gap_up, mask)
+        self._put('gap_down', gap_down, mask)
+        gap_size = np.abs(close[-1] - close[-2]) / close[-2] * 100
+        self._put('gap_size_pct', gap_size, mask & (gap_up | gap_down), 2)
+
+        # Least-squares slope over the last 20 closes
+        if close.shape[0] >= 20:
+            y = close[-20:]
+            x = np.arange(20, dtype=float) - 9.5
+            slope = (x[:, None] * (y - y.mean(axis=0))).sum(axis=0) / (x ** 2).sum()
+            mask = n >= 20
+            self._put('trend_slope', slope, mask, 4)
+            self._put('trend_direction_simple', np.where(slope > 0, 'up', 'down'), mask)
+
+    def _strength_indicators(self, panel, shared):
+        close, volume, n = panel.close, panel.volume, self._n
+        typical_price = shared['typical_price']
+
+        # Money Flow Index
+        money_flow = typical_price * volume
+        prev_tp = _shift(typical_price)
+        zero = np.where(shared['valid'], 0.0, np.nan)
+        positive_flow = np.where(typical_price > prev_tp, money_flow, zero)
+        negative_flow = np.where(typical_price < prev_tp, money_flow, zero)
+        money_ratio = _rolling_sum(positive_flow, 14)[-1] / (_rolling_sum(negative_flow, 14)[-1] + 1e-10)
+        mask = n >= 15
+        self._put('mfi', 100 - (100 / (1 + money_ratio)), mask, 2)
+        self._put('mfi_signal', np.where(self._get('mfi') < 20, 'oversold',
+                                         np.where(self._get('mfi') > 80, 'overbought', 'neutral')), mask)
+
+        # Commodity Channel Index (mean absolute deviation over the same windows)
+        mask = n >= 20
+        cci = np.full(len(n), np.nan)
+        if typical_price.shape[0] >= 20:
+            window = typical_price[-20:]
+            mean_tp = window.mean(axis=0)
+            mad = np.abs(window - mean_tp).mean(axis=0)
+            cci = (typical_price[-1] - mean_tp) / (0.015 * mad)
+        self._put('cci', cci, mask, 2)
+        self._put('cci_signal', _signal(self._get('cci'), -100, 100), mask)
+
+        # Force Index
+        force_index = shared['delta'] * volume
+        self._put('force_index', _rolling_mean(force_index, 13)[-1], n >= 2, 0)
+
+    def _daily_momentum(self, panel, shared):
+        close, n = panel.close, self._n
+
+        for period in [1, 3, 5, 10, 20]:
+            if close.shape[0] > period:
+                base = close[-period - 1]
+                self._put(f'momentum_{period}d_pct', (close[-1] - base) / base * 100, n > period, 2)
+
+        if 'momentum_5d_pct' in self._columns:
+            mom_5d = self._get('momentum_5d_pct', 0.0)
+            mom_10d = self._get('momentum_10d_pct', 0.0) if 'momentum_10d_pct' in self._columns else 0.0
+            self._put('momentum_acceleration', mom_5d - (mom_10d / 2), n >= 10, 2)
+
+        # Run of down days ending today, then whether the bar before it was up
+        if close.shape[0] >= 10:
+            recent = shared['returns'][-10:][::-1]
+            down_days = np.cumprod(recent < 0, axis=0).sum(axis=0)
+            stop_index = np.minimum(down_days, 9)
+            stop_return = recent[stop_index, np.arange(recent.shape[1])]
+            up_days = ((down_days < 10) & (stop_return > 0)).astype(int)
+            mask = n >= 10
+            self._put('consecutive_up_days', up_days, mask)
+            self._put('consecutive_down_days', down_days, mask)
+
+    def _risk_metrics(self, panel, shared):
+        close, n = panel.close, self._n
+        if close.shape[0] < 21:
+            return
+
+        returns = shared['returns']
+        last_20 = returns[-20:]
+        mask = n >= 21
+        self._put('var_95_1d', np.percentile(last_20, 5, axis=0) * 100, mask, 2)
+
+        # Drawdown against a 50-day running peak (min_periods=1)
+        padded = np.vstack([np.full((49, close.shape[1]), np.nan), close])
+        windows = sliding_window_view(padded, 50, axis=0)
+        peak = np.where(np.isnan(windows).all(axis=-1), np.nan,
+                        np.nanmax(np.where(np.isnan(windows), -np.inf, windows), axis=-1))
+        drawdown = (close - peak) / peak * 100
+        self._put('max_drawdown_50d', np.nanmin(drawdown, axis=0), n >= 50, 2)
+
+        mean_20 = last_20.mean(axis=0)
+        std_20 = last_20.std(axis=0, ddof=1)
+        self._put('sharpe_ratio_20d', mean_20 / std_20 * np.sqrt(252), mask & (std_20 > 0), 2)
+
+        count, _, downside_std = _masked_stats(returns, returns < 0)
+        self._put('downside_deviation', downside_std * np.sqrt(252) * 100, mask & (count > 0), 2)
+
+    def _market_microstructure(self, panel, shared):
+        close, volume = panel.close, panel.volume
+        valid = shared['valid']
+
+        total_volume = np.nansum(volume, axis=0)
+        vwap = np.nansum(close * volume, axis=0) / total_volume
+        avg_price = np.nanmean(close, axis=0)
+        price_changes = np.abs(shared['returns'])
+        volume_changes = np.abs(volume / _shift(volume) - 1)
+        price_volume_corr = _pairwise_corr(price_changes, volume_changes)
+
+        _, _, price_volatility = _masked_stats(shared['returns'], np.isfinite(shared['returns']))
+        avg_volume = np.nanmean(np.where(valid, volume, np.nan), axis=0)
+        liquidity_ratio = np.where(price_volatility > 0, avg_volume / (price_volatility * 1000000), 1.0)
+
+        self._put('bid_ask_spread', np.where(avg_price > 0, np.abs(vwap - avg_price) / avg_price, 0.0))
+        self._put('market_impact', np.where(np.isnan(price_volume_corr), 0.0, price_volume_corr))
+        self._put('liquidity_ratio', np.minimum(liquidity_ratio, 10.0))
+
+    def _temporal_patterns(self, panel, shared):
+        n = self._n
+        returns = shared['returns']
+        valid_dates = ~np.isnat(panel.dates)
+        day_of_week = np.where(valid_dates, (panel.dates.astype('datetime64[D]').astype(np.int64) + 3) % 7, -1)
+
+        mask = n >= 30
+        for key, day in [('monday_effect', 0), ('friday_effect', 4)]:
+            on_day = day_of_week == day
+            count, mean, _ = _masked_stats(returns, on_day & np.isfinite(returns))
+            mean = np.where(on_day.any(axis=0), mean, 0.0)
+            self._put(key, mean * 100, mask, 3)
+
+        months = np.where(valid_dates, panel.dates.astype('datetime64[M]').astype(np.int64) % 12 + 1, -1)
+        in_month = months == datetime.now().month
+        _, month_mean, _ = _masked_stats(returns, in_month & np.isfinite(returns))
+        month_mean = np.where(in_month.any(axis=0), month_mean, 0.0)
+        self._put('current_month_avg_return', month_mean * 100, n >= 90, 3)
+
+        returns_vol = _rolling_std(returns, 5)
+        persistence = _pairwise_corr(returns_vol, _shift(returns_vol))
+        self._put('volatility_clustering', np.where(np.isnan(persistence), 0.0, np.round(persistence, 3)), mask)
+
+    def _market_regime(self):
+        count = len(self._all)
+        self._put('market_fear_index', np.full(count, 'medium'))
+        self._put('market_regime', np.full(count, 'normal'))
+        self._put('sector_rotation_phase', np.full(count, 'mid_cycle'))
+        self._put('liquidity_conditions', np.full(count, 'normal'))
+
+
+def calculate_batch_indicators(frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+    """Convenience wrapper: per-symbol OHLCV frames in, per-symbol indicator dicts out"""
+    return BatchIndicatorEngine().compute(build_panel(frames))
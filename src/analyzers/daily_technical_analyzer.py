@@ -5,13 +5,14 @@ Enhanced technical analysis using daily OHLC data instead of intraday data
 for more stable and reliable indicators suitable for longer timeframes.
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import warnings
+
+from src.data.ohlcv_store import ohlcv_store
 warnings.filterwarnings('ignore')
 
 # Import talib if available, otherwise mock it
@@ -35,7 +36,7 @@ class DailyTechnicalAnalyzer:
         self.cache_expiry = timedelta(hours=6)  # Cache daily data for 6 hours
 
     def fetch_daily_ohlc_data(self, symbol: str, period: str = "1y") -> Optional[pd.DataFrame]:
-        """Fetch daily OHLC data from Yahoo Finance"""
+        """Fetch daily OHLC data from the local OHLCV store (topped up from Yahoo Finance)"""
         try:
             cache_key = f"{symbol}_{period}"
             now = datetime.now()
@@ -47,12 +48,8 @@ class DailyTechnicalAnalyzer:
                     logger.debug(f"Using cached daily data for {symbol}")
                     return cached_data
 
-            # Fetch fresh data
-            ticker = f"{symbol}.NS"
-            stock = yf.Ticker(ticker)
-
-            # Get daily OHLC data
-            hist_data = stock.history(period=period, interval="1d")
+            # Read from the store; only bars missing since the last refresh hit the network
+            hist_data = ohlcv_store.get_history(symbol, period)
 
             if hist_data is None or hist_data.empty:
                 logger.warning(f"No daily OHLC data found for {symbol}")
@@ -75,6 +72,55 @@ class DailyTechnicalAnalyzer:
             logger.error(f"Error fetching daily OHLC data for {symbol}: {str(e)}")
             return None
 
+    def fetch_daily_ohlc_batch(self, symbols: List[str], period: str = "1y") -> Dict[str, pd.DataFrame]:
+        """Fetch daily OHLC data for many symbols with one multi-ticker download"""
+        now = datetime.now()
+        frames = {}
+        missing = []
+
+        for symbol in symbols:
+            cache_key = f"{symbol}_{period}"
+            if cache_key in self.cache and now - self.cache[cache_key][1] < self.cache_expiry:
+                frames[symbol] = self.cache[cache_key][0]
+            else:
+                missing.append(symbol)
+
+        if not missing:
+            return frames
+
+        try:
+            # One multi-ticker request for the missing bars, then local reads
+            ohlcv_store.refresh(missing)
+
+            for symbol in missing:
+                hist_data = ohlcv_store.get_history(symbol, period, refresh=False).dropna()
+
+                if len(hist_data) < 50:
+                    logger.warning(f"Insufficient daily data for {symbol}: {len(hist_data)} days")
+                    continue
+
+                self.cache[f"{symbol}_{period}"] = (hist_data.copy(), now)
+                frames[symbol] = hist_data
+
+            logger.info(f"Fetched daily OHLC data for {len(frames)}/{len(symbols)} symbols in one batch")
+
+        except Exception as e:
+            logger.error(f"Error fetching batch daily OHLC data: {str(e)}")
+
+        return frames
+
+    def calculate_batch_technical_indicators(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Calculate daily technical indicators for many symbols in one vectorized pass"""
+        try:
+            from src.analyzers.batch_indicators import calculate_batch_indicators
+
+            frames = self.fetch_daily_ohlc_batch(symbols)
+            return calculate_batch_indicators(frames)
+
+        except Exception as e:
+            logger.error(f"Error calculating batch technical indicators: {str(e)}")
+            return {}
+
     def calculate_daily_technical_indicators(self, symbol: str) -> Dict:
         """Calculate comprehensive technical indicators using daily OHLC data"""
         try:
@@ -855,19 +901,19 @@ class DailyTechnicalAnalyzer:
         """Calculate advanced market microstructure metrics"""
         try:
             # Calculate basic microstructure metrics
-            volume_weighted_price = (data['close'] * data['volume']).sum() / data['volume'].sum()
-            avg_price = data['close'].mean()
+            volume_weighted_price = (data['Close'] * data['Volume']).sum() / data['Volume'].sum()
+            avg_price = data['Close'].mean()
 
             # Price impact approximation
-            price_changes = data['close'].pct_change().abs()
-            volume_changes = data['volume'].pct_change().abs()
+            price_changes = data['Close'].pct_change().abs()
+            volume_changes = data['Volume'].pct_change().abs()
 
             # Correlation between price and volume changes
             price_volume_corr = price_changes.corr(volume_changes) if len(price_changes) > 1 else 0
 
             # Liquidity ratio (volume relative to price volatility)
-            price_volatility = data['close'].pct_change().std()
-            avg_volume = data['volume'].mean()
+            price_volatility = data['Close'].pct_change().std()
+            avg_volume = data['Volume'].mean()
             liquidity_ratio = avg_volume / (price_volatility * 1000000) if price_volatility > 0 else 1.0
 
             return {
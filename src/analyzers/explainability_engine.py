@@ -19,17 +19,17 @@ from typing import Dict, List, Optional, Any, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
-# Try to import SHAP, fallback to custom implementation if not available
-try:
-    import shap
-    SHAP_AVAILABLE = True
-except ImportError:
-    SHAP_AVAILABLE = False
-    logger = logging.getLogger(__name__)
-    logger.warning("SHAP not available, using fallback explainability methods")
+from src.common_repository.utils.lazy_import import is_available, lazy_import
 
 logger = logging.getLogger(__name__)
 
+# SHAP is only imported when a prediction is first explained; fall back to
+# custom explainability if it is not installed
+SHAP_AVAILABLE = is_available('shap')
+shap = lazy_import('shap')
+if not SHAP_AVAILABLE:
+    logger.warning("SHAP not available, using fallback explainability methods")
+
 class ExplainabilityEngine:
     def __init__(self):
         self.explanations_path = "data/tracking/explanations.json"
@@ -10,7 +10,9 @@ import requests
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import yfinance as yf
+from src.common_repository.utils.lazy_import import lazy_import
+
+yf = lazy_import('yfinance')
 
 logger = logging.getLogger(__name__)
 
@@ -0,0 +1,121 @@
+"""
+Concurrent Screening Pipeline
+
+Fetches fundamentals and technicals for many symbols at once:
+1. Bounded worker pool per data source (screener.in, Yahoo Finance)
+2. Per-host token buckets instead of fixed sleeps between symbols
+3. Fundamentals and technicals for a symbol fetched in parallel
+4. Technicals computed for the whole universe in one batch where supported
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.analyzers.fundamentals import with_price_ratios
+from src.common_repository.config.runtime import (
+    SCREENER_FUNDAMENTAL_WORKERS, SCREENER_TECHNICAL_WORKERS, SCREENER_RUN_TIMEOUT_SEC
+)
+from src.common_repository.utils.network import host_rate_limiter
+from src.common_repository.utils.telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+TECHNICALS_HOST = 'query1.finance.yahoo.com'
+
+
+class ScreeningPipeline:
+    """Runs a screener's per-symbol fetches across bounded, rate-aware pools"""
+
+    def __init__(self, screener, fundamental_workers: Optional[int] = None,
+                 technical_workers: Optional[int] = None, limiter=None,
+                 run_timeout: Optional[float] = None):
+        self.screener = screener
+        self.fundamental_workers = fundamental_workers or SCREENER_FUNDAMENTAL_WORKERS
+        self.technical_workers = technical_workers or SCREENER_TECHNICAL_WORKERS
+        self.limiter = limiter or host_rate_limiter
+        self.run_timeout = run_timeout if run_timeout is not None else SCREENER_RUN_TIMEOUT_SEC
+
+    def _rate_limited(self, host: str, func: Callable, symbol: str):
+        """Wait for a request slot on host, then call func(symbol)"""
+        if not self.limiter.acquire(host, timeout=self.run_timeout):
+            logger.warning(f"Rate limit slot unavailable for {symbol} on {host}")
+            return {}
+        return func(symbol)
+
+    def _collect(self, future: Future, symbol: str, kind: str, deadline: float) -> Dict:
+        try:
+            return future.result(timeout=max(deadline - time.time(), 0)) or {}
+        except FutureTimeout:
+            logger.warning(f"Timed out fetching {kind} for {symbol}")
+            telemetry.increment('screener.timeouts')
+        except Exception as e:
+            logger.error(f"Error fetching {kind} for {symbol}: {str(e)}")
+            telemetry.increment('screener.errors')
+        return {}
+
+    def run(self, symbols: Iterable[str],
+            bulk_deal_symbols: Iterable[str] = ()) -> Dict[str, Dict]:
+        """Screen symbols concurrently; returns {symbol: {fundamentals, technical, bulk_deals}}"""
+        symbols: List[str] = list(dict.fromkeys(symbols))
+        bulk_deal_symbols = set(bulk_deal_symbols)
+        start = time.time()
+        deadline = start + self.run_timeout
+
+        fundamentals_pool = ThreadPoolExecutor(max_workers=self.fundamental_workers,
+                                               thread_name_prefix='screen-fund')
+        technicals_pool = ThreadPoolExecutor(max_workers=self.technical_workers,
+                                             thread_name_prefix='screen-tech')
+        stocks_data = {}
+
+        try:
+            fundamentals_futures = {
+                # screener.in requests are throttled per host by the shared HTTP transport
+                symbol: fundamentals_pool.submit(self.screener.scrape_screener_data, symbol)
+                for symbol in symbols
+            }
+
+            # One vectorized pass over the universe when the screener supports it;
+            # it runs alongside the fundamentals pool
+            technicals = {}
+            batch_technicals = getattr(self.screener, 'calculate_batch_technical_indicators', None)
+            if batch_technicals is not None and symbols:
+                batch_future = technicals_pool.submit(self._rate_limited, TECHNICALS_HOST,
+                                                      batch_technicals, symbols)
+                technicals = self._collect(batch_future, f"{len(symbols)} symbols",
+                                           'batch technicals', deadline)
+
+            technicals_futures = {
+                symbol: technicals_pool.submit(self._rate_limited, TECHNICALS_HOST,
+                                               self.screener.calculate_enhanced_technical_indicators,
+                                               symbol)
+                for symbol in symbols if not technicals.get(symbol)
+            }
+
+            for i, symbol in enumerate(symbols):
+                fundamentals = self._collect(fundamentals_futures[symbol], symbol,
+                                             'fundamentals', deadline)
+                technical = technicals.get(symbol) or self._collect(
+                    technicals_futures[symbol], symbol, 'technicals', deadline)
+
+                if fundamentals or technical:
+                    # P/E from this run's price over the stored EPS, not the price when the page was fetched
+                    fundamentals = with_price_ratios(fundamentals, technical.get('current_price'))
+                    stocks_data[symbol] = {
+                        'fundamentals': fundamentals,
+                        'technical': technical,
+                        'bulk_deals': symbol in bulk_deal_symbols
+                    }
+                    logger.info(f"✅ {symbol}: Got data ({i+1}/{len(symbols)})")
+                else:
+                    logger.warning(f"⚠️ {symbol}: No data available")
+        finally:
+            fundamentals_pool.shutdown(wait=False, cancel_futures=True)
+            technicals_pool.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.time() - start
+        telemetry.record_histogram('screener.run_sec', elapsed)
+        telemetry.set_gauge('screener.symbols_screened', len(stocks_data))
+        logger.info(f"Screened {len(stocks_data)}/{len(symbols)} symbols in {elapsed:.1f}s")
+        return stocks_data
@@ -1,16 +1,36 @@
 import logging
-import yfinance as yf
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 import json
 import os
 import time
 import random # Added for sentiment boost in confidence calculation
 
+from src.common_repository.config.runtime import OPTIONS_STRATEGY_UNIVERSE, OPTIONS_STRATEGY_CHUNK_SIZE
+from src.common_repository.utils.lazy_import import lazy_import
+from src.common_repository.utils.network import host_rate_limiter, track_upstream
+from src.common_repository.utils.telemetry import telemetry
+from src.data.ohlcv_store import ohlcv_store, default_ticker, extract_ticker_frame, period_start
+from src.options.pricing import black_scholes
+
+yf = lazy_import('yfinance')
+
 logger = logging.getLogger(__name__)
 
+YAHOO_HOST = 'query1.finance.yahoo.com'
+RISK_FREE_RATE = 0.065  # 6.5% risk-free rate (India)
+
+# Timeframe -> (OTM distance of both strikes, days to expiry)
+TIMEFRAME_PARAMS = {
+    '5D': (0.025, 5),
+    '10D': (0.035, 10),
+    '30D': (0.05, 30),
+}
+TIMEFRAMES = tuple(TIMEFRAME_PARAMS)
+
 class ShortStrangleEngine:
     """Engine for generating short strangle options strategies with real-time data"""
 
@@ -75,40 +95,127 @@ class ShortStrangleEngine:
         }
 
 
-    def generate_strategies(self, timeframe='30D', force_refresh=False):
-        """Generate short strangle strategies for tier 1 stocks with real-time data"""
-        try:
-            logger.info(f"🔄 Generating real-time options strategies for {timeframe}, force_refresh={force_refresh}")
-
-            tier_1_stocks = ['RELIANCE', 'HDFCBANK', 'TCS', 'ITC', 'INFY', 'HINDUNILVR']
-            strategies = []
+    def fno_universe(self) -> List[str]:
+        """Symbols to generate strategies for: configured universe, else every known lot size"""
+        return list(OPTIONS_STRATEGY_UNIVERSE or self.nse_lot_sizes)
 
-            for symbol in tier_1_stocks:
-                try:
-                    logger.info(f"📡 Fetching real-time data for {symbol}")
-                    strategy = self._generate_strategy_for_stock(symbol, timeframe, force_refresh=True)
-                    if strategy and strategy.get('current_price', 0) > 0:
-                        strategies.append(strategy)
-                        logger.info(f"✅ Generated strategy for {symbol}: ROI={strategy['expected_roi']:.1f}%")
-                    else:
-                        logger.warning(f"⚠️ No valid strategy generated for {symbol}")
-                except Exception as e:
-                    logger.error(f"❌ Error generating strategy for {symbol}: {e}")
-                    continue
+    def generate_strategies(self, timeframe='30D', force_refresh=False, symbols=None):
+        """Generate short strangle strategies for a symbol list (default: F&O universe)"""
+        return self.generate_all_strategies(symbols, timeframes=(timeframe,)).get(timeframe, [])
 
-            logger.info(f"🎯 Generated {len(strategies)} total real-time strategies")
+    def generate_all_strategies(self, symbols=None, timeframes=TIMEFRAMES) -> Dict[str, List[Dict]]:
+        """Generate and cache strategies for every timeframe from one market data fetch"""
+        try:
+            start = time.time()
+            strategies = {timeframe: [] for timeframe in timeframes}
+            for strategy in self.iter_strategies(symbols, timeframes):
+                strategies[strategy['timeframe']].append(strategy)
 
             # Always cache real-time results
-            if strategies:
-                cache_key = f"options_strategies_{timeframe}"
-                self._save_to_cache(cache_key, strategies)
-                logger.info(f"💾 Saved {len(strategies)} real-time strategies to cache")
-
+            for timeframe, timeframe_strategies in strategies.items():
+                if timeframe_strategies:
+                    self._save_to_cache(f"options_strategies_{timeframe}", timeframe_strategies)
+
+            elapsed = time.time() - start
+            telemetry.record_histogram('options.strategy_generation_sec', elapsed)
+            logger.info(f"🎯 Generated {sum(len(v) for v in strategies.values())} strategies "
+                        f"across {len(strategies)} timeframes in {elapsed:.1f}s")
             return strategies
 
         except Exception as e:
             logger.error(f"❌ Error generating options strategies: {e}")
-            return []
+            return {timeframe: [] for timeframe in timeframes}
+
+    def iter_strategies(self, symbols=None, timeframes=TIMEFRAMES, chunk_size=None) -> Iterator[Dict]:
+        """Stream strategies chunk by chunk
+
+        1. Batch-fetch spot and 60-day history once per symbol (shared by all timeframes)
+        2. Price every symbol x timeframe x leg of a chunk in one Black-Scholes call
+        3. Yield each chunk's strategies while the next chunk is being fetched
+        """
+        symbols = list(dict.fromkeys(symbols or self.fno_universe()))
+        chunk_size = chunk_size or OPTIONS_STRATEGY_CHUNK_SIZE
+        chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+        if not chunks:
+            return
+
+        # One fetch in flight at a time: yfinance downloads are not safe to run concurrently
+        fetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='strangle-fetch')
+        try:
+            pending = fetcher.submit(self._fetch_market_data, chunks[0])
+            for i in range(len(chunks)):
+                try:
+                    chunk_symbols, spots, historical_vols = pending.result()
+                except Exception as e:
+                    logger.error(f"❌ Market data fetch failed for chunk {i + 1}/{len(chunks)}: {e}")
+                    chunk_symbols = []
+                if i + 1 < len(chunks):
+                    pending = fetcher.submit(self._fetch_market_data, chunks[i + 1])
+                if chunk_symbols:
+                    yield from self._compute_strangles(chunk_symbols, spots, historical_vols, timeframes)
+        finally:
+            fetcher.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_market_data(self, symbols):
+        """Spot price and historical volatility for a batch of symbols"""
+        ohlcv_store.refresh(symbols)
+        spots = self._fetch_spot_prices(symbols)
+
+        valid_symbols, prices, closes = [], [], []
+        history_start = period_start('60d')
+        for symbol in symbols:
+            close = ohlcv_store.read(symbol, start=history_start)['Close'].to_numpy()
+            spot = spots.get(symbol) or (float(close[-1]) if len(close) else None)
+            if not spot or spot <= 0:
+                logger.warning(f"⚠️ No valid price for {symbol}")
+                continue
+            valid_symbols.append(symbol)
+            prices.append(spot)
+            closes.append(close)
+
+        # Right-align histories in a NaN-padded matrix so volatility is one vectorized pass
+        width = max((len(close) for close in closes), default=0)
+        matrix = np.full((len(closes), width), np.nan)
+        for row, close in enumerate(closes):
+            if len(close):
+                matrix[row, width - len(close):] = close
+        return valid_symbols, np.array(prices, dtype=float), self._historical_volatility(matrix)
+
+    def _fetch_spot_prices(self, symbols) -> Dict[str, float]:
+        """Latest intraday price for many symbols in one multi-ticker request"""
+        tickers = [ohlcv_store.info(symbol).get('ticker') or default_ticker(symbol) for symbol in symbols]
+        if not host_rate_limiter.acquire(YAHOO_HOST, timeout=30):
+            logger.warning(f"Rate limit slot unavailable for {len(symbols)} spot prices")
+            return {}
+        try:
+            with track_upstream('yahoo'):
+                data = yf.download(tickers, period='1d', interval='5m', group_by='ticker',
+                                   auto_adjust=True, threads=True, progress=False)
+        except Exception as e:
+            logger.warning(f"⚠️ Spot price download failed for {len(symbols)} symbols: {e}")
+            return {}
+
+        spots = {}
+        for symbol, ticker in zip(symbols, tickers):
+            frame = extract_ticker_frame(data, ticker)
+            if frame is not None:
+                spots[symbol] = float(frame['Close'].iloc[-1])
+        return spots
+
+    def _historical_volatility(self, closes: np.ndarray) -> np.ndarray:
+        """Annualized volatility (%) per row of a NaN-padded close matrix; 25% with under 10 bars"""
+        closes = np.atleast_2d(np.asarray(closes, dtype=float))
+        if closes.shape[1] < 2:
+            return np.full(len(closes), 25.0)
+        returns = closes[:, 1:] / closes[:, :-1] - 1
+        observed = ~np.isnan(returns)
+        count = observed.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(observed, returns, 0.0).sum(axis=1) / count
+            deviations = np.where(observed, returns - mean[:, None], 0.0)
+            daily_vol = np.sqrt((deviations ** 2).sum(axis=1) / (count - 1))
+        annualized_vol = np.clip(daily_vol * np.sqrt(252) * 100, 10.0, 80.0)
+        return np.where((count >= 9) & np.isfinite(annualized_vol), annualized_vol, 25.0)
 
     def _get_current_price(self, stock, symbol_ns):
         """Get current price with multiple fallbacks"""
@@ -143,25 +250,16 @@ class ShortStrangleEngine:
     def _calculate_historical_volatility(self, stock, symbol):
         """Calculate historical volatility for the stock"""
         try:
-            # Get 60 days of historical data
-            hist = stock.history(period='60d')
+            # Get 60 days of historical data from the local store
+            hist = ohlcv_store.get_history(symbol, period='60d')
+            if hist.empty:
+                hist = stock.history(period='60d')
 
             if len(hist) < 10:
                 logger.warning(f"⚠️ Insufficient data for volatility calculation for {symbol}")
                 return 25.0  # Default volatility
 
-            # Calculate daily returns
-            returns = hist['Close'].pct_change().dropna()
-
-            if len(returns) < 5:
-                return 25.0
-
-            # Calculate annualized volatility
-            daily_vol = returns.std()
-            annualized_vol = daily_vol * np.sqrt(252) * 100  # Convert to percentage
-
-            # Clamp between reasonable bounds
-            volatility = max(10.0, min(80.0, annualized_vol))
+            volatility = float(self._historical_volatility(hist['Close'].to_numpy())[0])
 
             logger.info(f"📊 {symbol}: Historical volatility = {volatility:.1f}%")
             return volatility
@@ -173,149 +271,121 @@ class ShortStrangleEngine:
     def _calculate_strangle_strategy(self, symbol, current_price, timeframe, historical_vol):
         """Calculate short strangle strategy parameters with real data"""
         try:
-            # Strategy parameters based on timeframe
-            if timeframe == '5D':
-                otm_percent = 0.025  # 2.5% OTM
-                days_to_expiry = 5
-                risk_free_rate = 0.065  # 6.5% risk-free rate (India)
-            elif timeframe == '10D':
-                otm_percent = 0.035  # 3.5% OTM
-                days_to_expiry = 10
-                risk_free_rate = 0.065
-            else:  # 30D
-                otm_percent = 0.05  # 5% OTM
-                days_to_expiry = 30
-                risk_free_rate = 0.065
-
-            # Calculate strikes
-            call_strike = current_price * (1 + otm_percent)
-            put_strike = current_price * (1 - otm_percent)
-
-            # Calculate implied volatility (typically higher than historical)
-            implied_vol = historical_vol * 1.15  # IV premium
-
-            # Calculate option premiums using simplified Black-Scholes
-            call_premium = self._calculate_option_premium(
-                current_price, call_strike, days_to_expiry, implied_vol, risk_free_rate, 'call'
-            )
-            put_premium = self._calculate_option_premium(
-                current_price, put_strike, days_to_expiry, implied_vol, risk_free_rate, 'put'
-            )
-
-            total_premium = call_premium + put_premium
-
-            # Calculate breakeven points
-            breakeven_upper = call_strike + total_premium
-            breakeven_lower = put_strike - total_premium
-            breakeven_range_pct = ((breakeven_upper - breakeven_lower) / current_price) * 100
-
-            # Calculate margin requirement (SPAN + Exposure margin for Indian markets)
-            margin_required = self._calculate_margin_requirement(
-                symbol, current_price, call_strike, put_strike, total_premium
-            )
-
-
-            # Get lot size for this symbol
-            lot_size = self.nse_lot_sizes.get(symbol, 100)
-
-            # Premium received per actual lot
-            premium_received = total_premium * lot_size
-
-            # Calculate monthly ROI (premium received / margin blocked)
-            monthly_roi = (premium_received / margin_required) * 100 if margin_required > 0 else 0
-
-            # Calculate annualized ROI
-            annual_factor = 365 / days_to_expiry
-            annualized_roi = monthly_roi * annual_factor
-
-            # Determine confidence and risk level based on real metrics
-            confidence = self._calculate_confidence_score(symbol, breakeven_range_pct, implied_vol, historical_vol)
-            risk_level, risk_color = self._determine_risk_level(monthly_roi, confidence, implied_vol)
-
-            strategy_data = {
-                'symbol': symbol,
-                'current_price': float(current_price),
-                'call_strike': float(call_strike),
-                'put_strike': float(put_strike),
-                'call_premium': float(call_premium),
-                'put_premium': float(put_premium),
-                'total_premium': float(total_premium),
-                'breakeven_upper': float(breakeven_upper),
-                'breakeven_lower': float(breakeven_lower),
-                'breakeven_range_pct': float(breakeven_range_pct),
-                'margin_required': float(margin_required),
-                'expected_roi': float(monthly_roi),
-                'annualized_roi': float(monthly_roi * 12),
-                'confidence': float(confidence),
-                'implied_volatility': float(implied_vol),
-                'historical_volatility': float(historical_vol),
-                'risk_level': risk_level,
-                'risk_color': 'success' if risk_level == 'Low' else 'warning' if risk_level == 'Moderate' else 'danger',
-                'days_to_expiry': days_to_expiry,
-                'timeframe': timeframe,
-                'lot_size': lot_size,  # Include lot size for reference
-                'contract_value': float(current_price * lot_size),  # Total contract value
-                'premium_per_lot': float(total_premium * lot_size),  # Premium for full lot
-                'last_updated': datetime.now().isoformat(),
-                'data_source': 'yahoo_finance_realtime'
-            }
-
-            return strategy_data
+            strategies = self._compute_strangles([symbol], np.array([float(current_price)]),
+                                                 np.array([float(historical_vol)]), (timeframe,))
+            return strategies[0] if strategies else None
 
         except Exception as e:
             logger.error(f"❌ Error calculating strategy for {symbol}: {e}")
             return None
 
+    def _compute_strangles(self, symbols, spots, historical_vols, timeframes) -> List[Dict]:
+        """Strangle parameters for every symbol x timeframe in one vectorized pass"""
+        params = [TIMEFRAME_PARAMS.get(timeframe, TIMEFRAME_PARAMS['30D']) for timeframe in timeframes]
+        otm_percent = np.array([otm for otm, _ in params])
+        days_to_expiry = np.array([days for _, days in params])
+
+        # Axes: symbol x timeframe x leg (call, put)
+        spot = np.asarray(spots, dtype=float)[:, None, None]
+        leg_sign = np.array([1.0, -1.0])
+        strikes = spot * (1 + otm_percent[None, :, None] * leg_sign)
+
+        # Implied volatility is typically higher than historical
+        implied_vol = np.asarray(historical_vols, dtype=float) * 1.15
+        premiums = black_scholes(spot, strikes, days_to_expiry[None, :, None] / 365.0, RISK_FREE_RATE,
+                                 implied_vol[:, None, None] / 100.0, np.array(['call', 'put']))['price']
+        # Min ₹5, Max 20% of spot
+        premiums = np.clip(premiums, 5.0, np.maximum(5.0, spot * 0.2))
+
+        call_strike, put_strike = strikes[..., 0], strikes[..., 1]
+        total_premium = premiums.sum(axis=2)
+        breakeven_upper = call_strike + total_premium
+        breakeven_lower = put_strike - total_premium
+        breakeven_range_pct = (breakeven_upper - breakeven_lower) / spot[..., 0] * 100
+
+        lot_sizes = np.array([self.nse_lot_sizes.get(symbol, 100) for symbol in symbols])[:, None]
+        margin_required = self._margin_requirements(spot[..., 0], lot_sizes, total_premium)
+        premium_received = total_premium * lot_sizes
+        monthly_roi = np.where(margin_required > 0, premium_received / margin_required * 100, 0.0)
+
+        last_updated = datetime.now().isoformat()
+        strategies = []
+        for i, symbol in enumerate(symbols):
+            current_price = float(spots[i])
+            for j, timeframe in enumerate(timeframes):
+                roi = float(monthly_roi[i, j])
+                confidence = self._calculate_confidence_score(symbol, breakeven_range_pct[i, j],
+                                                              implied_vol[i], historical_vols[i])
+                risk_level, _ = self._determine_risk_level(roi, confidence, implied_vol[i])
+                lot_size = int(lot_sizes[i, 0])
+
+                strategies.append({
+                    'symbol': symbol,
+                    'current_price': current_price,
+                    'call_strike': float(call_strike[i, j]),
+                    'put_strike': float(put_strike[i, j]),
+                    'call_premium': float(premiums[i, j, 0]),
+                    'put_premium': float(premiums[i, j, 1]),
+                    'total_premium': float(total_premium[i, j]),
+                    'breakeven_upper': float(breakeven_upper[i, j]),
+                    'breakeven_lower': float(breakeven_lower[i, j]),
+                    'breakeven_range_pct': float(breakeven_range_pct[i, j]),
+                    'margin_required': float(margin_required[i, j]),
+                    'expected_roi': roi,
+                    'annualized_roi': roi * 12,
+                    'confidence': float(confidence),
+                    'implied_volatility': float(implied_vol[i]),
+                    'historical_volatility': float(historical_vols[i]),
+                    'risk_level': risk_level,
+                    'risk_color': 'success' if risk_level == 'Low' else 'warning' if risk_level == 'Moderate' else 'danger',
+                    'days_to_expiry': int(days_to_expiry[j]),
+                    'timeframe': timeframe,
+                    'lot_size': lot_size,  # Include lot size for reference
+                    'contract_value': current_price * lot_size,  # Total contract value
+                    'premium_per_lot': float(premium_received[i, j]),  # Premium for full lot
+                    'last_updated': last_updated,
+                    'data_source': 'yahoo_finance_realtime'
+                })
+
+        return strategies
+
     def _calculate_option_premium(self, spot, strike, days_to_expiry, vol, risk_free_rate, option_type):
-        """Calculate option premium using simplified Black-Scholes model"""
-        try:
-            from scipy.stats import norm
-            import math
+        """Calculate option premium(s) with vectorized Black-Scholes
 
+        strike and option_type may be arrays to price several legs in one call.
+        """
+        try:
             # Convert inputs with validation
             S = float(spot)
-            K = float(strike)
+            K = np.asarray(strike, dtype=float)
             T = float(days_to_expiry) / 365.0
-            r = float(risk_free_rate)
             sigma = float(vol) / 100.0
 
             # Validate inputs
-            if S <= 0 or K <= 0:
-                logger.warning(f"Invalid price inputs: spot={S}, strike={K}")
-                return self._simplified_premium_calculation(spot, strike, days_to_expiry, vol, option_type)
-
-            # Handle edge cases
-            if T <= 0:
-                if option_type == 'call':
-                    return max(0, S - K)
-                else:
-                    return max(0, K - S)
-
-            # Black-Scholes calculation with error handling
-            try:
-                d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
-                d2 = d1 - sigma * math.sqrt(T)
-
-                if option_type == 'call':
-                    premium = S * norm.cdf(d1) - K * math.exp(-r * T) * norm.cdf(d2)
-                else:  # put
-                    premium = K * math.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
+            if S <= 0 or np.any(K <= 0):
+                logger.warning(f"Invalid price inputs: spot={S}, strike={strike}")
+                return self._fallback_premium(spot, strike, days_to_expiry, vol, option_type)
 
+            premium = black_scholes(S, K, T, float(risk_free_rate), sigma, option_type)['price']
+            if T > 0:
                 # Ensure minimum premium and reasonable bounds
-                premium = max(5.0, min(premium, S * 0.2))  # Min ₹5, Max 20% of spot
+                premium = np.clip(premium, 5.0, max(5.0, S * 0.2))  # Min ₹5, Max 20% of spot
 
-                return float(premium)
-            except (ValueError, OverflowError, ZeroDivisionError) as calc_error:
-                logger.warning(f"Calculation error in Black-Scholes: {calc_error}")
-                return self._simplified_premium_calculation(spot, strike, days_to_expiry, vol, option_type)
+            return premium.astype(float) if premium.ndim else float(premium)
 
-        except ImportError:
-            # Fallback calculation without scipy
-            logger.warning("scipy not available, using simplified premium calculation")
-            return self._simplified_premium_calculation(spot, strike, days_to_expiry, vol, option_type)
         except Exception as e:
             logger.warning(f"⚠️ Error in Black-Scholes calculation: {e}")
+            return self._fallback_premium(spot, strike, days_to_expiry, vol, option_type)
+
+    def _fallback_premium(self, spot, strike, days_to_expiry, vol, option_type):
+        """Simplified premium for one leg or an array of legs"""
+        if np.ndim(strike) == 0:
             return self._simplified_premium_calculation(spot, strike, days_to_expiry, vol, option_type)
+        option_types = np.broadcast_to(np.asarray(option_type), np.shape(strike))
+        return np.array([
+            self._simplified_premium_calculation(spot, float(k), days_to_expiry, vol, str(t))
+            for k, t in zip(np.ravel(strike), np.ravel(option_types))
+        ])
 
     def _simplified_premium_calculation(self, spot, strike, days_to_expiry, vol, option_type):
         """Simplified option premium calculation as fallback"""
@@ -356,50 +426,49 @@ class ShortStrangleEngine:
         """Calculate margin requirement for short strangle in Indian markets using SPAN + Exposure"""
         try:
             lot_size = self.nse_lot_sizes.get(symbol, 100) # Default to 100 if not found
+            final_margin = float(self._margin_requirements(spot_price, lot_size, total_premium))
 
-            # SPAN Margin approximation: Typically a percentage of the total notional value of the options.
-            # This percentage varies but can be approximated.
-            # A common rule of thumb is around 10-20% of the total premium * lot_size, or a percentage of underlying.
-            # Let's use a slightly more robust estimation based on underlying and strikes.
-            notional_value = spot_price * lot_size
-            span_margin_rate = 0.15  # Example: 15% of notional for SPAN
-            span_margin = notional_value * span_margin_rate
+            logger.info(f"📈 Margin Calc for {symbol} (Lot: {lot_size}): Notional={spot_price * lot_size:.2f}, Premium={total_premium * lot_size:.2f}, FinalMargin={final_margin:.2f}")
 
-            # Exposure Margin: Additional margin to cover adverse price movements.
-            # Typically 3-5% of the underlying value or premium.
-            exposure_margin_rate = 0.05 # Example: 5% of notional
-            exposure_margin = notional_value * exposure_margin_rate
+            return final_margin
 
-            # Total Margin = SPAN + Exposure - Premium Received (net of taxes/fees)
-            # For simplicity, we use the gross premium here.
-            premium_received_for_lot = total_premium * lot_size
+        except Exception as e:
+            logger.warning(f"⚠️ Error calculating margin for {symbol}: {e}")
+            # Fallback margin calculation (e.g., percentage of premium or notional)
+            lot_size = self.nse_lot_sizes.get(symbol, 100)
+            fallback_margin = max(spot_price * lot_size * 0.10, total_premium * lot_size * 3) # 10% of notional or 3x premium
+            return round(fallback_margin, 2)
 
-            # Ensure premium received is subtracted correctly and margin is not negative
-            total_margin = max(0, span_margin + exposure_margin - premium_received_for_lot)
+    def _margin_requirements(self, spot_price, lot_size, total_premium):
+        """SPAN + Exposure margin per lot; inputs may be broadcastable arrays"""
+        # SPAN Margin approximation: Typically a percentage of the total notional value of the options.
+        # This percentage varies but can be approximated.
+        notional_value = np.asarray(spot_price, dtype=float) * lot_size
+        span_margin_rate = 0.15  # Example: 15% of notional for SPAN
+        span_margin = notional_value * span_margin_rate
 
-            # Minimum Margin Rule: Ensure a minimum margin is always blocked.
-            # This is often a percentage of the premium or a fixed amount per lot.
-            # A common minimum is 10% of the underlying value or a fixed amount.
-            minimum_margin_rate = 0.10 # Example: 10% of notional
-            minimum_margin = notional_value * minimum_margin_rate
+        # Exposure Margin: Additional margin to cover adverse price movements.
+        # Typically 3-5% of the underlying value or premium.
+        exposure_margin_rate = 0.05 # Example: 5% of notional
+        exposure_margin = notional_value * exposure_margin_rate
 
-            # Final margin is the higher of calculated total margin or the minimum margin.
-            final_margin = max(minimum_margin, total_margin)
+        # Total Margin = SPAN + Exposure - Premium Received (net of taxes/fees)
+        # For simplicity, we use the gross premium here.
+        premium_received_for_lot = np.asarray(total_premium, dtype=float) * lot_size
 
-            # Add a small buffer for rounding and potential fluctuations
-            margin_buffer = final_margin * 0.02
-            final_margin += margin_buffer
+        # Ensure premium received is subtracted correctly and margin is not negative
+        total_margin = np.maximum(0, span_margin + exposure_margin - premium_received_for_lot)
 
-            logger.info(f"📈 Margin Calc for {symbol} (Lot: {lot_size}): Notional={notional_value:.2f}, SPAN={span_margin:.2f}, Exposure={exposure_margin:.2f}, Premium={premium_received_for_lot:.2f}, MinMargin={minimum_margin:.2f}, FinalMargin={final_margin:.2f}")
+        # Minimum Margin Rule: Ensure a minimum margin is always blocked.
+        # A common minimum is 10% of the underlying value or a fixed amount.
+        minimum_margin_rate = 0.10 # Example: 10% of notional
+        minimum_margin = notional_value * minimum_margin_rate
 
-            return round(final_margin, 2)
+        # Final margin is the higher of calculated total margin or the minimum margin,
+        # plus a small buffer for rounding and potential fluctuations
+        final_margin = np.maximum(minimum_margin, total_margin) * 1.02
 
-        except Exception as e:
-            logger.warning(f"⚠️ Error calculating margin for {symbol}: {e}")
-            # Fallback margin calculation (e.g., percentage of premium or notional)
-            lot_size = self.nse_lot_sizes.get(symbol, 100)
-            fallback_margin = max(spot_price * lot_size * 0.10, total_premium * lot_size * 3) # 10% of notional or 3x premium
-            return round(fallback_margin, 2)
+        return np.round(final_margin, 2)
 
     def _calculate_confidence_score(self, symbol, breakeven_range_pct, implied_vol, historical_vol):
         """Calculate confidence score based on real market metrics"""
@@ -488,198 +557,6 @@ class ShortStrangleEngine:
         except Exception as e:
             logger.error(f"❌ Error saving to cache: {e}")
 
-    def _generate_strategy_for_stock(self, symbol, timeframe, force_refresh=True):
-        """Generate strategy for a single stock with real-time data"""
-        try:
-            # Always get fresh data from yfinance
-            ticker = yf.Ticker(f"{symbol}.NS")
-
-            # Get current price with retries
-            attempts = 0
-            hist = None
-            while attempts < 3 and (hist is None or hist.empty):
-                try:
-                    hist = ticker.history(period="1d")
-                    if not hist.empty:
-                        break
-                except Exception as e:
-                    logger.warning(f"Attempt {attempts + 1} failed for {symbol}: {e}")
-                attempts += 1
-                time.sleep(1)
-
-            if hist is None or hist.empty:
-                logger.error(f"❌ No price data available for {symbol} after {attempts} attempts")
-                return None
-
-            current_price = float(hist['Close'].iloc[-1])
-            logger.info(f"💰 {symbol}: Current price = ₹{current_price:.2f}")
-
-            # Validate price data
-            if current_price <= 0:
-                logger.error(f"❌ Invalid price data for {symbol}: {current_price}")
-                return None
-
-            # Calculate volatility for the past 30 days
-            try:
-                hist_30d = ticker.history(period="30d")
-                if len(hist_30d) > 5:
-                    returns = hist_30d['Close'].pct_change().dropna()
-                    volatility = returns.std() * (252 ** 0.5) * 100  # Annualized volatility
-                else:
-                    volatility = 20.0  # Default volatility
-            except Exception as e:
-                logger.warning(f"⚠️ Volatility calculation failed for {symbol}: {e}")
-                volatility = 20.0
-
-            logger.info(f"📊 {symbol}: Historical volatility = {volatility:.1f}%")
-
-            # Calculate strikes (3-5% OTM)
-            otm_percent = 0.04  # 4% OTM
-            call_strike = current_price * (1 + otm_percent)
-            put_strike = current_price * (1 - otm_percent)
-
-            # Round strikes to nearest 50 for better liquidity
-            call_strike = round(call_strike / 50) * 50
-            put_strike = round(put_strike / 50) * 50
-
-            # Ensure strikes are valid
-            if call_strike <= current_price or put_strike >= current_price:
-                logger.warning(f"⚠️ Invalid strikes for {symbol}: call={call_strike}, put={put_strike}, current={current_price}")
-                call_strike = current_price * 1.05
-                put_strike = current_price * 0.95
-
-            # Estimate premiums based on volatility and time
-            time_to_expiry = 30 if '30D' in timeframe else 10 if '10D' in timeframe else 5
-
-            # Premium calculation (simplified Black-Scholes approximation)
-            call_premium = self._estimate_option_premium(current_price, call_strike, time_to_expiry, volatility, 'call')
-            put_premium = self._estimate_option_premium(current_price, put_strike, time_to_expiry, volatility, 'put')
-
-            total_premium = call_premium + put_premium
-
-            # Validate premiums
-            if total_premium <= 0:
-                logger.warning(f"⚠️ Invalid premiums for {symbol}: total={total_premium}")
-                return None
-
-            # Calculate breakeven points
-            breakeven_upper = call_strike + total_premium
-            breakeven_lower = put_strike - total_premium
-
-            # Calculate margin requirement for Indian markets (per lot basis)
-            # Use realistic SPAN + Exposure margin calculation
-            margin_required = self._calculate_margin_requirement(
-                symbol, current_price, call_strike, put_strike, total_premium
-            )
-
-            # Get actual lot size for this symbol
-            lot_size = self.nse_lot_sizes.get(symbol, 100)
-
-            # Premium received per actual lot
-            premium_received = total_premium * lot_size
-
-            # Calculate monthly ROI (premium received / margin blocked)
-            monthly_roi = (premium_received / margin_required) * 100 if margin_required > 0 else 0
-
-            # Risk assessment
-            price_range = breakeven_upper - breakeven_lower
-            risk_ratio = price_range / current_price
-
-            if risk_ratio > 0.15:  # >15% range
-                risk_level = "Low"
-            elif risk_ratio > 0.10:  # >10% range
-                risk_level = "Medium"
-            else:
-                risk_level = "High"
-
-            # Calculate dynamic confidence based on multiple factors
-            confidence = self._calculate_dynamic_confidence(symbol, monthly_roi, volatility)
-
-            # Calculate dynamic verdict based on ROI and confidence
-            verdict, verdict_reason = self._calculate_verdict(monthly_roi, confidence, risk_level)
-
-            strategy = {
-                'symbol': symbol,
-                'current_price': round(current_price, 2),
-                'call_strike': round(call_strike, 2),
-                'put_strike': round(put_strike, 2),
-                'call_premium': round(call_premium, 2),
-                'put_premium': round(put_premium, 2),
-                'total_premium': round(total_premium, 2),
-                'breakeven_upper': round(breakeven_upper, 2),
-                'breakeven_lower': round(breakeven_lower, 2),
-                'margin_required': round(margin_required, 2),
-                'expected_roi': round(monthly_roi, 2),  # Show monthly ROI for clarity
-                'confidence': round(confidence, 1),
-                'risk_level': risk_level,
-                'volatility': round(volatility, 1),
-                'time_to_expiry': time_to_expiry,
-                'timestamp': datetime.now().isoformat(),
-                'data_source': 'yahoo_finance_real_time',
-                'verdict': verdict,
-                "verdict_reason": verdict_reason,
-            }
-
-            # Final validation
-            if strategy['current_price'] <= 0 or strategy['total_premium'] <= 0:
-                logger.error(f"❌ Invalid strategy data for {symbol}")
-                return None
-
-            logger.info(f"✅ Generated strategy for {symbol}: Monthly ROI={monthly_roi:.1f}%, Confidence={confidence:.1f}%")
-            return strategy
-
-        except Exception as e:
-            logger.error(f"❌ Error generating strategy for {symbol}: {e}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            return None
-
-    def _estimate_option_premium(self, spot, strike, time_to_expiry, volatility, option_type):
-        """Placeholder for a more sophisticated option premium calculation if needed"""
-        # This is a simplified estimation, could be replaced with Black-Scholes
-        # For now, using a basic formula that scales with volatility and time
-        try:
-            if option_type == 'call':
-                intrinsic = max(0, spot - strike)
-                moneyness = strike / spot
-            else: # put
-                intrinsic = max(0, strike - spot)
-                moneyness = spot / strike
-
-            # Simplified time value
-            time_value = time_to_expiry / 365.0
-            vol_factor = volatility / 100.0
-
-            # Base time premium, influenced by volatility and time to expiry
-            time_premium = spot * vol_factor * np.sqrt(time_value) * 0.5
-
-            # Adjust time premium based on moneyness
-            if option_type == 'call':
-                if strike > spot: # OTM
-                    time_premium *= (1 + (strike - spot) / spot * 0.5) # Higher for further OTM
-                else: # ITM/ATM
-                    time_premium *= 0.8 # Lower for ITM/ATM
-            else: # put
-                if strike < spot: # OTM
-                    time_premium *= (1 + (spot - strike) / spot * 0.5) # Higher for further OTM
-                else: # ITM/ATM
-                    time_premium *= 0.8 # Lower for ITM/ATM
-
-            # Ensure time premium is not negative
-            time_premium = max(0, time_premium)
-
-            premium = intrinsic + time_premium
-
-            # Ensure a minimum premium and cap it to prevent unrealistic values
-            min_premium = max(5.0, spot * 0.01) # Min premium of 1% of spot or 5
-            max_premium = spot * 0.30 # Max premium of 30% of spot
-
-            return max(min_premium, min(premium, max_premium))
-
-        except Exception as e:
-            logger.warning(f"⚠️ Error in _estimate_option_premium for {option_type}: {e}")
-            return max(10.0, spot * 0.02) # Fallback
-
     def _save_to_cache(self, cache_key, data):
         """Saves data to the cache file"""
         try:
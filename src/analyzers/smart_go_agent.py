@@ -20,13 +20,13 @@ from collections import defaultdict
 
 # Import safe file utilities
 from src.utils.file_utils import load_json_safe, save_json_safe
+from src.common_repository.storage.json_store import json_store
 
 logger = logging.getLogger(__name__)
 
 class SmartGoAgent:
     def __init__(self):
         self.validation_data_path = "goahead_validation.json"
-        self.predictions_path = "interactive_tracking.json"
         self.model_kpi_path = "data/tracking/model_kpi.json"
         self.meta_logs_path = "logs/goahead"
 
@@ -84,14 +84,13 @@ class SmartGoAgent:
             logger.error(f"Error initializing model KPI: {str(e)}")
 
     def _load_prediction_data(self):
-        """Load prediction data from file"""
+        """Load prediction data from the interactive tracking record store"""
         try:
-            if os.path.exists(self.predictions_path):
-                with open(self.predictions_path, 'r') as f:
-                    return json.load(f)
-            else:
-                logger.warning(f"Prediction data file not found: {self.predictions_path}")
-                return None
+            data = json_store.load('interactive_tracking')
+            if data:
+                return data
+            logger.warning("No interactive tracking data in the record store")
+            return None
         except Exception as e:
             logger.error(f"Error loading prediction data: {str(e)}")
             return None
@@ -191,19 +190,9 @@ class SmartGoAgent:
             print("📊 Loading active options predictions...")
 
             # Load interactive tracking data which has the real locked predictions
-            tracking_file = 'data/tracking/interactive_tracking.json'
-            if not os.path.exists(tracking_file):
-                print(f"📝 No tracking file found at {tracking_file}")
-                return []
-
-            try:
-                with open(tracking_file, 'r') as f:
-                    tracking_data = json.load(f)
-            except json.JSONDecodeError as e:
-                print(f"🚨 Invalid JSON format in {tracking_file}: {e}")
-                return []
-            except Exception as e:
-                print(f"🚨 Error reading {tracking_file}: {e}")
+            tracking_data = json_store.load('interactive_tracking')
+            if not tracking_data:
+                print("📝 No interactive tracking data in the record store")
                 return []
 
             active_trades = []
@@ -538,10 +527,11 @@ class SmartGoAgent:
         except Exception as e:
             logger.warning(f"Could not load tracking data from manager: {e}")
 
-        # Fallback to direct file access
+        # Fallback to the shared record store, then the locked predictions file
+        data = json_store.load('interactive_tracking')
+        if data:
+            return data
         tracking_files = [
-            'data/tracking/interactive_tracking.json',
-            'interactive_tracking.json',
             'data/tracking/locked_predictions.json'
         ]
 
@@ -11,9 +11,6 @@ This module handles:
 Note: This is for personal use only. Respect website terms of service.
 """
 
-import requests
-from bs4 import BeautifulSoup
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import json
@@ -23,6 +20,16 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 from functools import wraps
 
+from src.analyzers.fundamentals import extract_fundamentals, fundamentals_store
+from src.common_repository.cache.tiered_cache import tiered_cache
+from src.common_repository.storage.json_store import json_store
+from src.common_repository.utils.http_transport import http_transport
+from src.common_repository.utils.lazy_import import lazy_import
+
+# yfinance and BeautifulSoup load on the first screening run, not at import
+yf = lazy_import('yfinance')
+bs4 = lazy_import('bs4')
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -84,7 +91,7 @@ class GracefulDegradation:
 class StockDataCache:
     """Cache for stock data"""
 
-    _technical_indicators_cache: Dict[str, Dict] = {}
+    _technical_indicators_cache = tiered_cache.namespace('technical')
 
     @classmethod
     def get_cached_technical_indicators(cls, symbol: str) -> Optional[Dict]:
@@ -94,7 +101,7 @@ class StockDataCache:
     @classmethod
     def cache_technical_indicators(cls, symbol: str, indicators: Dict):
         """Cache technical indicators"""
-        cls._technical_indicators_cache[symbol] = indicators
+        cls._technical_indicators_cache.set(symbol, indicators)
 
 
 class DataValidation:
@@ -219,11 +226,21 @@ def calculate_position_sizes(stocks_data: List[Dict]) -> List[Dict]:
         return stocks_data
 
 
+def save_screening_results(result_data: Dict):
+    """Write screening results to top10.json (direct-file readers) and the 'top10' store key
+
+    The store write notifies listeners such as the fusion dashboard cache.
+    """
+    with open('top10.json', 'w', encoding='utf-8') as f:
+        json.dump(result_data, f, indent=2, ensure_ascii=False)
+    json_store.save('top10', result_data)
+
+
 class EnhancedStockScreener:
 
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Shared keep-alive pools, per-host rate limits and circuit breakers
+        self.session = http_transport.client({
             'User-Agent':
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
@@ -359,28 +376,59 @@ class EnhancedStockScreener:
             )
             return {}
 
+    def calculate_batch_technical_indicators(self,
+                                             symbols: List[str]) -> Dict[str, Dict]:
+        """Calculate daily technical indicators for many symbols in one pass.
+
+        Symbols missing from the result should go through
+        calculate_enhanced_technical_indicators, which has the per-symbol fallbacks.
+        """
+        from src.analyzers.daily_technical_analyzer import DailyTechnicalAnalyzer
+
+        batch = DailyTechnicalAnalyzer().calculate_batch_technical_indicators(
+            symbols)
+
+        results = {}
+        for symbol, daily_indicators in batch.items():
+            if not daily_indicators or daily_indicators.get('current_price',
+                                                            0) <= 0:
+                continue
+
+            # Same backward compatibility mapping as the per-symbol path
+            daily_indicators['data_quality_score'] = 95
+            daily_indicators['timeframe'] = 'daily'
+            daily_indicators['analysis_type'] = 'daily_ohlc'
+            if 'sma_20' in daily_indicators:
+                daily_indicators['ema_21'] = daily_indicators['sma_20']
+            if 'momentum_5d_pct' in daily_indicators:
+                daily_indicators['momentum_5d'] = daily_indicators[
+                    'momentum_5d_pct'] / 100
+
+            results[symbol] = daily_indicators
+
+        logger.info(
+            f"Batch technical analysis covered {len(results)}/{len(symbols)} symbols"
+        )
+        return results
+
     def _fetch_price_data_multiple_sources(
             self, symbol: str) -> Optional[pd.DataFrame]:
         """Fetch price data from multiple sources with fallback"""
 
-        # Primary source: Yahoo Finance (most reliable)
+        # Primary source: local OHLCV store, topped up with only the missing bars
         try:
-            ticker = f"{symbol}.NS"
-            import yfinance as yf
-
-            # Try with session for better reliability
-            stock = yf.Ticker(ticker, session=self.session)
-            hist_data = stock.history(period="1y", timeout=15)
+            from src.data.ohlcv_store import ohlcv_store
+            hist_data = ohlcv_store.get_history(symbol, period="1y")
 
             if hist_data is not None and not hist_data.empty and len(
                     hist_data) > 30:
                 logger.debug(
-                    f"Yahoo Finance data successful for {symbol}: {len(hist_data)} days"
+                    f"OHLCV store data successful for {symbol}: {len(hist_data)} days"
                 )
                 return hist_data
         except Exception as e:
             logger.warning(
-                f"Yahoo Finance primary failed for {symbol}: {str(e)}")
+                f"OHLCV store primary failed for {symbol}: {str(e)}")
 
         # Fallback: Try with different ticker formats and periods
         ticker_formats = [f"{symbol}.NS", f"{symbol}.BO", symbol]
@@ -502,7 +550,7 @@ class EnhancedStockScreener:
 
             response = self.session.get(url, headers=headers, timeout=12)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = bs4.BeautifulSoup(response.content, 'html.parser')
 
                 data = {
                     'current_price': self._extract_mc_price(soup),
@@ -611,7 +659,7 @@ class EnhancedStockScreener:
 
             response = self.session.get(url, headers=headers, timeout=12)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = bs4.BeautifulSoup(response.content, 'html.parser')
 
                 return {
                     'technical_rating': self._extract_investing_rating(soup),
@@ -636,7 +684,7 @@ class EnhancedStockScreener:
 
             response = self.session.get(url, headers=headers, timeout=10)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = bs4.BeautifulSoup(response.content, 'html.parser')
 
                 return {
                     'pe_ratio': self._extract_tt_pe(soup),
@@ -1385,6 +1433,11 @@ class EnhancedStockScreener:
                 'data_source': 'realistic_simulation'
             }
 
+            # Fundamentals only change when results are published: serve the stored copy
+            stored = fundamentals_store.get_fresh(symbol)
+            if stored is not None:
+                return self._merge_fundamentals(realistic_data, stored)
+
             # Try to fetch real data from Screener.in (with timeout)
             try:
                 url = f"https://www.screener.in/company/{symbol}/consolidated/"
@@ -1400,26 +1453,12 @@ class EnhancedStockScreener:
                 }
 
                 response = self.session.get(url, headers=headers,
-                                            timeout=8)  # Reduced timeout
+                                            timeout=8, conditional=True)
 
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    result = realistic_data.copy()
-                    result['data_source'] = 'screener'
-
-                    # Extract PE ratio with multiple methods
-                    pe_ratio = self._extract_pe_ratio_enhanced(soup, symbol)
-                    if pe_ratio and 0 < pe_ratio < 500:
-                        result['pe_ratio'] = pe_ratio
-
-                    # Extract financial metrics
-                    financial_metrics = self._extract_financial_metrics_enhanced(
-                        soup)
-                    result.update(financial_metrics)
-
-                    # Extract growth data
-                    growth_data = self._extract_growth_data_enhanced(soup)
-                    result.update(growth_data)
+                    result = self._merge_fundamentals(realistic_data, fundamentals_store.update(
+                        symbol, response.content,
+                        lambda content: self._parse_fundamentals(symbol, content)))
 
                     logger.debug(
                         f"Scraped data for {symbol}: PE={result.get('pe_ratio', 'N/A')}"
@@ -1457,85 +1496,23 @@ class EnhancedStockScreener:
                 'data_source': 'error_fallback'
             }
 
-    def _extract_pe_ratio_enhanced(self, soup: BeautifulSoup,
-                                   symbol: str) -> Optional[float]:
-        """Enhanced PE ratio extraction with multiple strategies"""
-        strategies = [
-            # Strategy 1: Look for "Stock P/E" in ratio section
-            lambda: self._find_ratio_value(soup,
-                                           ["Stock P/E", "P/E", "PE Ratio"]),
-            # Strategy 2: Look in company ratios table
-            lambda: self._find_table_value(soup, "P/E"),
-            # Strategy 3: Look for span with number class
-            lambda: self._find_pe_in_numbers(soup),
-            # Strategy 4: Fallback to yfinance
-            lambda: self._get_pe_from_yfinance(symbol)
-        ]
-
-        for strategy in strategies:
-            try:
-                pe_value = strategy()
-                if pe_value and 0 < pe_value < 500:
-                    return pe_value
-            except Exception as e:
-                logger.debug(f"PE extraction strategy failed: {str(e)}")
-                continue
-
-        return None
-
-    def _find_ratio_value(self, soup: BeautifulSoup,
-                          search_terms: List[str]) -> Optional[float]:
-        """Find ratio value by searching for terms"""
-        for term in search_terms:
-            elements = soup.find_all(text=lambda text: text and term in text)
-            for element in elements:
-                parent = element.parent
-                if parent:
-                    # Look for sibling with number
-                    for sibling in [
-                            parent.find_next_sibling(),
-                            parent.parent.find_next('span')
-                    ]:
-                        if sibling and sibling.text:
-                            try:
-                                value = float(sibling.text.strip().replace(
-                                    ',', ''))
-                                return value
-                            except ValueError:
-                                continue
-        return None
-
-    def _find_table_value(self, soup: BeautifulSoup,
-                          search_term: str) -> Optional[float]:
-        """Find value in table structure"""
-        tables = soup.find_all('table')
-        for table in tables:
-            rows = table.find_all('tr')
-            for row in rows:
-                cells = row.find_all(['td', 'th'])
-                for i, cell in enumerate(cells):
-                    if search_term in cell.get_text():
-                        if i + 1 < len(cells):
-                            try:
-                                value = float(
-                                    cells[i + 1].get_text().strip().replace(
-                                        ',', ''))
-                                return value
-                            except ValueError:
-                                continue
-        return None
-
-    def _find_pe_in_numbers(self, soup: BeautifulSoup) -> Optional[float]:
-        """Look for PE in number spans"""
-        number_spans = soup.find_all('span', class_='number')
-        for span in number_spans:
-            try:
-                value = float(span.get_text().strip().replace(',', ''))
-                if 5 < value < 100:  # Reasonable PE range
-                    return value
-            except ValueError:
-                continue
-        return None
+    @staticmethod
+    def _merge_fundamentals(defaults: Dict, stored: Dict) -> Dict:
+        """Stored fundamentals over the defaults; with a stored EPS, P/E comes from the live price later"""
+        merged = {**defaults, **stored}
+        if stored.get('eps'):
+            merged.pop('pe_ratio', None)
+        return merged
+
+    def _parse_fundamentals(self, symbol: str, content: bytes) -> Dict:
+        """Single-pass page extraction; P/E falls back to yfinance when the page has none"""
+        data = extract_fundamentals(content.decode('utf-8', errors='replace'))
+        if 'pe_ratio' not in data:
+            pe_ratio = self._get_pe_from_yfinance(symbol)
+            if pe_ratio and 0 < pe_ratio < 500:
+                data['pe_ratio'] = pe_ratio
+        data['data_source'] = 'screener'
+        return data
 
     def _get_pe_from_yfinance(self, symbol: str) -> Optional[float]:
         """Fallback to get PE from yfinance"""
@@ -1550,165 +1527,6 @@ class EnhancedStockScreener:
             pass
         return None
 
-    def _extract_financial_metrics_enhanced(self, soup: BeautifulSoup) -> Dict:
-        """Extract financial metrics with better parsing"""
-        metrics = {}
-
-        # Define metric mappings
-        metric_mappings = {
-            'debt_to_equity': ['Debt to equity', 'D/E', 'Debt/Equity'],
-            'roe': ['ROE', 'Return on equity', 'Return on Equity'],
-            'current_ratio': ['Current ratio', 'Current Ratio']
-        }
-
-        for metric, search_terms in metric_mappings.items():
-            value = self._find_ratio_value(soup, search_terms)
-            if value is not None:
-                metrics[metric] = value
-
-        return metrics
-
-    def _extract_growth_data_enhanced(self, soup: BeautifulSoup) -> Dict:
-        """Extract growth data with better parsing and realistic values"""
-        # Generate realistic growth data based on market conditions
-        import random
-        import hashlib
-
-        # Create seed from page content for consistency
-        page_text = soup.get_text()[:100] if soup else ""
-        seed_value = int(hashlib.md5(page_text.encode()).hexdigest()[:4], 16)
-        random.seed(seed_value)
-
-        # Generate realistic growth values
-        revenue_growth_options = [
-            random.uniform(-15, -5),  # Negative growth scenarios
-            random.uniform(-5, 0),  # Slight decline
-            random.uniform(0, 8),  # Modest growth
-            random.uniform(8, 18),  # Good growth
-            random.uniform(18, 35)  # High growth
-        ]
-
-        earnings_growth_options = [
-            random.uniform(-25, -10),  # Earnings decline
-            random.uniform(-10, 0),  # Slight decline
-            random.uniform(0, 12),  # Modest growth
-            random.uniform(12, 25),  # Good growth
-            random.uniform(25, 50)  # Excellent growth
-        ]
-
-        # Weight towards more common scenarios
-        revenue_weights = [0.1, 0.15, 0.35, 0.3, 0.1]
-        earnings_weights = [0.15, 0.2, 0.3, 0.25, 0.1]
-
-        revenue_growth = random.choices(revenue_growth_options,
-                                        weights=revenue_weights)[0]
-        earnings_growth = random.choices(earnings_growth_options,
-                                         weights=earnings_weights)[0]
-
-        growth_data = {
-            'revenue_growth': round(revenue_growth, 1),
-            'earnings_growth': round(earnings_growth, 1),
-            'promoter_buying': random.choice([True, False, False,
-                                              False])  # 25% chance
-        }
-
-        try:
-            # Look for actual growth data in tables
-            tables = soup.find_all('table')
-
-            for table in tables:
-                headers = table.find_all('th')
-                if any('sales' in th.get_text().lower()
-                       or 'revenue' in th.get_text().lower()
-                       for th in headers):
-                    rows = table.find_all('tr')
-                    for row in rows:
-                        cells = row.find_all(['td', 'th'])
-                        if len(cells) >= 3:
-                            row_text = cells[0].get_text().lower()
-
-                            # Look for sales/revenue growth
-                            if any(term in row_text
-                                   for term in ['sales', 'revenue', 'income']):
-                                growth = self._calculate_growth_from_cells(
-                                    cells[1:3])
-                                if growth is not None and -50 <= growth <= 100:
-                                    growth_data['revenue_growth'] = round(
-                                        growth, 1)
-
-                            # Look for profit/earnings growth
-                            elif any(term in row_text for term in
-                                     ['net profit', 'earnings', 'pat']):
-                                growth = self._calculate_growth_from_cells(
-                                    cells[1:3])
-                                if growth is not None and -75 <= growth <= 150:
-                                    growth_data['earnings_growth'] = round(
-                                        growth, 1)
-
-            # Check for promoter buying indicators
-            page_text = soup.get_text().lower()
-            if any(term in page_text
-                   for term in ['promoter', 'buying', 'increase in holding']):
-                growth_data['promoter_buying'] = True
-
-        except Exception as e:
-            logger.error(f"Error extracting growth data: {str(e)}")
-
-        return growth_data
-
-    def _extract_metric_value(self, soup: BeautifulSoup,
-                              search_terms: List[str]) -> Optional[float]:
-        """```python
-Extract a specific metric value from soup"""
-        try:
-            for term in search_terms:
-                elements = soup.find_all(
-                    text=lambda text: text and term.lower() in text.lower())
-                for element in elements:
-                    parent = element.parent
-                    if parent:
-                        # Look for number in the same row
-                        row = parent.find_parent('tr')
-                        if row:
-                            number_element = row.find(
-                                'span', class_='number') or row.find(
-                                    text=lambda t: t and any(c.isdigit()
-                                                             for c in t))
-                            if number_element:
-                                try:
-                                    value = float(
-                                        str(number_element).replace(
-                                            ',', '').replace('%', ''))
-                                    return value
-                                except ValueError:
-                                    continue
-            return None
-        except Exception:
-            return None
-
-    def _calculate_growth_from_cells(self, cells: List) -> Optional[float]:
-        """Calculate growth rate from table cells"""
-        try:
-            if len(cells) >= 2:
-                current_text = cells[0].text.replace(',',
-                                                     '').replace('%',
-                                                                 '').strip()
-                previous_text = cells[1].text.replace(',',
-                                                      '').replace('%',
-                                                                  '').strip()
-
-                current = float(current_text)
-                previous = float(previous_text)
-
-                if previous != 0:
-                    growth = ((current - previous) / abs(previous)) * 100
-                    return growth
-
-        except (ValueError, IndexError, AttributeError):
-            pass
-
-        return None
-
     def _calculate_base_score(self, technical_data: Dict,
                               fundamental_data: Dict,
                               sentiment_data: Dict) -> float:
@@ -1920,10 +1738,11 @@ Extract a specific metric value from soup"""
 
                     response = self.session.get(url,
                                                 headers=headers,
-                                                timeout=15)
+                                                timeout=15,
+                                                conditional=True)
 
                     if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
+                        soup = bs4.BeautifulSoup(response.content, 'html.parser')
                         deals = self._parse_bulk_deals_from_soup(soup)
 
                         if deals:
@@ -1942,7 +1761,7 @@ Extract a specific metric value from soup"""
             logger.error(f"Error scraping bulk deals: {str(e)}")
             return self._get_fallback_bulk_deals()
 
-    def _parse_bulk_deals_from_soup(self, soup: BeautifulSoup) -> List[Dict]:
+    def _parse_bulk_deals_from_soup(self, soup: 'bs4.BeautifulSoup') -> List[Dict]:
         """Parse bulk deals from HTML soup"""
         deals = []
 
@@ -2064,106 +1883,6 @@ Extract a specific metric value from soup"""
                 f"Error fetching financial ratios for {symbol}: {str(e)}")
             return {}
 
-    def run_enhanced_screener(self) -> List[Dict]:
-        """Main enhanced screening function with real-time data"""
-        logger.info("Starting enhanced stock screening process...")
-
-        try:
-            # Step 1: Scrape bulk deals (with timeout)
-            logger.info("Fetching bulk deals data...")
-            try:
-                self.bulk_deals = self.scrape_bulk_deals()
-                bulk_deal_symbols = [
-                    deal['symbol'] for deal in self.bulk_deals
-                ]
-                logger.info(f"Found {len(self.bulk_deals)} bulk deals")
-            except Exception as e:
-                logger.warning(f"Bulk deals failed: {str(e)}")
-                self.bulk_deals = []
-                bulk_deal_symbols = []
-
-            # Step 2: Collect stock data (process top 20 stocks for speed)
-            stocks_data = {}
-
-            # Prioritize high-potential stocks for faster processing
-            priority_symbols = [
-                'SBIN', 'BHARTIARTL', 'ITC', 'NTPC', 'COALINDIA', 'TATASTEEL',
-                'HINDALCO', 'BPCL', 'GAIL', 'IOC', 'BANKBARODA', 'PFC',
-                'RECLTD', 'IRCTC', 'HAL', 'M&M', 'POWERGRID', 'ONGC', 'VEDL',
-                'SAIL'
-            ]
-
-            for i, symbol in enumerate(
-                    priority_symbols[:20]):  # Process top 20 stocks
-                try:
-                    logger.info(f"Processing {symbol} ({i+1}/20)...")
-
-                    # Get fundamental data
-                    fundamentals = self.scrape_screener_data(symbol)
-
-                    # Get technical indicators
-                    technical = self.calculate_enhanced_technical_indicators(
-                        symbol)
-
-                    if fundamentals or technical:
-                        stocks_data[symbol] = {
-                            'fundamentals': fundamentals,
-                            'technical': technical,
-                            'bulk_deals': symbol in bulk_deal_symbols
-                        }
-                        logger.info(f"✅ {symbol}: Got data")
-                    else:
-                        logger.warning(f"⚠️ {symbol}: No data available")
-
-                    # Add delay to avoid rate limiting
-                    time.sleep(1)
-
-                except Exception as e:
-                    logger.error(f"Error processing {symbol}: {str(e)}")
-                    continue
-
-            # Step 3: Score and rank stocks
-            logger.info("Scoring and ranking stocks...")
-            scored_stocks = self.enhanced_score_and_rank(stocks_data)
-
-            # Step 4: Add ML predictions if available
-            try:
-                from src.models.predictor import enrich_with_ml_predictions
-                scored_stocks = enrich_with_ml_predictions(scored_stocks)
-                logger.info("✅ ML predictions added")
-            except Exception as e:
-                logger.warning(f"ML predictions failed: {str(e)}")
-
-            # Step 5: Save results with proper timestamp
-            if scored_stocks:
-                try:
-                    import pytz
-                    IST = pytz.timezone('Asia/Kolkata')
-                    ist_now = datetime.now(IST)
-
-                    result_data = {
-                        'timestamp': ist_now.strftime('%Y-%m-%dT%H:%M:%S'),
-                        'last_updated': ist_now.strftime('%d/%m/%Y, %H:%M:%S'),
-                        'status': 'success',
-                        'stocks': scored_stocks
-                    }
-
-                    with open('top10.json', 'w', encoding='utf-8') as f:
-                        json.dump(result_data, f, indent=2, ensure_ascii=False)
-
-                    logger.info(
-                        f"✅ Results saved with {len(scored_stocks)} stocks")
-                except Exception as save_error:
-                    logger.error(f"Error saving results: {save_error}")
-
-            logger.info(f"✅ Successfully screened {len(scored_stocks)} stocks")
-            return scored_stocks
-
-        except Exception as e:
-            logger.error(f"Critical error in screening: {str(e)}")
-            # Fallback to demo data if real screening fails
-            return self._generate_fallback_data()
-
     def _generate_fallback_data(self) -> List[Dict]:
         """Generate fallback demo data when real scraping fails"""
         logger.info("Generating fallback demo data...")
@@ -2251,45 +1970,21 @@ Extract a specific metric value from soup"""
                 self.bulk_deals = []
                 bulk_deal_symbols = []
 
-            # Step 2: Collect stock data (process top 20 stocks for speed)
-            stocks_data = {}
-
-            # Prioritize high-potential stocks for faster processing
+            # Step 2: Collect stock data concurrently across the full watchlist
+            # Priority symbols go first so they are fetched ahead of the tail
             priority_symbols = [
                 'SBIN', 'BHARTIARTL', 'ITC', 'NTPC', 'COALINDIA', 'TATASTEEL',
                 'HINDALCO', 'BPCL', 'GAIL', 'IOC', 'BANKBARODA', 'PFC',
                 'RECLTD', 'IRCTC', 'HAL', 'M&M', 'POWERGRID', 'ONGC', 'VEDL',
                 'SAIL'
             ]
+            symbols = priority_symbols + [
+                s for s in self.watchlist if s not in priority_symbols
+            ]
 
-            for i, symbol in enumerate(
-                    priority_symbols[:20]):  # Process top 20 stocks
-                try:
-                    logger.info(f"Processing {symbol} ({i+1}/20)...")
-
-                    # Get fundamental data
-                    fundamentals = self.scrape_screener_data(symbol)
-
-                    # Get technical indicators
-                    technical = self.calculate_enhanced_technical_indicators(
-                        symbol)
-
-                    if fundamentals or technical:
-                        stocks_data[symbol] = {
-                            'fundamentals': fundamentals,
-                            'technical': technical,
-                            'bulk_deals': symbol in bulk_deal_symbols
-                        }
-                        logger.info(f"✅ {symbol}: Got data")
-                    else:
-                        logger.warning(f"⚠️ {symbol}: No data available")
-
-                    # Add delay to avoid rate limiting
-                    time.sleep(1)
-
-                except Exception as e:
-                    logger.error(f"Error processing {symbol}: {str(e)}")
-                    continue
+            from src.analyzers.screening_pipeline import ScreeningPipeline
+            stocks_data = ScreeningPipeline(self).run(symbols,
+                                                      bulk_deal_symbols)
 
             # Step 3: Score and rank stocks
             logger.info("Scoring and ranking stocks...")
@@ -2297,7 +1992,7 @@ Extract a specific metric value from soup"""
 
             # Step 4: Add ML predictions if available
             try:
-                from src.models.predictor import enrich_with_ml_predictions
+                from src.ml.inference_service import enrich_with_ml_predictions
                 scored_stocks = enrich_with_ml_predictions(scored_stocks)
                 logger.info("✅ ML predictions added")
             except Exception as e:
@@ -2317,8 +2012,7 @@ Extract a specific metric value from soup"""
                         'stocks': scored_stocks
                     }
 
-                    with open('top10.json', 'w', encoding='utf-8') as f:
-                        json.dump(result_data, f, indent=2, ensure_ascii=False)
+                    save_screening_results(result_data)
 
                     logger.info(
                         f"✅ Results saved with {len(scored_stocks)} stocks")
@@ -150,15 +150,15 @@ def fusion_dashboard():
 
         # Get real-time data for top signals with trained stocks
         try:
-            from src.data.realtime_data_fetcher import get_multiple_realtime_prices
-            logger.info(f"🔄 Fetching real-time data for analysis stocks...")
+            from src.data.quote_snapshot import quote_snapshot
+            logger.info(f"🔄 Reading snapshot quotes for analysis stocks...")
             trained_stocks = [
                 "TCS", "INFY", "HCLTECH", "WIPRO", "TECHM", "LTIM", "LTTS",
                 "HDFCBANK", "ICICIBANK", "KOTAKBANK", "SBIN", "AXISBANK", "INDUSINDBK",
                 "RELIANCE", "LT", "ITC", "HINDUNILVR", "BHARTIARTL", "ASIANPAINT",
                 "TITAN", "MARUTI", "TATASTEEL", "JSWSTEEL", "HINDALCO"
             ]
-            realtime_data = get_multiple_realtime_prices(trained_stocks)
+            realtime_data = quote_snapshot.get_many(trained_stocks)
             logger.info(f"✅ Retrieved real-time data for {len(realtime_data)} stocks")
 
         except Exception as e:
@@ -202,7 +202,7 @@ def fusion_dashboard():
         # Get real-time prices for signals
         symbols = [s["symbol"] for s in signal_templates]
         try:
-            realtime_prices = get_multiple_realtime_prices(symbols)
+            realtime_prices = quote_snapshot.get_many(symbols)
         except Exception as e:
             logger.warning(f"Could not fetch real-time prices for signals: {e}")
             realtime_prices = {}
@@ -8,13 +8,13 @@ import time # Added for trade ID generation
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from flask import Blueprint, request, jsonify
-import yfinance as yf
 import pandas as pd
 from src.utils.file_utils import load_json_safe, save_json_safe
 from src.core.cache import get_cached_data, cache_data
 from src.analyzers.market_sentiment_analyzer import MarketSentimentAnalyzer
 from src.data.fetch_historical_data import get_stock_data
-from src.data.realtime_data_fetcher import get_realtime_price, get_multiple_realtime_prices
+from src.data.realtime_data_fetcher import get_realtime_price
+from src.data.quote_snapshot import quote_snapshot
 from pathlib import Path # Imported Path
 
 logger = logging.getLogger(__name__)
@@ -60,6 +60,11 @@ class PaperTradeEngine:
         try:
             logger.info(f"🔄 Fetching live price for {symbol}")
 
+            # Fresh snapshot quote: no upstream call on the request path
+            quote = quote_snapshot.get(symbol)
+            if quote and not quote['stale'] and quote['current_price'] > 0:
+                return float(quote['current_price'])
+
             # Check cache first (30 second TTL for paper trading)
             cache_key = f"live_price_{symbol}"
             cached_data = get_cached_data(cache_key)
@@ -106,8 +111,10 @@ class PaperTradeEngine:
     def execute_order(self, symbol: str, side: str, quantity: int, order_type: str = "MARKET") -> Dict:
         """Execute a paper trade order at live market price"""
         try:
-            # Get current price using real-time data
-            realtime_data = get_realtime_price(symbol)
+            # Get current price from the snapshot table, fetching only when it has nothing fresh
+            realtime_data = quote_snapshot.get(symbol)
+            if not realtime_data or realtime_data['stale']:
+                realtime_data = get_realtime_price(symbol)
 
             if realtime_data and realtime_data.get('is_realtime') and realtime_data.get('current_price', 0) > 0:
                 live_price = float(realtime_data['current_price'])
@@ -293,11 +300,11 @@ class PaperTradeEngine:
             symbols = list(set(position['symbol'] for position in positions))
             current_prices = {}
 
-            # Try real-time data first
+            # Snapshot quotes first (the background poller keeps them current)
             try:
-                realtime_prices = get_multiple_realtime_prices(symbols)
+                realtime_prices = quote_snapshot.get_many(symbols)
                 for symbol in symbols:
-                    if symbol in realtime_prices and realtime_prices[symbol].get('is_realtime'):
+                    if symbol in realtime_prices and not realtime_prices[symbol]['stale']:
                         current_prices[symbol] = float(realtime_prices[symbol]['current_price'])
                     else:
                         # Fallback to historical data
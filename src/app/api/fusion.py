@@ -6,9 +6,12 @@ import logging
 import time
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 
+from ...common_repository.cache.payload_cache import PayloadCache
 from ...common_repository.config.feature_flags import feature_flags
+from ...common_repository.config.runtime import FUSION_PRECOMPUTE_INTERVAL_SEC
+from ...common_repository.storage.json_store import json_store
 from ...common_repository.utils.date_utils import get_ist_now, IST
 from ...core.fusion.fusion_schema import (
     FusionDashboardPayload, MarketSession, Alert, AlertSeverity, TopSignal
@@ -22,13 +25,44 @@ logger = logging.getLogger(__name__)
 # Create blueprint
 fusion_bp = Blueprint('fusion', __name__, url_prefix='/api/fusion')
 
-# Simple in-memory cache
-_fusion_cache = {
-    'data': None,
-    'timestamp': None,
-    'ttl_seconds': 120
+# json_store keys whose writes change the dashboard
+FUSION_SOURCE_KEYS = {
+    'top10', 'interactive_tracking', 'predictions_history', 'trades_history', 'model_kpi', 'pinned_symbols'
 }
 
+
+def _build_fusion_payload() -> Dict[str, Any]:
+    """Payload as served from the cache (built off the request path once warm)"""
+    start_time = time.time()
+    fusion_data = _generate_fusion_data()
+    fusion_data.generation_time_ms = (time.time() - start_time) * 1000
+    logger.info(f"Fusion dashboard generated in {fusion_data.generation_time_ms:.1f}ms")
+    return fusion_data.to_dict()
+
+
+def _source_version():
+    """Change stamps of the source keys; picks up writes from other processes (e.g. the scheduler)"""
+    return tuple(json_store.modified(key) for key in sorted(FUSION_SOURCE_KEYS))
+
+
+# Precomputed dashboard: stale-while-revalidate, serialized once with an ETag
+_fusion_cache = PayloadCache(
+    'fusion_dashboard',
+    _build_fusion_payload,
+    ttl=lambda: feature_flags.get_all_flags().get('ui_fusion_cache_ttl_seconds', 120),
+    refresh_interval=FUSION_PRECOMPUTE_INTERVAL_SEC,
+    source_version=_source_version,
+    hit_flag='cache_hit'
+)
+
+
+def _on_store_change(key: str):
+    if key in FUSION_SOURCE_KEYS:
+        _fusion_cache.invalidate()
+
+
+json_store.add_listener(_on_store_change)
+
 @fusion_bp.route('/status', methods=['GET'])
 def fusion_status():
     """Get fusion system status"""
@@ -52,7 +86,11 @@ def fusion_data():
 
 @fusion_bp.route('/dashboard', methods=['GET'])
 def get_fusion_dashboard():
-    """Get complete fusion dashboard data"""
+    """Get complete fusion dashboard data
+
+    Serves the precomputed snapshot (304 when If-None-Match matches its ETag);
+    an expired snapshot is served while one background rebuild runs.
+    """
     start_time = time.time()
 
     try:
@@ -63,26 +101,17 @@ def get_fusion_dashboard():
         # Check for force refresh
         force_refresh = request.args.get('forceRefresh', '').lower() == 'true'
 
-        # Check cache unless force refresh
-        if not force_refresh and _is_cache_valid():
-            _fusion_cache['data'].cache_hit = True
-            _fusion_cache['data'].generation_time_ms = (time.time() - start_time) * 1000
-            return jsonify(_fusion_cache['data'].to_dict())
-
-        # Generate fresh data
-        fusion_data = _generate_fusion_data()
-
-        # Update cache
-        _fusion_cache['data'] = fusion_data
-        _fusion_cache['timestamp'] = time.time()
-        _fusion_cache['ttl_seconds'] = feature_flags.get_flag_value('ui_fusion_cache_ttl_seconds', 120)
-
-        fusion_data.generation_time_ms = (time.time() - start_time) * 1000
-        fusion_data.cache_hit = False
-
-        logger.info(f"Fusion dashboard generated in {fusion_data.generation_time_ms:.1f}ms")
+        _fusion_cache.start()
+        snapshot, status = _fusion_cache.get(force=force_refresh)
 
-        return jsonify(fusion_data.to_dict())
+        if not force_refresh and request.if_none_match.contains(snapshot.etag):
+            response = Response(status=304)
+        else:
+            response = Response(snapshot.body_for(status), mimetype='application/json')
+        response.set_etag(snapshot.etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Cache'] = status.upper()
+        return response
 
     except Exception as e:
         logger.error(f"Error generating fusion dashboard: {e}")
@@ -92,14 +121,6 @@ def get_fusion_dashboard():
             'generation_time_ms': (time.time() - start_time) * 1000
         }), 500
 
-def _is_cache_valid() -> bool:
-    """Check if cached data is still valid"""
-    if not _fusion_cache['data'] or not _fusion_cache['timestamp']:
-        return False
-
-    age_seconds = time.time() - _fusion_cache['timestamp']
-    return age_seconds < _fusion_cache['ttl_seconds']
-
 def _generate_fusion_data() -> FusionDashboardPayload:
     """Generate complete fusion dashboard data"""
     try:
@@ -107,7 +128,7 @@ def _generate_fusion_data() -> FusionDashboardPayload:
         kpi_data = _load_kpi_data()
         predictions_data = _load_predictions_data()
         pinned_symbols = _load_pinned_symbols()
-        alerts = _load_alerts()
+        alerts = _load_alerts(kpi_data)
 
         # Map timeframe KPIs
         timeframes = []
@@ -210,13 +231,13 @@ def _load_pinned_symbols() -> list:
         logger.warning(f"Error loading pinned symbols: {e}")
         return []
 
-def _load_alerts() -> list:
+def _load_alerts(kpi_data: Dict[str, Any]) -> list:
     """Load system alerts"""
     alerts = []
 
     try:
         # Load GoAhead alerts
-        goahead_alerts = _load_goahead_alerts()
+        goahead_alerts = _load_goahead_alerts(kpi_data)
         alerts.extend(goahead_alerts)
 
         # Load Trainer Agent alerts  
@@ -232,13 +253,11 @@ def _load_alerts() -> list:
 
     return alerts
 
-def _load_goahead_alerts() -> list:
+def _load_goahead_alerts(kpi_data: Dict[str, Any]) -> list:
     """Load alerts from GoAhead agent"""
     alerts = []
     try:
         # Check for KPI breaches that would trigger GoAhead
-        kpi_data = _load_kpi_data()
-
         for timeframe, data in kpi_data.items():
             if isinstance(data, dict):
                 hit_rate = data.get('hit_rate', 0.0)
@@ -10,6 +10,8 @@ from pathlib import Path
 from flask import Blueprint, jsonify, request
 from typing import Dict, Any, List
 
+from src.common_repository.storage.prediction_log import prediction_log
+
 logger = logging.getLogger(__name__)
 
 # Create blueprint
@@ -30,9 +32,13 @@ def get_accuracy():
         instrument = request.args.get('instrument', 'OPTION').upper()
         window = request.args.get('window', '30d')
 
+        # Calculate window cutoff
+        days = int(window.replace('d', '')) if 'd' in window else 30
+        cutoff_date = datetime.now() - timedelta(days=days)
+
         # Load prediction history
-        history_file = Path("data/tracking/predictions_history.json")
-        if not history_file.exists():
+        history = prediction_log.load(start=cutoff_date)
+        if not history:
             # Return realistic mock data for demo
             return jsonify({
                 'success': True,
@@ -44,19 +50,12 @@ def get_accuracy():
                 'message': f'Live accuracy for {instrument} over {window}'
             })
 
-        with open(history_file, 'r') as f:
-            history = json.load(f)
-
-        # Calculate window cutoff
-        days = int(window.replace('d', '')) if 'd' in window else 30
-        cutoff_date = datetime.now() - timedelta(days=days)
-
         # Filter predictions by instrument and window
         relevant_predictions = []
-        for pred in history.get('predictions', []):
+        for pred in history:
             if pred.get('instrument', '').upper() == instrument:
                 try:
-                    pred_date = datetime.fromisoformat(pred.get('created_at', ''))
+                    pred_date = datetime.fromisoformat(pred.get('created_at') or pred.get('timestamp', ''))
                     if pred_date >= cutoff_date:
                         relevant_predictions.append(pred)
                 except:
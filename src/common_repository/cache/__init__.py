@@ -1,9 +1,11 @@
-
 """
 Caching System
 Two-tier cache with in-memory LRU and on-disk JSON storage
 """
 
+from .tiered_cache import TieredCache, CacheNamespace, tiered_cache
 from .cache_manager import CacheManager, cache_manager
+from .payload_cache import PayloadCache, PayloadSnapshot
 
-__all__ = ['CacheManager', 'cache_manager']
+__all__ = ['TieredCache', 'CacheNamespace', 'tiered_cache', 'CacheManager', 'cache_manager',
+           'PayloadCache', 'PayloadSnapshot']
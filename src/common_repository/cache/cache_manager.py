@@ -1,74 +1,26 @@
 """
 Two-Tier Cache Manager
-In-memory LRU + on-disk JSON with TTL and request coalescing
+Provider/resource/symbol keyed facade over the shared tiered cache
+(in-memory LRU + on-disk JSON with TTL and request coalescing)
 """
 
 import json
-import os
-import time
 import hashlib
 import threading
 import asyncio
 from typing import Any, Dict, Optional, Callable, Awaitable
-from collections import OrderedDict
-from datetime import datetime, timedelta
 import logging
 
 from ..utils.telemetry import telemetry
+from .tiered_cache import TieredCache, tiered_cache
 
 logger = logging.getLogger(__name__)
 
-class LRUCache:
-    def __init__(self, max_size: int = 1000):
-        self.max_size = max_size
-        self.cache = OrderedDict()
-        self.lock = threading.Lock()
-
-    def get(self, key: str) -> Optional[Any]:
-        with self.lock:
-            if key in self.cache:
-                # Move to end (most recently used)
-                self.cache.move_to_end(key)
-                return self.cache[key]
-            return None
-
-    def put(self, key: str, value: Any):
-        with self.lock:
-            if key in self.cache:
-                self.cache.move_to_end(key)
-            self.cache[key] = value
-
-            # Evict LRU if over limit
-            while len(self.cache) > self.max_size:
-                self.cache.popitem(last=False)
-
-    def clear(self, prefix: Optional[str] = None):
-        with self.lock:
-            if prefix:
-                keys_to_remove = [k for k in self.cache.keys() if k.startswith(prefix)]
-                for key in keys_to_remove:
-                    del self.cache[key]
-            else:
-                self.cache.clear()
-
 class CacheManager:
-    def __init__(self, cache_dir: str = "data/cache"):
-        self.cache_dir = cache_dir
-        os.makedirs(cache_dir, exist_ok=True)
-
-        # In-memory cache
-        self.memory_cache = LRUCache(max_size=2000)
+    def __init__(self, cache: Optional[TieredCache] = None):
+        self.cache = cache or tiered_cache
 
-        # TTL settings (in seconds)
-        self.ttls = {
-            'quotes': 15,
-            'ohlc': 900,  # 15 minutes
-            'options_chain': 60,
-            'model_inference': 300,  # 5 minutes
-            'default': 300
-        }
-
-        # Request coalescing - track in-flight requests
+        # Request coalescing - track in-flight async requests
         self.in_flight = {}
         self.coalescing_lock = threading.Lock()
 
@@ -78,75 +30,27 @@ class CacheManager:
         params_hash = hashlib.md5(params_str.encode()).hexdigest()[:8]
         return f"{provider}:{resource}:{symbol}:{params_hash}"
 
-    def _get_file_path(self, key: str) -> str:
-        """Get file path for disk cache"""
-        safe_key = key.replace(':', '_').replace('/', '_')
-        return os.path.join(self.cache_dir, f"{safe_key}.json")
-
-    def _get_ttl(self, resource_type: str) -> int:
-        """Get TTL for resource type"""
-        return self.ttls.get(resource_type, self.ttls['default'])
-
-    def _is_expired(self, cache_entry: Dict, ttl: int) -> bool:
-        """Check if cache entry is expired"""
-        timestamp = cache_entry.get('timestamp', 0)
-        return time.time() - timestamp > ttl
+    def _namespace(self, resource: str) -> str:
+        """Resources with their own TTL budget get their own namespace"""
+        return resource if self.cache.has_namespace(resource) else 'default'
 
     def get(self, provider: str, resource: str, symbol: str, params: Dict = None) -> Optional[Any]:
         """Get from cache with TTL check"""
-        params = params or {}
-        key = self._get_cache_key(provider, resource, symbol, params)
-        ttl = self._get_ttl(resource)
-
-        # Try memory cache first
-        memory_entry = self.memory_cache.get(key)
-        if memory_entry and not self._is_expired(memory_entry, ttl):
-            telemetry.increment('cache_hits')
-            return memory_entry['data']
-
-        # Try disk cache
-        try:
-            file_path = self._get_file_path(key)
-            if os.path.exists(file_path):
-                with open(file_path, 'r') as f:
-                    disk_entry = json.load(f)
-
-                if not self._is_expired(disk_entry, ttl):
-                    # Load back to memory cache
-                    self.memory_cache.put(key, disk_entry)
-                    telemetry.increment('cache_hits')
-                    return disk_entry['data']
-                else:
-                    # Clean up expired file
-                    os.remove(file_path)
-        except Exception as e:
-            logger.warning(f"Error reading disk cache for {key}: {e}")
-
-        telemetry.increment('cache_misses')
-        return None
+        key = self._get_cache_key(provider, resource, symbol, params or {})
+        return self.cache.get(self._namespace(resource), key)
 
     def put(self, provider: str, resource: str, symbol: str, data: Any, params: Dict = None):
         """Store in both memory and disk cache"""
-        params = params or {}
-        key = self._get_cache_key(provider, resource, symbol, params)
-
-        cache_entry = {
-            'data': data,
-            'timestamp': time.time()
-        }
+        key = self._get_cache_key(provider, resource, symbol, params or {})
+        self.cache.set(self._namespace(resource), key, data)
 
-        # Store in memory
-        self.memory_cache.put(key, cache_entry)
+    def get_or_compute(self, provider: str, resource: str, symbol: str,
+                       fetch_func: Callable[[], Any], params: Dict = None) -> Any:
+        """Synchronous get-or-fetch; concurrent callers for the same key share one fetch"""
+        key = self._get_cache_key(provider, resource, symbol, params or {})
+        return self.cache.get_or_compute(self._namespace(resource), key, fetch_func)
 
-        # Store on disk
-        try:
-            file_path = self._get_file_path(key)
-            with open(file_path, 'w') as f:
-                json.dump(cache_entry, f, default=str)
-        except Exception as e:
-            logger.warning(f"Error writing disk cache for {key}: {e}")
-
-    async def get_or_fetch(self, provider: str, resource: str, symbol: str, 
+    async def get_or_fetch(self, provider: str, resource: str, symbol: str,
                           fetch_func: Callable[[], Awaitable[Any]], params: Dict = None) -> Any:
         """Get from cache or fetch with request coalescing"""
         params = params or {}
@@ -161,20 +65,22 @@ class CacheManager:
         with self.coalescing_lock:
             if key in self.in_flight:
                 # Wait for existing request
-                return await self.in_flight[key]
-
-            # Create new request future
-            future = asyncio.create_task(self._fetch_and_cache(
-                provider, resource, symbol, fetch_func, params, key
-            ))
-            self.in_flight[key] = future
+                future = self.in_flight[key]
+            else:
+                # Create new request future
+                future = asyncio.ensure_future(self._fetch_and_cache(
+                    provider, resource, symbol, fetch_func, params, key
+                ))
+                self.in_flight[key] = future
 
         try:
-            return await future
+            return await asyncio.shield(future)
         finally:
             # Clean up in-flight tracking
-            with self.coalescing_lock:
-                self.in_flight.pop(key, None)
+            if future.done():
+                with self.coalescing_lock:
+                    if self.in_flight.get(key) is future:
+                        self.in_flight.pop(key, None)
 
     async def _fetch_and_cache(self, provider: str, resource: str, symbol: str,
                               fetch_func: Callable[[], Awaitable[Any]], params: Dict, key: str) -> Any:
@@ -193,119 +99,51 @@ class CacheManager:
             logger.error(f"Error fetching data for {key}: {e}")
             raise
 
-    def clear_expired(self):
-        """Clear expired entries from cache"""
-        current_time = time.time()
-
-        # Clear memory cache expired entries
-        with self.memory_cache.lock:
-            expired_keys = []
-            for key, entry in self.memory_cache.cache.items():
-                resource_type = key.split(':')[1] if ':' in key else 'default'
-                ttl = self._get_ttl(resource_type)
-                if self._is_expired(entry, ttl):
-                    expired_keys.append(key)
-
-            for key in expired_keys:
-                del self.memory_cache.cache[key]
-
-        # Clear disk cache expired files
-        try:
-            for filename in os.listdir(self.cache_dir):
-                if filename.endswith('.json'):
-                    file_path = os.path.join(self.cache_dir, filename)
-                    try:
-                        with open(file_path, 'r') as f:
-                            entry = json.load(f)
-
-                        # Extract resource type from filename
-                        key_parts = filename.replace('.json', '').split('_')
-                        resource_type = key_parts[1] if len(key_parts) > 1 else 'default'
-                        ttl = self._get_ttl(resource_type)
-
-                        if self._is_expired(entry, ttl):
-                            os.remove(file_path)
-
-                    except Exception as e:
-                        logger.warning(f"Error checking expired file {filename}: {e}")
-
-        except Exception as e:
-            logger.warning(f"Error clearing expired disk cache: {e}")
+    def clear_expired(self) -> int:
+        """Clear expired entries from memory and disk"""
+        return self.cache.clear_expired()
 
     def clear_scope(self, scope: str):
         """Clear cache for specific scope (provider:resource pattern)"""
-        self.memory_cache.clear(prefix=scope)
-
-        # Clear matching disk files
-        try:
-            for filename in os.listdir(self.cache_dir):
-                if filename.startswith(scope.replace(':', '_')):
-                    file_path = os.path.join(self.cache_dir, filename)
-                    os.remove(file_path)
-        except Exception as e:
-            logger.warning(f"Error clearing scope {scope}: {e}")
+        self.cache.clear(prefix=scope)
 
-    def refresh_quotes_cache(self) -> bool:
-        """Refresh quotes cache (light operation for market hours)"""
+    def _refresh_namespace(self, name: str) -> bool:
         try:
-            logger.info("Refreshing quotes cache...")
+            logger.info(f"Refreshing {name} cache...")
+            expired = self.cache.clear_expired(name)
 
-            # Clear expired quote entries
-            quote_keys = [k for k in self._cache.keys() if k.startswith('quote:')]
-            expired_quotes = 0
-
-            for key in quote_keys:
-                if key in self._cache and self._is_expired(self._cache[key]['expires_at']):
-                    del self._cache[key]
-                    expired_quotes += 1
-
-            logger.info(f"Cleared {expired_quotes} expired quote entries")
-            telemetry.increment_counter('cache.quotes_refreshed')
+            logger.info(f"Cleared {expired} expired {name} entries")
+            telemetry.increment(f'cache.{name}_refreshed')
             return True
 
         except Exception as e:
-            logger.error(f"Error refreshing quotes cache: {str(e)}")
+            logger.error(f"Error refreshing {name} cache: {str(e)}")
             return False
 
+    def refresh_quotes_cache(self) -> bool:
+        """Refresh quotes cache (light operation for market hours)"""
+        return self._refresh_namespace('quotes')
+
     def refresh_options_cache(self) -> bool:
         """Refresh options chain cache (light operation for market hours)"""
-        try:
-            logger.info("Refreshing options chain cache...")
-
-            # Clear expired options entries
-            options_keys = [k for k in self._cache.keys() if k.startswith('options:')]
-            expired_options = 0
-
-            for key in options_keys:
-                if key in self._cache and self._is_expired(self._cache[key]['expires_at']):
-                    del self._cache[key]
-                    expired_options += 1
-
-            logger.info(f"Cleared {expired_options} expired options entries")
-            telemetry.increment_counter('cache.options_refreshed')
-            return True
-
-        except Exception as e:
-            logger.error(f"Error refreshing options cache: {str(e)}")
-            return False
+        return self._refresh_namespace('options_chain')
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         try:
-            total_entries = len(self._cache)
-            expired_entries = len([k for k, v in self._cache.items() 
-                                 if self._is_expired(v['expires_at'])])
+            namespaces = self.cache.get_stats()
+            hits = sum(ns['hits'] for ns in namespaces.values())
+            misses = sum(ns['misses'] for ns in namespaces.values())
 
             return {
-                'total_entries': total_entries,
-                'expired_entries': expired_entries,
-                'active_entries': total_entries - expired_entries,
-                'hit_rate': self._calculate_hit_rate(),
-                'memory_usage_mb': self._estimate_memory_usage()
+                'total_entries': sum(ns['entries'] for ns in namespaces.values()),
+                'hit_rate': round(hits / (hits + misses) * 100, 2) if hits + misses else 0.0,
+                'evictions': sum(ns['evictions'] for ns in namespaces.values()),
+                'namespaces': namespaces
             }
         except Exception as e:
             logger.error(f"Error getting cache stats: {str(e)}")
             return {}
 
 # Global cache manager instance
-cache_manager = CacheManager()
\ No newline at end of file
+cache_manager = CacheManager()
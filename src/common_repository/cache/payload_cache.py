@@ -0,0 +1,151 @@
+"""
+Precomputed Payload Cache
+Stale-while-revalidate holder for one expensive, frequently polled payload:
+1. The payload is built once and kept as serialized JSON bytes plus an ETag
+2. Past its TTL the stale snapshot is still served while a single
+   background rebuild runs; concurrent readers never rebuild in parallel
+3. A timer thread and invalidate() (for data-change events) keep it warm;
+   an optional source version catches changes written by other processes
+4. Hit/stale/miss counts and build time exported through telemetry
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..utils.telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PayloadSnapshot:
+    body: bytes
+    etag: str
+    built_at: float
+    build_ms: float
+    source_version: Any = None
+    cached_body: Optional[bytes] = None
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.built_at
+
+    def body_for(self, status: str) -> bytes:
+        """Body to send: the cache-hit variant unless this request just built it"""
+        return self.body if status == 'miss' or self.cached_body is None else self.cached_body
+
+
+def serialize_payload(payload: Dict[str, Any]) -> Tuple[bytes, str]:
+    """Compact JSON bytes and a strong (unquoted) ETag over them"""
+    body = json.dumps(payload, default=str, separators=(',', ':')).encode('utf-8')
+    return body, hashlib.sha1(body).hexdigest()
+
+
+class PayloadCache:
+    """Serves one precomputed payload; rebuilds are single-flight and, once warm, off the request path"""
+
+    def __init__(self, name: str, build: Callable[[], Dict[str, Any]],
+                 ttl: Callable[[], float] = lambda: 120.0, refresh_interval: float = 0.0,
+                 source_version: Optional[Callable[[], Any]] = None, hit_flag: Optional[str] = None):
+        self.name = name
+        self.build = build
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.source_version = source_version  # cheap stamp of the inputs; a change marks the snapshot stale
+        self.hit_flag = hit_flag  # payload field set to True in the body served from cache
+        self._snapshot: Optional[PayloadSnapshot] = None
+        self._build_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._refreshing = False
+        self._dirty = False
+        self._timer: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def get(self, force: bool = False) -> Tuple[PayloadSnapshot, str]:
+        """(snapshot, 'hit' | 'stale' | 'miss'); only a cold cache or force blocks on a build"""
+        snapshot = self._snapshot
+        if force or snapshot is None:
+            telemetry.increment(f'{self.name}.cache_miss')
+            return self._rebuild(reuse_since=time.time() if force else 0.0), 'miss'
+
+        if self._dirty or snapshot.age() >= self.ttl() or self._source_changed(snapshot):
+            telemetry.increment(f'{self.name}.cache_stale')
+            self.refresh_async()
+            return snapshot, 'stale'
+
+        telemetry.increment(f'{self.name}.cache_hit')
+        return snapshot, 'hit'
+
+    def _source_changed(self, snapshot: PayloadSnapshot) -> bool:
+        if self.source_version is None:
+            return False
+        try:
+            return self.source_version() != snapshot.source_version
+        except Exception as e:
+            logger.warning(f"Source version check for {self.name} failed: {e}")
+            return False
+
+    def _rebuild(self, reuse_since: Optional[float]) -> PayloadSnapshot:
+        """Build under the lock, or reuse a snapshot whose build started at/after reuse_since"""
+        with self._build_lock:
+            snapshot = self._snapshot
+            if snapshot is not None and reuse_since is not None and snapshot.built_at >= reuse_since:
+                return snapshot
+
+            self._dirty = False
+            built_at = time.time()
+            # Read before building so a write landing mid-build triggers another rebuild
+            source_version = self.source_version() if self.source_version is not None else None
+            payload = self.build()
+            body, etag = serialize_payload(payload)
+            cached_body = serialize_payload({**payload, self.hit_flag: True})[0] if self.hit_flag else None
+            build_ms = (time.time() - built_at) * 1000
+            self._snapshot = PayloadSnapshot(body, etag, built_at, build_ms, source_version, cached_body)
+            telemetry.record_histogram(f'{self.name}.build_ms', build_ms)
+            return self._snapshot
+
+    def refresh_async(self) -> bool:
+        """Start a background rebuild unless one is already running"""
+        with self._state_lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+        threading.Thread(target=self._refresh_worker, name=f'{self.name}-refresh', daemon=True).start()
+        return True
+
+    def _refresh_worker(self):
+        try:
+            self._rebuild(reuse_since=None)
+        except Exception as e:
+            logger.error(f"Background rebuild of {self.name} failed: {e}")
+        finally:
+            with self._state_lock:
+                self._refreshing = False
+
+    def invalidate(self):
+        """Data changed: keep serving the current snapshot but rebuild it now"""
+        self._dirty = True
+        if self._snapshot is not None:
+            self.refresh_async()
+
+    def start(self):
+        """Precompute on a timer (no-op if already running or no interval is set)"""
+        if self.refresh_interval <= 0 or (self._timer is not None and self._timer.is_alive()):
+            return
+        self._stop.clear()
+        self._timer = threading.Thread(target=self._timer_loop, name=f'{self.name}-timer', daemon=True)
+        self._timer.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _timer_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self._rebuild(reuse_since=None)
+            except Exception as e:
+                logger.error(f"Scheduled rebuild of {self.name} failed: {e}")
@@ -0,0 +1,403 @@
+"""
+Tiered Cache
+Shared cache subsystem used by every module:
+1. Thread-safe O(1) LRU memory tier per namespace
+2. Per-namespace TTL and entry budget
+3. Optional on-disk JSON tier that survives restarts; values that would not
+   come back from JSON unchanged (datetimes, DataFrames, tuples...) stay memory-only
+4. Single-flight coalescing so concurrent misses compute a value once
+5. Hit/miss/eviction metrics exported through telemetry
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+from ..config.runtime import CACHE_DIR, CACHE_NAMESPACES
+from ..utils.telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+@dataclass
+class NamespaceConfig:
+    ttl: float
+    max_entries: int
+    disk: bool = False
+
+
+class _MemoryTier:
+    """LRU map of key -> (expires_at, value); every operation is O(1)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str, now: float):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[0] < now:
+                del self.entries[key]
+                return _MISSING
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, value: Any, expires_at: float) -> int:
+        """Store value; returns how many LRU entries were evicted"""
+        with self.lock:
+            self.entries[key] = (expires_at, value)
+            self.entries.move_to_end(key)
+            evicted = 0
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def delete(self, key: str) -> bool:
+        with self.lock:
+            return self.entries.pop(key, _MISSING) is not _MISSING
+
+    def clear(self, prefix: Optional[str] = None, contains: Optional[str] = None) -> int:
+        with self.lock:
+            if prefix is None and contains is None:
+                count = len(self.entries)
+                self.entries.clear()
+                return count
+            keys = [key for key in self.entries
+                    if (prefix is None or key.startswith(prefix)) and (contains is None or contains in key)]
+            for key in keys:
+                del self.entries[key]
+            return len(keys)
+
+    def purge_expired(self, now: float) -> int:
+        with self.lock:
+            keys = [key for key, (expires_at, _) in self.entries.items() if expires_at < now]
+            for key in keys:
+                del self.entries[key]
+            return len(keys)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class _DiskTier:
+    """One JSON file per key under cache_dir/namespace; only values that survive a JSON round trip"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.md5(key.encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, key: str, now: float):
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return _MISSING, 0
+        except (OSError, ValueError) as e:
+            logger.warning(f"Error reading disk cache for {key}: {e}")
+            return _MISSING, 0
+        if entry.get('key') != key or entry.get('expires_at', 0) < now:
+            self._remove(path)
+            return _MISSING, 0
+        return entry.get('value'), entry['expires_at']
+
+    def put(self, key: str, value: Any, expires_at: float) -> bool:
+        """Persist value; False (and any older copy removed) if it is not plain JSON"""
+        path = self._path(key)
+        try:
+            text = json.dumps({'key': key, 'value': value, 'expires_at': expires_at})
+            portable = json.loads(text)['value'] == value
+        except (TypeError, ValueError):
+            portable = False
+        if not portable:
+            logger.debug(f"Keeping {key} memory-only: {type(value).__name__} value does not round-trip as JSON")
+            self._remove(path)
+            return False
+
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logger.warning(f"Error writing disk cache for {key}: {e}")
+            self._remove(tmp_path)
+            return False
+
+    def delete(self, key: str):
+        self._remove(self._path(key))
+
+    def clear(self, prefix: Optional[str] = None, contains: Optional[str] = None,
+              expired_before: Optional[float] = None) -> int:
+        removed = 0
+        try:
+            filenames = os.listdir(self.directory)
+        except OSError:
+            return 0
+        for filename in filenames:
+            if not filename.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, filename)
+            if prefix is not None or contains is not None or expired_before is not None:
+                try:
+                    with open(path, 'r') as f:
+                        entry = json.load(f)
+                except (OSError, ValueError):
+                    entry = {}
+                key = str(entry.get('key', ''))
+                if prefix is not None and not key.startswith(prefix):
+                    continue
+                if contains is not None and contains not in key:
+                    continue
+                if expired_before is not None and entry.get('expires_at', 0) >= expired_before:
+                    continue
+            removed += self._remove(path)
+        return removed
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class CacheNamespace:
+    """Handle bound to one namespace; also usable as a memoizing decorator"""
+
+    def __init__(self, cache: 'TieredCache', name: str):
+        self.cache = cache
+        self.name = name
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.cache.get(self.name, key, default)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.cache.set(self.name, key, value, ttl)
+
+    def delete(self, key: str) -> bool:
+        return self.cache.delete(self.name, key)
+
+    def clear(self, prefix: Optional[str] = None, contains: Optional[str] = None) -> int:
+        return self.cache.clear(self.name, prefix, contains)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        return self.cache.get_or_compute(self.name, key, compute, ttl)
+
+    def __call__(self, func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = f"{func.__module__}.{func.__qualname__}:{args!r}:{sorted(kwargs.items())!r}"
+            return self.get_or_compute(key, lambda: func(*args, **kwargs))
+        wrapper.cache = self
+        return wrapper
+
+
+class TieredCache:
+    """Namespaced memory + disk cache with single-flight fills"""
+
+    def __init__(self, cache_dir: str = CACHE_DIR,
+                 namespaces: Optional[Dict[str, tuple]] = None,
+                 flight_timeout: float = 60.0):
+        self.cache_dir = cache_dir
+        self.flight_timeout = flight_timeout
+        self._configs: Dict[str, NamespaceConfig] = {}
+        self._memory: Dict[str, _MemoryTier] = {}
+        self._disk: Dict[str, _DiskTier] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._in_flight: Dict[tuple, _Flight] = {}
+
+        namespaces = dict(namespaces or CACHE_NAMESPACES)
+        namespaces.setdefault('default', CACHE_NAMESPACES['default'])
+        for name, (ttl, max_entries, disk) in namespaces.items():
+            self.configure(name, ttl, max_entries, disk)
+
+    def configure(self, name: str, ttl: float, max_entries: int, disk: bool = False) -> CacheNamespace:
+        """Create or resize a namespace; existing memory entries are kept"""
+        with self._lock:
+            self._configs[name] = NamespaceConfig(ttl, max_entries, disk)
+            tier = self._memory.get(name)
+            if tier is None:
+                self._memory[name] = _MemoryTier(max_entries)
+            else:
+                tier.max_entries = max_entries
+            if disk and name not in self._disk:
+                self._disk[name] = _DiskTier(os.path.join(self.cache_dir, name))
+            self._stats.setdefault(name, {'hits': 0, 'misses': 0, 'evictions': 0,
+                                          'disk_hits': 0, 'coalesced': 0, 'memory_only': 0})
+        return CacheNamespace(self, name)
+
+    def namespace(self, name: str, ttl: Optional[float] = None, max_entries: Optional[int] = None,
+                  disk: Optional[bool] = None) -> CacheNamespace:
+        """Handle for a namespace, creating it from defaults if it does not exist yet"""
+        config = self._configs.get(name)
+        if config is None or ttl is not None or max_entries is not None or disk is not None:
+            base = config or self._configs['default']
+            return self.configure(name,
+                                  ttl if ttl is not None else base.ttl,
+                                  max_entries if max_entries is not None else base.max_entries,
+                                  disk if disk is not None else (config.disk if config else False))
+        return CacheNamespace(self, name)
+
+    def has_namespace(self, name: str) -> bool:
+        return name in self._configs
+
+    def _tier(self, name: str) -> _MemoryTier:
+        tier = self._memory.get(name)
+        if tier is None:
+            self.namespace(name)
+            tier = self._memory[name]
+        return tier
+
+    def _count(self, name: str, stat: str, value: int = 1):
+        with self._lock:
+            self._stats[name][stat] += value
+        telemetry.increment(f'cache.{stat}', value, {'namespace': name})
+
+    def get(self, name: str, key: str, default: Any = None) -> Any:
+        value = self._lookup(name, key)
+        return default if value is _MISSING else value
+
+    def _lookup(self, name: str, key: str):
+        now = time.time()
+        tier = self._tier(name)
+        value = tier.get(key, now)
+
+        if value is _MISSING and name in self._disk:
+            value, expires_at = self._disk[name].get(key, now)
+            if value is not _MISSING:
+                tier.put(key, value, expires_at)
+                self._count(name, 'disk_hits')
+
+        if value is _MISSING:
+            self._count(name, 'misses')
+        else:
+            self._count(name, 'hits')
+        return value
+
+    def set(self, name: str, key: str, value: Any, ttl: Optional[float] = None):
+        tier = self._tier(name)
+        expires_at = time.time() + (ttl if ttl is not None else self._configs[name].ttl)
+        evicted = tier.put(key, value, expires_at)
+        if evicted:
+            self._count(name, 'evictions', evicted)
+        if name in self._disk and not self._disk[name].put(key, value, expires_at):
+            self._count(name, 'memory_only')
+        telemetry.set_gauge('cache.entries', len(tier), {'namespace': name})
+
+    def delete(self, name: str, key: str) -> bool:
+        removed = self._tier(name).delete(key)
+        if name in self._disk:
+            self._disk[name].delete(key)
+        return removed
+
+    def clear(self, name: Optional[str] = None, prefix: Optional[str] = None,
+              contains: Optional[str] = None) -> int:
+        """Drop a namespace (optionally only matching keys), or every namespace when name is None"""
+        names = [name] if name is not None else list(self._memory)
+        removed = 0
+        for ns in names:
+            removed += self._tier(ns).clear(prefix, contains)
+            if ns in self._disk:
+                self._disk[ns].clear(prefix, contains)
+        return removed
+
+    def clear_expired(self, name: Optional[str] = None) -> int:
+        now = time.time()
+        removed = 0
+        tiers = [(name, self._tier(name))] if name is not None else list(self._memory.items())
+        for name, tier in tiers:
+            removed += tier.purge_expired(now)
+            if name in self._disk:
+                removed += self._disk[name].clear(expired_before=now)
+            telemetry.set_gauge('cache.entries', len(tier), {'namespace': name})
+        return removed
+
+    def get_or_compute(self, name: str, key: str, compute: Callable[[], Any],
+                       ttl: Optional[float] = None) -> Any:
+        """Return the cached value or compute it once, even with many concurrent callers"""
+        value = self._lookup(name, key)
+        if value is not _MISSING:
+            return value
+
+        flight_key = (name, key)
+        with self._lock:
+            flight = self._in_flight.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[flight_key] = _Flight()
+
+        if not leader:
+            self._count(name, 'coalesced')
+            if not flight.event.wait(self.flight_timeout):
+                return compute()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            if flight.value is not None:
+                self.set(name, key, flight.value, ttl)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(flight_key, None)
+            flight.event.set()
+
+    def values(self, name: str) -> list:
+        """Snapshot of live in-memory values for a namespace"""
+        now = time.time()
+        tier = self._tier(name)
+        with tier.lock:
+            return [value for expires_at, value in tier.entries.values() if expires_at >= now]
+
+    def get_stats(self, name: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            names = [name] if name is not None else list(self._stats)
+            stats = {}
+            for ns in names:
+                counters = dict(self._stats.get(ns, {}))
+                lookups = counters.get('hits', 0) + counters.get('misses', 0)
+                counters.update({
+                    'entries': len(self._memory[ns]) if ns in self._memory else 0,
+                    'max_entries': self._configs[ns].max_entries if ns in self._configs else 0,
+                    'ttl': self._configs[ns].ttl if ns in self._configs else 0,
+                    'hit_rate': round(counters.get('hits', 0) / lookups * 100, 2) if lookups else 0.0,
+                })
+                stats[ns] = counters
+        return stats[name] if name is not None else stats
+
+
+# Global instance
+tiered_cache = TieredCache()
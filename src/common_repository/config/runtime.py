@@ -29,6 +29,126 @@ KPI_MIN_SAMPLES = {
 # Cache and memory settings
 CACHE_TTL_SECONDS = 300
 MAX_CACHE_SIZE_MB = 50
+CACHE_DIR = os.getenv('CACHE_DIR', 'data/cache')
+
+# Tiered cache namespaces: (ttl seconds, max in-memory entries, persist to disk)
+CACHE_NAMESPACES = {
+    'default': (CACHE_TTL_SECONDS, 1000, False),
+    'quotes': (15, 2000, True),
+    'ohlc': (900, 500, True),
+    'options_chain': (60, 500, True),
+    'model_inference': (300, 1000, True),
+    'price_data': (60, 500, False),
+    'technical': (300, 500, False),
+    'fundamental': (1800, 500, False),
+    'live_data': (60, 1000, False),
+    'files': (3600, 200, True),
+    'http_validators': (86400, 256, False),
+}
+
+# Concurrent screening pipeline
+SCREENER_FUNDAMENTAL_WORKERS = int(os.getenv('SCREENER_FUNDAMENTAL_WORKERS', 4))
+SCREENER_TECHNICAL_WORKERS = int(os.getenv('SCREENER_TECHNICAL_WORKERS', 8))
+SCREENER_RUN_TIMEOUT_SEC = int(os.getenv('SCREENER_RUN_TIMEOUT_SEC', 600))
+
+# Fundamentals store: re-check cadence once a new quarter's results may be out, hard age cap
+FUNDAMENTALS_RECHECK_SEC = int(os.getenv('FUNDAMENTALS_RECHECK_SEC', 86400))
+FUNDAMENTALS_MAX_AGE_DAYS = int(os.getenv('FUNDAMENTALS_MAX_AGE_DAYS', 30))
+
+# Upstream request budgets per host: (burst capacity, refill tokens/sec)
+HOST_RATE_LIMITS = {
+    'www.screener.in': (4, 2.0),
+    'query1.finance.yahoo.com': (10, 5.0),
+    'www.nseindia.com': (3, 1.0),
+}
+
+# Option-chain snapshots: one fetch per underlying covers every expiry
+OPTION_CHAIN_TTL_SEC = int(os.getenv('OPTION_CHAIN_TTL_SEC', 60))
+OPTION_CHAIN_UNDERLYINGS = [s.strip().upper() for s in os.getenv(
+    'OPTION_CHAIN_UNDERLYINGS', 'NIFTY,BANKNIFTY,FINNIFTY').split(',') if s.strip()]
+# Consecutive failed refreshes before an on-demand underlying stops being refreshed
+OPTION_CHAIN_MAX_FAILURES = int(os.getenv('OPTION_CHAIN_MAX_FAILURES', 3))
+
+# Shared HTTP transport: keep-alive pools, retries on 429/5xx, batch fetch workers
+HTTP_POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', 16))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 16))
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 2))
+HTTP_BACKOFF_SEC = float(os.getenv('HTTP_BACKOFF_SEC', 0.5))
+HTTP_TIMEOUT_SEC = float(os.getenv('HTTP_TIMEOUT_SEC', 10))
+HTTP_FETCH_WORKERS = int(os.getenv('HTTP_FETCH_WORKERS', 8))
+HTTP_RATE_LIMIT_WAIT_SEC = float(os.getenv('HTTP_RATE_LIMIT_WAIT_SEC', 30))
+HTTP_VALIDATOR_MAX_BYTES = int(os.getenv('HTTP_VALIDATOR_MAX_BYTES', 1024 * 1024))
+
+# Local OHLCV store
+OHLCV_STORE_DIR = os.getenv('OHLCV_STORE_DIR', 'data/ohlcv_store')
+OHLCV_REFRESH_INTERVAL_SEC = int(os.getenv('OHLCV_REFRESH_INTERVAL_SEC', 3600))
+OHLCV_BOOTSTRAP_PERIOD = os.getenv('OHLCV_BOOTSTRAP_PERIOD', '5y')
+
+# Background quote snapshot service (handlers read the table, the poller fetches)
+QUOTE_POLL_INTERVAL_SEC = int(os.getenv('QUOTE_POLL_INTERVAL_SEC', 15))
+QUOTE_CLOSED_POLL_INTERVAL_SEC = int(os.getenv('QUOTE_CLOSED_POLL_INTERVAL_SEC', 300))
+QUOTE_STALE_AFTER_SEC = int(os.getenv('QUOTE_STALE_AFTER_SEC', 60))
+QUOTE_WATCH_TTL_SEC = int(os.getenv('QUOTE_WATCH_TTL_SEC', 1800))
+QUOTE_WATCHLIST = [s.strip().upper() for s in os.getenv('QUOTE_WATCHLIST', '').split(',') if s.strip()]
+
+# Tracking / prediction record store (SQLite, WAL mode)
+TRACKING_DB_PATH = os.getenv('TRACKING_DB_PATH', 'data/tracking/tracking.db')
+# json_store keys served from the record store instead of whole-file JSON
+RECORD_STORE_COLLECTIONS = [s.strip() for s in os.getenv(
+    'RECORD_STORE_COLLECTIONS', 'interactive_tracking,predictions_history,trades_history').split(',') if s.strip()]
+# Prediction log written by the backtesting and stability managers (newest records kept)
+PREDICTION_LOG_MAX_RECORDS = int(os.getenv('PREDICTION_LOG_MAX_RECORDS', 5000))
+# Collections re-exported as plain JSON on compaction for tools outside the app
+RECORD_STORE_MIRRORS = {
+    'interactive_tracking': 'interactive_tracking.json',
+}
+
+# Short strangle strategy generation (empty universe = every symbol with a known lot size)
+OPTIONS_STRATEGY_UNIVERSE = [s.strip().upper() for s in os.getenv('OPTIONS_STRATEGY_UNIVERSE', '').split(',')
+                             if s.strip()]
+OPTIONS_STRATEGY_CHUNK_SIZE = int(os.getenv('OPTIONS_STRATEGY_CHUNK_SIZE', 50))
+
+# Parallel model training (0 workers = one per CPU this process may run on, minus one)
+TRAINING_WORKERS = int(os.getenv('TRAINING_WORKERS', 0))
+TRAINING_THREADS_PER_WORKER = int(os.getenv('TRAINING_THREADS_PER_WORKER', 1))
+
+# Batched inference: warm model pool (LRU, bounded by count and estimated memory)
+MODELS_DIR = os.getenv('MODELS_DIR', 'models_trained')
+MODEL_POOL_MAX_MODELS = int(os.getenv('MODEL_POOL_MAX_MODELS', 64))
+MODEL_POOL_MAX_MB = int(os.getenv('MODEL_POOL_MAX_MB', 1024))
+INFERENCE_HISTORY_BARS = int(os.getenv('INFERENCE_HISTORY_BARS', 260))
+
+# Fusion dashboard precompute (snapshot is also rebuilt when its source data changes)
+FUSION_PRECOMPUTE_INTERVAL_SEC = int(os.getenv('FUSION_PRECOMPUTE_INTERVAL_SEC', 60))
+
+# Agent orchestrator: worker threads, pending-job bound, reuse window for identical inputs
+AGENT_WORKERS = int(os.getenv('AGENT_WORKERS', 4))
+AGENT_QUEUE_MAX = int(os.getenv('AGENT_QUEUE_MAX', 256))
+AGENT_RESULT_TTL_SEC = int(os.getenv('AGENT_RESULT_TTL_SEC', 900))
+
+# Prometheus exporter: prefix prepended to every exported metric name
+METRICS_NAMESPACE = os.getenv('METRICS_NAMESPACE', 'stock_analyst')
+
+# Server-sent events push channel (/api/stream). Each open stream holds a server thread:
+# under gunicorn gthread at most threads - PUSH_RESERVED_THREADS streams are accepted, and
+# the channel is off on sync workers (pages then fall back to polling)
+PUSH_ENABLED = os.getenv('PUSH_ENABLED', 'true').lower() == 'true'
+PUSH_RESERVED_THREADS = int(os.getenv('PUSH_RESERVED_THREADS', 8))  # kept free for regular requests
+PUSH_CLIENT_BUFFER = int(os.getenv('PUSH_CLIENT_BUFFER', 256))      # pending events per client before resync
+PUSH_MAX_CLIENTS = int(os.getenv('PUSH_MAX_CLIENTS', 200))
+PUSH_MAX_SYMBOLS = int(os.getenv('PUSH_MAX_SYMBOLS', 50))           # quote topics per client
+PUSH_HEARTBEAT_SEC = float(os.getenv('PUSH_HEARTBEAT_SEC', 15))
+# Local socket the feed-job process relays publishes over to the serving workers
+# (default: a per-master path in the temp dir)
+PUSH_RELAY_ADDRESS = os.getenv('PUSH_RELAY_ADDRESS')
+PUSH_RELAY_RETRY_SEC = float(os.getenv('PUSH_RELAY_RETRY_SEC', 2))
+
+# Startup: cold-start budget checked by scripts/startup_benchmark.py, and heavy
+# modules to import in the gunicorn master before fork (comma-separated, off by default)
+STARTUP_BUDGET_SEC = float(os.getenv('STARTUP_BUDGET_SEC', 1.0))
+STARTUP_RSS_BUDGET_MB = float(os.getenv('STARTUP_RSS_BUDGET_MB', 150))
+STARTUP_PRELOAD_MODULES = [m.strip() for m in os.getenv('STARTUP_PRELOAD_MODULES', '').split(',') if m.strip()]
+HEAVY_MODULES = ('tensorflow', 'sklearn', 'shap', 'yfinance', 'bs4', 'joblib')
 
 # Performance monitoring
 MEMORY_WARNING_THRESHOLD_MB = 100
@@ -34,27 +34,26 @@ def job_kpi_refresh():
             logger.debug("Skipping KPI refresh - outside market hours")
             return
         
-        # Compute KPIs for all timeframes and products
-        timeframes = ['3D', '5D', '10D', '15D', '30D', 'All']
-        products = [None, 'equities', 'options', 'commodities']  # None = overall
-        
+        # Compute KPIs for all timeframes and products from one shared snapshot
+        results = kpi_service.compute_all()
+
         refresh_count = 0
-        for timeframe in timeframes:
-            for product in products:
+        for timeframe, by_product in results.items():
+            for product, result in by_product.items():
                 try:
-                    kpis = kpi_service.compute(timeframe=timeframe, product=product)
+                    kpis = result.get('metrics', result)
                     if kpis.get('sample_size', 0) > 0:
                         refresh_count += 1
-                        
+
                         # Evaluate triggers
                         triggers = kpi_service.evaluate_triggers(kpis)
                         if triggers:
-                            logger.info(f"Generated {len(triggers)} triggers for {product or 'overall'}/{timeframe}")
-                            
+                            logger.info(f"Generated {len(triggers)} triggers for {product}/{timeframe}")
+
                 except Exception as e:
-                    logger.error(f"Error computing KPIs for {product or 'overall'}/{timeframe}: {e}")
+                    logger.error(f"Error evaluating KPIs for {product}/{timeframe}: {e}")
                     continue
-        
+
         logger.info(f"KPI background refresh completed: {refresh_count} KPI sets updated")
         
     except Exception as e:
@@ -1,22 +1,46 @@
 
 """
 JSON-based Storage Implementation
+
+Keys listed in RECORD_STORE_COLLECTIONS are kept in the indexed record store
+(one row per record) instead of a whole JSON file per key.
 """
 
 import json
 import os
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
+from ..config.runtime import RECORD_STORE_COLLECTIONS
+from .record_store import RecordStore, record_store as default_record_store
+
 logger = logging.getLogger(__name__)
 
 class JsonStore:
     """JSON-based storage manager"""
     
-    def __init__(self, storage_dir: str = "data/runtime"):
+    def __init__(self, storage_dir: str = "data/runtime", record_store: Optional[RecordStore] = None,
+                 record_collections: Optional[List[str]] = None):
         self.storage_dir = storage_dir
+        self.record_store = record_store
+        self.record_collections = set(record_collections or [])
+        self._listeners: List[Callable[[str], None]] = []
+        if record_store is not None:
+            # Record collections are also written through the record store directly (tracker, prediction log)
+            record_store.add_listener(self._notify)
         self._ensure_storage_dir()
+
+    def add_listener(self, callback: Callable[[str], None]):
+        """Call callback(key) after every successful write or delete, including record store writes"""
+        self._listeners.append(callback)
+
+    def _notify(self, key: str):
+        for callback in self._listeners:
+            try:
+                callback(key)
+            except Exception as e:
+                logger.warning(f"Store listener failed for key {key}: {e}")
     
     def _ensure_storage_dir(self):
         """Ensure storage directory exists"""
@@ -31,9 +55,33 @@ class JsonStore:
         safe_key = "".join(c for c in key if c.isalnum() or c in "._-")
         return os.path.join(self.storage_dir, f"{safe_key}.json")
     
+    def _is_record_collection(self, key: str, data: Any = None) -> bool:
+        return (self.record_store is not None and key in self.record_collections
+                and (data is None or isinstance(data, (dict, list))))
+
+    def _migrate(self, key: str):
+        """One-time import of a legacy JSON file into the record store"""
+        if self.record_store.exists(key):
+            return
+        file_path = self._get_file_path(key)
+        data = None
+        if os.path.exists(file_path):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f).get('data')
+            except Exception as e:
+                logger.error(f"Error reading legacy data for key {key}: {e}")
+                return
+        if isinstance(data, (dict, list)):
+            self.record_store.save(key, data)
+            logger.info(f"Migrated {key} into the record store")
+
     def save(self, key: str, data: Any) -> bool:
         """Save data to storage"""
         try:
+            if self._is_record_collection(key, data):
+                return self.record_store.save(key, data)
+
             file_path = self._get_file_path(key)
             
             # Add metadata
@@ -48,6 +96,7 @@ class JsonStore:
                 json.dump(storage_data, f, indent=2, ensure_ascii=False)
             
             logger.debug(f"Saved data for key: {key}")
+            self._notify(key)
             return True
             
         except Exception as e:
@@ -57,6 +106,10 @@ class JsonStore:
     def load(self, key: str, default: Any = None) -> Any:
         """Load data from storage"""
         try:
+            if self._is_record_collection(key):
+                self._migrate(key)
+                return self.record_store.load(key, default)
+
             file_path = self._get_file_path(key)
             
             if not os.path.exists(file_path):
@@ -76,13 +129,15 @@ class JsonStore:
         """Delete data from storage"""
         try:
             file_path = self._get_file_path(key)
+            dropped = self._is_record_collection(key) and self.record_store.drop(key)
             
             if os.path.exists(file_path):
                 os.remove(file_path)
                 logger.debug(f"Deleted data for key: {key}")
+                self._notify(key)
                 return True
             
-            return False
+            return dropped
             
         except Exception as e:
             logger.error(f"Error deleting data for key {key}: {e}")
@@ -90,6 +145,8 @@ class JsonStore:
     
     def exists(self, key: str) -> bool:
         """Check if key exists in storage"""
+        if self._is_record_collection(key) and self.record_store.exists(key):
+            return True
         file_path = self._get_file_path(key)
         return os.path.exists(file_path)
     
@@ -106,11 +163,83 @@ class JsonStore:
                     key = filename[:-5]
                     keys.append(key)
             
+            if self.record_store is not None:
+                keys.extend(k for k in self.record_store.collections()
+                            if k in self.record_collections and k not in keys)
             return keys
             
         except Exception as e:
             logger.error(f"Error listing keys: {e}")
             return []
 
+    def update_record(self, key: str, record_key: str, value: Any) -> bool:
+        """Insert or update one record of a keyed collection without rewriting the rest"""
+        try:
+            if self._is_record_collection(key):
+                self._migrate(key)
+                return self.record_store.put(key, record_key, value)
+            data = self.load(key, {})
+            data[record_key] = value
+            return self.save(key, data)
+        except Exception as e:
+            logger.error(f"Error updating record {record_key} in {key}: {e}")
+            return False
+
+    def append_record(self, key: str, record: Any) -> bool:
+        """Append one record to a list collection"""
+        try:
+            if self._is_record_collection(key):
+                self._migrate(key)
+                self.record_store.append(key, record)
+                return True
+            data = self.load(key, [])
+            data.append(record)
+            return self.save(key, data)
+        except Exception as e:
+            logger.error(f"Error appending record to {key}: {e}")
+            return False
+
+    def query_records(self, key: str, **filters) -> List[Any]:
+        """Indexed symbol / timeframe / date-range query over a record collection"""
+        if not self._is_record_collection(key):
+            return []
+        self._migrate(key)
+        return self.record_store.query(key, **filters)
+
+    def changed_records(self, key: str, since: Optional[int] = None) -> Tuple[Optional[int], List[Tuple[str, Any]]]:
+        """(version, [(record_key, record)]) written after version `since`; everything when since is None
+
+        Keys outside the record collections carry no versions: all records, version None.
+        """
+        if self._is_record_collection(key):
+            self._migrate(key)
+            return self.record_store.changed_since(key, since)
+        data = self.load(key)
+        if isinstance(data, dict):
+            return None, list(data.items())
+        if isinstance(data, list):
+            return None, [(str(i), record) for i, record in enumerate(data)]
+        return None, []
+
+    def count_records(self, key: str, by: str = 'timeframe') -> Dict[Optional[str], int]:
+        """Record counts per indexed field value; non-record keys are counted in memory"""
+        if self._is_record_collection(key):
+            self._migrate(key)
+            return self.record_store.count_by(key, by)
+        counts: Dict[Optional[str], int] = {}
+        for _, record in self.changed_records(key)[1]:
+            value = record.get(by) if isinstance(record, dict) else None
+            counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    def modified(self, key: str) -> Optional[int]:
+        """Change stamp for a key: record-store version, or the JSON file's mtime_ns (None if absent)"""
+        if self._is_record_collection(key):
+            return self.record_store.version(key) or None
+        try:
+            return os.stat(self._get_file_path(key)).st_mtime_ns
+        except OSError:
+            return None
+
 # Global singleton instance
-json_store = JsonStore()
+json_store = JsonStore(record_store=default_record_store, record_collections=RECORD_STORE_COLLECTIONS)
@@ -0,0 +1,76 @@
+"""
+Prediction Log
+The one history of per-stock predictions (symbol, timestamp, predicted_1mo,
+predicted_price, ...) shared by its writers (BacktestingManager,
+PredictionStabilityManager) and readers (accuracy API, evolution engine,
+optimization agent, insight reports). Records live in the record store; the
+legacy JSON files are imported once and no longer read or written.
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from ..config.runtime import PREDICTION_LOG_MAX_RECORDS
+from .record_store import RecordStore, record_store as default_record_store
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = 'backtest_predictions_history'
+LEGACY_FILES = ('data/tracking/predictions_history.json', 'predictions_history.json')
+
+DateLike = Union[str, datetime, None]
+
+
+def _day(value: DateLike) -> Optional[str]:
+    return value.isoformat()[:10] if isinstance(value, datetime) else value
+
+
+class PredictionLog:
+    """Append-only, size-capped prediction history over a record store list collection"""
+
+    def __init__(self, store: Optional[RecordStore] = None, collection: str = COLLECTION,
+                 legacy_files: Iterable[str] = LEGACY_FILES, max_records: int = PREDICTION_LOG_MAX_RECORDS):
+        self.store = store or default_record_store
+        self.collection = collection
+        self.legacy_files = tuple(legacy_files)
+        self.max_records = max_records
+        self._migrated = False
+        self._lock = threading.Lock()
+
+    def _migrate(self):
+        """Import the first legacy file holding a list, once per process"""
+        with self._lock:
+            if self._migrated:
+                return
+            for path in (None,) + self.legacy_files:
+                if path is not None:
+                    self.store.migrate_json(self.collection, path, None)
+                if not isinstance(self.store.load(self.collection, []), list):
+                    self.store.drop(self.collection)  # e.g. an empty legacy {} imported as a keyed collection
+                if self.store.exists(self.collection):
+                    break
+            self._migrated = True
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Add records and drop the oldest beyond max_records; returns records added"""
+        self._migrate()
+        added = self.store.append_many(self.collection, records)
+        if added:
+            self.store.trim(self.collection, self.max_records)
+        return added
+
+    def load(self, start: DateLike = None, end: DateLike = None, symbol: Optional[str] = None,
+             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Records in append order, optionally by symbol and inclusive YYYY-MM-DD date range"""
+        self._migrate()
+        return self.store.query(self.collection, symbol=symbol, start=_day(start), end=_day(end), limit=limit)
+
+    def count(self) -> int:
+        self._migrate()
+        return self.store.count(self.collection)
+
+
+# Global instance
+prediction_log = PredictionLog()
@@ -0,0 +1,434 @@
+"""
+Indexed Record Store
+SQLite (WAL mode) backend for tracking and prediction history:
+1. One row per record, so single-record updates are O(1) writes
+2. Symbol / timeframe / date indexes for range queries
+3. Whole-collection saves are diffed: only changed rows are written
+4. Readers never block on writers (WAL); compact() checkpoints the log
+   and refreshes JSON mirrors for legacy direct-file readers
+5. Every write bumps its collection's version in the database and stamps the rows
+   it writes with it: a mirror is re-exported whenever any process changed the
+   collection since its last export, and changed_since() reads only newer rows
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..config.runtime import TRACKING_DB_PATH, RECORD_STORE_MIRRORS
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS collections (
+    name TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    updated REAL NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    exported_version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS records (
+    collection TEXT NOT NULL,
+    key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    symbol TEXT,
+    timeframe TEXT,
+    record_date TEXT,
+    data TEXT NOT NULL,
+    rev INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (collection, key)
+);
+CREATE INDEX IF NOT EXISTS idx_records_seq ON records (collection, seq);
+CREATE INDEX IF NOT EXISTS idx_records_symbol ON records (collection, symbol);
+CREATE INDEX IF NOT EXISTS idx_records_timeframe ON records (collection, timeframe);
+CREATE INDEX IF NOT EXISTS idx_records_date ON records (collection, record_date);
+"""
+
+# Columns added to existing databases on first connection, then indexes that need them
+_ADDED_COLUMNS = {
+    'collections': {
+        'version': 'INTEGER NOT NULL DEFAULT 1',
+        'exported_version': 'INTEGER NOT NULL DEFAULT 0',
+    },
+    'records': {
+        'rev': 'INTEGER NOT NULL DEFAULT 0',
+    },
+}
+_ADDED_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_records_rev ON records (collection, rev);
+"""
+
+_DATE_FIELDS = ('timestamp', 'date', 'start_date', 'created_at')
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def _index_fields(key: str, value: Any, kind: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(symbol, timeframe, date) for the indexes; dict collections fall back to the key as symbol"""
+    if not isinstance(value, dict):
+        return (key if kind == 'dict' else None), None, None
+    symbol = value.get('symbol') or (key if kind == 'dict' else None)
+    timeframe = value.get('timeframe') or value.get('period')
+    record_date = next((str(value[f])[:10] for f in _DATE_FIELDS if value.get(f)), None)
+    return (str(symbol) if symbol else None), (str(timeframe) if timeframe else None), record_date
+
+
+class RecordStore:
+    """Keyed (dict) or ordered (list) collections of JSON records in one SQLite database"""
+
+    def __init__(self, db_path: str = TRACKING_DB_PATH, mirrors: Optional[Dict[str, str]] = None):
+        self.db_path = db_path
+        self.mirrors = dict(RECORD_STORE_MIRRORS if mirrors is None else mirrors)
+        self._local = threading.local()
+        self._write_lock = threading.RLock()
+        self._listeners: List[Callable[[str], None]] = []
+
+    def add_listener(self, callback: Callable[[str], None]):
+        """Call callback(collection) after every committed write, trim, delete or drop"""
+        self._listeners.append(callback)
+
+    def _notify(self, collection: str):
+        for callback in self._listeners:
+            try:
+                callback(collection)
+            except Exception as e:
+                logger.warning(f"Record store listener failed for {collection}: {e}")
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers proceed while a writer commits"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            for table, added in _ADDED_COLUMNS.items():
+                columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+                for column, definition in added.items():
+                    if column not in columns:
+                        try:
+                            conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+                        except sqlite3.OperationalError:
+                            pass  # another process added it first
+            conn.executescript(_ADDED_INDEXES)
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # Collections
+
+    def exists(self, collection: str) -> bool:
+        return self._kind(collection) is not None
+
+    def _kind(self, collection: str) -> Optional[str]:
+        row = self._connection().execute(
+            'SELECT kind FROM collections WHERE name = ?', (collection,)).fetchone()
+        return row[0] if row else None
+
+    def _touch(self, conn: sqlite3.Connection, collection: str, kind: str) -> int:
+        """Bump the collection's version inside the write transaction; returns it for the rows written"""
+        conn.execute('INSERT INTO collections (name, kind, updated) VALUES (?, ?, ?) '
+                     'ON CONFLICT(name) DO UPDATE SET kind = excluded.kind, updated = excluded.updated, '
+                     'version = collections.version + 1',
+                     (collection, kind, time.time()))
+        return conn.execute('SELECT version FROM collections WHERE name = ?', (collection,)).fetchone()[0]
+
+    def collections(self) -> List[str]:
+        return [row[0] for row in self._connection().execute('SELECT name FROM collections ORDER BY name')]
+
+    def drop(self, collection: str) -> bool:
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                conn.execute('DELETE FROM records WHERE collection = ?', (collection,))
+                deleted = conn.execute('DELETE FROM collections WHERE name = ?', (collection,)).rowcount
+        if deleted:
+            self._notify(collection)
+        return bool(deleted)
+
+    # Whole-collection access (JsonStore compatible)
+
+    def load(self, collection: str, default: Any = None) -> Any:
+        """Dict collections come back as {key: record}, list collections in append order"""
+        kind = self._kind(collection)
+        if kind is None:
+            return default
+        rows = self._connection().execute(
+            'SELECT key, data FROM records WHERE collection = ? ORDER BY seq', (collection,)).fetchall()
+        if kind == 'list':
+            return [json.loads(data) for _, data in rows]
+        return {key: json.loads(data) for key, data in rows}
+
+    def save(self, collection: str, data: Any) -> bool:
+        """Replace a collection, writing only the records that changed"""
+        if isinstance(data, dict):
+            items = [(str(key), _dumps(value), value) for key, value in data.items()]
+            kind = 'dict'
+        elif isinstance(data, list):
+            items = [(None, _dumps(value), value) for value in data]
+            kind = 'list'
+        else:
+            raise TypeError(f"RecordStore collections hold a dict or list, got {type(data).__name__}")
+
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                if self._kind(collection) not in (None, kind):
+                    conn.execute('DELETE FROM records WHERE collection = ?', (collection,))
+                rev = self._touch(conn, collection, kind)
+                if kind == 'dict':
+                    self._save_dict(conn, collection, items, rev)
+                else:
+                    self._save_list(conn, collection, items, rev)
+        self._notify(collection)
+        return True
+
+    def _save_dict(self, conn: sqlite3.Connection, collection: str, items: List[Tuple], rev: int):
+        existing = dict(conn.execute(
+            'SELECT key, data FROM records WHERE collection = ?', (collection,)).fetchall())
+        changed = [(key, text, value) for key, text, value in items if existing.get(key) != text]
+        removed = set(existing) - {key for key, _, _ in items}
+        if removed:
+            conn.executemany('DELETE FROM records WHERE collection = ? AND key = ?',
+                             [(collection, key) for key in removed])
+        self._upsert(conn, collection, 'dict', changed, rev)
+
+    def _save_list(self, conn: sqlite3.Connection, collection: str, items: List[Tuple], rev: int):
+        """Match records to existing rows by content; appends and head trims touch only those rows"""
+        rows = conn.execute('SELECT key, seq, data FROM records WHERE collection = ? ORDER BY seq',
+                            (collection,)).fetchall()
+        pool = defaultdict(deque)
+        for key, seq, text in rows:
+            pool[text].append((key, seq))
+        matched = [pool[text].popleft() if pool[text] else None for _, text, _ in items]
+
+        kept = [match for match in matched if match is not None]
+        first_new = next((i for i, match in enumerate(matched) if match is None), len(matched))
+        in_order = all(a[1] < b[1] for a, b in zip(kept, kept[1:]))
+        if not in_order or any(match is not None for match in matched[first_new:]):
+            # Reordered or edited in the middle: rewrite the collection
+            conn.execute('DELETE FROM records WHERE collection = ?', (collection,))
+            kept, first_new = [], 0
+
+        kept_keys = {key for key, _ in kept}
+        stale = [(collection, key) for key, _, _ in rows if key not in kept_keys]
+        if stale:
+            conn.executemany('DELETE FROM records WHERE collection = ? AND key = ?', stale)
+        for _, text, value in items[first_new:]:
+            self._append(conn, collection, value, text, rev)
+
+    def _upsert(self, conn: sqlite3.Connection, collection: str, kind: str, items: Iterable[Tuple], rev: int):
+        items = list(items)
+        if not items:
+            return
+        next_seq = self._next_seq(conn, collection)
+        conn.executemany(
+            'INSERT INTO records (collection, key, seq, symbol, timeframe, record_date, data, rev) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT(collection, key) DO UPDATE SET symbol = excluded.symbol, '
+            'timeframe = excluded.timeframe, record_date = excluded.record_date, data = excluded.data, '
+            'rev = excluded.rev',
+            [(collection, key, next_seq + i, *_index_fields(key, value, kind), text, rev)
+             for i, (key, text, value) in enumerate(items)])
+
+    def _append(self, conn: sqlite3.Connection, collection: str, value: Any, text: str, rev: int) -> str:
+        seq = self._next_seq(conn, collection)
+        key = f"{seq:012d}"
+        conn.execute('INSERT INTO records (collection, key, seq, symbol, timeframe, record_date, data, rev) '
+                     'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                     (collection, key, seq, *_index_fields(key, value, 'list'), text, rev))
+        return key
+
+    @staticmethod
+    def _next_seq(conn: sqlite3.Connection, collection: str) -> int:
+        row = conn.execute('SELECT MAX(seq) FROM records WHERE collection = ?', (collection,)).fetchone()
+        return (row[0] or 0) + 1
+
+    # Single-record access
+
+    def get(self, collection: str, key: str, default: Any = None) -> Any:
+        row = self._connection().execute(
+            'SELECT data FROM records WHERE collection = ? AND key = ?', (collection, str(key))).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def put(self, collection: str, key: str, value: Any) -> bool:
+        """Insert or update one record of a dict collection"""
+        return self.put_many(collection, {key: value})
+
+    def put_many(self, collection: str, records: Dict[str, Any]) -> bool:
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                rev = self._touch(conn, collection, 'dict')
+                self._upsert(conn, collection, 'dict',
+                             [(str(key), _dumps(value), value) for key, value in records.items()], rev)
+        self._notify(collection)
+        return True
+
+    def append(self, collection: str, record: Any) -> str:
+        """Append one record to a list collection; returns its key"""
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                rev = self._touch(conn, collection, 'list')
+                key = self._append(conn, collection, record, _dumps(record), rev)
+        self._notify(collection)
+        return key
+
+    def append_many(self, collection: str, records: Iterable[Any]) -> int:
+        """Append records to a list collection in one transaction; returns how many"""
+        records = list(records)
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                rev = self._touch(conn, collection, 'list')
+                for record in records:
+                    self._append(conn, collection, record, _dumps(record), rev)
+        self._notify(collection)
+        return len(records)
+
+    def trim(self, collection: str, keep: int) -> int:
+        """Delete all but the newest `keep` records of a list collection; returns rows deleted"""
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                deleted = conn.execute(
+                    'DELETE FROM records WHERE collection = ? AND seq <= ('
+                    'SELECT seq FROM records WHERE collection = ? ORDER BY seq DESC LIMIT 1 OFFSET ?)',
+                    (collection, collection, max(int(keep), 0))).rowcount
+                if deleted:
+                    self._touch(conn, collection, 'list')
+        if deleted:
+            self._notify(collection)
+        return deleted
+
+    def delete(self, collection: str, key: str) -> bool:
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                deleted = conn.execute('DELETE FROM records WHERE collection = ? AND key = ?',
+                                       (collection, str(key))).rowcount
+                if deleted:
+                    self._touch(conn, collection, self._kind(collection) or 'dict')
+        if deleted:
+            self._notify(collection)
+        return bool(deleted)
+
+    def query(self, collection: str, symbol: Optional[str] = None, timeframe: Optional[str] = None,
+              start: Optional[str] = None, end: Optional[str] = None,
+              limit: Optional[int] = None) -> List[Any]:
+        """Records matching symbol / timeframe and an inclusive YYYY-MM-DD date range, in order"""
+        clauses, params = ['collection = ?'], [collection]
+        for column, value in (('symbol', symbol), ('timeframe', timeframe)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        if start is not None:
+            clauses.append('record_date >= ?')
+            params.append(str(start)[:10])
+        if end is not None:
+            clauses.append('record_date <= ?')
+            params.append(str(end)[:10])
+        sql = f"SELECT data FROM records WHERE {' AND '.join(clauses)} ORDER BY seq"
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(int(limit))
+        return [json.loads(row[0]) for row in self._connection().execute(sql, params)]
+
+    def version(self, collection: str) -> int:
+        """Current write version of a collection (0 if it does not exist)"""
+        row = self._connection().execute(
+            'SELECT version FROM collections WHERE name = ?', (collection,)).fetchone()
+        return row[0] if row else 0
+
+    def changed_since(self, collection: str, version: Optional[int] = None) -> Tuple[int, List[Tuple[str, Any]]]:
+        """(current version, [(key, record)] written after `version`, in order; every record for None)
+
+        Pass the returned version next time to read only what changed in between.
+        Deletions are not reported.
+        """
+        conn = self._connection()
+        current = self.version(collection)
+        rows = conn.execute('SELECT key, data FROM records WHERE collection = ? AND rev > ? AND rev <= ? '
+                            'ORDER BY seq', (collection, -1 if version is None else int(version), current)).fetchall()
+        return current, [(key, json.loads(data)) for key, data in rows]
+
+    def count_by(self, collection: str, column: str = 'timeframe') -> Dict[Optional[str], int]:
+        """Record counts per value of an indexed column ('symbol', 'timeframe' or 'record_date')"""
+        if column not in ('symbol', 'timeframe', 'record_date'):
+            raise ValueError(f"Not an indexed column: {column}")
+        return dict(self._connection().execute(
+            f'SELECT {column}, COUNT(*) FROM records WHERE collection = ? GROUP BY {column}', (collection,)))
+
+    def count(self, collection: str) -> int:
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM records WHERE collection = ?', (collection,)).fetchone()[0]
+
+    # Maintenance
+
+    def migrate_json(self, collection: str, path: str, default: Any):
+        """Import a legacy JSON file once; later calls are no-ops"""
+        if self.exists(collection):
+            return
+        data = default
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.error(f"Error reading legacy file {path}: {e}")
+                return
+        if isinstance(data, (dict, list)):
+            self.save(collection, data)
+
+    def export_json(self, collection: str, path: str) -> bool:
+        """Atomically write a collection snapshot as plain JSON"""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.load(collection, {}), f, indent=2, ensure_ascii=False, default=str)
+            os.replace(temp_path, path)
+            return True
+        except Exception as e:
+            logger.error(f"Error exporting {collection} to {path}: {e}")
+            return False
+
+    def compact(self) -> Dict[str, Any]:
+        """Checkpoint the WAL into the database and refresh mirrors of collections changed since their export"""
+        conn = self._connection()
+        with self._write_lock:
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        exported = []
+        for collection in sorted(self.mirrors):
+            row = conn.execute('SELECT version FROM collections WHERE name = ? AND version > exported_version',
+                               (collection,)).fetchone()
+            if row is None or not self.export_json(collection, self.mirrors[collection]):
+                continue
+            # Writes that landed during the export bumped the version past this one: exported again next time
+            with self._write_lock, conn:
+                conn.execute('UPDATE collections SET exported_version = MAX(exported_version, ?) WHERE name = ?',
+                             (row[0], collection))
+            exported.append(collection)
+        return {'checkpointed': True, 'mirrors_exported': exported}
+
+
+# Global instance
+record_store = RecordStore()
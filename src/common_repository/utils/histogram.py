@@ -0,0 +1,157 @@
+"""
+Fixed-Memory Latency Histogram
+HDR-style log-linear buckets for streaming quantiles:
+1. Memory is fixed at construction (one counter per bucket), however many
+   values are recorded
+2. record() is O(1): one log and an in-place counter bump
+3. quantile() walks the buckets once, O(buckets), with a relative error
+   bounded by the bucket width (~4.4% with 16 sub-buckets per octave)
+4. Histograms with the same layout merge by adding counts
+"""
+
+import math
+import threading
+from array import array
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """Counts per log-scaled bucket between `lowest` and `highest` (values outside are clamped)"""
+
+    __slots__ = ('lowest', 'highest', 'sub_buckets', '_scale', '_counts', 'count', 'total', 'min', 'max', '_lock')
+
+    def __init__(self, lowest: float = 0.01, highest: float = 3_600_000.0, sub_buckets: int = 16):
+        self.lowest = lowest
+        self.highest = highest
+        self.sub_buckets = sub_buckets
+        self._scale = sub_buckets / math.log(2)
+        size = int(math.ceil(math.log(highest / lowest) * self._scale)) + 2
+        self._counts = array('Q', bytes(8 * size))
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._lock = threading.Lock()
+
+    def _index(self, value: float) -> int:
+        if value <= self.lowest:
+            return 0
+        return min(int(math.log(value / self.lowest) * self._scale) + 1, len(self._counts) - 1)
+
+    def upper_bound(self, index: int) -> float:
+        """Largest value that lands in bucket `index`"""
+        return self.lowest * math.exp(index / self._scale)
+
+    def record(self, value: float):
+        index = self._index(value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile q (0-1), 0.0 when empty"""
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            rank = max(1, int(math.ceil(q * self.count)))
+            seen = 0
+            for index, bucket_count in enumerate(self._counts):
+                seen += bucket_count
+                if seen >= rank:
+                    # Geometric midpoint of the bucket, kept within the observed range
+                    lower = self.upper_bound(index - 1) if index else 0.0
+                    estimate = math.sqrt(lower * self.upper_bound(index)) if lower else self.lowest
+                    return min(max(estimate, self.min), self.max)
+            return self.max
+
+    def quantiles(self, qs: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, float]:
+        return {f"p{q * 100:g}": self.quantile(q) for q in qs}
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Add another histogram's counts into this one (same bucket layout required)"""
+        if (other.lowest, other.highest, other.sub_buckets) != (self.lowest, self.highest, self.sub_buckets):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        with other._lock:
+            counts = array('Q', other._counts)
+            count, total, low, high = other.count, other.total, other.min, other.max
+        with self._lock:
+            for index, bucket_count in enumerate(counts):
+                if bucket_count:
+                    self._counts[index] += bucket_count
+            self.count += count
+            self.total += total
+            self.min = min(self.min, low)
+            self.max = max(self.max, high)
+
+    def copy(self) -> 'LatencyHistogram':
+        clone = LatencyHistogram(self.lowest, self.highest, self.sub_buckets)
+        clone.merge(self)
+        return clone
+
+    def since(self, earlier: 'LatencyHistogram') -> 'LatencyHistogram':
+        """Values recorded after `earlier` (a copy() of this histogram); min/max are bucket bounds"""
+        window = LatencyHistogram(self.lowest, self.highest, self.sub_buckets)
+        with self._lock:
+            for index, bucket_count in enumerate(self._counts):
+                delta = bucket_count - earlier._counts[index]
+                if delta > 0:
+                    window._counts[index] = delta
+                    window.min = min(window.min, self.upper_bound(index - 1) if index else 0.0)
+                    window.max = self.upper_bound(index)
+            window.count = self.count - earlier.count
+            window.total = self.total - earlier.total
+        return window
+
+    def cumulative_buckets(self) -> Iterator[Tuple[float, int]]:
+        """(upper bound, cumulative count) for every non-empty bucket, ascending"""
+        with self._lock:
+            counts = array('Q', self._counts)
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count:
+                seen += bucket_count
+                yield self.upper_bound(index), seen
+
+    def counts_at(self, bounds: Sequence[float]) -> Tuple[List[int], int, float]:
+        """Cumulative counts at each ascending bound (to bucket resolution), plus count and sum"""
+        with self._lock:
+            counts = array('Q', self._counts)
+            count, total = self.count, self.total
+        cumulative = []
+        seen = 0
+        index = 0
+        for bound in bounds:
+            last = self._index(bound)
+            while index <= last:
+                seen += counts[index]
+                index += 1
+            cumulative.append(seen)
+        return cumulative, count, total
+
+    def summary(self, qs: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, float]:
+        """count, mean, min, max and the requested quantiles"""
+        if self.count == 0:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3),
+            'min': round(self.min, 3),
+            'max': round(self.max, 3),
+            **{name: round(value, 3) for name, value in self.quantiles(qs).items()},
+        }
+
+    def reset(self):
+        with self._lock:
+            for index in range(len(self._counts)):
+                self._counts[index] = 0
+            self.count = 0
+            self.total = 0.0
+            self.min = math.inf
+            self.max = -math.inf
@@ -0,0 +1,217 @@
+"""
+Shared HTTP Transport
+One keep-alive connection pool for every scraper and market-data provider:
+1. Per-host pools on a single requests session, with retries and backoff on 429/5xx
+2. Per-host token buckets (HostRateLimiter) and circuit breakers from network.py
+3. Conditional GET: ETag/Last-Modified validators are replayed and a 304
+   returns the cached body without downloading it again
+4. fetch_many() runs a batch of URLs on a bounded thread pool
+5. Per-host latency and per-source status metrics
+"""
+
+import time
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from ..cache.tiered_cache import tiered_cache
+from ..config.runtime import (
+    HTTP_POOL_HOSTS, HTTP_POOL_MAXSIZE, HTTP_RETRIES, HTTP_BACKOFF_SEC, HTTP_TIMEOUT_SEC,
+    HTTP_FETCH_WORKERS, HTTP_RATE_LIMIT_WAIT_SEC, HTTP_VALIDATOR_MAX_BYTES
+)
+from .network import CircuitBreaker, CircuitOpenError, host_rate_limiter, instrument_session
+from .telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+VALIDATOR_NAMESPACE = 'http_validators'
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RateLimitedError(Exception):
+    """No request slot for the host became free within the wait budget"""
+
+
+class HttpTransport:
+    """Pooled, rate-limited, circuit-broken HTTP client shared across components"""
+
+    def __init__(self, pool_connections: int = HTTP_POOL_HOSTS, pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 retries: int = HTTP_RETRIES, backoff: float = HTTP_BACKOFF_SEC,
+                 timeout: float = HTTP_TIMEOUT_SEC, workers: int = HTTP_FETCH_WORKERS,
+                 limiter=None, rate_limit_wait: float = HTTP_RATE_LIMIT_WAIT_SEC,
+                 validator_cache=None):
+        self.timeout = timeout
+        self.workers = workers
+        self.limiter = limiter or host_rate_limiter
+        self.rate_limit_wait = rate_limit_wait
+        self.validators = validator_cache or tiered_cache
+        self.breakers: Dict[str, CircuitBreaker] = defaultdict(CircuitBreaker)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries,
+                      backoff_factor=backoff, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=frozenset({'GET', 'HEAD'}), raise_on_status=False,
+                      respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              max_retries=retry)
+        self.session = instrument_session(requests.Session())
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def client(self, headers: Optional[Dict[str, str]] = None) -> 'HttpClient':
+        """A per-component view with its own default headers over the shared pools"""
+        return HttpClient(self, headers)
+
+    def request(self, method: str, url: str, conditional: bool = False, **kwargs) -> requests.Response:
+        """Send a request through the host's token bucket and circuit breaker"""
+        host = urlsplit(url).hostname or ''
+        breaker = self.breakers[host]
+        if not breaker.allow():
+            telemetry.increment('upstream.circuit_open', 1, {'host': host})
+            raise CircuitOpenError(f"Circuit breaker is OPEN for {host}")
+        if not self.limiter.acquire(host, timeout=self.rate_limit_wait):
+            raise RateLimitedError(f"No request slot for {host} within {self.rate_limit_wait}s")
+
+        kwargs.setdefault('timeout', self.timeout)
+        cached = None
+        if conditional and method == 'GET':
+            cached = self.validators.get(VALIDATOR_NAMESPACE, url)
+            if cached:
+                headers = CaseInsensitiveDict(kwargs.get('headers') or {})
+                if cached.get('etag'):
+                    headers['If-None-Match'] = cached['etag']
+                if cached.get('last_modified'):
+                    headers['If-Modified-Since'] = cached['last_modified']
+                kwargs['headers'] = headers
+
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+        finally:
+            telemetry.record_histogram('upstream.host_ms', (time.perf_counter() - start) * 1000,
+                                       {'host': host})
+
+        if response.status_code >= 500 or response.status_code == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if conditional and method == 'GET':
+            if response.status_code == 304 and cached:
+                telemetry.increment('upstream.not_modified', 1, {'host': host})
+                return _replay(cached, response)
+            self._store_validators(url, response)
+        return response
+
+    def _store_validators(self, url: str, response: requests.Response):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+        if len(response.content) > HTTP_VALIDATOR_MAX_BYTES:
+            return
+        self.validators.set(VALIDATOR_NAMESPACE, url, {
+            'etag': etag,
+            'last_modified': last_modified,
+            'content': response.content,
+            'headers': dict(response.headers),
+            'encoding': response.encoding,
+        })
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def fetch_many(self, urls: Iterable[str], **kwargs) -> Dict[str, Optional[requests.Response]]:
+        """GET every URL concurrently; failed fetches map to None"""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        executor = self._pool()
+        futures = {url: executor.submit(self.get, url, **kwargs) for url in urls}
+        results = {}
+        for url, future in futures.items():
+            try:
+                results[url] = future.result()
+            except Exception as e:
+                logger.warning(f"Fetch failed for {url}: {e}")
+                results[url] = None
+        return results
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix='http-fetch')
+            return self._executor
+
+    def get_stats(self) -> Dict[str, Dict[str, object]]:
+        """Circuit state per host the transport has talked to"""
+        return {host: {'circuit': breaker.state.value, 'failures': breaker.failure_count}
+                for host, breaker in list(self.breakers.items())}
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        self.session.close()
+
+
+class HttpClient:
+    """Default headers for one component; requests go through the shared transport"""
+
+    def __init__(self, transport: HttpTransport, headers: Optional[Dict[str, str]] = None):
+        self.transport = transport
+        self.headers = CaseInsensitiveDict(headers or {})
+
+    def _headers(self, headers: Optional[Dict[str, str]]) -> CaseInsensitiveDict:
+        merged = CaseInsensitiveDict(self.headers)
+        merged.update(headers or {})
+        return merged
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                **kwargs) -> requests.Response:
+        return self.transport.request(method, url, headers=self._headers(headers), **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def fetch_many(self, urls: Iterable[str], headers: Optional[Dict[str, str]] = None,
+                   **kwargs) -> Dict[str, Optional[requests.Response]]:
+        return self.transport.fetch_many(urls, headers=self._headers(headers), **kwargs)
+
+
+def _replay(cached: Dict, not_modified: requests.Response) -> requests.Response:
+    """The cached 200 response for a 304, with the fresh request's url and timing"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = cached['content']
+    response.headers = CaseInsensitiveDict(cached['headers'])
+    response.encoding = cached['encoding']
+    response.url = not_modified.url
+    response.request = not_modified.request
+    response.elapsed = not_modified.elapsed
+    response.from_cache = True
+    return response
+
+
+# Global instance
+http_transport = HttpTransport()
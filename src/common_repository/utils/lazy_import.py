@@ -0,0 +1,93 @@
+"""
+Lazy Module Imports
+Defers heavy dependencies (TensorFlow, scikit-learn, SHAP, yfinance, ...) until
+first attribute access, so importing a blueprint does not pay for them:
+1. lazy_import('tensorflow') returns a module proxy; `tf.keras...` imports on first use
+2. Every deferred load is timed into the 'imports.load_ms{module}' histogram
+3. preload() imports a list of modules up front (gunicorn master warm-up)
+"""
+
+import sys
+import time
+import types
+import logging
+import importlib
+import importlib.util
+import threading
+from typing import Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """Stands in for a module until an attribute is read, then forwards to the real one"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_target'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_target']
+        if module is None:
+            with _lock:
+                module = self.__dict__['_lazy_target']
+                if module is None:
+                    module = _timed_import(self.__name__)
+                    self.__dict__['_lazy_target'] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_target'] is not None else 'deferred'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def _timed_import(name: str) -> types.ModuleType:
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    # Telemetry is imported here so this module stays importable from anywhere
+    from .telemetry import telemetry
+    telemetry.record_histogram('imports.load_ms', elapsed_ms, {'module': name})
+    logger.info(f"Loaded {name} on first use in {elapsed_ms:.0f}ms")
+    return module
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Module proxy for `name`; the real module if something has already imported it"""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def is_available(name: str) -> bool:
+    """Whether `name` can be imported, without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def is_loaded(name: str) -> bool:
+    return name in sys.modules
+
+
+def preload(names: Iterable[str]) -> Dict[str, float]:
+    """Import each module now; returns load time in ms per module (-1 if it failed)"""
+    timings = {}
+    for name in names:
+        start = time.perf_counter()
+        try:
+            _timed_import(name)
+            timings[name] = round((time.perf_counter() - start) * 1000, 1)
+        except Exception as e:
+            logger.warning(f"Could not preload {name}: {e}")
+            timings[name] = -1
+    return timings
@@ -7,15 +7,31 @@ import time
 import random
 import threading
 import logging
+from contextlib import contextmanager
 from typing import Dict, Callable, Any, Optional
+from urllib.parse import urlsplit
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, deque
 from enum import Enum
 
 from .telemetry import telemetry
+from ..config.runtime import HOST_RATE_LIMITS
 
 logger = logging.getLogger(__name__)
 
+UPSTREAM_FETCH_METRIC = 'upstream.fetch_ms'
+
+# Host suffix -> source label for upstream fetch metrics
+UPSTREAM_SOURCES = {
+    'yahoo.com': 'yahoo',
+    'nseindia.com': 'nse',
+    'bseindia.com': 'bse',
+    'screener.in': 'screener',
+    'moneycontrol.com': 'moneycontrol',
+    'tickertape.in': 'tickertape',
+    'investing.com': 'investing',
+}
+
 class CircuitState(Enum):
     CLOSED = "closed"
     OPEN = "open"
@@ -45,65 +61,120 @@ class TokenBucket:
                 return True
             return False
 
+    def wait(self, tokens: int = 1, timeout: Optional[float] = None) -> bool:
+        """Block until tokens are available or timeout expires"""
+        deadline = None if timeout is None else time.time() + timeout
+        while not self.acquire(tokens):
+            with self.lock:
+                deficit = max(tokens - self.tokens, 0)
+            delay = deficit / self.refill_rate if self.refill_rate > 0 else 0.1
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                delay = min(delay, remaining)
+            time.sleep(max(delay, 0.001))
+        return True
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open"""
+
 class CircuitBreaker:
-    def __init__(self, failure_threshold: float = 0.5, recovery_timeout: int = 60):
+    """Failure-rate breaker over a rolling window of the most recent calls.
+
+    OPEN rejects calls until recovery_timeout has passed since it tripped, then
+    HALF_OPEN lets a single probe through: its success closes the circuit, its
+    failure opens it again. Every state change starts a fresh window.
+    """
+
+    def __init__(self, failure_threshold: float = 0.5, recovery_timeout: int = 60,
+                 window_size: int = 20, min_calls: int = 10):
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
+        self.min_calls = min_calls
         self.state = CircuitState.CLOSED
+        self.outcomes = deque(maxlen=window_size)
         self.failure_count = 0
         self.success_count = 0
         self.last_failure_time = None
+        self.opened_at = None
+        self.probe_started = None
         self.lock = threading.Lock()
-        
-    def call(self, func: Callable, *args, **kwargs) -> Any:
+
+    def allow(self) -> bool:
+        """False while the circuit is open or a half-open probe is already in flight"""
         with self.lock:
-            # Check if circuit should transition states
-            self._check_state_transition()
-            
+            now = time.time()
             if self.state == CircuitState.OPEN:
-                raise Exception("Circuit breaker is OPEN")
+                if now - self.opened_at < self.recovery_timeout:
+                    return False
+                self._transition(CircuitState.HALF_OPEN)
+            if self.state == CircuitState.HALF_OPEN:
+                # A probe that never reported back (e.g. rate limited before sending)
+                # frees the slot after another recovery_timeout
+                if self.probe_started is not None and now - self.probe_started < self.recovery_timeout:
+                    return False
+                self.probe_started = now
+            return True
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        if not self.allow():
+            raise CircuitOpenError("Circuit breaker is OPEN")
                 
         try:
             result = func(*args, **kwargs)
-            self._record_success()
+            self.record_success()
             return result
         except Exception as e:
-            self._record_failure()
+            self.record_failure()
             raise
-            
-    def _check_state_transition(self):
-        now = time.time()
-        
-        if self.state == CircuitState.OPEN:
-            if (self.last_failure_time and 
-                now - self.last_failure_time > self.recovery_timeout):
-                self.state = CircuitState.HALF_OPEN
-                logger.info("Circuit breaker transitioning to HALF_OPEN")
-                
-        elif self.state == CircuitState.HALF_OPEN:
-            if self.success_count > 0:
-                self.state = CircuitState.CLOSED
-                self.failure_count = 0
-                self.success_count = 0
-                logger.info("Circuit breaker transitioning to CLOSED")
-                
-    def _record_success(self):
+
+    def reset(self):
         with self.lock:
+            self._transition(CircuitState.CLOSED)
+
+    def _transition(self, state: CircuitState):
+        self.state = state
+        self.outcomes.clear()
+        self.failure_count = 0
+        self.success_count = 0
+        self.probe_started = None
+        self.opened_at = time.time() if state == CircuitState.OPEN else None
+        logger.info(f"Circuit breaker transitioning to {state.name}")
+
+    def _record(self, success: bool):
+        if len(self.outcomes) == self.outcomes.maxlen:
+            if self.outcomes[0]:
+                self.success_count -= 1
+            else:
+                self.failure_count -= 1
+        self.outcomes.append(success)
+        if success:
             self.success_count += 1
-            if self.state == CircuitState.CLOSED:
-                # Reset failure count on success
-                self.failure_count = max(0, self.failure_count - 1)
-                
-    def _record_failure(self):
-        with self.lock:
+        else:
             self.failure_count += 1
+
+    def record_success(self):
+        with self.lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self._transition(CircuitState.CLOSED)
+            elif self.state == CircuitState.CLOSED:
+                self._record(True)
+
+    def record_failure(self):
+        with self.lock:
             self.last_failure_time = time.time()
-            
-            total_calls = self.failure_count + self.success_count
-            if total_calls >= 10:  # Minimum calls before evaluating
-                failure_rate = self.failure_count / total_calls
+            if self.state == CircuitState.HALF_OPEN:
+                self._transition(CircuitState.OPEN)
+                logger.warning("Circuit breaker OPEN again after failed half-open probe")
+                return
+            if self.state != CircuitState.CLOSED:
+                return
+            self._record(False)
+            if len(self.outcomes) >= self.min_calls:  # Minimum calls before evaluating
+                failure_rate = self.failure_count / len(self.outcomes)
                 if failure_rate >= self.failure_threshold:
-                    self.state = CircuitState.OPEN
+                    self._transition(CircuitState.OPEN)
                     logger.warning(f"Circuit breaker OPEN due to failure rate: {failure_rate:.2%}")
 
 class RateLimiter:
@@ -165,11 +236,7 @@ class RateLimiter:
         
     def reset_circuit(self, provider: str):
         """Reset circuit breaker for provider"""
-        circuit_breaker = self.circuit_breakers[provider]
-        with circuit_breaker.lock:
-            circuit_breaker.state = CircuitState.CLOSED
-            circuit_breaker.failure_count = 0
-            circuit_breaker.success_count = 0
+        self.circuit_breakers[provider].reset()
             
     def get_stats(self) -> Dict[str, Any]:
         """Get rate limiter statistics"""
@@ -182,5 +249,87 @@ class RateLimiter:
             }
         }
 
+class HostRateLimiter:
+    """Per-host token buckets shared by concurrent fetchers hitting the same upstream"""
+
+    def __init__(self, limits: Optional[Dict[str, tuple]] = None,
+                 default_limit: tuple = (5, 2.0)):
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def configure(self, host: str, capacity: int, refill_rate: float):
+        """Set burst capacity and refill rate (tokens/sec) for a host"""
+        with self.lock:
+            self.limits[host] = (capacity, refill_rate)
+            self.buckets[host] = TokenBucket(capacity=capacity, refill_rate=refill_rate)
+
+    def get_bucket(self, host: str) -> TokenBucket:
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                capacity, refill_rate = self.limits.get(host, self.default_limit)
+                bucket = TokenBucket(capacity=capacity, refill_rate=refill_rate)
+                self.buckets[host] = bucket
+            return bucket
+
+    def acquire(self, host: str, timeout: Optional[float] = None) -> bool:
+        """Wait for a request slot on host; False if timeout expired first"""
+        start = time.time()
+        acquired = self.get_bucket(host).wait(timeout=timeout)
+        waited_ms = (time.time() - start) * 1000
+        telemetry.record_histogram('ratelimit.wait_ms', waited_ms, {'host': host})
+        if not acquired:
+            telemetry.increment('ratelimit.throttled', 1, {'host': host})
+            logger.debug(f"Host rate limit wait timed out for {host}")
+        return acquired
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                host: {'tokens': bucket.tokens, 'capacity': bucket.capacity,
+                       'refill_rate': bucket.refill_rate}
+                for host, bucket in self.buckets.items()
+            }
+
+def upstream_source(url: str) -> str:
+    """Source label for a URL ('other' for hosts not in UPSTREAM_SOURCES)"""
+    host = (urlsplit(url).hostname or '').lower()
+    for suffix, source in UPSTREAM_SOURCES.items():
+        if host == suffix or host.endswith('.' + suffix):
+            return source
+    return 'other'
+
+def _record_response(response, *args, **kwargs):
+    source = upstream_source(response.url)
+    telemetry.record_histogram(UPSTREAM_FETCH_METRIC, response.elapsed.total_seconds() * 1000,
+                               {'source': source})
+    telemetry.increment('upstream.responses', 1, {'source': source, 'status': response.status_code})
+    return response
+
+def instrument_session(session):
+    """Record fetch latency and status per upstream source for every response of a requests session"""
+    hooks = session.hooks.setdefault('response', [])
+    if _record_response not in hooks:
+        hooks.append(_record_response)
+    return session
+
+@contextmanager
+def track_upstream(source: str):
+    """Time a fetch that doesn't go through an instrumented session (e.g. yfinance downloads)"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        telemetry.increment('upstream.errors', 1, {'source': source})
+        raise
+    finally:
+        telemetry.record_histogram(UPSTREAM_FETCH_METRIC, (time.perf_counter() - start) * 1000,
+                                   {'source': source})
+
 # Global rate limiter instance
 rate_limiter = RateLimiter()
+
+# Global per-host limiter used by concurrent scrapers
+host_rate_limiter = HostRateLimiter(HOST_RATE_LIMITS)
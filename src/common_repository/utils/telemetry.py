@@ -2,40 +2,149 @@
 """
 Lightweight Telemetry System
 Tracks performance metrics in-process without external dependencies
+
+Histograms are fixed-memory streaming histograms (see histogram.py), one per
+metric and label set; request latency, job durations and guardrail checks
+all read the same series. Counters are striped over a fixed number of shards
+(threads are spread round-robin, one lock per shard) so increments rarely
+contend; readers sum the shards.
 """
 
 import time
 import threading
+import itertools
 import gc
 import psutil
 import os
-from typing import Dict, Any
-from collections import defaultdict, deque
+from typing import Dict, Any, List, Optional, Tuple
+from collections import defaultdict
 from datetime import datetime, timedelta
 
+from .histogram import LatencyHistogram
+
+# Shared series names
+REQUEST_LATENCY_METRIC = 'http.request_ms'
+JOB_DURATION_METRIC = 'jobs.duration_ms'
+
+# Counter stripes: bounds memory and read cost regardless of how many threads increment
+COUNTER_SHARDS = 16
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+def _label_set(labels: Optional[Dict[str, Any]]) -> LabelSet:
+    return tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ()
+
+
+class ShardedCounters:
+    """Counter dicts striped over a fixed set of shards, each guarded by its own lock
+
+    Each thread is assigned a shard round-robin on its first increment, so memory and
+    read cost stay bounded by the shard count however many threads come and go.
+    """
+
+    def __init__(self, shards: int = COUNTER_SHARDS):
+        self._shards: List[Dict[Any, int]] = [defaultdict(int) for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._next_shard = itertools.count()
+        self._local = threading.local()
+
+    def _index(self) -> int:
+        index = getattr(self._local, 'index', None)
+        if index is None:
+            index = self._local.index = next(self._next_shard) % len(self._shards)
+        return index
+
+    def add(self, key: Any, value: int = 1):
+        index = self._index()
+        with self._locks[index]:
+            self._shards[index][key] += value
+
+    def snapshot(self) -> Dict[Any, int]:
+        """Totals per key across every shard"""
+        totals = defaultdict(int)
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                items = list(shard.items())
+            for key, value in items:
+                totals[key] += value
+        return totals
+
+    def get(self, key: Any, default: int = 0) -> int:
+        total, found = 0, False
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                if key in shard:
+                    found = True
+                    total += shard[key]
+        return total if found else default
+
+
 class TelemetryCollector:
     def __init__(self):
         self._lock = threading.Lock()
-        self._counters = defaultdict(int)
-        self._gauges = defaultdict(float)
-        self._histograms = defaultdict(lambda: deque(maxlen=1000))
+        self._counters = ShardedCounters()
+        self._gauges: Dict[Any, float] = {}
+        self._histograms: Dict[Tuple[str, LabelSet], LatencyHistogram] = {}
         self._start_time = time.time()
         self._process = psutil.Process(os.getpid()) if psutil else None
         
-    def increment(self, metric: str, value: int = 1):
-        """Increment a counter metric"""
-        with self._lock:
-            self._counters[metric] += value
+    def increment(self, metric: str, value: int = 1, labels: Optional[Dict[str, Any]] = None):
+        """Increment a counter metric (labeled counters are keyed (metric, labels))"""
+        self._counters.add((metric, _label_set(labels)) if labels else metric, value)
+
+    def increment_counter(self, metric: str, labels: Optional[Dict[str, Any]] = None):
+        self.increment(metric, 1, labels)
             
-    def set_gauge(self, metric: str, value: float):
-        """Set a gauge metric"""
-        with self._lock:
-            self._gauges[metric] = value
+    def set_gauge(self, metric: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        """Set a gauge metric (a single dict store, atomic under the GIL)"""
+        self._gauges[(metric, _label_set(labels)) if labels else metric] = value
             
-    def record_histogram(self, metric: str, value: float):
-        """Record a value in histogram"""
+    def record_histogram(self, metric: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        """Record a value in the metric's histogram for this label set"""
+        key = (metric, _label_set(labels))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, LatencyHistogram())
+        histogram.record(value)
+
+    record_metric = record_histogram
+
+    def get_histogram(self, metric: str, labels: Optional[Dict[str, Any]] = None) -> Optional[LatencyHistogram]:
+        return self._histograms.get((metric, _label_set(labels)))
+
+    def iter_histograms(self, metric: Optional[str] = None) -> List[Tuple[str, Dict[str, str], LatencyHistogram]]:
+        """(metric, labels, histogram) for every series, optionally of one metric"""
         with self._lock:
-            self._histograms[metric].append(value)
+            series = list(self._histograms.items())
+        return [(name, dict(label_set), histogram) for (name, label_set), histogram in series
+                if metric is None or name == metric]
+
+    def iter_counters(self) -> List[Tuple[str, Dict[str, str], int]]:
+        """(metric, labels, value) for every counter series"""
+        return [(key, {}, value) if isinstance(key, str) else (key[0], dict(key[1]), value)
+                for key, value in self._counters.snapshot().items()]
+
+    def iter_gauges(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """(metric, labels, value) for every gauge series"""
+        return [(key, {}, value) if isinstance(key, str) else (key[0], dict(key[1]), value)
+                for key, value in self._gauges.copy().items()]
+
+    def get_counter(self, metric: str, labels: Optional[Dict[str, Any]] = None) -> int:
+        return self._counters.get((metric, _label_set(labels)) if labels else metric)
+
+    def counter_total(self, metric: str) -> int:
+        """Sum of a counter across all of its label sets"""
+        return sum(value for name, _, value in self.iter_counters() if name == metric)
+
+    def get_latency_stats(self, metric: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """count/mean/min/max/p50/p95/p99 per series"""
+        stats = {}
+        for name, labels, histogram in self.iter_histograms(metric):
+            label_text = ','.join(f'{k}={v}' for k, v in labels.items())
+            stats[f'{name}{{{label_text}}}' if label_text else name] = histogram.summary()
+        return stats
             
     def get_memory_stats(self) -> Dict[str, float]:
         """Get current memory statistics"""
@@ -57,30 +166,28 @@ class TelemetryCollector:
         
     def get_io_stats(self) -> Dict[str, float]:
         """Get I/O statistics"""
-        with self._lock:
-            total_api_calls = self._counters.get('api_calls', 0)
-            total_failures = self._counters.get('api_failures', 0)
-            cache_hits = self._counters.get('cache_hits', 0)
-            cache_misses = self._counters.get('cache_misses', 0)
-            
-            uptime_minutes = (time.time() - self._start_time) / 60
-            
-            return {
-                'api_calls_per_min': total_api_calls / max(uptime_minutes, 1),
-                'failures_per_min': total_failures / max(uptime_minutes, 1),
-                'cache_hit_rate': cache_hits / max(cache_hits + cache_misses, 1) * 100,
-                'cache_hits': cache_hits,
-                'cache_misses': cache_misses
-            }
+        total_api_calls = self._counters.get('api_calls')
+        total_failures = self._counters.get('api_failures')
+        cache_hits = self.counter_total('cache.hits')
+        cache_misses = self.counter_total('cache.misses')
+
+        uptime_minutes = (time.time() - self._start_time) / 60
+
+        return {
+            'api_calls_per_min': total_api_calls / max(uptime_minutes, 1),
+            'failures_per_min': total_failures / max(uptime_minutes, 1),
+            'cache_hit_rate': cache_hits / max(cache_hits + cache_misses, 1) * 100,
+            'cache_hits': cache_hits,
+            'cache_misses': cache_misses
+        }
             
     def get_job_stats(self) -> Dict[str, Any]:
         """Get job queue statistics"""
-        with self._lock:
-            return {
-                'queue_depth': self._gauges.get('jobs.queue_depth', 0),
-                'last_run_sec': self._gauges.get('jobs.last_run_sec', 0),
-                'lag_sec': self._gauges.get('jobs.lag_sec', 0)
-            }
+        return {
+            'queue_depth': self._gauges.get('jobs.queue_depth', 0),
+            'last_run_sec': self._gauges.get('jobs.last_run_sec', 0),
+            'lag_sec': self._gauges.get('jobs.lag_sec', 0)
+        }
             
     def check_budgets(self) -> Dict[str, bool]:
         """Check if metrics are within acceptable budgets"""
@@ -105,6 +212,7 @@ class TelemetryCollector:
             'io': self.get_io_stats(),
             'jobs': self.get_job_stats(),
             'budgets': self.check_budgets(),
+            'latency': self.get_latency_stats(),
             'uptime_seconds': time.time() - self._start_time
         }
 
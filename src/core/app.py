@@ -3,7 +3,7 @@ import sys
 import json
 import time
 from datetime import datetime
-from flask import Flask, jsonify, render_template, request, redirect
+from flask import Flask, Response, jsonify, render_template, request, redirect
 from flask_cors import CORS
 import logging
 
@@ -14,6 +14,7 @@ logger = logging.getLogger(__name__)
 
 def create_app():
     """Create and configure Flask application"""
+    started = time.perf_counter()
     app = Flask(__name__,
                 template_folder='../../web/templates',
                 static_folder='../../web/static')
@@ -28,6 +29,10 @@ def create_app():
     # Configure app
     app.config['DEBUG'] = os.getenv('DEBUG', 'True').lower() == 'true'
 
+    # Request latency / count instrumentation (single hook for metrics and guardrails)
+    from src.core.logging import add_request_logging
+    add_request_logging(app)
+
     # Basic health endpoint
     @app.route('/health')
     def health():
@@ -37,16 +42,11 @@ def create_app():
             "version": "1.0.0"
         })
 
-    # Metrics endpoint for performance monitoring
+    # Prometheus scrape endpoint: routes, scheduler jobs, caches, upstream fetches, agent runs
     @app.route('/metrics')
     def metrics():
-        return jsonify({
-            "server_status": "running",
-            "uptime_seconds": time.time(),
-            "memory_usage_mb": 128,
-            "active_connections": 1,
-            "timestamp": datetime.now().isoformat()
-        })
+        from src.core.prometheus import CONTENT_TYPE, render_metrics
+        return Response(render_metrics(), content_type=CONTENT_TYPE)
 
     # Register API blueprints with better error handling
     try:
@@ -113,6 +113,14 @@ def create_app():
     except Exception as e:
         logger.warning(f"⚠️ Could not register Pins & Locks API: {e}")
 
+    try:
+        # Server-sent events push channel
+        from src.core.push import push_bp
+        app.register_blueprint(push_bp, url_prefix='/api')
+        logger.info("✅ Registered push stream at /api/stream")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not register push stream: {e}")
+
     # Register Paper Trade API
     try:
         from src.api.papertrade import papertrade_bp
@@ -134,6 +142,15 @@ def create_app():
             "timestamp": datetime.now().isoformat()
         })
 
+    @app.route('/api/metrics/models')
+    def metrics_models():
+        """Warm inference model pool: per-model memory, hits and evictions"""
+        from src.ml.inference_service import inference_service
+        return jsonify({
+            "models": inference_service.stats(),
+            "timestamp": datetime.now().isoformat()
+        })
+
     # Register web routes with error handling
     @app.route('/')
     def index():
@@ -255,6 +272,9 @@ def create_app():
         return redirect(url)
 
 
+    from src.core.startup import record_startup
+    record_startup(started)
+
     logger.info("✅ Flask app created successfully")
     return app
 
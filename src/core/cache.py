@@ -1,111 +1,67 @@
-import json
-import time
-import os
-from typing import Any, Dict, Optional, Callable
-from functools import wraps
-import threading
+from datetime import datetime, timezone
+from typing import Any, Optional
 import logging
 
+from src.common_repository.cache.tiered_cache import CacheNamespace, tiered_cache
+
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
 class Cache:
-    def __init__(self):
-        self._cache = {}
-        self._timestamps = {}
+    def __init__(self, namespace: str = "core"):
+        self._cache = tiered_cache.namespace(namespace)
 
     def get(self, key: str):
         return self._cache.get(key)
 
     def set(self, key: str, value: Any, ttl: int = 300):
-        self._cache[key] = value
-        self._timestamps[key] = time.time() + ttl
+        self._cache.set(key, value, ttl)
 
     def invalidate(self, key: str):
-        if key in self._cache:
-            del self._cache[key]
-        if key in self._timestamps:
-            del self._timestamps[key]
+        self._cache.delete(key)
 
     def is_expired(self, key: str) -> bool:
-        if key not in self._timestamps:
-            return True
-        return time.time() > self._timestamps[key]
+        return self._cache.get(key, _MISSING) is _MISSING
 
 # Global cache instance
 cache = Cache()
 
-def ttl_cache(ttl: int = 300):
-    """TTL cache decorator"""
-    def decorator(func: Callable):
-        cache_dict = {}
-        cache_times = {}
-
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Create cache key from function name and arguments
-            key = f"{func.__name__}_{hash(str(args) + str(sorted(kwargs.items())))}"
-
-            # Check if cached result exists and is not expired
-            if key in cache_dict and key in cache_times:
-                if time.time() < cache_times[key]:
-                    return cache_dict[key]
+class TTLCache(CacheNamespace):
+    """Bounded TTL cache namespace with get/set and decorator support"""
 
-            # Call function and cache result
-            result = func(*args, **kwargs)
-            cache_dict[key] = result
-            cache_times[key] = time.time() + ttl
+    def __init__(self, ttl_sec: int = 300, namespace: Optional[str] = None,
+                 max_entries: Optional[int] = None):
+        name = namespace or f"ttl_{ttl_sec}"
+        tiered_cache.namespace(name, ttl=ttl_sec, max_entries=max_entries)
+        super().__init__(tiered_cache, name)
 
-            return result
-
-        return wrapper
-    return decorator
+def ttl_cache(ttl: int = 300, namespace: Optional[str] = None, ttl_sec: Optional[int] = None) -> TTLCache:
+    """TTL cache decorator (entries are LRU-bounded and expire per namespace TTL)"""
+    return TTLCache(ttl_sec if ttl_sec is not None else ttl, namespace)
 
 # File-based cache for persistent data
 class FileCache:
-    def __init__(self, cache_dir: str = "data/cache"):
-        self.cache_dir = cache_dir
-        os.makedirs(cache_dir, exist_ok=True)
-
-    def get_file_path(self, key: str) -> str:
-        return os.path.join(self.cache_dir, f"{key}.json")
+    def __init__(self, namespace: str = "files"):
+        self._cache = tiered_cache.namespace(namespace, disk=True)
 
     def get(self, key: str) -> Optional[Any]:
-        file_path = self.get_file_path(key)
-        try:
-            if os.path.exists(file_path):
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    if 'expires_at' in data and time.time() > data['expires_at']:
-                        os.remove(file_path)
-                        return None
-                    return data.get('value')
-        except Exception as e:
-            logger.error(f"Error reading cache file {file_path}: {e}")
-        return None
+        return self._cache.get(key)
 
     def set(self, key: str, value: Any, ttl: int = 3600):
-        file_path = self.get_file_path(key)
-        try:
-            data = {
-                'value': value,
-                'expires_at': time.time() + ttl,
-                'created_at': time.time()
-            }
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
-        except Exception as e:
-            logger.error(f"Error writing cache file {file_path}: {e}")
+        self._cache.set(key, value, ttl)
 
 # Global file cache instance
 file_cache = FileCache()
 
+def now_iso() -> str:
+    """Current UTC time as an ISO-8601 string"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
 def get_cached_data(key: str, default=None):
     """Get cached data with fallback to default value"""
     try:
-        result = cache.get(key)
-        if result is None or cache.is_expired(key):
-            return default
-        return result
+        return cache._cache.get(key, default)
     except Exception as e:
         logger.error(f"Error getting cached data for key {key}: {e}")
         return default
@@ -117,4 +73,4 @@ def cache_data(key: str, value: Any, ttl: int = 300):
         return True
     except Exception as e:
         logger.error(f"Error caching data for key {key}: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -2,6 +2,10 @@
 """
 Performance Guardrails System
 Auto-disables heavy features when performance budgets are exceeded
+
+Latency budgets read the shared per-endpoint telemetry histograms; each
+enforcement check looks only at requests recorded since the previous one.
+The status endpoint evaluates the same window without advancing it.
 """
 
 import time
@@ -10,10 +14,13 @@ import os
 import psutil
 import threading
 from datetime import datetime, timedelta
-from collections import defaultdict, deque
+from collections import defaultdict
 from typing import Dict, Any, Optional
 import logging
 
+from src.common_repository.utils.histogram import LatencyHistogram
+from src.common_repository.utils.telemetry import telemetry, REQUEST_LATENCY_METRIC
+
 logger = logging.getLogger(__name__)
 
 class PerformanceGuardrails:
@@ -21,8 +28,8 @@ class PerformanceGuardrails:
         self.feature_flags_path = "data/persistent/feature_flags.json"
         self.metrics_lock = threading.Lock()
         
-        # Rolling metrics storage
-        self.latency_data = defaultdict(lambda: deque(maxlen=100))
+        # Histogram copies taken at the last budget check (start of the current latency window)
+        self.latency_marks: Dict[str, LatencyHistogram] = {}
         self.cache_hits = defaultdict(int)
         self.cache_misses = defaultdict(int)
         
@@ -93,11 +100,15 @@ class PerformanceGuardrails:
 
     def record_request_latency(self, endpoint: str, latency_ms: float):
         """Record request latency for an endpoint"""
-        with self.metrics_lock:
-            self.latency_data[endpoint].append({
-                'latency_ms': latency_ms,
-                'timestamp': time.time()
-            })
+        telemetry.record_histogram(REQUEST_LATENCY_METRIC, latency_ms, {'endpoint': endpoint})
+
+    def _latency_window(self, endpoint: str) -> Optional[LatencyHistogram]:
+        """Latency recorded since the last budget check"""
+        histogram = telemetry.get_histogram(REQUEST_LATENCY_METRIC, {'endpoint': endpoint})
+        if histogram is None:
+            return None
+        mark = self.latency_marks.get(endpoint)
+        return histogram if mark is None else histogram.since(mark)
 
     def record_cache_hit(self, endpoint: str):
         """Record cache hit for an endpoint"""
@@ -111,18 +122,10 @@ class PerformanceGuardrails:
 
     def get_p95_latency(self, endpoint: str) -> float:
         """Calculate p95 latency for an endpoint"""
-        with self.metrics_lock:
-            if endpoint not in self.latency_data or not self.latency_data[endpoint]:
-                return 0.0
-                
-            latencies = [entry['latency_ms'] for entry in self.latency_data[endpoint]]
-            latencies.sort()
-            
-            if len(latencies) < 5:  # Need at least 5 samples
-                return 0.0
-                
-            p95_index = int(len(latencies) * 0.95)
-            return latencies[p95_index]
+        window = self._latency_window(endpoint)
+        if window is None or window.count < 5:  # Need at least 5 samples
+            return 0.0
+        return window.quantile(0.95)
 
     def get_cache_hit_rate(self, endpoint: str) -> float:
         """Calculate cache hit rate for an endpoint"""
@@ -146,7 +149,7 @@ class PerformanceGuardrails:
             return 0.0
 
     def check_budgets(self) -> Dict[str, bool]:
-        """Check if performance budgets are being met"""
+        """Check if performance budgets are being met and start a new latency window"""
         now = time.time()
         
         # Only check every 30 seconds to avoid overhead
@@ -154,6 +157,24 @@ class PerformanceGuardrails:
             return {}
             
         self.last_check = now
+        latency_series = self._latency_series()
+        budget_status = self._evaluate_budgets(latency_series)
+
+        # Next check only looks at requests recorded from here on
+        for endpoint, histogram in latency_series.items():
+            self.latency_marks[endpoint] = histogram.copy()
+
+        return budget_status
+
+    def _latency_series(self) -> Dict[str, LatencyHistogram]:
+        """Shared latency histograms by endpoint"""
+        return {labels.get('endpoint', ''): histogram
+                for _, labels, histogram in telemetry.iter_histograms(REQUEST_LATENCY_METRIC)}
+
+    def _evaluate_budgets(self, latency_series: Optional[Dict[str, LatencyHistogram]] = None) -> Dict[str, bool]:
+        """Budget status over the current latency window, leaving the window and throttle untouched"""
+        if latency_series is None:
+            latency_series = self._latency_series()
         budget_status = {}
         
         # Check memory budget
@@ -162,26 +183,26 @@ class PerformanceGuardrails:
         
         # Check latency and cache hit rate per endpoint
         with self.metrics_lock:
-            endpoints = set(list(self.latency_data.keys()) + list(self.cache_hits.keys()))
-            
-            overall_latency_ok = True
-            overall_cache_ok = True
-            
-            for endpoint in endpoints:
-                # Check p95 latency
-                p95_latency = self.get_p95_latency(endpoint)
-                if p95_latency > self.budgets['p95_latency_ms']:
-                    overall_latency_ok = False
-                    logger.warning(f"Endpoint {endpoint} p95 latency: {p95_latency:.1f}ms > {self.budgets['p95_latency_ms']}ms")
-                
-                # Check cache hit rate
-                hit_rate = self.get_cache_hit_rate(endpoint)
-                if hit_rate < self.budgets['cache_hit_rate']:
-                    overall_cache_ok = False
-                    logger.warning(f"Endpoint {endpoint} cache hit rate: {hit_rate:.2%} < {self.budgets['cache_hit_rate']:.2%}")
-            
-            budget_status['latency_ok'] = overall_latency_ok
-            budget_status['cache_ok'] = overall_cache_ok
+            endpoints = set(latency_series) | set(self.cache_hits.keys())
+
+        overall_latency_ok = True
+        overall_cache_ok = True
+
+        for endpoint in endpoints:
+            # Check p95 latency
+            p95_latency = self.get_p95_latency(endpoint)
+            if p95_latency > self.budgets['p95_latency_ms']:
+                overall_latency_ok = False
+                logger.warning(f"Endpoint {endpoint} p95 latency: {p95_latency:.1f}ms > {self.budgets['p95_latency_ms']}ms")
+
+            # Check cache hit rate
+            hit_rate = self.get_cache_hit_rate(endpoint)
+            if hit_rate < self.budgets['cache_hit_rate']:
+                overall_cache_ok = False
+                logger.warning(f"Endpoint {endpoint} cache hit rate: {hit_rate:.2%} < {self.budgets['cache_hit_rate']:.2%}")
+
+        budget_status['latency_ok'] = overall_latency_ok
+        budget_status['cache_ok'] = overall_cache_ok
         
         return budget_status
 
@@ -267,8 +288,8 @@ class PerformanceGuardrails:
         }
 
     def get_performance_status(self) -> Dict[str, Any]:
-        """Get current performance status"""
-        budgets = self.check_budgets()
+        """Get current performance status (read-only: enforcement keeps its own window)"""
+        budgets = self._evaluate_budgets()
         degraded = self.is_degraded_mode()
         
         return {
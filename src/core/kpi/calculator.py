@@ -17,6 +17,7 @@ from src.common_repository.config.runtime import (
     KPI_ROLLING_WINDOW_DAYS, KPI_MIN_SAMPLES, get_market_tz
 )
 from src.common_repository.storage.json_store import json_store
+from .incremental import RunningKPIStats
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +58,8 @@ class KPICalculator:
     def __init__(self):
         self.kpi_file = 'data/runtime/kpi_metrics.json'
         self.open_signals_file = 'data/runtime/kpi_open_signals.json'
+        self.state_file = 'data/runtime/kpi_state.json'
+        self.timeframes = ["3D", "5D", "10D", "15D", "30D"]
         self.backup_dir = 'data/backup/kpi'
         self.max_versions = 7
         
@@ -67,29 +70,66 @@ class KPICalculator:
     def load_predictions_data(self) -> List[Dict[str, Any]]:
         """Load prediction data from various sources"""
         try:
-            predictions = []
-            
-            # Load from tracking data
-            tracking_data = json_store.load('interactive_tracking', {})
-            for symbol, data in tracking_data.items():
-                if isinstance(data, dict):
-                    predictions.extend(self._extract_predictions_from_tracking(symbol, data))
-            
-            # Load from prediction history
-            history_data = json_store.load('predictions_history', [])
-            if isinstance(history_data, list):
-                predictions.extend(history_data)
-            
-            # Load from backtesting data
-            backtest_data = json_store.load('backtesting_results', {})
-            if isinstance(backtest_data, dict) and 'predictions' in backtest_data:
-                predictions.extend(backtest_data['predictions'])
-            
-            return predictions
-            
+            return self.read_predictions(self._empty_state())
         except Exception as e:
             logger.error(f"Error loading predictions data: {str(e)}")
             return []
+
+    def read_predictions(self, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Predictions from source records written since the versions in state['sources']
+
+        A state without sources reads everything. Record-store collections return only
+        rows written after the saved version; the backtesting results file is re-read only
+        when it changes. Updates state['sources'] with the new versions and the per-source
+        prediction counts behind total_predictions.
+        """
+        sources = state.setdefault('sources', {})
+        predictions = []
+
+        # Load from tracking data (only symbols whose record changed)
+        tracking = sources.setdefault('interactive_tracking', {'version': None, 'timeframes': {}})
+        version, changed = json_store.changed_records('interactive_tracking', tracking['version'])
+        for symbol, data in changed:
+            if isinstance(data, dict):
+                extracted = self._extract_predictions_from_tracking(symbol, data)
+                tracking['timeframes'][symbol] = [pred['timeframe'] for pred in extracted]
+                predictions.extend(extracted)
+        tracking['version'] = version
+
+        # Load from prediction history (only appended or rewritten records)
+        history = sources.setdefault('predictions_history', {'version': None})
+        version, changed = json_store.changed_records('predictions_history', history['version'])
+        predictions.extend(record for _, record in changed if isinstance(record, dict))
+        history['version'] = version
+        history['totals'] = json_store.count_records('predictions_history', by='timeframe')
+
+        # Load from backtesting data (whole file, only when it changed)
+        backtest = sources.setdefault('backtesting_results', {'version': None, 'totals': {}})
+        stamp = json_store.modified('backtesting_results')
+        if stamp is None or stamp != backtest['version']:
+            backtest_data = json_store.load('backtesting_results', {})
+            backtest_predictions = []
+            if isinstance(backtest_data, dict) and isinstance(backtest_data.get('predictions'), list):
+                backtest_predictions = backtest_data['predictions']
+            totals: Dict[str, int] = {}
+            for pred in backtest_predictions:
+                totals[pred.get('timeframe')] = totals.get(pred.get('timeframe'), 0) + 1
+            predictions.extend(backtest_predictions)
+            backtest.update({'version': stamp, 'totals': totals})
+
+        return predictions
+
+    def source_totals(self, state: Dict[str, Any]) -> Dict[Optional[str], int]:
+        """Predictions per timeframe across all sources, from the counts read_predictions keeps"""
+        sources = state.get('sources', {})
+        totals: Dict[Optional[str], int] = {}
+        for timeframes in sources.get('interactive_tracking', {}).get('timeframes', {}).values():
+            for tf in timeframes:
+                totals[tf] = totals.get(tf, 0) + 1
+        for name in ('predictions_history', 'backtesting_results'):
+            for tf, count in sources.get(name, {}).get('totals', {}).items():
+                totals[tf] = totals.get(tf, 0) + count
+        return totals
     
     def _extract_predictions_from_tracking(self, symbol: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract predictions from tracking data"""
@@ -435,23 +475,133 @@ class KPICalculator:
     
     def write_kpi_metrics_atomic(self, kpi_data: Dict[str, Any]):
         """Write KPI metrics atomically using temp file + rename"""
+        self._write_json_atomic(self.kpi_file, kpi_data)
+        logger.info(f"KPI metrics written atomically to {self.kpi_file}")
+
+    def _write_json_atomic(self, path: str, data: Dict[str, Any]):
+        temp_file = path + '.tmp'
         try:
-            temp_file = self.kpi_file + '.tmp'
-            
             with open(temp_file, 'w') as f:
-                json.dump(kpi_data, f, indent=2, ensure_ascii=False)
-            
+                json.dump(data, f, indent=2, ensure_ascii=False)
+
             # Atomic rename
-            os.rename(temp_file, self.kpi_file)
-            
-            logger.info(f"KPI metrics written atomically to {self.kpi_file}")
-            
+            os.replace(temp_file, path)
+
         except Exception as e:
-            logger.error(f"Error writing KPI metrics: {str(e)}")
+            logger.error(f"Error writing {path}: {str(e)}")
             # Clean up temp file if it exists
             if os.path.exists(temp_file):
                 os.remove(temp_file)
-    
+
+    # Incremental state: running statistics per timeframe plus a resolution watermark
+
+    def _prediction_key(self, pred: Dict[str, Any]) -> str:
+        return "|".join(str(pred.get(field) or '') for field in ('symbol', 'timeframe', 'start_date', 'timestamp'))
+
+    def _resolved_at(self, pred: Dict[str, Any]) -> Optional[float]:
+        """Epoch seconds a prediction resolved (resolved_at, else due date, else timestamp)"""
+        value = pred.get('resolved_at') or pred.get('due_date') or pred.get('timestamp')
+        if not value:
+            return None
+        try:
+            resolved = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        if resolved.tzinfo is None:
+            resolved = get_market_tz().localize(resolved)
+        return resolved.timestamp()
+
+    def _empty_state(self) -> Dict[str, Any]:
+        return {'watermark': None, 'boundary_keys': [], 'untimed_keys': [], 'timeframes': {}, 'sources': {}}
+
+    def load_state(self) -> Optional[Dict[str, Any]]:
+        """Load persisted running statistics (None if no state yet)"""
+        try:
+            if not os.path.exists(self.state_file):
+                return None
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            state['timeframes'] = {tf: RunningKPIStats.from_dict(stats)
+                                   for tf, stats in state.get('timeframes', {}).items()}
+            return state
+        except Exception as e:
+            logger.error(f"Error loading KPI state, rebuilding: {str(e)}")
+            return None
+
+    def save_state(self, state: Dict[str, Any]):
+        data = dict(state)
+        data['timeframes'] = {tf: stats.to_dict() for tf, stats in state['timeframes'].items()}
+        data['updated'] = datetime.now(get_market_tz()).isoformat()
+        self._write_json_atomic(self.state_file, data)
+
+    def fold_predictions(self, state: Dict[str, Any], predictions: List[Dict[str, Any]]) -> int:
+        """Fold closed predictions resolved after the watermark into the state; returns how many
+
+        Predictions that surface late with a resolution time before the watermark are
+        picked up by the next full recompute, which rebuilds the state from scratch.
+        """
+        watermark = state['watermark']
+        boundary_keys = set(state['boundary_keys'])
+        untimed_keys = set(state['untimed_keys'])
+
+        new_predictions = []
+        for pred in predictions:
+            if not pred.get('resolved', False):
+                continue
+            key = self._prediction_key(pred)
+            resolved_at = self._resolved_at(pred)
+            if resolved_at is None:
+                if key in untimed_keys:
+                    continue
+                untimed_keys.add(key)
+            elif watermark is not None and (resolved_at < watermark or
+                                            (resolved_at == watermark and key in boundary_keys)):
+                continue
+            new_predictions.append((resolved_at, key, pred))
+
+        # Chronological order keeps the running drawdown path meaningful
+        new_predictions.sort(key=lambda item: float('inf') if item[0] is None else item[0])
+
+        folded = 0
+        for resolved_at, key, pred in new_predictions:
+            stats = state['timeframes'].setdefault(pred.get('timeframe') or 'unknown', RunningKPIStats())
+            try:
+                stats.add(pred)
+                folded += 1
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Skipping malformed prediction {key}: {str(e)}")
+
+            if resolved_at is not None:
+                if watermark is None or resolved_at > watermark:
+                    watermark = resolved_at
+                    boundary_keys = set()
+                if resolved_at == watermark:
+                    boundary_keys.add(key)
+
+        state.update({'watermark': watermark, 'boundary_keys': sorted(boundary_keys),
+                      'untimed_keys': sorted(untimed_keys)})
+        return folded
+
+    def metrics_from_state(self, timeframe: str, stats: Optional[RunningKPIStats],
+                           total_predictions: int) -> KPIMetrics:
+        """KPIMetrics for a timeframe from its running statistics"""
+        stats = stats or RunningKPIStats()
+        min_samples = KPI_MIN_SAMPLES.get(timeframe, 5)
+
+        metrics = KPIMetrics(
+            timeframe=timeframe,
+            total_predictions=total_predictions,
+            closed_predictions=stats.closed,
+            insufficient_data=stats.closed < min_samples
+        )
+
+        if not metrics.insufficient_data and stats.closed:
+            for name, value in stats.metrics().items():
+                setattr(metrics, name, value)
+            metrics.status = self.determine_status(metrics)
+
+        return metrics
+
     def full_recompute(self) -> bool:
         """Full KPI recomputation (heavy job, after market hours)"""
         try:
@@ -460,18 +610,18 @@ class KPICalculator:
             # Backup previous version
             self.backup_previous_version()
             
-            # Load all prediction data
-            predictions = self.load_predictions_data()
+            # Load all prediction data, noting source versions for later incremental reads
+            state = self._empty_state()
+            predictions = self.read_predictions(state)
             
             if not predictions:
                 logger.warning("No prediction data found for KPI calculation")
                 return False
             
             # Calculate metrics for each timeframe
-            timeframes = ["3D", "5D", "10D", "15D", "30D"]
             timeframe_metrics = {}
             
-            for tf in timeframes:
+            for tf in self.timeframes:
                 metrics = self.calculate_timeframe_metrics(tf, predictions)
                 timeframe_metrics[tf] = asdict(metrics)
             
@@ -493,6 +643,10 @@ class KPICalculator:
             
             # Write atomically
             self.write_kpi_metrics_atomic(kpi_data)
+
+            # Rebuild running statistics so intraday updates continue from here
+            self.fold_predictions(state, predictions)
+            self.save_state(state)
             
             logger.info(f"✅ Full KPI recompute completed: {len(predictions)} predictions processed")
             return True
@@ -502,23 +656,54 @@ class KPICalculator:
             return False
     
     def incremental_update(self) -> bool:
-        """Incremental KPI update (light job, market hours)"""
+        """Incremental KPI update (light job, market hours)
+
+        Reads only source records written since the versions saved with the state, folds
+        those resolved after the watermark into the persisted running statistics, then
+        rewrites the KPI file from them. Cost tracks new records, not total history.
+        """
         try:
             logger.info("Starting incremental KPI update...")
             
-            # Load existing KPI data
-            existing_data = {}
-            if os.path.exists(self.kpi_file):
-                with open(self.kpi_file, 'r') as f:
-                    existing_data = json.load(f)
-            
-            # Update timestamp
-            existing_data['last_incremental_update'] = datetime.now(get_market_tz()).isoformat()
-            
-            # Write back (light update)
-            self.write_kpi_metrics_atomic(existing_data)
+            state = self.load_state() or self._empty_state()
+            predictions = self.read_predictions(state)
+            folded = self.fold_predictions(state, predictions)
+
+            totals = self.source_totals(state)
+            total_predictions = sum(totals.values())
+
+            timeframe_metrics = {
+                tf: asdict(self.metrics_from_state(tf, state['timeframes'].get(tf), totals.get(tf, 0)))
+                for tf in self.timeframes
+            }
+            overall_metrics = self.metrics_from_state("overall", state['timeframes'].get("overall"),
+                                                      totals.get("overall", 0))
+            closed = sum(stats.closed for stats in state['timeframes'].values())
+            now = datetime.now(get_market_tz())
+
+            kpi_data = {
+                'timestamp': now.isoformat(),
+                'last_updated': now.strftime('%Y-%m-%d %H:%M:%S IST'),
+                'last_incremental_update': now.isoformat(),
+                'timeframes': timeframe_metrics,
+                'overall': asdict(overall_metrics),
+                'summary': {
+                    'total_predictions': total_predictions,
+                    'closed_predictions': closed,
+                    'data_quality': 'excellent' if total_predictions > 100 else 'good' if total_predictions > 50 else 'building'
+                },
+                'incremental': {
+                    'read': len(predictions),
+                    'folded': folded,
+                    'watermark': datetime.fromtimestamp(state['watermark'], get_market_tz()).isoformat()
+                                 if state['watermark'] is not None else None
+                }
+            }
+
+            self.save_state(state)
+            self.write_kpi_metrics_atomic(kpi_data)
             
-            logger.info("✅ Incremental KPI update completed")
+            logger.info(f"✅ Incremental KPI update completed: {folded} newly resolved predictions folded in")
             return True
             
         except Exception as e:
@@ -0,0 +1,197 @@
+"""
+Incremental KPI State
+Running sufficient statistics so intraday KPI updates only fold in newly resolved predictions:
+1. Counts, sums and Welford moments for Brier, hit rate, Sharpe and Sortino
+2. Running cumulative return / peak / max drawdown
+3. Mergeable quantile sketch (t-digest style centroids) for VaR
+"""
+
+import math
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class QuantileSketch:
+    """Streaming quantiles from weighted centroids; exact while every centroid holds one value
+
+    Centroid sizes are bounded by q(1-q), so the tails used for VaR stay near exact.
+    """
+
+    def __init__(self, compression: int = 200, centroids: Optional[List[List[float]]] = None):
+        self.compression = compression
+        self.centroids: List[List[float]] = [list(c) for c in (centroids or [])]  # [mean, weight], sorted
+        self._buffer: List[float] = []
+
+    @property
+    def count(self) -> float:
+        self._flush()
+        return sum(weight for _, weight in self.centroids)
+
+    def add(self, value: float):
+        self._buffer.append(float(value))
+        if len(self._buffer) >= self.compression:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        merged = sorted(self.centroids + [[value, 1.0] for value in self._buffer])
+        self._buffer = []
+        if len(merged) > 2 * self.compression:
+            merged = self._compress(merged)
+        self.centroids = merged
+
+    def _compress(self, centroids: List[List[float]]) -> List[List[float]]:
+        total = sum(weight for _, weight in centroids)
+        compressed = [list(centroids[0])]
+        cumulative = 0.0
+        for mean, weight in centroids[1:]:
+            current = compressed[-1]
+            combined = current[1] + weight
+            q = (cumulative + combined / 2) / total
+            if combined <= max(1.0, 4 * total * q * (1 - q) / self.compression):
+                current[0] += (mean - current[0]) * weight / combined
+                current[1] = combined
+            else:
+                cumulative += current[1]
+                compressed.append([mean, weight])
+        return compressed
+
+    def quantile(self, q: float) -> float:
+        """Linear-interpolated quantile (matches np.percentile while uncompressed)"""
+        self._flush()
+        if not self.centroids:
+            return 0.0
+        means = np.array([mean for mean, _ in self.centroids])
+        weights = np.array([weight for _, weight in self.centroids])
+        # Rank of each centroid's centre in units of sample index
+        centres = np.cumsum(weights) - weights + (weights - 1) / 2
+        return float(np.interp(q * (weights.sum() - 1), centres, means))
+
+    def to_dict(self) -> Dict[str, Any]:
+        self._flush()
+        return {'compression': self.compression, 'centroids': self.centroids}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'QuantileSketch':
+        data = data or {}
+        return cls(data.get('compression', 200), data.get('centroids'))
+
+
+@dataclass
+class RunningKPIStats:
+    """Sufficient statistics for one timeframe's closed predictions"""
+    closed: int = 0
+    brier_sum: float = 0.0
+    brier_count: int = 0
+    hits: int = 0
+    hit_total: int = 0
+    # Returns: count, Welford mean / M2
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    # Negative returns only (for Sortino)
+    neg_count: int = 0
+    neg_mean: float = 0.0
+    neg_m2: float = 0.0
+    win_count: int = 0
+    win_sum: float = 0.0
+    loss_count: int = 0
+    loss_sum: float = 0.0
+    # Cumulative return path
+    cumulative: float = 0.0
+    peak: float = 0.0
+    max_drawdown: float = 0.0
+    exposure_sum: float = 0.0
+    returns_sketch: QuantileSketch = field(default_factory=QuantileSketch)
+
+    def add(self, pred: Dict[str, Any]):
+        """Fold one resolved prediction in (same rules as the KPICalculator list methods)"""
+        confidence = pred.get('confidence', 50.0) / 100.0
+        predicted_val = pred.get('predicted_value', 0)
+        actual_val = pred.get('actual_value', 0)
+        start_val = pred.get('start_value', predicted_val * 0.95)
+        self.closed += 1
+
+        if predicted_val != 0 and actual_val != 0:
+            correct = 1 if abs(actual_val - predicted_val) / abs(predicted_val) <= 0.05 else 0
+            self.brier_sum += (confidence - correct) ** 2
+            self.brier_count += 1
+
+        if predicted_val == 0 or actual_val == 0 or start_val == 0:
+            return
+
+        predicted_direction = 1 if predicted_val > start_val else -1
+        actual_direction = 1 if actual_val > start_val else -1
+        self.hits += predicted_direction == actual_direction
+        self.hit_total += 1
+
+        actual_return = (actual_val - start_val) / start_val
+        self.count, self.mean, self.m2 = _welford(self.count, self.mean, self.m2, actual_return)
+        if actual_return < 0:
+            self.neg_count, self.neg_mean, self.neg_m2 = _welford(
+                self.neg_count, self.neg_mean, self.neg_m2, actual_return)
+            self.loss_count += 1
+            self.loss_sum += actual_return
+        elif actual_return > 0:
+            self.win_count += 1
+            self.win_sum += actual_return
+
+        self.cumulative += actual_return
+        if self.cumulative > self.peak:
+            self.peak = self.cumulative
+        drawdown = (self.peak - self.cumulative) / self.peak if self.peak != 0 else 0
+        self.max_drawdown = max(self.max_drawdown, drawdown)
+
+        self.exposure_sum += pred.get('exposure', start_val)
+        self.returns_sketch.add(actual_return)
+
+    def metrics(self) -> Dict[str, float]:
+        """Brier, hit rate, financial and risk metrics in KPICalculator units"""
+        metrics = {
+            'brier_score': self.brier_sum / self.brier_count if self.brier_count else 1.0,
+            'directional_hit_rate': self.hits / self.hit_total * 100 if self.hit_total else 0.0,
+            'sharpe_ratio': 0.0, 'sortino_ratio': 0.0, 'win_loss_expectancy': 0.0, 'max_drawdown': 0.0,
+            'var_95': 0.0, 'var_99': 0.0, 'exposure_per_trade': 0.0,
+        }
+        if not self.count:
+            return metrics
+
+        # Sharpe ratio (assuming 5% risk-free rate), Sortino on the std of losing returns
+        std_return = math.sqrt(self.m2 / self.count)
+        downside_std = math.sqrt(self.neg_m2 / self.neg_count) if self.neg_count else std_return
+        win_rate = self.win_count / self.count
+        avg_win = self.win_sum / self.win_count if self.win_count else 0
+        avg_loss = abs(self.loss_sum / self.loss_count) if self.loss_count else 1
+
+        metrics.update({
+            'sharpe_ratio': (self.mean - 0.05) / std_return if std_return > 0 else 0.0,
+            'sortino_ratio': (self.mean - 0.05) / downside_std if downside_std > 0 else 0.0,
+            'win_loss_expectancy': (win_rate * avg_win) - ((1 - win_rate) * avg_loss),
+            'max_drawdown': self.max_drawdown * 100,  # Convert to percentage
+            'var_95': abs(self.returns_sketch.quantile(0.05) * 100),
+            'var_99': abs(self.returns_sketch.quantile(0.01) * 100),
+            'exposure_per_trade': self.exposure_sum / self.count,
+        })
+        return metrics
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['returns_sketch'] = self.returns_sketch.to_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RunningKPIStats':
+        data = dict(data)
+        data['returns_sketch'] = QuantileSketch.from_dict(data.get('returns_sketch'))
+        return cls(**data)
+
+
+def _welford(count: int, mean: float, m2: float, value: float):
+    count += 1
+    delta = value - mean
+    mean += delta / count
+    m2 += delta * (value - mean)
+    return count, mean, m2
@@ -188,7 +188,7 @@ class KPIWatcher:
                 event = self.create_trigger_event('kpi_breach', breach)
                 
                 if kpi_triggers_enabled and realtime_agents_enabled:
-                    # Queue trainer agent action (future implementation)
+                    # Trainer run is queued once for the whole batch below
                     event['agent_actions'].append({
                         'agent': 'trainer',
                         'action': 'retrain_evaluation',
@@ -216,6 +216,11 @@ class KPIWatcher:
                 
                 # Save trigger event
                 self.save_trigger_event(event)
+
+            if kpi_triggers_enabled and realtime_agents_enabled:
+                # One high-priority run per burst; repeats merge into the pending job
+                from src.agents.orchestrator import agent_orchestrator
+                agent_orchestrator.on_kpi_change({'breaches': breaches})
             
             return True
             
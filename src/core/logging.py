@@ -1,44 +1,44 @@
 import json
 import time
 import uuid
+import logging
 from flask import request, g
-from src.core.metrics import metrics, update_request_metrics
+from src.core.metrics import update_request_metrics
+
+logger = logging.getLogger(__name__)
 
 def before_request():
     """Initialize request tracking"""
-    g._start_ts = time.time()
+    g._start_ts = time.perf_counter()
     g._request_id = str(uuid.uuid4())
 
 def after_request(response):
     """Log request and collect metrics"""
     try:
-        latency_ms = int((time.time() - getattr(g, "_start_ts", time.time())) * 1000)
+        latency_ms = (time.perf_counter() - getattr(g, "_start_ts", time.perf_counter())) * 1000
         request_id = getattr(g, "_request_id", "unknown")
+        # Route template keeps one latency series per endpoint, not per concrete URL
+        endpoint = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
 
         # Log record
-        rec = {
-            "request_id": request_id,
-            "ts": int(time.time()),
-            "method": request.method,
-            "path": request.path,
-            "status": response.status_code,
-            "latency_ms": latency_ms,
-        }
-        print(json.dumps(rec))
-
-        # Collect metrics
-        metrics.increment(request.path)
-        metrics.increment(f"status_{response.status_code}")
-        metrics.record_latency(request.path, latency_ms)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps({
+                "request_id": request_id,
+                "ts": int(time.time()),
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "latency_ms": round(latency_ms, 2),
+            }))
 
         # Add request ID to response headers
         response.headers['X-Request-ID'] = request_id
 
-        # Update metrics
-        update_request_metrics(request.path, request.method, response.status_code, latency_ms)
+        # Update metrics (counters + the endpoint's latency histogram)
+        update_request_metrics(endpoint, request.method, response.status_code, latency_ms)
 
     except Exception as e:
-        print(f"Logging error: {e}")
+        logger.error(f"Request metrics error: {e}")
 
     return response
 
@@ -46,4 +46,4 @@ def add_request_logging(app):
     """Add request logging middleware to Flask app"""
     app.before_request(before_request)
     app.after_request(after_request)
-    return app
\ No newline at end of file
+    return app
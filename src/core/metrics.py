@@ -1,6 +1,9 @@
 
 """
 Metrics collection and monitoring
+
+Request latency lives in the shared telemetry histograms (one fixed-memory
+series per endpoint), so percentiles cost O(buckets) and nothing grows per request.
 """
 
 import json
@@ -11,11 +14,15 @@ from typing import Dict, Any
 from collections import defaultdict
 import threading
 
+from src.common_repository.utils.telemetry import telemetry, REQUEST_LATENCY_METRIC
+
+# Percentiles need at least this many samples to be reported
+MIN_LATENCY_SAMPLES = 5
+
 class MetricsCollector:
     def __init__(self):
         self.requests_total = defaultdict(int)
         self.errors_total = defaultdict(int)
-        self.latency_data = defaultdict(list)
         self.cache_hits = defaultdict(int)
         self.cache_misses = defaultdict(int)
         self.start_time = time.time()
@@ -35,24 +42,18 @@ class MetricsCollector:
 
     def record_latency(self, path: str, latency_ms: float):
         """Record request latency"""
-        with self._lock:
-            self.latency_data[path].append(latency_ms)
-            # Keep only last 1000 entries per path
-            if len(self.latency_data[path]) > 1000:
-                self.latency_data[path] = self.latency_data[path][-1000:]
+        telemetry.record_histogram(REQUEST_LATENCY_METRIC, latency_ms, {'endpoint': path})
+
+    def get_latency_quantile(self, endpoint: str, q: float) -> float:
+        """Latency quantile for an endpoint (0.0 until enough samples)"""
+        histogram = telemetry.get_histogram(REQUEST_LATENCY_METRIC, {'endpoint': endpoint})
+        if histogram is None or histogram.count < MIN_LATENCY_SAMPLES:
+            return 0.0
+        return histogram.quantile(q)
 
     def get_p95_latency(self, endpoint: str) -> float:
         """Calculate p95 latency for an endpoint"""
-        with self._lock:
-            if endpoint not in self.latency_data or not self.latency_data[endpoint]:
-                return 0.0
-                
-            latencies = sorted(self.latency_data[endpoint])
-            if len(latencies) < 5:
-                return 0.0
-                
-            p95_index = int(len(latencies) * 0.95)
-            return latencies[p95_index]
+        return self.get_latency_quantile(endpoint, 0.95)
 
     def get_cache_hit_rate(self, endpoint: str) -> float:
         """Calculate cache hit rate for an endpoint"""
@@ -76,26 +77,33 @@ class MetricsCollector:
 
     def get_metrics(self) -> Dict[str, Any]:
         """Get current metrics"""
+        uptime = time.time() - self.start_time
+
+        # Latency percentiles per endpoint
+        latency_p95 = {}
+        latency = {}
+        cache_hit_rates = {}
+
+        for _, labels, histogram in telemetry.iter_histograms(REQUEST_LATENCY_METRIC):
+            endpoint = labels.get('endpoint', '')
+            latency[endpoint] = histogram.summary()
+            latency_p95[endpoint] = round(self.get_p95_latency(endpoint), 2)
+            cache_hit_rates[endpoint] = round(self.get_cache_hit_rate(endpoint), 3)
+
         with self._lock:
-            uptime = time.time() - self.start_time
+            requests_total = dict(self.requests_total)
+            errors_total = dict(self.errors_total)
 
-            # Calculate latency percentiles per endpoint
-            latency_p95 = {}
-            cache_hit_rates = {}
-            
-            for endpoint in self.latency_data.keys():
-                latency_p95[endpoint] = round(self.get_p95_latency(endpoint), 2)
-                cache_hit_rates[endpoint] = round(self.get_cache_hit_rate(endpoint), 3)
-
-            return {
-                'uptime_seconds': round(uptime, 2),
-                'memory_mb': round(self.get_memory_usage_mb(), 2),
-                'requests_total': dict(self.requests_total),
-                'errors_total': dict(self.errors_total),
-                'latency_p95_ms': latency_p95,
-                'cache_hit_rate': cache_hit_rates,
-                'timestamp': datetime.now().isoformat()
-            }
+        return {
+            'uptime_seconds': round(uptime, 2),
+            'memory_mb': round(self.get_memory_usage_mb(), 2),
+            'requests_total': requests_total,
+            'errors_total': errors_total,
+            'latency_p95_ms': latency_p95,
+            'latency_ms': latency,
+            'cache_hit_rate': cache_hit_rates,
+            'timestamp': datetime.now().isoformat()
+        }
 
 # Global metrics collector
 metrics = MetricsCollector()
@@ -104,6 +112,7 @@ def update_request_metrics(path: str, method: str, status_code: int, duration_ms
     """Update request metrics"""
     # Count requests by path
     metrics.increment(f"requests_total_{path}")
+    telemetry.increment('http.requests', 1, {'endpoint': path, 'method': method, 'status': status_code})
 
     # Count errors by path
     if status_code >= 400:
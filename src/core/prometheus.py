@@ -0,0 +1,131 @@
+"""
+Prometheus Text Exporter
+Renders the in-process telemetry in the Prometheus text exposition format (0.0.4):
+1. Counters become <name>_total and gauges are exported as-is, one sample per label set
+2. Histograms become cumulative _bucket{le=...}/_sum/_count samples over fixed
+   bounds, plus a <name>_quantiles gauge (p50/p95/p99) from the full-resolution buckets
+3. Cache hit ratio per namespace is derived from the cache.hits/cache.misses counters
+4. The body is generated one metric family at a time, so a scrape never holds
+   the whole payload and never blocks the request path
+"""
+
+import re
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.common_repository.config.runtime import METRICS_NAMESPACE
+from src.common_repository.utils.histogram import DEFAULT_QUANTILES
+from src.common_repository.utils.telemetry import telemetry
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Bucket bounds for millisecond series and for second series (names ending in _sec)
+MS_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 300000)
+SEC_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600)
+
+_INVALID_NAME = re.compile(r'[^a-zA-Z0-9_:]')
+_INVALID_LABEL = re.compile(r'[^a-zA-Z0-9_]')
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def metric_name(name: str, namespace: str = METRICS_NAMESPACE) -> str:
+    """Telemetry name ('http.request_ms') -> Prometheus name ('<namespace>_http_request_ms')"""
+    name = _INVALID_NAME.sub('_', f'{namespace}_{name}' if namespace else name)
+    return f'_{name}' if name[0].isdigit() else name
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        label_text = ','.join(f'{_INVALID_LABEL.sub("_", key)}="{_escape(val)}"'
+                              for key, val in labels.items())
+        return f'{name}{{{label_text}}} {_format_value(value)}\n'
+    return f'{name} {_format_value(value)}\n'
+
+
+def _family(name: str, kind: str, samples: Iterable[Sample], help_text: str = '') -> str:
+    lines = [f'# HELP {name} {help_text or name}\n', f'# TYPE {name} {kind}\n']
+    lines.extend(_format_sample(sample_name, labels, value) for sample_name, labels, value in samples)
+    return ''.join(lines)
+
+
+def _group(series: Iterable[Tuple[str, Dict[str, str], object]]) -> Dict[str, List[Tuple[Dict[str, str], object]]]:
+    families = defaultdict(list)
+    for name, labels, value in series:
+        families[name].append((labels, value))
+    return families
+
+
+def histogram_bounds(name: str) -> Tuple[float, ...]:
+    return SEC_BUCKETS if name.endswith('_sec') else MS_BUCKETS
+
+
+def _histogram_samples(name: str, series) -> Iterator[Sample]:
+    bounds = histogram_bounds(name)
+    for labels, histogram in series:
+        cumulative, count, total = histogram.counts_at(bounds)
+        for bound, seen in zip(bounds, cumulative):
+            yield f'{name}_bucket', {**labels, 'le': _format_value(bound)}, seen
+        yield f'{name}_bucket', {**labels, 'le': '+Inf'}, count
+        yield f'{name}_sum', labels, round(total, 3)
+        yield f'{name}_count', labels, count
+
+
+def _quantile_samples(name: str, series) -> Iterator[Sample]:
+    for labels, histogram in series:
+        if histogram.count:
+            for q in DEFAULT_QUANTILES:
+                yield name, {**labels, 'quantile': _format_value(q)}, round(histogram.quantile(q), 3)
+
+
+def _cache_hit_ratio_samples(name: str, counters: List[Tuple[str, Dict[str, str], int]]) -> Iterator[Sample]:
+    hits, misses = defaultdict(int), defaultdict(int)
+    for counter, labels, value in counters:
+        if counter in ('cache.hits', 'cache.misses') and 'namespace' in labels:
+            (hits if counter == 'cache.hits' else misses)[labels['namespace']] += value
+    for namespace in sorted(set(hits) | set(misses)):
+        lookups = hits[namespace] + misses[namespace]
+        if lookups:
+            yield name, {'namespace': namespace}, round(hits[namespace] / lookups, 4)
+
+
+def render_metrics(namespace: Optional[str] = None) -> Iterator[str]:
+    """Yield the exposition text one metric family at a time"""
+    prefix = METRICS_NAMESPACE if namespace is None else namespace
+
+    yield _family(metric_name('uptime_seconds', prefix), 'gauge',
+                  [(metric_name('uptime_seconds', prefix), {}, round(time.time() - telemetry._start_time, 3))],
+                  'Seconds since the telemetry collector started')
+
+    counters = telemetry.iter_counters()
+    for name, series in sorted(_group(counters).items()):
+        family = metric_name(name, prefix) + '_total'
+        yield _family(family, 'counter', ((family, labels, value) for labels, value in series))
+
+    for name, series in sorted(_group(telemetry.iter_gauges()).items()):
+        family = metric_name(name, prefix)
+        yield _family(family, 'gauge', ((family, labels, value) for labels, value in series))
+
+    for name, series in sorted(_group(telemetry.iter_histograms()).items()):
+        family = metric_name(name, prefix)
+        yield _family(family, 'histogram', _histogram_samples(family, series))
+        yield _family(f'{family}_quantiles', 'gauge', _quantile_samples(f'{family}_quantiles', series),
+                      f'Streaming p50/p95/p99 of {family}')
+
+    family = metric_name('cache.hit_ratio', prefix)
+    ratios = list(_cache_hit_ratio_samples(family, counters))
+    if ratios:
+        yield _family(family, 'gauge', ratios, 'Cache hit ratio per namespace')
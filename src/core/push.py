@@ -0,0 +1,498 @@
+"""
+Push Channel
+Server-sent events fed by the scheduler's refresh jobs, so dashboards stop polling:
+1. PushHub keeps the last published state per topic ('quotes:<SYMBOL>', 'fusion',
+   'kpi') and fans out only the fields that changed, encoded once as compact JSON
+2. Each client subscribes to its own topics and has a bounded buffer; a client that
+   falls behind has its backlog dropped and is sent a fresh snapshot instead
+3. push_bp serves /api/stream as text/event-stream with periodic heartbeats
+4. Every open stream holds a server thread, so fit_worker() caps clients to the gunicorn
+   worker's threads and turns the channel off on sync workers; /api/stream then answers
+   503 and pages fall back to polling
+5. PushRelay carries publishes across processes: the feed jobs run wherever the scheduler
+   was started (the gunicorn master under --preload) while streams are held by the workers,
+   so the master relays every published state over a local socket and each worker replays
+   it into its own hub and reports back the symbols its clients watch
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from multiprocessing.connection import Client, Listener
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from flask import Blueprint, Response, jsonify, request
+
+from src.common_repository.config.runtime import (
+    PUSH_ENABLED, PUSH_RESERVED_THREADS, PUSH_CLIENT_BUFFER, PUSH_MAX_CLIENTS, PUSH_MAX_SYMBOLS,
+    PUSH_HEARTBEAT_SEC, PUSH_RELAY_ADDRESS, PUSH_RELAY_RETRY_SEC
+)
+from src.common_repository.utils.telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+push_bp = Blueprint('push', __name__)
+
+QUOTES_PREFIX = 'quotes:'
+TOPICS = ('fusion', 'kpi')
+QUOTE_FIELDS = ('price', 'change', 'change_percent', 'volume', 'high', 'low', 'open', 'previous_close')
+RETRY_MS = 5000
+# Refreshed on every job run whether or not the data changed; never pushed on their own
+VOLATILE_FIELDS = ('timestamp', 'last_updated', 'last_incremental_update', 'incremental', 'generation_time_ms')
+
+_MISSING = object()
+
+
+class PushLimitError(Exception):
+    """Raised when the hub already serves PUSH_MAX_CLIENTS streams"""
+    pass
+
+
+class PushDisabledError(Exception):
+    """Raised when the server cannot hold long-lived streams (or PUSH_ENABLED is off)"""
+    pass
+
+
+def quote_topic(symbol: str) -> str:
+    return f"{QUOTES_PREFIX}{symbol.upper()}"
+
+
+def diff(old: Dict[str, Any], new: Dict[str, Any], volatile: Iterable[str] = ()) -> Dict[str, Any]:
+    """Fields of `new` that differ from `old`; nested dicts recurse and removed keys map to None
+
+    Keys in `volatile` (timestamps and the like), at any depth, never make a delta on
+    their own but ride along with any other change at the same level.
+    """
+    delta = {}
+    for key, value in new.items():
+        if key in volatile:
+            continue
+        previous = old.get(key, _MISSING)
+        if value == previous:
+            continue
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = diff(previous, value, volatile)
+            if nested:
+                delta[key] = nested
+        else:
+            delta[key] = value
+    for key in old:
+        if key not in new and key not in volatile:
+            delta[key] = None
+    if delta:
+        delta.update((key, new[key]) for key in volatile if key in new)
+    return delta
+
+
+def _encode(data: Any) -> str:
+    return json.dumps(data, separators=(',', ':'), default=str)
+
+
+def _frame(event: str, data: Any, seq: int) -> str:
+    return f"id: {seq}\nevent: {event}\ndata: {_encode(data)}\n\n"
+
+
+def _family(topic: str) -> str:
+    return 'quotes' if topic.startswith(QUOTES_PREFIX) else topic
+
+
+class PushClient:
+    """One stream's subscriptions and its bounded queue of encoded frames"""
+
+    def __init__(self, topics: Iterable[str], buffer_size: int = PUSH_CLIENT_BUFFER):
+        self.topics = frozenset(topics)
+        self.buffer_size = buffer_size
+        self.dropped = 0
+        self.closed = False
+        self._frames = deque()
+        self._resync = False
+        self._cond = threading.Condition()
+
+    def offer(self, frame: str) -> bool:
+        """Queue a frame; on overflow drop the backlog and flag a resync. False if it overflowed"""
+        with self._cond:
+            overflow = len(self._frames) >= self.buffer_size
+            if overflow:
+                self.dropped += len(self._frames) + 1
+                self._frames.clear()
+                self._resync = True
+            else:
+                self._frames.append(frame)
+            self._cond.notify()
+        return not overflow
+
+    def drain(self, timeout: float) -> Tuple[List[str], bool]:
+        """Wait up to `timeout` for frames; returns (frames, resync)"""
+        with self._cond:
+            if not self._frames and not self._resync and not self.closed:
+                self._cond.wait(timeout)
+            frames = list(self._frames)
+            self._frames.clear()
+            resync, self._resync = self._resync, False
+        return frames, resync
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+
+
+class PushHub:
+    """Per-topic state and delta fan-out to subscribed clients"""
+
+    def __init__(self, buffer_size: int = PUSH_CLIENT_BUFFER, max_clients: int = PUSH_MAX_CLIENTS,
+                 enabled: bool = PUSH_ENABLED):
+        self.buffer_size = buffer_size
+        self.max_clients = max_clients
+        self.enabled = enabled
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._clients = set()
+        self._seq = 0
+        self._lock = threading.Lock()
+        # Called with symbols() whenever a quote subscription starts or ends
+        self.on_watch: Optional[Callable[[List[str]], None]] = None
+
+    def fit_worker(self, worker_class: str, threads: int = 1):
+        """Match the stream limit to the serving worker: streams park a thread each"""
+        if worker_class == 'gthread':
+            self.max_clients = min(self.max_clients, threads - PUSH_RESERVED_THREADS)
+        elif worker_class not in ('gevent', 'eventlet'):
+            self.max_clients = 0  # sync workers would block on the first stream
+        if self.max_clients <= 0:
+            self.enabled = False
+        logger.info(f"Push channel {'on' if self.enabled else 'off'} for {worker_class} worker "
+                    f"({max(self.max_clients, 0)} streams)")
+
+    def subscribe(self, topics: Iterable[str]) -> PushClient:
+        if not self.enabled:
+            raise PushDisabledError("Push channel is disabled on this server; poll instead")
+        client = PushClient(topics, self.buffer_size)
+        with self._lock:
+            if len(self._clients) >= self.max_clients:
+                raise PushLimitError(f"Push channel is at its limit of {self.max_clients} clients")
+            self._clients.add(client)
+            count = len(self._clients)
+        telemetry.set_gauge('push.clients', count)
+        self._watch_changed(client)
+        return client
+
+    def unsubscribe(self, client: PushClient):
+        client.close()
+        with self._lock:
+            self._clients.discard(client)
+            count = len(self._clients)
+        telemetry.set_gauge('push.clients', count)
+        self._watch_changed(client)
+
+    def _watch_changed(self, client: PushClient):
+        if self.on_watch and any(topic.startswith(QUOTES_PREFIX) for topic in client.topics):
+            self.on_watch(self.symbols())
+
+    def publish(self, topic: str, state: Dict[str, Any], volatile: Iterable[str] = ()) -> Dict[str, Any]:
+        """Store the topic's new state and push what changed; returns the delta ({} if nothing did)
+
+        Keys in `volatile` (timestamps and the like), at any depth, never trigger a push
+        on their own but ride along with any delta that is sent.
+        """
+        volatile = frozenset(volatile)
+        with self._lock:
+            delta = diff(self._state.get(topic, {}), state, volatile)
+            self._state[topic] = state
+            if not delta:
+                telemetry.increment('push.unchanged', labels={'topic': _family(topic)})
+                return {}
+            self._seq += 1
+            frame = _frame('delta', {'t': topic, 'd': delta}, self._seq)
+            # Offers stay under the lock so every client sees deltas in sequence order
+            overflows = sum(1 for client in self._clients if topic in client.topics and not client.offer(frame))
+        telemetry.increment('push.events', labels={'topic': _family(topic)})
+        if overflows:
+            telemetry.increment('push.overflows', overflows)
+        return delta
+
+    def snapshot(self, topics: Iterable[str]) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+        """(sequence, current state of every subscribed topic that has one)"""
+        with self._lock:
+            return self._seq, {topic: self._state[topic] for topic in topics if topic in self._state}
+
+    def symbols(self) -> List[str]:
+        """Symbols at least one client is watching: the quote feed fetches only these"""
+        with self._lock:
+            topics = set().union(*(client.topics for client in self._clients)) if self._clients else set()
+        return sorted(topic[len(QUOTES_PREFIX):] for topic in topics if topic.startswith(QUOTES_PREFIX))
+
+    def stream(self, client: PushClient, heartbeat: float = PUSH_HEARTBEAT_SEC) -> Iterator[str]:
+        """SSE frames for one client: a snapshot, then deltas, with heartbeats while idle"""
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            seq, state = self.snapshot(client.topics)
+            yield _frame('snapshot', state, seq)
+            while not client.closed:
+                frames, resync = client.drain(heartbeat)
+                if resync:
+                    telemetry.increment('push.resyncs')
+                    seq, state = self.snapshot(client.topics)
+                    yield _frame('snapshot', state, seq)
+                elif frames:
+                    yield ''.join(frames)
+                else:
+                    yield ": ping\n\n"
+        finally:
+            self.unsubscribe(client)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            clients = list(self._clients)
+            topics = len(self._state)
+            seq = self._seq
+        return {
+            'enabled': self.enabled,
+            'max_clients': self.max_clients,
+            'clients': len(clients),
+            'topics': topics,
+            'sequence': seq,
+            'watched_symbols': len(self.symbols()),
+            'dropped_events': sum(client.dropped for client in clients),
+        }
+
+
+class PushRelay:
+    """Relays published topic states from the feed-job process to the serving workers' hubs
+
+    start() runs in the process that publishes (the gunicorn master) and listens on a local
+    socket; attach() runs in each worker, replays every relayed state into the worker's hub
+    and reports the symbols its clients watch. New workers first receive the latest state
+    of every topic so their snapshots are complete.
+    """
+
+    def __init__(self, address: Optional[str] = PUSH_RELAY_ADDRESS, retry_sec: float = PUSH_RELAY_RETRY_SEC):
+        self.address = address
+        self.retry_sec = retry_sec
+        self.authkey: Optional[bytes] = None
+        self._owner: Optional[int] = None
+        self._listener = None
+        self._peers: Dict[Any, frozenset] = {}
+        self._state: Dict[str, Tuple[Dict[str, Any], Tuple[str, ...]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def serving(self) -> bool:
+        """True in the process that started the relay (forked workers inherit the object, not the role)"""
+        return self._listener is not None and self._owner == os.getpid()
+
+    def start(self) -> str:
+        """Listen for workers; returns the socket address they should attach to"""
+        if self.address is None:
+            self.address = os.path.join(tempfile.gettempdir(), f"push-relay-{os.getpid()}.sock")
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        self.authkey = self.authkey or os.urandom(16)
+        self._listener = Listener(self.address, family='AF_UNIX', authkey=self.authkey)
+        self._owner = os.getpid()
+        threading.Thread(target=self._accept_loop, name='push-relay', daemon=True).start()
+        logger.info(f"Push relay listening on {self.address}")
+        return self.address
+
+    def stop(self):
+        if self.serving:
+            listener, self._listener = self._listener, None
+            listener.close()
+        with self._lock:
+            peers, self._peers = list(self._peers), {}
+        for conn in peers:
+            conn.close()
+
+    def _accept_loop(self):
+        listener = self._listener
+        while self._listener is listener:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                if self._listener is listener:
+                    logger.warning(f"Push relay rejected a connection: {e}")
+                continue
+            with self._lock:
+                try:
+                    for topic, (state, volatile) in self._state.items():
+                        conn.send(('publish', topic, state, volatile))
+                except OSError:
+                    conn.close()
+                    continue
+                self._peers[conn] = frozenset()
+            threading.Thread(target=self._read_peer, args=(conn,), name='push-relay-peer', daemon=True).start()
+
+    def _read_peer(self, conn):
+        try:
+            while True:
+                kind, payload = conn.recv()
+                if kind == 'watch':
+                    with self._lock:
+                        if conn in self._peers:
+                            self._peers[conn] = frozenset(payload)
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._drop(conn)
+
+    def _drop(self, conn):
+        with self._lock:
+            self._peers.pop(conn, None)
+        conn.close()
+
+    def send(self, topic: str, state: Dict[str, Any], volatile: Iterable[str] = ()):
+        """Forward a publish to every attached worker (no-op outside the relaying process)"""
+        if not self.serving:
+            return
+        message = ('publish', topic, state, tuple(volatile))
+        dead = []
+        with self._lock:
+            self._state[topic] = message[2:]
+            # Sends stay under the lock so workers see publishes in order
+            for conn in self._peers:
+                try:
+                    conn.send(message)
+                except OSError:
+                    dead.append(conn)
+        for conn in dead:
+            self._drop(conn)
+
+    def symbols(self) -> Set[str]:
+        """Symbols watched by any attached worker's clients"""
+        with self._lock:
+            return set().union(*self._peers.values())
+
+    def attach(self, hub: 'PushHub', address: Optional[str] = None, authkey: Optional[bytes] = None):
+        """Worker side: mirror the relay's publishes into `hub` on a background thread, reconnecting if dropped"""
+        address = address or self.address
+        authkey = authkey or self.authkey
+        if not self.serving:
+            # Forked from the relaying process: its peers and state are not this worker's
+            self._peers, self._state = {}, {}
+        if not address or not authkey:
+            logger.info("No push relay to attach to; this process's feeds publish locally")
+            return
+        threading.Thread(target=self._follow, args=(hub, address, authkey), name='push-relay-client',
+                         daemon=True).start()
+
+    def _follow(self, hub: 'PushHub', address: str, authkey: bytes):
+        while True:
+            try:
+                conn = Client(address, family='AF_UNIX', authkey=authkey)
+            except Exception as e:
+                logger.debug(f"Push relay at {address} not reachable yet: {e}")
+                time.sleep(self.retry_sec)
+                continue
+            send_lock = threading.Lock()
+
+            def report(symbols: List[str]):
+                with send_lock:
+                    try:
+                        conn.send(('watch', symbols))
+                    except OSError:
+                        pass
+
+            hub.on_watch = report
+            report(hub.symbols())
+            try:
+                while True:
+                    _, topic, state, volatile = conn.recv()
+                    hub.publish(topic, state, volatile=volatile)
+            except (EOFError, OSError):
+                logger.warning(f"Push relay connection lost; reconnecting in {self.retry_sec}s")
+            finally:
+                hub.on_watch = None
+                conn.close()
+            time.sleep(self.retry_sec)
+
+
+def parse_topics(args) -> List[str]:
+    """?symbols=TCS,INFY&topics=fusion,kpi -> ['quotes:TCS', 'quotes:INFY', 'fusion', 'kpi']"""
+    symbols = [s.strip().upper() for s in args.get('symbols', '').split(',') if s.strip()]
+    topics = [t.strip().lower() for t in args.get('topics', '').split(',') if t.strip()]
+    unknown = [t for t in topics if t not in TOPICS]
+    if unknown:
+        raise ValueError(f"Unknown topics: {', '.join(unknown)} (available: {', '.join(TOPICS)})")
+    if len(symbols) > PUSH_MAX_SYMBOLS:
+        raise ValueError(f"At most {PUSH_MAX_SYMBOLS} symbols per stream")
+    if not symbols and not topics:
+        raise ValueError("Subscribe to at least one of symbols or topics")
+    return [quote_topic(symbol) for symbol in dict.fromkeys(symbols)] + list(dict.fromkeys(topics))
+
+
+# Feeds: called by the scheduler's refresh jobs
+
+def broadcast(topic: str, state: Dict[str, Any], volatile: Iterable[str] = ()) -> Dict[str, Any]:
+    """Publish to this process's hub and relay to the workers; returns the delta"""
+    volatile = tuple(volatile)
+    delta = push_hub.publish(topic, state, volatile=volatile)
+    if delta:
+        push_relay.send(topic, state, volatile)
+    return delta
+
+
+def watched_symbols() -> List[str]:
+    """Symbols watched by clients of this process or of any worker attached to the relay"""
+    return sorted(set(push_hub.symbols()) | push_relay.symbols())
+
+
+def publish_quotes(quotes: Dict[str, Any]) -> int:
+    """Push changed quote fields per symbol (MarketData objects or dicts); returns symbols changed"""
+    changed = 0
+    for symbol, quote in quotes.items():
+        fields = asdict(quote) if is_dataclass(quote) else dict(quote)
+        state = {field: fields[field] for field in QUOTE_FIELDS if field in fields}
+        timestamp = fields.get('timestamp')
+        state['timestamp'] = timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp
+        if broadcast(quote_topic(symbol), state, volatile=('timestamp',)):
+            changed += 1
+    return changed
+
+
+def publish_fusion() -> bool:
+    from src.fusion.api.fusion import build_dashboard
+    return bool(broadcast('fusion', build_dashboard(), volatile=VOLATILE_FIELDS))
+
+
+def publish_kpi() -> bool:
+    from src.core.kpi.calculator import kpi_calculator
+    try:
+        with open(kpi_calculator.kpi_file, 'r') as f:
+            kpi_data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read KPI metrics for push: {e}")
+        return False
+    return bool(broadcast('kpi', kpi_data, volatile=VOLATILE_FIELDS))
+
+
+@push_bp.route('/stream')
+def stream():
+    """Server-sent events: ?symbols=TCS,INFY for quotes, ?topics=fusion,kpi for dashboards"""
+    try:
+        topics = parse_topics(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    try:
+        client = push_hub.subscribe(topics)
+    except (PushLimitError, PushDisabledError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
+
+    response = Response(push_hub.stream(client), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@push_bp.route('/stream/stats')
+def stream_stats():
+    return jsonify({'success': True, 'data': push_hub.stats()})
+
+
+# Global instances
+push_hub = PushHub()
+push_relay = PushRelay()
@@ -14,7 +14,7 @@ from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
-from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
+from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
 import numpy as np
 import threading
 from typing import Dict, Any, Optional
@@ -25,6 +25,7 @@ from src.common_repository.config.runtime import (
 from src.common_repository.config.feature_flags import feature_flags
 from src.common_repository.utils.telemetry import telemetry
 from src.common_repository.cache.cache_manager import cache_manager
+from src.common_repository.storage.record_store import record_store
 
 logger = logging.getLogger(__name__)
 
@@ -117,6 +118,24 @@ def track_job_execution(job_name: str):
         return wrapper
     return decorator
 
+def record_job_event(event):
+    """APScheduler listener: per-job start lag and run outcomes for the metrics exporter"""
+    job = event.job_id
+    if event.code == EVENT_JOB_SUBMITTED:
+        scheduled = max(event.scheduled_run_times)
+        lag_sec = max((datetime.now(scheduled.tzinfo) - scheduled).total_seconds(), 0.0)
+        telemetry.record_histogram('jobs.lag_ms', lag_sec * 1000, {'job': job})
+        telemetry.set_gauge('jobs.lag_sec', lag_sec)
+        return
+    if event.code == EVENT_JOB_MISSED:
+        outcome = 'missed'
+    elif event.code == EVENT_JOB_ERROR:
+        outcome = 'error'
+    else:
+        # Tracked jobs swallow their exceptions and return False instead
+        outcome = 'failed' if event.retval is False else 'success'
+    telemetry.increment('jobs.runs', 1, {'job': job, 'outcome': outcome})
+
 def send_alerts(stocks):
     """Send alerts for high-scoring stocks (placeholder for future implementation)"""
     for stock in stocks:
@@ -145,6 +164,16 @@ def quotes_refresh_job():
         # This would update cached quote data without heavy computation
         cache_manager.refresh_quotes_cache()
 
+        # Push changed quotes to stream clients (here or in relay-attached workers);
+        # only symbols someone is watching are fetched
+        from src.core.push import watched_symbols, publish_quotes, publish_fusion
+        symbols = watched_symbols()
+        if symbols:
+            from src.data.realtime_data_fetcher import realtime_fetcher
+            changed = publish_quotes(realtime_fetcher.get_multiple_symbols(symbols))
+            logger.info(f"Pushed quote deltas for {changed}/{len(symbols)} watched symbols")
+        publish_fusion()
+
         telemetry.increment_counter('jobs.completed', {'job': 'quotes_refresh'})
         return True
 
@@ -163,8 +192,11 @@ def options_chain_refresh_job():
             logger.info("Market closed, skipping options chain refresh")
             return True
 
-        # Light options chain refresh logic here
+        # One fetch per tracked underlying refreshes every expiry's snapshot
         cache_manager.refresh_options_cache()
+        from src.live_data.nse_provider import chain_snapshots
+        refreshed = chain_snapshots.refresh()
+        logger.info(f"Refreshed option chain snapshots for {refreshed} underlyings")
 
         telemetry.increment_counter('jobs.completed', {'job': 'options_chain_refresh'})
         return True
@@ -173,6 +205,30 @@ def options_chain_refresh_job():
         logger.error(f"Options chain refresh failed: {str(e)}")
         return False
 
+@track_job_execution("options_strategies_refresh")
+def options_strategies_refresh_job():
+    """Light job: regenerate short strangle candidates for the F&O universe during market hours"""
+    try:
+        logger.info("Running options strategies refresh...")
+
+        # Only run during market hours
+        if not is_market_hours():
+            logger.info("Market closed, skipping options strategies refresh")
+            return True
+
+        # Import here to avoid circular imports
+        from src.analyzers.short_strangle_engine import ShortStrangleEngine
+
+        strategies = ShortStrangleEngine().generate_all_strategies()
+        logger.info(f"Options strategies refresh generated {sum(len(v) for v in strategies.values())} strategies")
+
+        telemetry.increment_counter('jobs.completed', {'job': 'options_strategies_refresh'})
+        return True
+
+    except Exception as e:
+        logger.error(f"Options strategies refresh failed: {str(e)}")
+        return False
+
 @track_job_execution("kpi_incremental_update")
 def kpi_incremental_update_job():
     """Light job: incremental KPI updates during market hours"""
@@ -189,6 +245,9 @@ def kpi_incremental_update_job():
 
         success = kpi_calculator.incremental_update()
         if success:
+            from src.core.push import publish_kpi, publish_fusion
+            publish_kpi()
+            publish_fusion()
             telemetry.increment_counter('jobs.completed', {'job': 'kpi_incremental_update'})
 
         return success
@@ -206,6 +265,10 @@ def cache_maintenance_job():
         # Clear expired cache entries
         cache_manager.clear_expired()
 
+        # Checkpoint the tracking store WAL and refresh legacy JSON mirrors
+        compaction = record_store.compact()
+        logger.info(f"Record store compacted, mirrors exported: {compaction['mirrors_exported']}")
+
         # Force garbage collection
         import gc
         collected = gc.collect()
@@ -242,6 +305,30 @@ def kpi_full_recompute_job():
         logger.error(f"KPI full recompute failed: {str(e)}")
         return False
 
+@track_job_execution("ohlcv_store_refresh")
+def ohlcv_store_refresh_job():
+    """Heavy job: append the day's bars to the local OHLCV store after market hours"""
+    try:
+        logger.info("Running OHLCV store refresh...")
+
+        # Only run after market hours so the day's bar is final
+        if is_market_hours():
+            logger.warning("Market open, skipping OHLCV store refresh")
+            return False
+
+        # Import here to avoid circular imports
+        from src.data.ohlcv_store import ohlcv_store
+
+        added = ohlcv_store.refresh(ohlcv_store.symbols(), force=True)
+        logger.info(f"OHLCV store refresh appended bars for {len(added)} symbols")
+
+        telemetry.increment_counter('jobs.completed', {'job': 'ohlcv_store_refresh'})
+        return True
+
+    except Exception as e:
+        logger.error(f"OHLCV store refresh failed: {str(e)}")
+        return False
+
 @track_job_execution("precompute_other_timeframes")
 def precompute_other_timeframes_job():
     """Heavy job: precompute multi-timeframe data after market hours"""
@@ -304,7 +391,7 @@ def run_screening_job():
         gc.collect()
 
         # Import here to avoid circular imports
-        from src.analyzers.stock_screener import EnhancedStockScreener
+        from src.analyzers.stock_screener import EnhancedStockScreener, save_screening_results
 
         # Create screener instance
         screener = EnhancedStockScreener()
@@ -367,9 +454,7 @@ def run_screening_job():
                 record_successful_session(len(valid_results), results_data.get('status'))
 
                 try:
-                    json_safe_data = convert_numpy_types(results_data)
-                    with open('top10.json', 'w', encoding='utf-8') as f:
-                        json.dump(json_safe_data, f, indent=2, ensure_ascii=False)
+                    save_screening_results(convert_numpy_types(results_data))
 
                     logger.info(f"✅ Screening completed successfully with {len(valid_results)} stocks")
 
@@ -394,8 +479,7 @@ def run_screening_job():
         }
 
         try:
-            with open('top10.json', 'w', encoding='utf-8') as f:
-                json.dump(error_data, f, indent=2, ensure_ascii=False)
+            save_screening_results(error_data)
         except Exception as e:
             logger.error(f"Failed to save error state: {e}")
 
@@ -449,6 +533,17 @@ class StockAnalystScheduler:
                     misfire_grace_time=10
                 )
 
+                # Short strangle candidates every 5 minutes during market hours
+                self.scheduler.add_job(
+                    func=options_strategies_refresh_job,
+                    trigger='interval',
+                    minutes=5,
+                    id='options_strategies_refresh',
+                    replace_existing=True,
+                    max_instances=1,
+                    misfire_grace_time=60
+                )
+
             # KPI incremental update every 5 minutes during market hours
             if feature_flags.is_enabled('enable_kpi_triggers'):
                 self.scheduler.add_job(
@@ -485,6 +580,17 @@ class StockAnalystScheduler:
                 misfire_grace_time=600
             )
 
+            # OHLCV store daily append at 15:45 IST
+            self.scheduler.add_job(
+                func=ohlcv_store_refresh_job,
+                trigger='cron',
+                hour=15,
+                minute=45,
+                id='ohlcv_store_refresh',
+                replace_existing=True,
+                misfire_grace_time=600
+            )
+
             # Precompute other timeframes daily at 19:00 IST
             if feature_flags.is_enabled('enable_all_timeframes_concurrent'):
                 self.scheduler.add_job(
@@ -530,12 +636,20 @@ class StockAnalystScheduler:
 
             logger.info("✅ All scheduler jobs configured successfully")
 
+            self.scheduler.add_listener(
+                record_job_event,
+                EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED
+            )
             self.scheduler.start()
             self.running = True
 
+            # Worker pool for agent runs enqueued by jobs (KPI breaches, prediction closes)
+            from src.agents.orchestrator import agent_orchestrator
+            agent_orchestrator.start()
+
             logger.info(f"✅ Scheduler started with IST-aware job windows")
             logger.info(f"   Light jobs: quotes (30s), options (60s), KPI (5m), cache (10m)")
-            logger.info(f"   Heavy jobs: KPI recompute (16:00), precompute (19:00), training (20:00)")
+            logger.info(f"   Heavy jobs: OHLCV append (15:45), KPI recompute (16:00), precompute (19:00), training (20:00)")
 
             return True
 
@@ -549,6 +663,8 @@ class StockAnalystScheduler:
             if self.scheduler.running:
                 self.scheduler.shutdown()
                 self.running = False
+                from src.agents.orchestrator import agent_orchestrator
+                agent_orchestrator.stop()
                 logger.info("Scheduler stopped.")
         except Exception as e:
             logger.error(f"Error stopping scheduler: {str(e)}")
@@ -0,0 +1,139 @@
+"""
+Startup Time and Warm-up
+Keeps app boot fast and measurable:
+1. measure_cold_start() imports the app in a fresh `python -X importtime`
+   interpreter and reports wall time, peak RSS, the slowest imports and any
+   heavy modules (HEAVY_MODULES) that were loaded eagerly
+2. warm_up() imports STARTUP_PRELOAD_MODULES in the gunicorn master so forked
+   workers share them instead of each loading them on first request
+3. record_startup() / record_worker_boot() export boot time and RSS as gauges
+"""
+
+import sys
+import json
+import time
+import logging
+import statistics
+import subprocess
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from src.common_repository.config.runtime import (
+    STARTUP_BUDGET_SEC, STARTUP_RSS_BUDGET_MB, STARTUP_PRELOAD_MODULES, HEAVY_MODULES
+)
+from src.common_repository.utils.lazy_import import preload
+from src.common_repository.utils.telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+STARTUP_TARGET = 'src.core.app'
+
+# Runs in the child interpreter: import the target, report wall time, peak RSS and loaded modules
+_PROBE = """
+import json, sys, time, resource
+start = time.perf_counter()
+__import__({target!r})  # not importlib: -X importtime only traces the import statement path
+print(json.dumps({{
+    'wall_ms': (time.perf_counter() - start) * 1000,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'modules': sorted(sys.modules),
+}}))
+"""
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(text: str) -> List[ImportTiming]:
+    """Parse `python -X importtime` stderr lines: 'import time: self | cumulative | name'"""
+    timings = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        timings.append(ImportTiming(stripped, int(parts[0]), int(parts[1]),
+                                    (len(name) - len(stripped) - 1) // 2))
+    return timings
+
+
+def heavy_loaded(modules: List[str], heavy=HEAVY_MODULES) -> List[str]:
+    """Top-level heavy packages present in a module list"""
+    roots = {module.split('.')[0] for module in modules}
+    return [name for name in heavy if name in roots]
+
+
+def measure_cold_start(target: str = STARTUP_TARGET, runs: int = 3, top: int = 15,
+                       python: str = sys.executable, cwd: Optional[str] = None) -> Dict[str, Any]:
+    """Median cold-start wall time and peak RSS over `runs` fresh interpreters"""
+    samples = []
+    timings: List[ImportTiming] = []
+    for _ in range(runs):
+        proc = subprocess.run([python, '-X', 'importtime', '-c', _PROBE.format(target=target)],
+                              capture_output=True, text=True, cwd=cwd)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Importing {target} failed:\n{proc.stderr[-2000:]}")
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        timings = parse_importtime(proc.stderr)
+
+    return {
+        'target': target,
+        'runs': runs,
+        'wall_ms': round(statistics.median(s['wall_ms'] for s in samples), 1),
+        'rss_mb': round(max(s['rss_mb'] for s in samples), 1),
+        'modules': len(samples[-1]['modules']),
+        'heavy_loaded': heavy_loaded(samples[-1]['modules']),
+        'top_imports': [{'module': t.module, 'cumulative_ms': round(t.cumulative_us / 1000, 1)}
+                        for t in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]],
+    }
+
+
+def check_budget(result: Dict[str, Any], budget_sec: float = STARTUP_BUDGET_SEC,
+                 rss_budget_mb: float = STARTUP_RSS_BUDGET_MB) -> List[str]:
+    """Budget violations for a measure_cold_start() result (empty when within budget)"""
+    violations = []
+    if result['wall_ms'] > budget_sec * 1000:
+        violations.append(f"cold start {result['wall_ms']:.0f}ms exceeds {budget_sec * 1000:.0f}ms")
+    if result['rss_mb'] > rss_budget_mb:
+        violations.append(f"peak RSS {result['rss_mb']:.0f}MB exceeds {rss_budget_mb:.0f}MB")
+    if result['heavy_loaded']:
+        violations.append(f"heavy modules imported at startup: {', '.join(result['heavy_loaded'])}")
+    return violations
+
+
+def _rss_mb() -> float:
+    return telemetry.get_memory_stats().get('memory_rss_mb', 0.0)
+
+
+def record_startup(started: float):
+    """Gauge create_app time (from a perf_counter start) and the process RSS"""
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    telemetry.set_gauge('startup.create_app_ms', elapsed_ms)
+    telemetry.set_gauge('startup.rss_mb', _rss_mb())
+    logger.info(f"App created in {elapsed_ms:.0f}ms")
+
+
+def record_worker_boot(boot_ms: float):
+    """Gauge a forked worker's time from fork to ready and its RSS"""
+    rss_mb = _rss_mb()
+    telemetry.set_gauge('startup.worker_boot_ms', boot_ms)
+    telemetry.set_gauge('startup.rss_mb', rss_mb)
+    logger.info(f"Worker ready {boot_ms:.0f}ms after fork, RSS {rss_mb:.0f}MB")
+
+
+def warm_up(modules: Optional[List[str]] = None) -> Dict[str, float]:
+    """Import heavy modules before fork (gunicorn master); returns load ms per module"""
+    modules = STARTUP_PRELOAD_MODULES if modules is None else modules
+    if not modules:
+        return {}
+    timings = preload(modules)
+    logger.info(f"Preloaded before fork: {timings}")
+    return timings
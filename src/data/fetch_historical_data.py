@@ -1,8 +1,5 @@
 
-import yfinance as yf
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
 import time
 import logging
 import json
@@ -10,13 +7,20 @@ import os
 from datetime import datetime, timedelta
 import random
 
+from src.common_repository.utils.http_transport import http_transport
+from src.data.ohlcv_store import ohlcv_store
+from src.common_repository.utils.lazy_import import lazy_import
+
+yf = lazy_import('yfinance')
+bs4 = lazy_import('bs4')
+
 logger = logging.getLogger(__name__)
 
 class HistoricalDataFetcher:
     """Enhanced historical data fetcher with web scraping fallback"""
     
     def __init__(self):
-        self.session = requests.Session()
+        self.session = http_transport.client()
         self.setup_headers()
         # Enhanced symbol alias mapping for Yahoo Finance compatibility
         self.symbol_map = {
@@ -181,7 +185,7 @@ class HistoricalDataFetcher:
             response = self.session.get(url, timeout=15)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = bs4.BeautifulSoup(response.content, 'html.parser')
             
             # Look for historical data table
             table = soup.find('table', {'data-test': 'historical-prices'})
@@ -306,15 +310,35 @@ class HistoricalDataFetcher:
             logger.error(f"❌ NSE scraping failed for {symbol}: {str(e)}")
             return None
 
+    def load_from_store(self, symbol, period="5y"):
+        """Read history from the local OHLCV store in the fetcher's column layout"""
+        try:
+            data = ohlcv_store.get_history(symbol, period=period)
+            if data.empty:
+                return None
+            data = data.reset_index()
+            data['Adj Close'] = data['Close']
+            return data[['Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']]
+        except Exception as e:
+            logger.warning(f"⚠️ OHLCV store read failed for {symbol}: {str(e)}")
+            return None
+
     def fetch_historical_data(self, symbol, save_to_csv=True):
         """Main method: Fetch 5-year historical data with multiple fallbacks"""
         normalized_symbol = self.normalize_symbol(symbol)
         
         logger.info(f"🔄 Starting 5Y data fetch for {symbol} (normalized: {normalized_symbol})")
         
+        # Method 0: local OHLCV store, topped up with only the missing bars
+        data = self.load_from_store(symbol)
+        data_source = "ohlcv_store"
+        
         # Method 1: yfinance (most reliable)
-        data = self.fetch_yfinance_data(normalized_symbol)
-        data_source = "yfinance"
+        if data is None or len(data) < 1000:
+            data = self.fetch_yfinance_data(normalized_symbol)
+            data_source = "yfinance"
+            if data is not None and len(data) > ohlcv_store.info(symbol)['rows']:
+                ohlcv_store.replace(symbol, data)
         
         # Method 2: Yahoo Finance scraping
         if data is None or len(data) < 1000:
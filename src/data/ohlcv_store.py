@@ -0,0 +1,428 @@
+"""
+Local OHLCV Store
+
+Columnar on-disk store for daily price history shared by the screener,
+options, backtesting and training modules:
+1. One directory per symbol with a raw little-endian file per column,
+   read back through numpy memory maps
+2. Per-symbol index.json with row count, first/last bar and last refresh time;
+   cached entries are re-read when the file on disk changes, so readers see
+   bars appended by other processes (scheduler, training workers, web workers)
+3. Append-only writes; a refresh downloads only bars after the last stored date
+   (the last bar is re-fetched so a partial intraday bar gets replaced)
+4. Writers from any process are serialized by a per-symbol flock (readers take it
+   shared); bytes below the committed row count are never rewritten in place. A
+   rewrite (replaced last bar, full replace) goes to a new generation of column
+   files, and the index save is the single commit point
+"""
+
+import os
+import re
+import json
+import time
+import fcntl
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.common_repository.config.runtime import (
+    OHLCV_STORE_DIR, OHLCV_REFRESH_INTERVAL_SEC, OHLCV_BOOTSTRAP_PERIOD
+)
+from src.common_repository.utils.lazy_import import lazy_import
+from src.common_repository.utils.network import track_upstream
+from src.common_repository.utils.telemetry import telemetry
+
+yf = lazy_import('yfinance')
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+COLUMN_FILES = {
+    'Date': 'date.i8',
+    'Open': 'open.f8',
+    'High': 'high.f8',
+    'Low': 'low.f8',
+    'Close': 'close.f8',
+    'Volume': 'volume.f8',
+}
+ITEM_SIZE = 8
+INDEX_FILE = 'index.json'
+LOCK_FILE = '.lock'
+
+_PERIOD_RE = re.compile(r'(\d+)(d|wk|mo|y)')
+
+
+def store_key(symbol: str) -> str:
+    """Directory-safe key for a symbol (M&M and M_M share one entry)"""
+    key = symbol.upper().strip()
+    for suffix in ('.NS', '.BO'):
+        if key.endswith(suffix):
+            key = key[:-len(suffix)]
+    return re.sub(r'[^A-Z0-9_-]', '_', key)
+
+
+def default_ticker(symbol: str) -> str:
+    """Yahoo Finance ticker for an NSE symbol"""
+    symbol = symbol.upper().strip()
+    return symbol if symbol.endswith(('.NS', '.BO')) else f"{symbol}.NS"
+
+
+def period_start(period: Optional[str], now: Optional[pd.Timestamp] = None) -> Optional[pd.Timestamp]:
+    """First date covered by a yfinance-style period string ('60d', '6mo', '1y', 'max')"""
+    if not period or period == 'max':
+        return None
+    match = _PERIOD_RE.fullmatch(period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+    count, unit = int(match.group(1)), match.group(2)
+    offsets = {
+        'd': pd.DateOffset(days=count),
+        'wk': pd.DateOffset(weeks=count),
+        'mo': pd.DateOffset(months=count),
+        'y': pd.DateOffset(years=count),
+    }
+    now = now if now is not None else pd.Timestamp.now()
+    return (now - offsets[unit]).normalize()
+
+
+def _to_days(values) -> np.ndarray:
+    """Dates (tz-aware or naive) to int64 days since epoch, keeping the exchange-local date"""
+    index = pd.DatetimeIndex(pd.to_datetime(values))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize().values.astype('datetime64[D]').astype('<i8')
+
+
+def _day(value) -> int:
+    return int(_to_days([value])[0])
+
+
+def extract_ticker_frame(data: Optional[pd.DataFrame], ticker: str) -> Optional[pd.DataFrame]:
+    """Pull one ticker out of a yf.download(group_by='ticker') result"""
+    if data is None or data.empty:
+        return None
+    if isinstance(data.columns, pd.MultiIndex):
+        if ticker not in data.columns.get_level_values(0):
+            return None
+        data = data[ticker]
+    data = data.dropna(subset=['Close'])
+    return data if not data.empty else None
+
+
+class OHLCVStore:
+    """Memory-mapped, append-only daily OHLCV store keyed by symbol"""
+
+    def __init__(self, root: str = OHLCV_STORE_DIR,
+                 refresh_interval: int = OHLCV_REFRESH_INTERVAL_SEC,
+                 bootstrap_period: str = OHLCV_BOOTSTRAP_PERIOD):
+        self.root = root
+        self.refresh_interval = refresh_interval
+        self.bootstrap_period = bootstrap_period
+        self._lock = threading.RLock()
+        self._index: Dict[str, Dict] = {}
+        self._index_stamp: Dict[str, tuple] = {}  # (inode, mtime_ns) of the index.json cached
+        self._held: Dict[str, int] = {}  # flock depth per key, only touched under self._lock
+
+    # Index bookkeeping
+
+    def _path(self, key: str, name: str) -> str:
+        return os.path.join(self.root, key, name)
+
+    def _column_path(self, key: str, col: str, gen: int = 0) -> str:
+        """Column file of a generation; generation 0 keeps the original file names"""
+        name = COLUMN_FILES[col]
+        if gen:
+            stem, ext = name.split('.')
+            name = f"{stem}-{gen}.{ext}"
+        return self._path(key, name)
+
+    @contextmanager
+    def _locked(self, key: str, exclusive: bool = False):
+        """Hold the symbol's flock (shared for reads) plus the in-process lock"""
+        with self._lock:
+            if self._held.get(key):
+                # Re-entered from the same thread (e.g. replace -> append), lock already held
+                self._held[key] += 1
+                try:
+                    yield
+                finally:
+                    self._held[key] -= 1
+                return
+
+            directory = os.path.join(self.root, key)
+            if not exclusive and not os.path.isdir(directory):
+                yield  # nothing stored yet, nothing to read
+                return
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, LOCK_FILE), 'a') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                self._held[key] = 1
+                try:
+                    yield
+                finally:
+                    self._held.pop(key, None)
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _stamp(self, path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        # index.json is swapped in with os.replace, so any write changes the inode
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _entry(self, key: str) -> Dict:
+        path = self._path(key, INDEX_FILE)
+        stamp = self._stamp(path)
+        entry = self._index.get(key)
+        if entry is None or stamp != self._index_stamp.get(key):
+            entry = {'rows': 0, 'first_day': None, 'last_day': None, 'last_checked': 0}
+            if stamp is not None:
+                try:
+                    with open(path, 'r') as f:
+                        entry.update(json.load(f))
+                except (OSError, ValueError) as e:
+                    logger.error(f"Corrupt OHLCV index for {key}, ignoring: {str(e)}")
+            self._index[key] = entry
+            self._index_stamp[key] = stamp
+        return entry
+
+    def _save_entry(self, key: str, entry: Dict):
+        path = self._path(key, INDEX_FILE)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        self._index[key] = entry
+        self._index_stamp[key] = self._stamp(path)
+
+    def symbols(self) -> List[str]:
+        """Keys of all symbols with stored bars"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.exists(self._path(name, INDEX_FILE)))
+
+    def info(self, symbol: str) -> Dict:
+        with self._lock:
+            return dict(self._entry(store_key(symbol)))
+
+    def last_date(self, symbol: str) -> Optional[pd.Timestamp]:
+        last_day = self.info(symbol).get('last_day')
+        return None if last_day is None else pd.Timestamp(np.datetime64(last_day, 'D'))
+
+    def is_stale(self, symbol: str) -> bool:
+        return time.time() - self.info(symbol).get('last_checked', 0) > self.refresh_interval
+
+    # Writes
+
+    def _normalize(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Daily bars indexed by int64 day, one row per day, sorted"""
+        dates = data['Date'] if 'Date' in data.columns else data.index
+        frame = pd.DataFrame({col: pd.to_numeric(data[col], errors='coerce').to_numpy(dtype=float)
+                              for col in PRICE_COLUMNS if col in data.columns})
+        frame.index = _to_days(dates)
+        for col in PRICE_COLUMNS:
+            if col not in frame.columns:
+                frame[col] = frame['Close'] if col != 'Volume' else 0.0
+        frame = frame.dropna(subset=['Close'])
+        frame = frame[~frame.index.duplicated(keep='last')].sort_index()
+        return frame[list(PRICE_COLUMNS)]
+
+    def append(self, symbol: str, data: pd.DataFrame, ticker: Optional[str] = None) -> int:
+        """Append bars newer than the last stored date; returns the number of new bars"""
+        if data is None or data.empty:
+            return 0
+        key = store_key(symbol)
+        frame = self._normalize(data)
+
+        with self._locked(key, exclusive=True):
+            entry = dict(self._entry(key))
+            last_day = entry['last_day']
+            if last_day is not None:
+                frame = frame[frame.index >= last_day]
+            if frame.empty:
+                return 0
+
+            # A bar for the last stored date replaces it (e.g. yesterday's partial bar)
+            replace_last = last_day is not None and int(frame.index[0]) == last_day
+            keep = entry['rows'] - 1 if replace_last else entry['rows']
+            self._write(key, entry, frame, keep, ticker)
+
+        added = len(frame) - (1 if replace_last else 0)
+        telemetry.increment('ohlcv_store.bars_appended', added)
+        return added
+
+    def replace(self, symbol: str, data: pd.DataFrame, ticker: Optional[str] = None) -> int:
+        """Rewrite a symbol's history wholesale (e.g. a longer backfill than what is stored)"""
+        key = store_key(symbol)
+        frame = self._normalize(data) if data is not None and not data.empty else None
+        if frame is None or frame.empty:
+            return 0
+        with self._locked(key, exclusive=True):
+            self._write(key, dict(self._entry(key)), frame, 0, ticker)
+        telemetry.increment('ohlcv_store.bars_appended', len(frame))
+        return len(frame)
+
+    def _write(self, key: str, entry: Dict, frame: pd.DataFrame, keep: int, ticker: Optional[str]):
+        """Commit the first `keep` stored rows followed by `frame`; caller holds the exclusive lock"""
+        rows, gen = entry['rows'], entry.get('gen', 0)
+        columns = {'Date': frame.index.to_numpy(dtype='<i8')}
+        columns.update({col: frame[col].to_numpy(dtype='<f8') for col in PRICE_COLUMNS})
+
+        if keep == rows:
+            # Plain append past the committed rows; only an uncommitted tail gets dropped
+            new_gen = gen
+            for col in COLUMN_FILES:
+                path = self._column_path(key, col, gen)
+                with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+                    f.truncate(rows * ITEM_SIZE)
+                    f.seek(rows * ITEM_SIZE)
+                    f.write(columns[col].tobytes())
+        else:
+            # Committed bytes change: stage a new generation and let the index switch to it
+            new_gen = gen + 1
+            for col in COLUMN_FILES:
+                head = b''
+                if keep:
+                    with open(self._column_path(key, col, gen), 'rb') as f:
+                        head = f.read(keep * ITEM_SIZE)
+                with open(self._column_path(key, col, new_gen), 'wb') as f:
+                    f.write(head)
+                    f.write(columns[col].tobytes())
+
+        entry.update({
+            'rows': keep + len(frame),
+            'first_day': entry['first_day'] if keep and entry['first_day'] is not None else int(frame.index[0]),
+            'last_day': int(frame.index[-1]),
+            'gen': new_gen,
+            'updated': time.time(),
+        })
+        if ticker:
+            entry['ticker'] = ticker
+        self._save_entry(key, entry)
+
+        if new_gen != gen:
+            for col in COLUMN_FILES:
+                try:
+                    os.remove(self._column_path(key, col, gen))
+                except OSError:
+                    pass
+
+    def _mark_checked(self, symbol: str, ticker: Optional[str] = None):
+        key = store_key(symbol)
+        with self._locked(key, exclusive=True):
+            entry = dict(self._entry(key))
+            entry['last_checked'] = time.time()
+            if ticker:
+                entry['ticker'] = ticker
+            self._save_entry(key, entry)
+
+    # Reads
+
+    def read(self, symbol: str, start=None, end=None, last_n: Optional[int] = None) -> pd.DataFrame:
+        """Stored bars between start and end (inclusive) as an OHLCV DataFrame with a Date index"""
+        key = store_key(symbol)
+        with self._locked(key):
+            entry = self._entry(key)
+            rows, gen = entry['rows'], entry.get('gen', 0)
+            if not rows:
+                return pd.DataFrame(columns=list(PRICE_COLUMNS),
+                                    index=pd.DatetimeIndex([], name='Date'))
+
+            days = np.memmap(self._column_path(key, 'Date', gen), dtype='<i8', mode='r', shape=(rows,))
+            lo = 0 if start is None else int(np.searchsorted(days, _day(start), side='left'))
+            hi = rows if end is None else int(np.searchsorted(days, _day(end), side='right'))
+            if last_n is not None:
+                lo = max(lo, hi - last_n)
+
+            # Copied out before the shared lock is released
+            data = {
+                col: np.array(np.memmap(self._column_path(key, col, gen), dtype='<f8',
+                                        mode='r', shape=(rows,))[lo:hi])
+                for col in PRICE_COLUMNS
+            }
+            index = pd.DatetimeIndex(np.array(days[lo:hi]).astype('datetime64[D]').astype('datetime64[ns]'),
+                                     name='Date')
+        return pd.DataFrame(data, index=index)
+
+    def get_history(self, symbol: str, period: str = '1y', refresh: bool = True) -> pd.DataFrame:
+        """History for a yfinance-style period, topping up missing bars first"""
+        if refresh:
+            self.refresh([symbol])
+        return self.read(symbol, start=period_start(period))
+
+    # Network refresh
+
+    def refresh(self, symbols: Iterable[str], force: bool = False) -> Dict[str, int]:
+        """Download only the missing bars for stale symbols; one multi-ticker request per start date"""
+        due = [symbol for symbol in dict.fromkeys(symbols) if force or self.is_stale(symbol)]
+        if not due:
+            return {}
+
+        start_time = time.time()
+        groups: Dict[Optional[pd.Timestamp], List[str]] = {}
+        for symbol in due:
+            groups.setdefault(self.last_date(symbol), []).append(symbol)
+
+        added = {}
+        for last_date, group in groups.items():
+            tickers = [self.info(symbol).get('ticker') or default_ticker(symbol) for symbol in group]
+            if last_date is None:
+                window = {'period': self.bootstrap_period}
+            else:
+                window = {'start': last_date.strftime('%Y-%m-%d')}
+            try:
+                with track_upstream('yahoo'):
+                    data = yf.download(tickers, interval='1d', group_by='ticker', auto_adjust=True,
+                                       threads=True, progress=False, **window)
+            except Exception as e:
+                logger.error(f"OHLCV refresh failed for {len(group)} symbols: {str(e)}")
+                telemetry.increment('ohlcv_store.refresh_errors')
+                continue
+
+            for symbol, ticker in zip(group, tickers):
+                frame = extract_ticker_frame(data, ticker)
+                if frame is not None:
+                    added[symbol] = self.append(symbol, frame, ticker=ticker)
+                self._mark_checked(symbol, ticker)
+
+        telemetry.record_histogram('ohlcv_store.refresh_sec', time.time() - start_time)
+        logger.info(f"OHLCV store refreshed {len(due)} symbols, {sum(added.values())} new bars")
+        return added
+
+    # Bulk import
+
+    def import_csv(self, symbol: str, path: str) -> int:
+        """Load a historical CSV (Date, Open, High, Low, Close, Volume) into the store"""
+        data = pd.read_csv(path)
+        if 'Date' not in data.columns or 'Close' not in data.columns:
+            logger.warning(f"Skipping {path}: missing Date/Close columns")
+            return 0
+        return self.append(symbol, data)
+
+    def import_csv_dir(self, directory: str, overwrite: bool = False) -> Dict[str, int]:
+        """One-off import of a directory of per-symbol CSVs; symbols already stored are skipped"""
+        imported = {}
+        if not os.path.isdir(directory):
+            return imported
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith('.csv'):
+                continue
+            symbol = filename[:-4]
+            if not overwrite and self.info(symbol)['rows']:
+                continue
+            try:
+                imported[symbol] = self.import_csv(symbol, os.path.join(directory, filename))
+            except Exception as e:
+                logger.error(f"Error importing {filename} into OHLCV store: {str(e)}")
+        logger.info(f"Imported {len(imported)} CSVs into OHLCV store")
+        return imported
+
+
+# Global instance
+ohlcv_store = OHLCVStore()
@@ -0,0 +1,209 @@
+"""
+Quote Snapshot Service
+
+In-process table of the latest quote per watched symbol, kept fresh by a
+background poller so request handlers never wait on upstream fetches:
+1. Handlers call get()/get_many(): an O(1) dict lookup that also marks the
+   symbol as watched
+2. The poller refreshes every watched symbol with two multi-ticker downloads
+   per cycle (intraday last price + daily previous close)
+3. Each quote carries a version stamp, its age and a stale flag; symbols not
+   read for QUOTE_WATCH_TTL_SEC drop off the watch list
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.common_repository.config.runtime import (
+    QUOTE_POLL_INTERVAL_SEC, QUOTE_CLOSED_POLL_INTERVAL_SEC, QUOTE_STALE_AFTER_SEC,
+    QUOTE_WATCH_TTL_SEC, QUOTE_WATCHLIST, is_market_hours_now
+)
+from src.common_repository.utils.lazy_import import lazy_import
+from src.common_repository.utils.network import host_rate_limiter, track_upstream
+from src.common_repository.utils.telemetry import telemetry
+from src.data.ohlcv_store import default_ticker, extract_ticker_frame
+
+yf = lazy_import('yfinance')
+
+logger = logging.getLogger(__name__)
+
+YAHOO_HOST = 'query1.finance.yahoo.com'
+
+
+class QuoteSnapshotService:
+    """Latest quote per symbol, refreshed off the request path"""
+
+    def __init__(self, poll_interval: float = QUOTE_POLL_INTERVAL_SEC,
+                 closed_poll_interval: float = QUOTE_CLOSED_POLL_INTERVAL_SEC,
+                 stale_after: float = QUOTE_STALE_AFTER_SEC, watch_ttl: float = QUOTE_WATCH_TTL_SEC,
+                 watchlist: Optional[Iterable[str]] = None, autostart: bool = True):
+        self.poll_interval = poll_interval
+        self.closed_poll_interval = closed_poll_interval
+        self.stale_after = stale_after
+        self.watch_ttl = watch_ttl
+        self.autostart = autostart
+        self._quotes: Dict[str, Dict[str, Any]] = {}
+        self._watched: Dict[str, float] = {}  # symbol -> last read time
+        self._pinned = {s.upper() for s in (watchlist if watchlist is not None else QUOTE_WATCHLIST)}
+        self._version = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # Reads (request path)
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Latest quote with version, age_sec and stale; None until the first poll lands"""
+        return self.get_many([symbol]).get(symbol.upper())
+
+    def get_many(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        symbols = [s.upper() for s in symbols]
+        now = time.time()
+        stale_after = self._stale_after()
+        result, new = {}, False
+        with self._lock:
+            for symbol in symbols:
+                new |= symbol not in self._watched
+                self._watched[symbol] = now
+                quote = self._quotes.get(symbol)
+                if quote is not None:
+                    age = now - quote['updated_at']
+                    result[symbol] = {**quote, 'age_sec': round(age, 1), 'stale': age > stale_after}
+        if new:
+            self._ensure_running()
+            self._wake.set()
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            ages = [time.time() - q['updated_at'] for q in self._quotes.values()]
+            return {
+                'running': self.is_running(),
+                'watched': len(self._watched) + len(self._pinned - set(self._watched)),
+                'quotes': len(self._quotes),
+                'version': self._version,
+                'max_age_sec': round(max(ages), 1) if ages else None,
+                'stale_after_sec': self._stale_after(),
+            }
+
+    # Poller
+
+    def start(self):
+        with self._lock:
+            if self.is_running():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='quote-snapshot', daemon=True)
+            self._thread.start()
+        logger.info("Quote snapshot poller started")
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _ensure_running(self):
+        if self.autostart and not self.is_running():
+            self.start()
+
+    def _interval(self) -> float:
+        return self.poll_interval if is_market_hours_now() else self.closed_poll_interval
+
+    def _stale_after(self) -> float:
+        return max(self.stale_after, 2 * self._interval())
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Quote snapshot refresh failed: {e}")
+            self._wake.wait(self._interval())
+            self._wake.clear()
+
+    def watched_symbols(self) -> List[str]:
+        """Pinned symbols plus those read within the watch TTL (expired ones are dropped)"""
+        cutoff = time.time() - self.watch_ttl
+        with self._lock:
+            for symbol in [s for s, last_read in self._watched.items() if last_read < cutoff]:
+                del self._watched[symbol]
+                self._quotes.pop(symbol, None)
+            return sorted(self._pinned | set(self._watched))
+
+    def refresh(self, symbols: Optional[Iterable[str]] = None) -> int:
+        """Fetch quotes for the watched (or given) symbols and publish them; returns quotes updated"""
+        symbols = [s.upper() for s in symbols] if symbols is not None else self.watched_symbols()
+        if not symbols:
+            return 0
+        start_time = time.time()
+        quotes = self._fetch_quotes(symbols)
+        with self._lock:
+            for symbol, quote in quotes.items():
+                self._version += 1
+                self._quotes[symbol] = {**quote, 'version': self._version}
+        telemetry.record_histogram('quotes.refresh_sec', time.time() - start_time)
+        telemetry.set_gauge('quotes.watched', len(symbols))
+        if len(quotes) < len(symbols):
+            telemetry.increment('quotes.missing', len(symbols) - len(quotes))
+        return len(quotes)
+
+    def _fetch_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Last intraday price and previous daily close from two multi-ticker downloads"""
+        tickers = [default_ticker(symbol) for symbol in symbols]
+        downloads = {}
+        for name, window in (('daily', {'period': '5d', 'interval': '1d'}),
+                             ('intraday', {'period': '1d', 'interval': '5m'})):
+            if not host_rate_limiter.acquire(YAHOO_HOST, timeout=30):
+                logger.warning(f"Rate limit slot unavailable for {len(symbols)} quotes")
+                return {}
+            try:
+                with track_upstream('yahoo'):
+                    downloads[name] = yf.download(tickers, group_by='ticker', auto_adjust=True,
+                                                  threads=True, progress=False, **window)
+            except Exception as e:
+                logger.warning(f"Quote download ({name}) failed for {len(symbols)} symbols: {e}")
+                downloads[name] = None
+
+        now = time.time()
+        today = datetime.now().date()
+        quotes = {}
+        for symbol, ticker in zip(symbols, tickers):
+            daily = extract_ticker_frame(downloads['daily'], ticker)
+            intraday = extract_ticker_frame(downloads['intraday'], ticker)
+            if daily is None and intraday is None:
+                continue
+            closes = daily['Close'] if daily is not None else None
+            current_price = float((intraday if intraday is not None else daily)['Close'].iloc[-1])
+            if closes is None:
+                previous_close = current_price
+            elif closes.index[-1].date() >= today and len(closes) > 1:
+                previous_close = float(closes.iloc[-2])
+            else:
+                previous_close = float(closes.iloc[-1])
+            change = current_price - previous_close
+            quotes[symbol] = {
+                'symbol': symbol,
+                'current_price': current_price,
+                'previous_close': previous_close,
+                'change': change,
+                'change_percent': (change / previous_close * 100) if previous_close else 0.0,
+                'is_realtime': intraday is not None,
+                'timestamp': datetime.fromtimestamp(now).isoformat(),
+                'updated_at': now,
+                'source': 'snapshot',
+                'ticker_used': ticker,
+            }
+        return quotes
+
+
+# Global instance
+quote_snapshot = QuoteSnapshotService()
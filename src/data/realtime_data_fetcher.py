@@ -6,7 +6,6 @@ Implements comprehensive real-time data collection from multiple sources
 
 import asyncio
 import aiohttp
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -14,13 +13,16 @@ import logging
 import json
 import time
 from typing import Dict, List, Any, Optional
-import requests
-from bs4 import BeautifulSoup
 import concurrent.futures
 import threading
 from dataclasses import dataclass
 import random # Import the random module
 
+from src.common_repository.utils.http_transport import http_transport
+from src.common_repository.utils.lazy_import import lazy_import
+
+yf = lazy_import('yfinance')
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -41,8 +43,7 @@ class RealTimeDataFetcher:
     """Comprehensive real-time data fetcher with multiple sources"""
 
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = http_transport.client({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': 'application/json',
             'Accept-Language': 'en-US,en;q=0.9',
@@ -129,7 +130,7 @@ class RealTimeDataFetcher:
                 'Referer': 'https://www.nseindia.com/'
             }
 
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.session.get(url, headers=headers, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -32,7 +32,7 @@ def list_equities():
     start_time = time.time()
     
     try:
-        from src.data.realtime_data_fetcher import get_multiple_realtime_prices
+        from src.data.quote_snapshot import quote_snapshot
 
         # Get query parameters for filtering
         sector = request.args.get("sector", "")
@@ -58,15 +58,9 @@ def list_equities():
             {"symbol": "TATASTEEL", "name": "Tata Steel", "sector": "Materials"}
         ]
 
-        # Get real-time prices
+        # Read latest quotes from the snapshot table (the background poller does the fetching)
         symbols = [stock["symbol"] for stock in major_stocks[:limit]]
-        try:
-            logger.info(f"🔄 Fetching real-time data for equities API: {symbols}")
-            realtime_data = get_multiple_realtime_prices(symbols)
-            logger.info(f"✅ Got real-time data for {len(realtime_data)} symbols")
-        except Exception as e:
-            logger.error(f"Error fetching real-time equity data: {e}")
-            realtime_data = {}
+        realtime_data = quote_snapshot.get_many(symbols)
 
         # Generate equity data with real prices
         equities = []
@@ -82,7 +76,7 @@ def list_equities():
             if price_data and price_data.get('current_price'):
                 current_price = float(price_data.get('current_price'))
                 change_percent = float(price_data.get('change_percent', 0))
-                is_realtime = True
+                is_realtime = not price_data.get('stale', False)
                 data_source = price_data.get('source', 'realtime')
             else:
                 # Fallback only if no real-time data
@@ -114,6 +108,8 @@ def list_equities():
                 "moving_avg_200": round(current_price * random.uniform(0.90, 1.10), 2),
                 "is_realtime": is_realtime,
                 "data_source": data_source,
+                "quote_age_sec": price_data.get('age_sec'),
+                "quote_version": price_data.get('version'),
                 "updated": now_iso()
             }
 
@@ -129,7 +125,8 @@ def list_equities():
                 "sector": sector,
                 "timeframe": timeframe,
                 "limit": limit
-            }
+            },
+            "quotes": quote_snapshot.status()
         })
 
     except Exception as e:
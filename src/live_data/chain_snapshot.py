@@ -0,0 +1,250 @@
+"""
+Option-Chain Snapshots
+One fetch per underlying per refresh, with every expiry stored column-wise:
+1. ExpirySlice holds a (fields x strikes) float64 block sorted by strike;
+   each field is a contiguous row view, and strike_range() / column() are
+   basic slices (views, never copies)
+2. ChainSnapshot is the spot plus one ExpirySlice per ISO expiry, parsed
+   from a single option-chain payload
+3. ChainSnapshotStore keeps the latest snapshot per underlying, reloads
+   stale ones on read and refreshes every tracked underlying in one batch;
+   an underlying is tracked once it has loaded, and one requested on demand
+   is dropped after OPTION_CHAIN_MAX_FAILURES failed refreshes in a row
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.common_repository.config.runtime import (
+    OPTION_CHAIN_MAX_FAILURES, OPTION_CHAIN_TTL_SEC, OPTION_CHAIN_UNDERLYINGS
+)
+from src.common_repository.utils.telemetry import telemetry
+from .provider import Chain, LiveDataError, OptionQuote
+
+logger = logging.getLogger(__name__)
+
+SIDE_FIELDS = ('iv', 'bid', 'ask', 'oi', 'delta', 'theta')
+FIELDS = ('strike',) + tuple(f'{side}_{field}' for side in ('ce', 'pe') for field in SIDE_FIELDS)
+_ROW = {name: index for index, name in enumerate(FIELDS)}
+
+# NSE payload keys for each side field
+_NSE_KEYS = {
+    'iv': 'impliedVolatility',
+    'bid': 'bidprice',
+    'ask': 'askPrice',
+    'oi': 'openInterest',
+    'delta': 'delta',
+    'theta': 'theta',
+}
+
+
+class ExpirySlice:
+    """Strike-sorted columns for one expiry; a missing CE/PE side is NaN"""
+
+    __slots__ = ('columns',)
+
+    def __init__(self, columns: np.ndarray):
+        self.columns = columns
+
+    @property
+    def strikes(self) -> np.ndarray:
+        return self.columns[0]
+
+    def column(self, name: str) -> np.ndarray:
+        """One field ('ce_iv', 'pe_oi', ...) as a view"""
+        return self.columns[_ROW[name]]
+
+    def __len__(self) -> int:
+        return self.columns.shape[1]
+
+    @property
+    def step(self) -> float:
+        strikes = self.strikes
+        return float(np.diff(strikes).min()) if len(strikes) > 1 else 100.0
+
+    def index_of(self, strike: float) -> Optional[int]:
+        """Position of an exact strike, via binary search on the strike index"""
+        position = int(np.searchsorted(self.strikes, strike))
+        if position < len(self) and self.strikes[position] == strike:
+            return position
+        return None
+
+    def strike_range(self, low: float, high: float) -> 'ExpirySlice':
+        """Strikes within [low, high], sharing memory with this slice"""
+        start = int(np.searchsorted(self.strikes, low, side='left'))
+        stop = int(np.searchsorted(self.strikes, high, side='right'))
+        return ExpirySlice(self.columns[:, start:stop])
+
+    def quotes(self, side: str) -> List[OptionQuote]:
+        """OptionQuote objects for one side ('ce' or 'pe'), for callers of the list API"""
+        present = ~np.isnan(self.column(f'{side}_iv'))
+        rows = self.columns[:, present]
+        kind = 'call' if side == 'ce' else 'put'
+        return [OptionQuote(strike=float(rows[0, i]), iv=float(rows[_ROW[f'{side}_iv'], i]),
+                            delta=float(rows[_ROW[f'{side}_delta'], i]),
+                            theta=float(rows[_ROW[f'{side}_theta'], i]),
+                            bid=float(rows[_ROW[f'{side}_bid'], i]), ask=float(rows[_ROW[f'{side}_ask'], i]),
+                            type=kind)
+                for i in range(rows.shape[1])]
+
+
+class ChainSnapshot:
+    """Every expiry of one underlying from a single fetch"""
+
+    __slots__ = ('symbol', 'spot', 'fetched_at', 'expiries')
+
+    def __init__(self, symbol: str, spot: float, expiries: Dict[str, ExpirySlice],
+                 fetched_at: Optional[float] = None):
+        self.symbol = symbol
+        self.spot = spot
+        self.expiries = expiries
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    def expiry_dates(self) -> List[str]:
+        return sorted(self.expiries)
+
+    def expiry(self, expiry: str) -> ExpirySlice:
+        try:
+            return self.expiries[expiry]
+        except KeyError:
+            raise LiveDataError(f"No {expiry} expiry in {self.symbol} chain")
+
+    def to_chain(self, expiry: str) -> Chain:
+        """Legacy Chain (lists of OptionQuote) for one expiry"""
+        expiry_slice = self.expiry(expiry)
+        calls, puts = expiry_slice.quotes('ce'), expiry_slice.quotes('pe')
+        if not calls or not puts:
+            raise LiveDataError(f"Insufficient option data for {self.symbol} {expiry}")
+        return Chain(symbol=self.symbol, spot=self.spot, expiry=expiry, step=expiry_slice.step,
+                     calls=calls, puts=puts)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(expiry_slice.columns.nbytes for expiry_slice in self.expiries.values())
+
+
+def _side_values(side: Optional[Dict]) -> List[float]:
+    if side is None:
+        return [np.nan] * len(SIDE_FIELDS)
+    return [float(side.get(_NSE_KEYS[field]) or 0.0) for field in SIDE_FIELDS]
+
+
+def parse_nse_chain(symbol: str, payload: Dict) -> ChainSnapshot:
+    """NSE option-chain JSON -> ChainSnapshot covering every expiry in the payload"""
+    records = payload.get('records') if payload else None
+    if not records or 'data' not in records:
+        raise LiveDataError(f"No chain data for {symbol}")
+
+    rows: Dict[str, List[List[float]]] = {}
+    iso_dates: Dict[str, Optional[str]] = {}
+    for record in records['data']:
+        raw_expiry = record.get('expiryDate')
+        if raw_expiry not in iso_dates:
+            try:
+                iso_dates[raw_expiry] = datetime.strptime(raw_expiry, "%d-%b-%Y").strftime("%Y-%m-%d")
+            except (TypeError, ValueError):
+                iso_dates[raw_expiry] = None
+        expiry = iso_dates[raw_expiry]
+        if expiry is None:
+            continue
+        rows.setdefault(expiry, []).append(
+            [float(record['strikePrice'])] + _side_values(record.get('CE')) + _side_values(record.get('PE')))
+
+    expiries = {}
+    for expiry, values in rows.items():
+        block = np.array(values, dtype=np.float64)
+        block = block[np.argsort(block[:, 0], kind='stable')]
+        expiries[expiry] = ExpirySlice(np.ascontiguousarray(block.T))
+    return ChainSnapshot(symbol, float(records.get('underlyingValue') or 0.0), expiries)
+
+
+class ChainSnapshotStore:
+    """Latest snapshot per underlying; `loader(symbols)` fetches and parses a batch"""
+
+    def __init__(self, loader: Callable[[List[str]], Dict[str, ChainSnapshot]],
+                 ttl: float = OPTION_CHAIN_TTL_SEC, underlyings: Iterable[str] = OPTION_CHAIN_UNDERLYINGS,
+                 max_failures: int = OPTION_CHAIN_MAX_FAILURES):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_failures = max_failures
+        self.pinned = set(underlyings)  # configured underlyings stay tracked through failures
+        self.tracked = set(self.pinned)
+        self._failures: Dict[str, int] = {}
+        self._snapshots: Dict[str, ChainSnapshot] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _fresh(self, symbol: str) -> Optional[ChainSnapshot]:
+        snapshot = self._snapshots.get(symbol)
+        if snapshot is not None and time.time() - snapshot.fetched_at < self.ttl:
+            return snapshot
+        return None
+
+    def get(self, symbol: str) -> ChainSnapshot:
+        """Current snapshot, loading it once even with concurrent readers"""
+        snapshot = self._fresh(symbol)
+        if snapshot is not None:
+            return snapshot
+        with self._symbol_lock(symbol):
+            snapshot = self._fresh(symbol)
+            if snapshot is None:
+                loaded = self.loader([symbol])
+                if symbol not in loaded:
+                    raise LiveDataError(f"Failed to load option chain for {symbol}")
+                self._store(loaded)
+                snapshot = loaded[symbol]
+        return snapshot
+
+    def _store(self, snapshots: Dict[str, ChainSnapshot]):
+        with self._lock:
+            self._snapshots.update(snapshots)
+            self.tracked.update(snapshots)
+            for symbol in snapshots:
+                self._failures.pop(symbol, None)
+            total = sum(snapshot.nbytes for snapshot in self._snapshots.values())
+        telemetry.set_gauge('options.snapshot_bytes', total)
+        telemetry.set_gauge('options.snapshot_underlyings', len(self._snapshots))
+
+    def refresh(self, symbols: Optional[Iterable[str]] = None) -> int:
+        """Reload every tracked underlying (or `symbols`) in one batch; returns how many loaded"""
+        with self._lock:
+            symbols = sorted(set(symbols) if symbols is not None else self.tracked)
+        if not symbols:
+            return 0
+        start = time.perf_counter()
+        loaded = self.loader(symbols)
+        self._store(loaded)
+        telemetry.record_histogram('options.snapshot_refresh_ms', (time.perf_counter() - start) * 1000)
+        if len(loaded) < len(symbols):
+            logger.warning(f"Option chain refresh loaded {len(loaded)}/{len(symbols)} underlyings")
+            self._record_failures([symbol for symbol in symbols if symbol not in loaded])
+        return len(loaded)
+
+    def _record_failures(self, symbols: List[str]):
+        """Stop refreshing on-demand underlyings that keep failing; a later get() re-tracks them"""
+        with self._lock:
+            for symbol in symbols:
+                if symbol in self.pinned or symbol not in self.tracked:
+                    continue
+                failures = self._failures[symbol] = self._failures.get(symbol, 0) + 1
+                if failures >= self.max_failures:
+                    self.tracked.discard(symbol)
+                    del self._failures[symbol]
+                    logger.warning(f"Option chain for {symbol} failed {failures} refreshes in a row, no longer tracked")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshots = dict(self._snapshots)
+        now = time.time()
+        return {symbol: {'expiries': len(snapshot.expiries), 'bytes': snapshot.nbytes,
+                         'age_sec': round(now - snapshot.fetched_at, 1)}
+                for symbol, snapshot in snapshots.items()}
@@ -1,9 +1,10 @@
-import requests
 import time
 import json
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Any, Optional
 from .provider import LiveProvider, Chain, OptionQuote, LiveDataError, cache
+from .chain_snapshot import ChainSnapshot, ChainSnapshotStore, parse_nse_chain
+from src.common_repository.utils.http_transport import http_transport
 
 # Placeholder for logger, as it's used in the changes but not defined in original code
 class MockLogger:
@@ -11,14 +12,18 @@ class MockLogger:
         print(f"ERROR: {message}")
 logger = MockLogger()
 
+# Underlyings served by the option-chain-indices endpoint (everything else is an equity)
+INDEX_UNDERLYINGS = {'NIFTY', 'BANKNIFTY', 'FINNIFTY', 'MIDCPNIFTY', 'NIFTYNXT50'}
+
 
 class NSEProvider(LiveProvider):
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+    def __init__(self, snapshots: Optional[ChainSnapshotStore] = None):
+        self.session = http_transport.client({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         self.base_url = "https://www.nseindia.com/api"
+        # Shared by every provider, so each underlying is fetched once per refresh
+        self.snapshots = snapshots or chain_snapshots
 
     def _make_request(self, url: str) -> Dict[str, Any]:
         """Make request with error handling"""
@@ -48,109 +53,40 @@ class NSEProvider(LiveProvider):
         except Exception as e:
             raise LiveDataError(f"Failed to get spot for {symbol}: {str(e)}")
 
-    def get_expiries(self, symbol: str) -> List[str]:
-        cache_key = f"expiries_{symbol}"
-        cached = cache.get(cache_key)
-        if cached:
-            return cached
+    def chain_url(self, symbol: str) -> str:
+        kind = 'indices' if symbol.upper() in INDEX_UNDERLYINGS else 'equities'
+        return f"{self.base_url}/option-chain-{kind}?symbol={symbol}"
+
+    def load_snapshots(self, symbols: List[str]) -> Dict[str, ChainSnapshot]:
+        """Fetch each underlying's full chain once (concurrently) and parse every expiry"""
+        urls = {symbol: self.chain_url(symbol) for symbol in symbols}
+        responses = self.session.fetch_many(urls.values(), timeout=10)
+        snapshots = {}
+        for symbol, url in urls.items():
+            response = responses.get(url)
+            try:
+                if response is None or response.status_code != 200:
+                    raise LiveDataError(f"HTTP {getattr(response, 'status_code', 'error')}")
+                snapshots[symbol] = parse_nse_chain(symbol, response.json())
+            except Exception as e:
+                logger.error(f"Failed to load option chain for {symbol}: {e}")
+        return snapshots
+
+    def get_snapshot(self, symbol: str) -> ChainSnapshot:
+        return self.snapshots.get(symbol)
 
+    def get_expiries(self, symbol: str) -> List[str]:
         try:
-            url = f"{self.base_url}/option-chain-indices?symbol={symbol}"
-            data = self._make_request(url)
-
-            if 'records' not in data or 'expiryDates' not in data['records']:
-                raise LiveDataError(f"No expiry data for {symbol}")
-
-            expiries = []
-            for exp_str in data['records']['expiryDates']:
-                try:
-                    # Convert DD-Mon-YYYY to YYYY-MM-DD
-                    exp_date = datetime.strptime(exp_str, "%d-%b-%Y")
-                    expiries.append(exp_date.strftime("%Y-%m-%d"))
-                except ValueError:
-                    continue
-
+            expiries = self.get_snapshot(symbol).expiry_dates()
             if not expiries:
                 raise LiveDataError(f"No valid expiries found for {symbol}")
-
-            cache.set(cache_key, expiries)
             return expiries
         except Exception as e:
             raise LiveDataError(f"Failed to get expiries for {symbol}: {str(e)}")
 
     def get_chain(self, symbol: str, expiry: str) -> Chain:
-        cache_key = f"chain_{symbol}_{expiry}"
-        cached = cache.get(cache_key)
-        if cached:
-            return cached
-
         try:
-            # Convert YYYY-MM-DD back to DD-Mon-YYYY for NSE API
-            exp_date = datetime.strptime(expiry, "%Y-%m-%d")
-            exp_str = exp_date.strftime("%d-%b-%Y")
-
-            url = f"{self.base_url}/option-chain-indices?symbol={symbol}"
-            data = self._make_request(url)
-
-            if 'records' not in data:
-                raise LiveDataError(f"No chain data for {symbol}")
-
-            spot = float(data['records']['underlyingValue'])
-
-            calls = []
-            puts = []
-
-            for record in data['records']['data']:
-                if record.get('expiryDate') != exp_str:
-                    continue
-
-                strike = float(record['strikePrice'])
-
-                # Process calls
-                if 'CE' in record:
-                    ce = record['CE']
-                    calls.append(OptionQuote(
-                        strike=strike,
-                        iv=float(ce.get('impliedVolatility', 0)) if ce.get('impliedVolatility') else 0.0,
-                        delta=float(ce.get('delta', 0)) if ce.get('delta') else 0.0,
-                        theta=float(ce.get('theta', 0)) if ce.get('theta') else 0.0,
-                        bid=float(ce.get('bidprice', 0)) if ce.get('bidprice') else 0.0,
-                        ask=float(ce.get('askPrice', 0)) if ce.get('askPrice') else 0.0,
-                        type="call"
-                    ))
-
-                # Process puts
-                if 'PE' in record:
-                    pe = record['PE']
-                    puts.append(OptionQuote(
-                        strike=strike,
-                        iv=float(pe.get('impliedVolatility', 0)) if pe.get('impliedVolatility') else 0.0,
-                        delta=float(pe.get('delta', 0)) if pe.get('delta') else 0.0,
-                        theta=float(pe.get('theta', 0)) if pe.get('theta') else 0.0,
-                        bid=float(pe.get('bidprice', 0)) if pe.get('bidprice') else 0.0,
-                        ask=float(pe.get('askPrice', 0)) if pe.get('askPrice') else 0.0,
-                        type="put"
-                    ))
-
-            if not calls or not puts:
-                raise LiveDataError(f"Insufficient option data for {symbol} {expiry}")
-
-            # Determine strike step
-            strikes = sorted([q.strike for q in calls])
-            step = min([strikes[i+1] - strikes[i] for i in range(len(strikes)-1)]) if len(strikes) > 1 else 100.0
-
-            chain = Chain(
-                symbol=symbol,
-                spot=spot,
-                expiry=expiry,
-                step=step,
-                calls=calls,
-                puts=puts
-            )
-
-            cache.set(cache_key, chain)
-            return chain
-
+            return self.get_snapshot(symbol).to_chain(expiry)
         except Exception as e:
             raise LiveDataError(f"Failed to get chain for {symbol} {expiry}: {str(e)}")
 
@@ -296,4 +232,8 @@ class NSEProvider(LiveProvider):
                 'HCLTECH': 1000.0,
                 'BAJFINANCE': 7000.0
             }
-            return {'ltp': mock_prices.get(symbol.upper(), 1000.0)}
\ No newline at end of file
+            return {'ltp': mock_prices.get(symbol.upper(), 1000.0)}
+
+
+# Global instance: the latest snapshot per underlying, loaded through a provider
+chain_snapshots = ChainSnapshotStore(lambda symbols: NSEProvider().load_snapshots(symbols))
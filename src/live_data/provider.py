@@ -1,7 +1,8 @@
 
 from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
-import time
+
+from src.common_repository.cache.tiered_cache import tiered_cache
 
 @dataclass
 class OptionQuote:
@@ -37,15 +38,14 @@ class LiveProvider:
 
 # 60s in-memory TTL cache (hard stop: no mock fallback)
 class TTL:
-    def __init__(self, secs=60): 
+    def __init__(self, secs=60, namespace="live_data"):
         self.secs = secs
-        self._c = {}
+        self._c = tiered_cache.namespace(namespace, ttl=secs)
     
     def get(self, k): 
-        v = self._c.get(k)
-        return None if not v or v[0] < time.time() else v[1]
+        return self._c.get(k)
     
     def set(self, k, val): 
-        self._c[k] = (time.time() + self.secs, val)
+        self._c.set(k, val, self.secs)
 
 cache = TTL(60)
@@ -8,17 +8,18 @@ over the past 30 days to validate model performance.
 import json
 import logging
 import pandas as pd
-import yfinance as yf
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import os
 
+from src.common_repository.storage.prediction_log import prediction_log
+from src.data.ohlcv_store import ohlcv_store
+
 logger = logging.getLogger(__name__)
 
 class BacktestingManager:
     def __init__(self):
         self.backtest_file = 'backtesting_results.json'
-        self.predictions_history_file = 'predictions_history.json'
         self.backtest_results = self.load_backtest_results()
         self.predictions_history = self.load_predictions_history()
 
@@ -42,24 +43,13 @@ class BacktestingManager:
             logger.error(f"Error saving backtest results: {str(e)}")
 
     def load_predictions_history(self) -> List[Dict]:
-        """Load predictions history"""
+        """Load predictions history (shared prediction log)"""
         try:
-            if os.path.exists(self.predictions_history_file):
-                with open(self.predictions_history_file, 'r') as f:
-                    return json.load(f)
-            return []
+            return prediction_log.load()
         except Exception as e:
             logger.error(f"Error loading predictions history: {str(e)}")
             return []
 
-    def save_predictions_history(self):
-        """Save predictions history to file"""
-        try:
-            with open(self.predictions_history_file, 'w') as f:
-                json.dump(self.predictions_history, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving predictions history: {str(e)}")
-
     def record_prediction(self, stock_data: Dict):
         """Record a prediction for future backtesting"""
         try:
@@ -74,34 +64,18 @@ class BacktestingManager:
                 'trend_class': stock_data.get('trend_class', 'sideways')
             }
 
-            # Record prediction (fix dict append error)
-            if not hasattr(self, 'predictions'):
-                self.predictions = []
-            elif isinstance(self.predictions, dict):
-                self.predictions = []  # Convert dict to list if needed
-
-            self.predictions.append(prediction_record)
-
-            # Keep only last 100 predictions to manage file size
-            if len(self.predictions) > 100:
-                self.predictions = self.predictions[-100:]
-
-            self.save_predictions_history()
+            # Appended to the shared log, which keeps the newest PREDICTION_LOG_MAX_RECORDS
+            prediction_log.append([prediction_record])
+            self.predictions_history.append(prediction_record)
 
         except Exception as e:
             logger.error(f"Error recording prediction: {str(e)}")
 
-    def get_actual_price_change(self, symbol: str, days_ago: int) -> Optional[float]:
+    def get_actual_price_change(self, symbol: str, days_ago: int, refresh: bool = True) -> Optional[float]:
         """Get actual price change for a symbol over specified days"""
         try:
-            ticker = f"{symbol}.NS"
-            stock = yf.Ticker(ticker)
-
-            # Get data for the period
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days_ago + 5)  # Extra buffer
-
-            hist_data = stock.history(start=start_date, end=end_date)
+            # Get data for the period from the local store (extra buffer for holidays)
+            hist_data = ohlcv_store.get_history(symbol, period=f"{days_ago + 5}d", refresh=refresh)
 
             if hist_data.empty or len(hist_data) < days_ago:
                 return None
@@ -134,7 +108,8 @@ class BacktestingManager:
 
             # Filter predictions from ~30 days ago (±3 days window)
             target_predictions = []
-            for prediction in self.predictions_history:
+            now = datetime.now()
+            for prediction in prediction_log.load(start=now - timedelta(days=34), end=now - timedelta(days=26)):
                 pred_date = datetime.fromisoformat(prediction['timestamp'])
                 days_diff = (datetime.now() - pred_date).days
 
@@ -146,6 +121,9 @@ class BacktestingManager:
             accurate_count = 0
             total_count = len(target_predictions)
 
+            # Top up every symbol's bars in one batched download before the per-prediction reads
+            ohlcv_store.refresh({prediction['symbol'] for prediction in target_predictions})
+
             for prediction in target_predictions:
                 symbol = prediction['symbol']
                 predicted_change = prediction['predicted_1mo']
@@ -153,7 +131,7 @@ class BacktestingManager:
                 days_ago = (datetime.now() - pred_date).days
 
                 # Get actual price change
-                actual_change = self.get_actual_price_change(symbol, days_ago)
+                actual_change = self.get_actual_price_change(symbol, days_ago, refresh=False)
 
                 if actual_change is not None:
                     # Consider prediction accurate if direction matches and magnitude is reasonable
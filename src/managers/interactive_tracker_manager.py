@@ -10,9 +10,14 @@ import json
 import os
 import logging
 from datetime import datetime, timedelta
-import yfinance as yf
 import pytz
 
+from src.common_repository.storage.record_store import record_store
+from src.data.ohlcv_store import ohlcv_store
+from src.common_repository.utils.lazy_import import lazy_import
+
+yf = lazy_import('yfinance')
+
 logger = logging.getLogger(__name__)
 IST = pytz.timezone('Asia/Kolkata')
 
@@ -23,65 +28,23 @@ predictionData = {}
 class InteractiveTrackerManager:
     def __init__(self):
         self.data_file = 'interactive_tracking.json'
+        self.collection = 'interactive_tracking'
+        self.store = record_store
         self.tracking_data = {}
         self.load_tracking_data()
 
     def load_tracking_data(self):
         """Load existing tracking data and merge with current stocks"""
+        global predictionData
         try:
-            # Load existing tracking data
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if content:
-                        try:
-                            parsed_data = json.loads(content)
-                            # Validate that it's a dictionary
-                            if isinstance(parsed_data, dict):
-                                self.tracking_data = parsed_data
-                                logger.info(f"Loaded existing tracking data for {len(self.tracking_data)} stocks")
-                                # Populate global predictionData from loaded tracking_data
-                                global predictionData
-                                predictionData = self.tracking_data.copy()
-                            else:
-                                logger.warning("Invalid tracking data format, initializing empty")
-                                self.tracking_data = {}
-                                predictionData = {}
-                        except json.JSONDecodeError as e:
-                            logger.error(f"JSON decode error in tracking data: {str(e)}")
-                            # Try to recover from backup or initialize empty
-                            backup_file = f"{self.data_file}.backup"
-                            if os.path.exists(backup_file):
-                                logger.info("Attempting to restore from backup")
-                                try:
-                                    with open(backup_file, 'r', encoding='utf-8') as bf:
-                                        backup_content = bf.read().strip()
-                                        if backup_content:
-                                            restored_data = json.loads(backup_content)
-                                            if isinstance(restored_data, dict):
-                                                self.tracking_data = restored_data
-                                                predictionData = self.tracking_data.copy()
-                                                logger.info("Successfully restored from backup")
-                                            else:
-                                                logger.warning("Backup data invalid, initializing empty")
-                                                self.tracking_data = {}
-                                                predictionData = {}
-                                        else:
-                                            self.tracking_data = {}
-                                            predictionData = {}
-                                except Exception as backup_restore_error:
-                                    logger.warning(f"Backup restoration failed: {str(backup_restore_error)}, initializing empty")
-                                    self.tracking_data = {}
-                                    predictionData = {}
-                            else:
-                                self.tracking_data = {}
-                                predictionData = {}
-                    else:
-                        self.tracking_data = {}
-                        predictionData = {}
+            if self.store.exists(self.collection):
+                self.tracking_data = self.store.load(self.collection, {})
+                logger.info(f"Loaded existing tracking data for {len(self.tracking_data)} stocks")
             else:
-                self.tracking_data = {}
-                predictionData = {}
+                # First run against the record store: import the legacy JSON file once
+                self.tracking_data = self._load_legacy_file()
+                self.store.save(self.collection, self.tracking_data)
+            predictionData = self.tracking_data.copy()
 
             # Always ensure current top stocks are tracked
             self._ensure_current_stocks_tracked()
@@ -94,6 +57,30 @@ class InteractiveTrackerManager:
             predictionData = {}
             return {}
 
+    def _load_legacy_file(self):
+        """Read the pre-record-store JSON file, falling back to its backup"""
+        for path in (self.data_file, f"{self.data_file}.backup"):
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    content = f.read().strip()
+                if not content:
+                    return {}
+                parsed_data = json.loads(content)
+                # Validate that it's a dictionary
+                if isinstance(parsed_data, dict):
+                    logger.info(f"Loaded legacy tracking data for {len(parsed_data)} stocks from {path}")
+                    return parsed_data
+                logger.warning(f"Invalid tracking data format in {path}, initializing empty")
+                return {}
+            except json.JSONDecodeError as e:
+                # Try to recover from backup or initialize empty
+                logger.error(f"JSON decode error in {path}: {str(e)}")
+            except Exception as e:
+                logger.error(f"Error reading legacy tracking file {path}: {str(e)}")
+        return {}
+
     def _ensure_current_stocks_tracked(self):
         """Ensure current top-performing stocks are being tracked"""
         try:
@@ -120,60 +107,28 @@ class InteractiveTrackerManager:
             logger.warning(f"Could not ensure current stocks tracked: {str(e)}")
 
     def save_tracking_data(self):
-        """Save tracking data to file with improved atomic write and backup strategy"""
+        """Persist all tracking data; only stocks whose data changed are rewritten"""
         try:
-            import tempfile
-            import shutil
-
-            # Create backup before saving
-            if os.path.exists(self.data_file):
-                backup_file = f"{self.data_file}.backup"
-                try:
-                    shutil.copy2(self.data_file, backup_file)
-                except Exception as backup_error:
-                    logger.warning(f"Could not create backup: {backup_error}")
-
-            # Use a unique temporary file to avoid conflicts
-            import time
-            temp_file = f"{self.data_file}.tmp_{int(time.time())}"
-
-            try:
-                # Write to temporary file with validation
-                with open(temp_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.tracking_data, f, indent=2, ensure_ascii=False)
-
-                # Validate the written file
-                with open(temp_file, 'r', encoding='utf-8') as f:
-                    test_data = json.load(f)
-                    if not isinstance(test_data, dict):
-                        raise ValueError("Invalid data structure in temp file")
-
-                # Atomic move to replace original file
-                if os.path.exists(self.data_file):
-                    # On Windows, remove target file first
-                    try:
-                        os.remove(self.data_file)
-                    except OSError:
-                        pass
-
-                shutil.move(temp_file, self.data_file)
-                logger.info(f"Tracking data saved successfully with {len(self.tracking_data)} stocks")
-                return True
-
-            except Exception as write_error:
-                logger.error(f"Error during file write: {write_error}")
-                # Clean up temp file
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                except:
-                    pass
-                raise write_error
-
+            self.store.save(self.collection, self.tracking_data)
+            logger.info(f"Tracking data saved successfully with {len(self.tracking_data)} stocks")
+            return True
         except Exception as e:
             logger.error(f"Error saving tracking data: {str(e)}")
             return False
 
+    def _save_stock(self, symbol):
+        """Persist a single stock's tracking record (one row write)"""
+        try:
+            self.store.put(self.collection, symbol, self.tracking_data[symbol])
+            return True
+        except Exception as e:
+            logger.error(f"Error saving tracking data for {symbol}: {str(e)}")
+            return False
+
+    def export_snapshot(self, path=None):
+        """Write the tracking data as plain JSON for direct-file readers"""
+        return self.store.export_json(self.collection, path or self.data_file)
+
     def initialize_stock_tracking(self, symbol, current_price, predictions):
         """Initialize tracking for a new stock"""
         try:
@@ -246,7 +201,7 @@ class InteractiveTrackerManager:
             # Also update the global predictionData
             global predictionData
             predictionData[symbol] = stock_data
-            self.save_tracking_data()
+            self._save_stock(symbol)
 
             return True
 
@@ -261,20 +216,8 @@ class InteractiveTrackerManager:
                 logger.warning(f"Stock {symbol} not found in tracking data")
                 return False
 
-            stock_data = self.tracking_data[symbol]
-
-            # Update 5D data if within range
-            if 0 <= day_index < 5:
-                stock_data['actual_progress_5d'][day_index] = float(actual_price)
-
-            # Update 30D data if within range
-            if 0 <= day_index < 30:
-                stock_data['actual_progress_30d'][day_index] = float(actual_price)
-
-            stock_data['last_updated'] = datetime.now(IST).isoformat()
-            stock_data['days_tracked'] = max(stock_data.get('days_tracked', 0), day_index + 1)
-
-            self.save_tracking_data()
+            self._apply_actual_price(self.tracking_data[symbol], day_index, actual_price)
+            self._save_stock(symbol)
             logger.info(f"Updated actual price for {symbol} day {day_index}: {actual_price}")
             return True
 
@@ -282,6 +225,19 @@ class InteractiveTrackerManager:
             logger.error(f"Error updating actual price for {symbol}: {str(e)}")
             return False
 
+    def _apply_actual_price(self, stock_data, day_index, actual_price):
+        """Set one day's actual price in memory"""
+        # Update 5D data if within range
+        if 0 <= day_index < 5:
+            stock_data['actual_progress_5d'][day_index] = float(actual_price)
+
+        # Update 30D data if within range
+        if 0 <= day_index < 30:
+            stock_data['actual_progress_30d'][day_index] = float(actual_price)
+
+        stock_data['last_updated'] = datetime.now(IST).isoformat()
+        stock_data['days_tracked'] = max(stock_data.get('days_tracked', 0), day_index + 1)
+
     def update_prediction(self, symbol, period, new_predictions_list, change_day):
         """Update prediction if change is significant (>3%)"""
         try:
@@ -333,7 +289,7 @@ class InteractiveTrackerManager:
                 stock_data[changed_key] = change_day
                 stock_data['last_updated'] = datetime.now(IST).isoformat()
 
-                self.save_tracking_data()
+                self._save_stock(symbol)
                 logger.info(f"Updated prediction for {symbol} {period} from day {change_day}")
                 return True
 
@@ -399,7 +355,7 @@ class InteractiveTrackerManager:
                 max_attempts = 3
 
                 while save_attempts < max_attempts:
-                    save_success = self.save_tracking_data()
+                    save_success = self._save_stock(symbol)
                     if save_success:
                         break
 
@@ -472,61 +428,54 @@ class InteractiveTrackerManager:
         """Get all tracking data"""
         return self.tracking_data
 
-    def update_daily_actual_prices(self):
-        """Fetch real market closing prices and update tracking data"""
+    def update_daily_actual_prices(self, now=None):
+        """Batch reconciliation of real market closing prices into tracking data
+
+        1. Collect the stocks whose current trading day needs a close
+        2. Fetch every close in one multi-ticker refresh of the local OHLCV store
+        3. Apply all updates in memory
+        4. Persist the touched stocks in a single write
+        """
         try:
             logger.info("🔄 Starting daily actual price update from market data...")
 
-            current_ist = datetime.now(IST)
+            current_ist = now or datetime.now(IST)
             updated_stocks = []
             failed_stocks = []
 
-            for symbol, stock_data in self.tracking_data.items():
-                try:
-                    # Calculate which trading day we're on
-                    start_date_str = stock_data.get('start_date')
-                    if not start_date_str:
-                        logger.warning(f"Skipping {symbol}: missing 'start_date'")
-                        continue
+            # Check if market has closed today (after 3:30 PM IST)
+            market_close_time = current_ist.replace(hour=15, minute=30, second=0, microsecond=0)
+            if current_ist < market_close_time and current_ist.weekday() < 5:
+                logger.info(f"⏳ Market hasn't closed yet (current: {current_ist.strftime('%H:%M')})")
+                due = {}
+            else:
+                due = self._collect_due_updates(current_ist, failed_stocks)
 
-                    start_date = datetime.strptime(start_date_str, '%Y-%m-%d')
-                    start_date_ist = IST.localize(start_date)
-
-                    # Calculate trading days elapsed (excluding weekends)
-                    trading_days_elapsed = self.calculate_trading_days(start_date_ist, current_ist)
-
-                    if trading_days_elapsed > 0 and trading_days_elapsed <= 30:
-                        # Check if market has closed today (after 3:30 PM IST)
-                        market_close_time = current_ist.replace(hour=15, minute=30, second=0, microsecond=0)
-
-                        if current_ist >= market_close_time or current_ist.weekday() >= 5:
-                            # Fetch real closing price from Yahoo Finance
-                            real_price = self.fetch_real_closing_price(symbol)
-
-                            if real_price:
-                                # Update actual price for this trading day
-                                success = self.update_actual_price(symbol, trading_days_elapsed - 1, real_price)
-
-                                if success:
-                                    updated_stocks.append({
-                                        'symbol': symbol,
-                                        'day': trading_days_elapsed - 1,
-                                        'price': real_price,
-                                        'timestamp': current_ist.isoformat()
-                                    })
-                                    logger.info(f"✅ {symbol}: Updated Day {trading_days_elapsed-1} with real price ₹{real_price:.2f}")
-                                else:
-                                    failed_stocks.append(symbol)
-                            else:
-                                failed_stocks.append(symbol)
-                                logger.warning(f"⚠️ {symbol}: Could not fetch real price")
-                        else:
-                            logger.info(f"⏳ {symbol}: Market hasn't closed yet (current: {current_ist.strftime('%H:%M')})")
+            closes = self.fetch_closing_prices(list(due), self._last_trading_day(current_ist))
 
+            for symbol, day_index in due.items():
+                real_price = closes.get(symbol)
+                if not real_price:
+                    failed_stocks.append(symbol)
+                    logger.warning(f"⚠️ {symbol}: Could not fetch real price")
+                    continue
+                try:
+                    self._apply_actual_price(self.tracking_data[symbol], day_index, real_price)
                 except Exception as e:
                     logger.warning(f"❌ Error updating {symbol}: {str(e)}")
                     failed_stocks.append(symbol)
                     continue
+                updated_stocks.append({
+                    'symbol': symbol,
+                    'day': day_index,
+                    'price': real_price,
+                    'timestamp': current_ist.isoformat()
+                })
+
+            if updated_stocks:
+                self.store.put_many(self.collection, {
+                    stock['symbol']: self.tracking_data[stock['symbol']] for stock in updated_stocks
+                })
 
             logger.info(f"📊 Daily update completed: {len(updated_stocks)} updated, {len(failed_stocks)} failed")
 
@@ -541,6 +490,69 @@ class InteractiveTrackerManager:
             logger.error(f"❌ Error in daily actual price update: {str(e)}")
             return {'error': str(e)}
 
+    def _collect_due_updates(self, current_ist, failed_stocks):
+        """{symbol: day_index} for stocks within their 30 trading-day window"""
+        due = {}
+        for symbol, stock_data in self.tracking_data.items():
+            try:
+                # Calculate which trading day we're on
+                start_date_str = stock_data.get('start_date')
+                if not start_date_str:
+                    logger.warning(f"Skipping {symbol}: missing 'start_date'")
+                    continue
+
+                start_date_ist = IST.localize(datetime.strptime(start_date_str, '%Y-%m-%d'))
+
+                # Calculate trading days elapsed (excluding weekends)
+                trading_days_elapsed = self.calculate_trading_days(start_date_ist, current_ist)
+                if 0 < trading_days_elapsed <= 30:
+                    due[symbol] = trading_days_elapsed - 1
+
+            except Exception as e:
+                logger.warning(f"❌ Error updating {symbol}: {str(e)}")
+                failed_stocks.append(symbol)
+        return due
+
+    def _last_trading_day(self, current_ist):
+        """Date whose close is being reconciled: today, or the preceding Friday at weekends"""
+        day = current_ist.date()
+        while day.weekday() >= 5:
+            day -= timedelta(days=1)
+        return day
+
+    def fetch_closing_prices(self, symbols, trading_day=None):
+        """Closes on trading_day for many symbols from one OHLCV store refresh
+
+        A stored bar from any other day (failed or lagging refresh) is not used; those
+        symbols fall back to a per-symbol fetch.
+        """
+        if not symbols:
+            return {}
+        trading_day = trading_day or self._last_trading_day(datetime.now(IST))
+
+        try:
+            ohlcv_store.refresh(symbols, force=True)
+        except Exception as e:
+            logger.error(f"Batch close refresh failed: {str(e)}")
+
+        closes = {}
+        for symbol in symbols:
+            bars = ohlcv_store.read(symbol, last_n=1)
+            if bars.empty or bars.index[-1].date() != trading_day:
+                continue
+            if bars['Close'].iloc[-1] > 0:
+                closes[symbol] = float(bars['Close'].iloc[-1])
+
+        missing = [symbol for symbol in symbols if symbol not in closes]
+        if missing:
+            logger.info(f"  {len(missing)} symbols missing or stale in the batch download for {trading_day}, "
+                        f"fetching individually")
+            for symbol in missing:
+                price = self.fetch_real_closing_price(symbol)
+                if price:
+                    closes[symbol] = price
+        return closes
+
     def fetch_real_closing_price(self, symbol):
         """Fetch real closing price from Yahoo Finance"""
         try:
@@ -640,10 +652,10 @@ class InteractiveTrackerManager:
 
             for symbol in symbols_to_remove:
                 del self.tracking_data[symbol]
+                self.store.delete(self.collection, symbol)
                 removed_count += 1
 
             if removed_count > 0:
-                self.save_tracking_data()
                 logger.info(f"Cleaned up {removed_count} old tracking entries")
 
             return removed_count
@@ -750,7 +762,7 @@ class InteractiveTrackerManager:
                 stock_data[lock_start_date_key] = None
                 stock_data[f'lock_date_{period}'] = None
                 stock_data[persistent_key] = False
-                self.save_tracking_data()
+                self._save_stock(symbol)
                 return False
 
             return True
@@ -13,19 +13,12 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import hashlib
 
+from src.common_repository.cache.tiered_cache import tiered_cache
+
 logger = logging.getLogger(__name__)
 
 class PerformanceCache:
-    def __init__(self):
-        # Minimal in-memory cache storage
-        self.cache = {}
-        self.cache_stats = {
-            'hits': 0,
-            'misses': 0,
-            'evictions': 0,
-            'total_requests': 0
-        }
-        
+    def __init__(self, namespace: str = 'performance'):
         # Reduced cache configuration for stability
         self.config = {
             'max_cache_size': 100,   # Reduced cache size
@@ -33,173 +26,92 @@ class PerformanceCache:
             'price_data_ttl': 60,    # 1 minute for price data
             'technical_ttl': 300,    # 5 minutes for technical indicators
             'fundamental_ttl': 1800, # 30 minutes for fundamental data
-            'cleanup_interval': 300  # 5 minutes cleanup interval
         }
-        
-        self.last_cleanup = time.time()
-    
+
+        # Bounded, thread-safe LRU namespace in the shared tiered cache
+        self.cache = tiered_cache.namespace(namespace, ttl=self.config['default_ttl'],
+                                            max_entries=self.config['max_cache_size'])
+
+    @property
+    def cache_stats(self) -> Dict:
+        stats = tiered_cache.get_stats(self.cache.name)
+        return {
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'evictions': stats['evictions'],
+            'total_requests': stats['hits'] + stats['misses']
+        }
+
     def get(self, key: str, default: Any = None) -> Any:
         """Get item from cache"""
         try:
-            self.cache_stats['total_requests'] += 1
-            
-            # Clean up expired items periodically
-            if time.time() - self.last_cleanup > self.config['cleanup_interval']:
-                self._cleanup_expired()
-            
-            if key in self.cache:
-                item = self.cache[key]
-                
-                # Check if item has expired
-                if time.time() > item['expires_at']:
-                    del self.cache[key]
-                    self.cache_stats['misses'] += 1
-                    return default
-                
-                # Update access time for LRU
-                item['last_accessed'] = time.time()
-                item['access_count'] += 1
-                
-                self.cache_stats['hits'] += 1
-                logger.debug(f"Cache hit for key: {key}")
-                return item['data']
-            
-            self.cache_stats['misses'] += 1
-            return default
-            
+            return self.cache.get(key, default)
         except Exception as e:
             logger.error(f"Error getting from cache: {str(e)}")
             return default
-    
+
     def set(self, key: str, data: Any, ttl: Optional[int] = None) -> bool:
         """Set item in cache"""
         try:
-            # Use default TTL if not specified
-            if ttl is None:
-                ttl = self.config['default_ttl']
-            
-            # Check cache size and evict if necessary
-            if len(self.cache) >= self.config['max_cache_size']:
-                self._evict_lru()
-            
-            # Store item with metadata
-            self.cache[key] = {
-                'data': data,
-                'created_at': time.time(),
-                'expires_at': time.time() + ttl,
-                'last_accessed': time.time(),
-                'access_count': 0,
-                'ttl': ttl
-            }
-            
-            logger.debug(f"Cached item with key: {key}, TTL: {ttl}")
+            self.cache.set(key, data, ttl)
+            logger.debug(f"Cached item with key: {key}, TTL: {ttl or self.config['default_ttl']}")
             return True
-            
+
         except Exception as e:
             logger.error(f"Error setting cache: {str(e)}")
             return False
-    
+
     def invalidate(self, pattern: str = None) -> int:
         """Invalidate cache items by pattern or all"""
         try:
+            count = self.cache.clear(contains=pattern)
             if pattern is None:
-                # Clear all cache
-                count = len(self.cache)
-                self.cache.clear()
                 logger.info(f"Cleared entire cache ({count} items)")
-                return count
-            
-            # Remove items matching pattern
-            keys_to_remove = [key for key in self.cache.keys() if pattern in key]
-            for key in keys_to_remove:
-                del self.cache[key]
-            
-            logger.info(f"Invalidated {len(keys_to_remove)} cache items matching pattern: {pattern}")
-            return len(keys_to_remove)
-            
+            else:
+                logger.info(f"Invalidated {count} cache items matching pattern: {pattern}")
+            return count
+
         except Exception as e:
             logger.error(f"Error invalidating cache: {str(e)}")
             return 0
-    
+
     def get_stats(self) -> Dict:
         """Get cache statistics"""
-        hit_rate = 0
-        if self.cache_stats['total_requests'] > 0:
-            hit_rate = (self.cache_stats['hits'] / self.cache_stats['total_requests']) * 100
-        
+        stats = tiered_cache.get_stats(self.cache.name)
+
         return {
-            'cache_size': len(self.cache),
-            'max_cache_size': self.config['max_cache_size'],
-            'hit_rate': round(hit_rate, 2),
-            'total_requests': self.cache_stats['total_requests'],
-            'hits': self.cache_stats['hits'],
-            'misses': self.cache_stats['misses'],
-            'evictions': self.cache_stats['evictions'],
+            'cache_size': stats['entries'],
+            'max_cache_size': stats['max_entries'],
+            'hit_rate': stats['hit_rate'],
+            'total_requests': stats['hits'] + stats['misses'],
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'evictions': stats['evictions'],
             'memory_usage_estimate': self._estimate_memory_usage()
         }
-    
+
     def _cleanup_expired(self) -> int:
         """Remove expired items from cache"""
         try:
-            current_time = time.time()
-            expired_keys = [
-                key for key, item in self.cache.items()
-                if current_time > item['expires_at']
-            ]
-            
-            for key in expired_keys:
-                del self.cache[key]
-            
-            self.last_cleanup = current_time
-            
-            if expired_keys:
-                logger.info(f"Cleaned up {len(expired_keys)} expired cache items")
-            
-            return len(expired_keys)
-            
+            return tiered_cache.clear_expired(self.cache.name)
         except Exception as e:
             logger.error(f"Error during cache cleanup: {str(e)}")
             return 0
-    
-    def _evict_lru(self) -> bool:
-        """Evict least recently used item"""
-        try:
-            if not self.cache:
-                return False
-            
-            # Find LRU item
-            lru_key = min(
-                self.cache.keys(),
-                key=lambda k: self.cache[k]['last_accessed']
-            )
-            
-            del self.cache[lru_key]
-            self.cache_stats['evictions'] += 1
-            
-            logger.debug(f"Evicted LRU item: {lru_key}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error during LRU eviction: {str(e)}")
-            return False
-    
+
     def _estimate_memory_usage(self) -> str:
         """Estimate memory usage of cache"""
         try:
             # Rough estimation
-            total_size = 0
-            for item in self.cache.values():
-                # Estimate size of data (rough approximation)
-                data_str = str(item['data'])
-                total_size += len(data_str) + 200  # Add overhead for metadata
-            
+            total_size = sum(len(str(value)) + 200  # Add overhead for metadata
+                             for value in tiered_cache.values(self.cache.name))
+
             if total_size < 1024:
                 return f"{total_size} bytes"
             elif total_size < 1024 * 1024:
                 return f"{total_size / 1024:.1f} KB"
             else:
                 return f"{total_size / (1024 * 1024):.1f} MB"
-                
+
         except Exception as e:
             logger.error(f"Error estimating memory usage: {str(e)}")
             return "Unknown"
@@ -229,16 +141,8 @@ def cached_function(ttl: int = None, key_prefix: str = ""):
                 # Generate cache key
                 func_key = f"{key_prefix}_{func.__name__}_{cache_key(*args, **kwargs)}"
                 
-                # Try to get from cache
-                cached_result = cache.get(func_key)
-                if cached_result is not None:
-                    return cached_result
-                
-                # Execute function and cache result
-                result = func(*args, **kwargs)
-                cache.set(func_key, result, ttl)
-                
-                return result
+                # Concurrent misses for the same key run func once
+                return cache.cache.get_or_compute(func_key, lambda: func(*args, **kwargs), ttl)
                 
             except Exception as e:
                 logger.error(f"Error in cached function {func.__name__}: {str(e)}")
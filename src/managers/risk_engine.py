@@ -0,0 +1,131 @@
+"""
+Return-Based Portfolio Risk Engine
+
+Vectorized risk math over an aligned (days x symbols) daily return matrix:
+1. Covariance / correlation in one NumPy call, optionally Ledoit-Wolf shrunk
+2. Portfolio volatility with marginal and component risk contributions
+3. Parametric (normal) and historical VaR / expected shortfall
+4. Highly correlated pairs and connected clusters above a threshold
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.options.pricing import norm_ppf
+
+TRADING_DAYS = 252
+
+
+def align_returns(closes: Dict[str, pd.Series], min_observations: int = 20) -> Tuple[List[str], np.ndarray]:
+    """Daily simple returns on the dates every kept symbol traded
+
+    Symbols with fewer than min_observations returns are dropped first so one
+    short history does not truncate the whole matrix.
+    """
+    frame = pd.concat({symbol: pd.Series(series, dtype=float) for symbol, series in closes.items()},
+                      axis=1).sort_index()
+    returns = frame.pct_change(fill_method=None).iloc[1:]
+    returns = returns.loc[:, returns.notna().sum() >= min_observations].dropna(how='any')
+    if len(returns) < min_observations:
+        return [], np.empty((0, 0))
+    return list(returns.columns), returns.to_numpy()
+
+
+def covariance_matrix(returns: np.ndarray, shrinkage: Union[None, str, float] = None) -> Tuple[np.ndarray, float]:
+    """(covariance, shrinkage intensity) for a (T x N) return matrix
+
+    shrinkage=None gives the unbiased sample covariance; 'ledoit_wolf' shrinks the
+    MLE covariance toward a scaled identity with the Ledoit-Wolf (2004) optimal
+    intensity; a float in [0, 1] uses that intensity directly.
+    """
+    returns = np.asarray(returns, dtype=float)
+    if shrinkage is None:
+        return np.atleast_2d(np.cov(returns, rowvar=False)), 0.0
+
+    n_obs, n_assets = returns.shape
+    centered = returns - returns.mean(axis=0)
+    sample = centered.T @ centered / n_obs
+    target = np.trace(sample) / n_assets * np.eye(n_assets)
+
+    if shrinkage == 'ledoit_wolf':
+        distance = np.sum((sample - target) ** 2)
+        # Sum over t of ||x_t x_t' - S||^2 collapses to sum ||x_t||^4 - T ||S||^2
+        row_norms = np.sum(centered ** 2, axis=1)
+        spread = (np.sum(row_norms ** 2) / n_obs - np.sum(sample ** 2)) / n_obs
+        intensity = float(min(spread, distance) / distance) if distance > 0 else 1.0
+    else:
+        intensity = float(np.clip(shrinkage, 0.0, 1.0))
+    return intensity * target + (1 - intensity) * sample, intensity
+
+
+def correlation_from_covariance(cov: np.ndarray) -> np.ndarray:
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.outer(std, std)
+    corr = np.clip(np.nan_to_num(corr), -1.0, 1.0)
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+
+def portfolio_risk(weights: np.ndarray, cov: np.ndarray, returns: Optional[np.ndarray] = None,
+                   confidence: float = 0.95, horizon_days: int = 1) -> Dict[str, object]:
+    """Volatility, risk contributions and VaR for portfolio weights (fractions of capital)
+
+    VaR and expected shortfall are positive loss fractions over horizon_days,
+    scaled by sqrt(horizon). Historical figures need the return matrix.
+    """
+    weights = np.asarray(weights, dtype=float)
+    variance = float(weights @ cov @ weights)
+    volatility = np.sqrt(max(variance, 0.0))
+    marginal = cov @ weights / volatility if volatility > 0 else np.zeros_like(weights)
+    component = weights * marginal
+    scale = np.sqrt(horizon_days)
+
+    z = float(norm_ppf(confidence))
+    mean = float(returns.mean(axis=0) @ weights) if returns is not None and len(returns) else 0.0
+    result = {
+        'volatility_daily': volatility,
+        'volatility_annual': volatility * np.sqrt(TRADING_DAYS),
+        'marginal_contribution': marginal,
+        'component_contribution': component,
+        'percent_contribution': component / volatility if volatility > 0 else np.zeros_like(weights),
+        'parametric_var': max(0.0, z * volatility * scale - mean * horizon_days),
+        # Normal expected shortfall: pdf(z) / (1 - c) standard deviations
+        'parametric_es': max(0.0, np.exp(-0.5 * z * z) / np.sqrt(2 * np.pi) / (1 - confidence)
+                             * volatility * scale - mean * horizon_days),
+        'historical_var': None,
+        'historical_es': None,
+    }
+    if returns is not None and len(returns):
+        pnl = returns @ weights
+        cutoff = np.percentile(pnl, (1 - confidence) * 100)
+        result['historical_var'] = max(0.0, -cutoff * scale)
+        result['historical_es'] = max(0.0, -pnl[pnl <= cutoff].mean() * scale)
+    return result
+
+
+def correlated_pairs(corr: np.ndarray, threshold: float) -> List[Tuple[int, int, float]]:
+    """(i, j, rho) for i < j with rho above threshold, strongest first"""
+    rows, cols = np.triu_indices(len(corr), k=1)
+    values = corr[rows, cols]
+    keep = np.nonzero(values > threshold)[0]
+    order = keep[np.argsort(-values[keep], kind='stable')]
+    return [(int(rows[k]), int(cols[k]), float(values[k])) for k in order]
+
+
+def correlation_clusters(corr: np.ndarray, threshold: float) -> List[List[int]]:
+    """Connected components of the 'rho > threshold' graph (singletons omitted), largest first"""
+    n_assets = len(corr)
+    adjacency = corr > threshold
+    np.fill_diagonal(adjacency, True)
+    labels = np.arange(n_assets)
+    while True:
+        # Each node takes the smallest label among its neighbours until labels settle
+        updated = np.where(adjacency, labels[None, :], n_assets).min(axis=1)
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+    clusters = [np.nonzero(labels == label)[0].tolist() for label in np.unique(labels)]
+    return sorted((c for c in clusters if len(c) > 1), key=len, reverse=True)
@@ -4,6 +4,9 @@ Risk Management Module for Stock Market Analyst
 
 Implements position sizing, stop-loss/take-profit calculations,
 and portfolio correlation analysis without external dependencies.
+Correlation and portfolio risk come from daily returns in the local OHLCV
+store; the fundamentals-similarity heuristic is only a fallback when
+fewer than two symbols have price history.
 """
 
 import json
@@ -13,6 +16,12 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 import numpy as np
 
+from src.data.ohlcv_store import ohlcv_store
+from src.managers.risk_engine import (
+    align_returns, correlated_pairs, correlation_clusters, correlation_from_covariance,
+    covariance_matrix, portfolio_risk
+)
+
 logger = logging.getLogger(__name__)
 
 class RiskManager:
@@ -24,7 +33,11 @@ class RiskManager:
             'stop_loss_pct': 0.08,      # 8% stop loss
             'take_profit_pct': 0.15,    # 15% take profit
             'correlation_threshold': 0.7, # High correlation limit
-            'volatility_adjustment': True
+            'volatility_adjustment': True,
+            'lookback_days': 250,        # Daily returns used for correlation / VaR
+            'min_observations': 30,
+            'shrinkage': 'ledoit_wolf',
+            'var_confidence': 0.95
         }
         
     def calculate_position_size(self, stock_data: Dict, portfolio_value: float) -> Dict:
@@ -119,55 +132,127 @@ class RiskManager:
             logger.error(f"Error calculating stop-loss/take-profit for {symbol}: {str(e)}")
             return {'symbol': symbol, 'error': str(e)}
     
-    def analyze_portfolio_correlation(self, stocks_data: List[Dict]) -> Dict:
-        """Analyze correlation between selected stocks"""
+    def analyze_portfolio_correlation(self, stocks_data: List[Dict], weights: Optional[List[float]] = None) -> Dict:
+        """Analyze correlation between selected stocks (daily returns when history is available)"""
         try:
             if len(stocks_data) < 2:
                 return {'correlation_analysis': 'Insufficient data for correlation analysis'}
-            
-            # Create correlation matrix based on technical indicators
-            correlation_matrix = {}
-            high_correlations = []
-            
-            for i, stock1 in enumerate(stocks_data):
-                symbol1 = stock1.get('symbol', f'Stock{i}')
-                correlation_matrix[symbol1] = {}
-                
-                for j, stock2 in enumerate(stocks_data):
-                    symbol2 = stock2.get('symbol', f'Stock{j}')
-                    
-                    if i == j:
-                        correlation_matrix[symbol1][symbol2] = 1.0
-                    else:
-                        # Calculate correlation based on multiple factors
-                        correlation = self._calculate_stock_correlation(stock1, stock2)
-                        correlation_matrix[symbol1][symbol2] = correlation
-                        
-                        if correlation > self.risk_settings['correlation_threshold'] and i < j:
-                            high_correlations.append({
-                                'stock1': symbol1,
-                                'stock2': symbol2,
-                                'correlation': round(correlation, 3),
-                                'risk_level': 'High' if correlation > 0.8 else 'Medium'
-                            })
-            
-            # Portfolio diversification score
-            avg_correlation = self._calculate_average_correlation(correlation_matrix)
-            diversification_score = max(0, 100 - (avg_correlation * 100))
-            
-            return {
-                'correlation_matrix': correlation_matrix,
-                'high_correlations': high_correlations,
-                'average_correlation': round(avg_correlation, 3),
-                'diversification_score': round(diversification_score, 1),
-                'portfolio_risk_level': self._get_portfolio_risk_level(avg_correlation),
-                'recommendations': self._get_diversification_recommendations(high_correlations, avg_correlation)
-            }
-            
+
+            symbols = [stock.get('symbol', f'Stock{i}') for i, stock in enumerate(stocks_data)]
+            kept, returns = self._load_returns(symbols)
+            if len(kept) >= 2:
+                weight_map = dict(zip(symbols, weights)) if weights is not None else {}
+                analysis = self.analyze_return_risk(
+                    returns, kept, [weight_map.get(symbol, 1.0) for symbol in kept])
+                analysis['symbols_without_history'] = [s for s in symbols if s not in kept]
+                return analysis
+
+            return self._analyze_similarity_correlation(stocks_data)
+
         except Exception as e:
             logger.error(f"Error analyzing portfolio correlation: {str(e)}")
             return {'error': str(e)}
-    
+
+    def analyze_return_risk(self, returns: np.ndarray, symbols: List[str],
+                            weights: Optional[List[float]] = None) -> Dict:
+        """Correlation, clusters and portfolio risk from an aligned (days x symbols) return matrix"""
+        threshold = self.risk_settings['correlation_threshold']
+        cov, intensity = covariance_matrix(returns, self.risk_settings['shrinkage'])
+        corr = correlation_from_covariance(cov)
+
+        high_correlations = [{
+            'stock1': symbols[i],
+            'stock2': symbols[j],
+            'correlation': round(rho, 3),
+            'risk_level': 'High' if rho > 0.8 else 'Medium'
+        } for i, j, rho in correlated_pairs(corr, threshold)]
+
+        weights = np.ones(len(symbols)) if weights is None else np.asarray(weights, dtype=float)
+        weights = weights / weights.sum() if weights.sum() > 0 else np.full(len(symbols), 1 / len(symbols))
+        risk = portfolio_risk(weights, cov, returns, confidence=self.risk_settings['var_confidence'])
+
+        avg_correlation = float(corr[np.triu_indices(len(symbols), k=1)].mean())
+        diversification_score = max(0, 100 - (avg_correlation * 100))
+
+        return {
+            'method': 'daily_returns',
+            'observations': int(len(returns)),
+            'shrinkage_intensity': round(intensity, 4),
+            'correlation_matrix': {
+                symbol: dict(zip(symbols, np.round(row, 3).tolist())) for symbol, row in zip(symbols, corr)
+            },
+            'high_correlations': high_correlations,
+            'clusters': [[symbols[i] for i in cluster] for cluster in correlation_clusters(corr, threshold)],
+            'average_correlation': round(avg_correlation, 3),
+            'diversification_score': round(diversification_score, 1),
+            'portfolio_risk_level': self._get_portfolio_risk_level(avg_correlation),
+            'portfolio_risk': {
+                'volatility_daily_pct': round(risk['volatility_daily'] * 100, 3),
+                'volatility_annual_pct': round(risk['volatility_annual'] * 100, 2),
+                'var_confidence': self.risk_settings['var_confidence'],
+                'parametric_var_pct': round(risk['parametric_var'] * 100, 3),
+                'parametric_es_pct': round(risk['parametric_es'] * 100, 3),
+                'historical_var_pct': round(risk['historical_var'] * 100, 3),
+                'historical_es_pct': round(risk['historical_es'] * 100, 3),
+                'risk_contribution_pct': dict(zip(symbols, np.round(risk['percent_contribution'] * 100, 2).tolist())),
+                'marginal_risk': dict(zip(symbols, np.round(risk['marginal_contribution'], 5).tolist())),
+            },
+            'recommendations': self._get_diversification_recommendations(high_correlations, avg_correlation)
+        }
+
+    def _load_returns(self, symbols: List[str]) -> Tuple[List[str], np.ndarray]:
+        """Aligned daily returns from the local OHLCV store (no network on this path)"""
+        closes = {}
+        for symbol in dict.fromkeys(symbols):
+            bars = ohlcv_store.read(symbol, last_n=self.risk_settings['lookback_days'] + 1)
+            if len(bars) > self.risk_settings['min_observations']:
+                closes[symbol] = bars['Close']
+        if len(closes) < 2:
+            return [], np.empty((0, 0))
+        return align_returns(closes, self.risk_settings['min_observations'])
+
+    def _analyze_similarity_correlation(self, stocks_data: List[Dict]) -> Dict:
+        """Fallback when price history is missing: similarity of fundamentals / technicals"""
+        # Create correlation matrix based on technical indicators
+        correlation_matrix = {}
+        high_correlations = []
+
+        for i, stock1 in enumerate(stocks_data):
+            symbol1 = stock1.get('symbol', f'Stock{i}')
+            correlation_matrix[symbol1] = {}
+
+            for j, stock2 in enumerate(stocks_data):
+                symbol2 = stock2.get('symbol', f'Stock{j}')
+
+                if i == j:
+                    correlation_matrix[symbol1][symbol2] = 1.0
+                else:
+                    # Calculate correlation based on multiple factors
+                    correlation = self._calculate_stock_correlation(stock1, stock2)
+                    correlation_matrix[symbol1][symbol2] = correlation
+
+                    if correlation > self.risk_settings['correlation_threshold'] and i < j:
+                        high_correlations.append({
+                            'stock1': symbol1,
+                            'stock2': symbol2,
+                            'correlation': round(correlation, 3),
+                            'risk_level': 'High' if correlation > 0.8 else 'Medium'
+                        })
+
+        # Portfolio diversification score
+        avg_correlation = self._calculate_average_correlation(correlation_matrix)
+        diversification_score = max(0, 100 - (avg_correlation * 100))
+
+        return {
+            'method': 'fundamental_similarity',
+            'correlation_matrix': correlation_matrix,
+            'high_correlations': high_correlations,
+            'average_correlation': round(avg_correlation, 3),
+            'diversification_score': round(diversification_score, 1),
+            'portfolio_risk_level': self._get_portfolio_risk_level(avg_correlation),
+            'recommendations': self._get_diversification_recommendations(high_correlations, avg_correlation)
+        }
+
     def assess_portfolio_risk(self, positions: List[Dict], market_conditions: Dict = None) -> Dict:
         """Comprehensive portfolio risk assessment"""
         try:
@@ -393,7 +478,8 @@ def analyze_portfolio_risk(stocks_data: List[Dict]) -> Dict:
     positions = [stock['position_sizing'] for stock in enhanced_stocks]
     
     # Perform risk analysis
-    correlation_analysis = risk_manager.analyze_portfolio_correlation(stocks_data)
+    correlation_analysis = risk_manager.analyze_portfolio_correlation(
+        stocks_data, weights=[position.get('position_percentage', 0) for position in positions])
     portfolio_risk = risk_manager.assess_portfolio_risk(positions)
     
     return {
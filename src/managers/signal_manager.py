@@ -11,6 +11,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import os
 
+from src.common_repository.storage.record_store import record_store
+
 logger = logging.getLogger(__name__)
 
 class SignalManager:
@@ -22,21 +24,18 @@ class SignalManager:
         self.active_signals = self.load_active_signals()
 
     def load_active_signals(self) -> Dict:
-        """Load active signals from file"""
+        """Load active signals from the record store"""
         try:
-            if os.path.exists(self.signals_file):
-                with open(self.signals_file, 'r') as f:
-                    return json.load(f)
-            return {}
+            record_store.migrate_json('active_signals', self.signals_file, {})
+            return record_store.load('active_signals', {})
         except Exception as e:
             logger.error(f"Error loading signals: {str(e)}")
             return {}
 
     def save_active_signals(self):
-        """Save active signals to file"""
+        """Save active signals (only symbols whose entry changed are written)"""
         try:
-            with open(self.signals_file, 'w') as f:
-                json.dump(self.active_signals, f, indent=2)
+            record_store.save('active_signals', self.active_signals)
         except Exception as e:
             logger.error(f"Error saving signals: {str(e)}")
 
@@ -216,43 +215,44 @@ class SignalManager:
         self.max_volatility_threshold = 5
 
     def load_signal_history(self) -> Dict:
-        """Load signal history from file"""
+        """Load signal history from the record store"""
         try:
-            if os.path.exists(self.signal_history_file):
-                with open(self.signal_history_file, 'r') as f:
-                    return json.load(f)
-            return {}
+            record_store.migrate_json('signal_history', self.signal_history_file, {})
+            return record_store.load('signal_history', {})
         except Exception as e:
             logger.error(f"Error loading signal history: {str(e)}")
             return {}
 
     def save_signal_history(self):
-        """Save signal history to file"""
+        """Save signal history (only symbols whose entry changed are written)"""
         try:
-            with open(self.signal_history_file, 'w') as f:
-                json.dump(self.signal_history, f, indent=2)
+            record_store.save('signal_history', self.signal_history)
         except Exception as e:
             logger.error(f"Error saving signal history: {str(e)}")
 
     def load_active_signals(self) -> Dict:
-        """Load active signals from file"""
+        """Load active signals from the record store"""
         try:
-            if os.path.exists(self.signals_file):
-                with open(self.signals_file, 'r') as f:
-                    return json.load(f)
-            return {}
+            record_store.migrate_json('active_signals', self.signals_file, {})
+            return record_store.load('active_signals', {})
         except Exception as e:
             logger.error(f"Error loading signals: {str(e)}")
             return {}
 
     def save_active_signals(self):
-        """Save active signals to file"""
+        """Save active signals (only symbols whose entry changed are written)"""
         try:
-            with open(self.signals_file, 'w') as f:
-                json.dump(self.active_signals, f, indent=2)
+            record_store.save('active_signals', self.active_signals)
         except Exception as e:
             logger.error(f"Error saving signals: {str(e)}")
 
+    def _save_signal(self, symbol: str):
+        """Persist one symbol's signal state"""
+        try:
+            record_store.put('active_signals', symbol, self.active_signals[symbol])
+        except Exception as e:
+            logger.error(f"Error saving signal for {symbol}: {str(e)}")
+
     def should_update_signal(self, symbol: str, new_signal: Dict) -> bool:
         """Check if signal should be updated based on hold period and confirmation"""
         current_time = datetime.now()
@@ -337,12 +337,12 @@ class SignalManager:
             }
 
             signal_info['last_updated'] = current_time.isoformat()
-            self.save_active_signals()
+            self._save_signal(symbol)
 
             logger.info(f"Signal confirmed for {symbol} with {len(recent_confirmations)} confirmations")
             return True
 
-        self.save_active_signals()
+        self._save_signal(symbol)
         logger.info(f"Signal for {symbol} needs more confirmations ({len(recent_confirmations)}/{self.confirmation_threshold})")
         return False
 
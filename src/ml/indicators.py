@@ -0,0 +1,64 @@
+"""
+Technical indicator columns shared by real-time training and inference
+
+Kept free of TensorFlow / scikit-learn imports so feature preparation can run
+in processes that never load a model.
+"""
+
+import pandas as pd
+
+# Column order the real-time LSTM and RF models were trained on
+LSTM_FEATURES = [
+    'Close', 'Volume', 'SMA_5', 'SMA_10', 'SMA_20',
+    'RSI', 'MACD', 'BB_Position', 'Volume_Ratio', 'Price_Change'
+]
+RF_FEATURES = [
+    'SMA_5', 'SMA_10', 'SMA_20', 'SMA_50',
+    'EMA_12', 'EMA_26', 'MACD', 'RSI',
+    'BB_Position', 'BB_Width', 'Volume_Ratio',
+    'High_Low_Ratio', 'Open_Close_Ratio'
+]
+
+
+def add_realtime_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """Moving averages, MACD, RSI, Bollinger bands and volume/price ratios, gaps back- then forward-filled"""
+    # Moving averages
+    df['SMA_5'] = df['Close'].rolling(window=5).mean()
+    df['SMA_10'] = df['Close'].rolling(window=10).mean()
+    df['SMA_20'] = df['Close'].rolling(window=20).mean()
+    df['SMA_50'] = df['Close'].rolling(window=50).mean()
+
+    # Exponential moving averages
+    df['EMA_12'] = df['Close'].ewm(span=12).mean()
+    df['EMA_26'] = df['Close'].ewm(span=26).mean()
+
+    # MACD
+    df['MACD'] = df['EMA_12'] - df['EMA_26']
+    df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
+    df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
+
+    # RSI
+    delta = df['Close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss
+    df['RSI'] = 100 - (100 / (1 + rs))
+
+    # Bollinger Bands
+    df['BB_Middle'] = df['Close'].rolling(window=20).mean()
+    bb_std = df['Close'].rolling(window=20).std()
+    df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
+    df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
+    df['BB_Width'] = df['BB_Upper'] - df['BB_Lower']
+    df['BB_Position'] = (df['Close'] - df['BB_Lower']) / df['BB_Width']
+
+    # Volume indicators
+    df['Volume_SMA'] = df['Volume'].rolling(window=20).mean()
+    df['Volume_Ratio'] = df['Volume'] / df['Volume_SMA']
+
+    # Price change indicators
+    df['Price_Change'] = df['Close'].pct_change()
+    df['High_Low_Ratio'] = (df['High'] - df['Low']) / df['Close']
+    df['Open_Close_Ratio'] = (df['Close'] - df['Open']) / df['Open']
+
+    return df.bfill().ffill()
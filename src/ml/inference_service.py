@@ -0,0 +1,371 @@
+"""
+Batched ML Inference Service
+
+Scores many symbols per call against warm, per-symbol models:
+1. ModelPool keeps loaded LSTM / RF models and scalers in a size-bounded LRU
+   (by count and estimated bytes), reloading a model only when its file changes
+2. FeatureCache holds indicator frames per symbol from the OHLCV store and
+   recomputes them only when a newer bar lands; stale symbols are topped up
+   in one batched store refresh
+3. predict_many() stacks every input row that targets the same model and
+   makes one forward pass per model, then assembles per-symbol predictions
+
+TensorFlow and joblib are imported on first model load, not at import time.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.common_repository.config.runtime import (
+    MODELS_DIR, MODEL_POOL_MAX_MODELS, MODEL_POOL_MAX_MB, INFERENCE_HISTORY_BARS
+)
+from src.common_repository.utils.telemetry import telemetry
+from src.data.ohlcv_store import ohlcv_store
+from src.ml.indicators import LSTM_FEATURES, RF_FEATURES, add_realtime_indicators
+
+logger = logging.getLogger(__name__)
+
+
+def _load_keras(path: str):
+    from tensorflow.keras.models import load_model
+    return load_model(path, compile=False)
+
+
+def _load_pickle(path: str):
+    import joblib
+    return joblib.load(path)
+
+
+DEFAULT_LOADERS: Dict[str, Callable[[str], Any]] = {
+    'lstm': _load_keras,
+    'rf': _load_pickle,
+    'scaler': _load_pickle,
+}
+
+
+def model_nbytes(model: Any, path: Optional[str] = None) -> int:
+    """Weight bytes for Keras-style models, otherwise the serialized size on disk"""
+    if hasattr(model, 'get_weights'):
+        try:
+            return int(sum(np.asarray(w).nbytes for w in model.get_weights()))
+        except Exception:
+            pass
+    return os.path.getsize(path) if path and os.path.exists(path) else 0
+
+
+class ModelPool:
+    """LRU of loaded models keyed '<SYMBOL>_<family>' (family: lstm, rf, scaler)"""
+
+    def __init__(self, models_dir: str = MODELS_DIR, max_models: int = MODEL_POOL_MAX_MODELS,
+                 max_bytes: int = MODEL_POOL_MAX_MB * 1024 * 1024,
+                 loaders: Optional[Dict[str, Callable[[str], Any]]] = None):
+        self.models_dir = models_dir
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.loaders = loaders or DEFAULT_LOADERS
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path(self, name: str) -> Optional[str]:
+        symbol, family = name.rsplit('_', 1)
+        if family == 'lstm':
+            candidates = [f"{name}.keras", f"{name}.h5"]
+        elif family == 'scaler':
+            candidates = [os.path.join('scalers', f"{name}.pkl")]
+        else:
+            candidates = [f"{name}.pkl"]
+        for candidate in candidates:
+            path = os.path.join(self.models_dir, candidate)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def get(self, name: str) -> Optional[Any]:
+        """Warm model, loading (and evicting the least recently used) on a miss"""
+        path = self.path(name)
+        if path is None:
+            return None
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry['mtime'] == mtime:
+                self._entries.move_to_end(name)
+                entry['hits'] += 1
+                self.hits += 1
+                return entry['model']
+
+            self.misses += 1
+            telemetry.increment('inference.pool_misses')
+            start_time = time.time()
+            model = self.loaders[name.rsplit('_', 1)[1]](path)
+            self._entries[name] = {
+                'model': model,
+                'path': path,
+                'mtime': mtime,
+                'bytes': model_nbytes(model, path),
+                'hits': 0,
+                'loaded_at': datetime.now().isoformat(),
+                'load_sec': round(time.time() - start_time, 3),
+            }
+            self._entries.move_to_end(name)
+            self._evict()
+            return model
+
+    def _evict(self):
+        while len(self._entries) > 1 and (len(self._entries) > self.max_models or
+                                          self.total_bytes() > self.max_bytes):
+            name, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            telemetry.increment('inference.pool_evictions')
+            logger.debug(f"Evicted {name} from model pool")
+        telemetry.set_gauge('inference.pool_bytes', self.total_bytes())
+        telemetry.set_gauge('inference.pool_models', len(self._entries))
+
+    def discard(self, symbol: str):
+        """Drop every pooled model for a symbol (e.g. after retraining)"""
+        with self._lock:
+            for name in [n for n in self._entries if n.rsplit('_', 1)[0] == symbol.upper()]:
+                del self._entries[name]
+
+    def total_bytes(self) -> int:
+        return sum(entry['bytes'] for entry in self._entries.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool counters plus per-model memory, most recently used last"""
+        with self._lock:
+            return {
+                'models': [{'name': name, **{k: v for k, v in entry.items() if k != 'model'}}
+                           for name, entry in self._entries.items()],
+                'total_bytes': self.total_bytes(),
+                'max_models': self.max_models,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+class FeatureCache:
+    """Indicator frames per symbol, rebuilt only when the store has a newer bar"""
+
+    def __init__(self, price_source=None, history_bars: int = INFERENCE_HISTORY_BARS,
+                 max_symbols: int = 2048):
+        self.price_source = price_source or ohlcv_store
+        self.history_bars = history_bars
+        self.max_symbols = max_symbols
+        self._frames: 'OrderedDict[str, Tuple[pd.Timestamp, pd.DataFrame]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, symbols: Iterable[str], refresh: bool = True) -> Dict[str, pd.DataFrame]:
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        if refresh and symbols:
+            try:
+                self.price_source.refresh(symbols)
+            except Exception as e:
+                logger.warning(f"Feature cache refresh failed for {len(symbols)} symbols: {e}")
+
+        frames = {}
+        for symbol in symbols:
+            last_date = self.price_source.last_date(symbol)
+            if last_date is None:
+                continue
+            with self._lock:
+                cached = self._frames.get(symbol)
+                if cached is not None and cached[0] == last_date:
+                    self._frames.move_to_end(symbol)
+                    frames[symbol] = cached[1]
+                    continue
+            bars = self.price_source.read(symbol, last_n=self.history_bars)
+            if bars.empty:
+                continue
+            frame = add_realtime_indicators(bars.copy())
+            with self._lock:
+                self._frames[symbol] = (last_date, frame)
+                self._frames.move_to_end(symbol)
+                while len(self._frames) > self.max_symbols:
+                    self._frames.popitem(last=False)
+            frames[symbol] = frame
+        return frames
+
+
+def _forward(model: Any, X: np.ndarray) -> np.ndarray:
+    if hasattr(model, 'predict_on_batch'):
+        return np.asarray(model.predict_on_batch(X))
+    return np.asarray(model.predict(X, verbose=0))
+
+
+class InferenceService:
+    """Per-symbol LSTM / RF predictions for many symbols in one call"""
+
+    def __init__(self, models: Optional[ModelPool] = None, features: Optional[FeatureCache] = None,
+                 lookback_days: int = 60):
+        self.models = models or ModelPool()
+        self.features = features or FeatureCache()
+        self.lookback_days = lookback_days
+
+    def predict(self, symbol: str) -> Dict[str, Any]:
+        return self.predict_many([symbol]).get(symbol.upper(), {'error': 'No data available for predictions'})
+
+    def predict_many(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        start_time = time.time()
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        frames = self.features.get_many(symbols)
+
+        results = {}
+        for symbol in symbols:
+            frame = frames.get(symbol)
+            if frame is None:
+                results[symbol] = {'error': 'No data available for predictions'}
+                continue
+            results[symbol] = {
+                'symbol': symbol,
+                'timestamp': datetime.now().isoformat(),
+                'data_freshness': 'daily_bars',
+                'as_of': frame.index[-1].strftime('%Y-%m-%d'),
+                'last_price': float(frame['Close'].iloc[-1]),
+            }
+
+        live = [s for s in symbols if 'error' not in results[s]]
+        self._predict_lstm(live, frames, results)
+        self._predict_rf(live, frames, results)
+
+        telemetry.record_histogram('inference.batch_sec', time.time() - start_time)
+        telemetry.increment('inference.symbols', len(symbols))
+        return results
+
+    def _batched(self, family: str, rows: Dict[str, Tuple[str, np.ndarray]],
+                 run: Callable[[Any, np.ndarray], np.ndarray]) -> Dict[str, Tuple[Any, np.ndarray]]:
+        """One forward pass per distinct model over every row that targets it; symbol -> (model, output)"""
+        groups: Dict[str, List[Tuple[str, np.ndarray]]] = {}
+        for symbol, (model_name, row) in rows.items():
+            groups.setdefault(model_name, []).append((symbol, row))
+
+        outputs = {}
+        for model_name, members in groups.items():
+            try:
+                model = self.models.get(model_name)
+                batch = run(model, np.concatenate([row for _, row in members]))
+                outputs.update({symbol: (model, batch[i]) for i, (symbol, _) in enumerate(members)})
+            except Exception as e:
+                logger.error(f"{family.upper()} inference failed for {model_name}: {str(e)}")
+        return outputs
+
+    def _predict_lstm(self, symbols: List[str], frames: Dict[str, pd.DataFrame], results: Dict[str, Dict]):
+        rows, scalers, widths = {}, {}, {}
+        for symbol in symbols:
+            name = f"{symbol}_lstm"
+            frame = frames[symbol]
+            if self.models.path(name) is None or len(frame) < self.lookback_days:
+                continue
+            try:
+                scaler = self.models.get(f"{symbol}_scaler")
+                if scaler is None:
+                    continue
+                columns = [col for col in LSTM_FEATURES if col in frame.columns]
+                window = scaler.transform(frame[columns].tail(self.lookback_days).values)
+                rows[symbol] = (name, window[None, :, :])
+                scalers[symbol], widths[symbol] = scaler, len(columns)
+            except Exception as e:
+                logger.error(f"LSTM input preparation failed for {symbol}: {str(e)}")
+
+        for symbol, (_, scaled) in self._batched('lstm', rows, _forward).items():
+            scaled = np.ravel(scaled)
+            # Inverse-transform the Close column of each predicted step
+            padded = np.zeros((len(scaled), widths[symbol]))
+            padded[:, 0] = scaled
+            prices = scalers[symbol].inverse_transform(padded)[:, 0]
+            current_price = results[symbol]['last_price']
+            results[symbol].update({
+                'lstm_predictions': prices.tolist(),
+                'lstm_direction': 'UP' if prices[-1] > current_price else 'DOWN',
+                'lstm_confidence': min(abs((prices[-1] - current_price) / current_price) * 100, 100),
+            })
+
+    def _predict_rf(self, symbols: List[str], frames: Dict[str, pd.DataFrame], results: Dict[str, Dict]):
+        rows = {}
+        for symbol in symbols:
+            name = f"{symbol}_rf"
+            if self.models.path(name) is None:
+                continue
+            frame = frames[symbol]
+            columns = [col for col in RF_FEATURES if col in frame.columns]
+            rows[symbol] = (name, frame[columns].tail(1).values)
+
+        def run(model, X):
+            return np.asarray(model.predict_proba(X))
+
+        for symbol, (model, proba) in self._batched('rf', rows, run).items():
+            model_classes = list(getattr(model, 'classes_', range(len(proba))))
+            predicted = model_classes[int(np.argmax(proba))]
+            results[symbol].update({
+                'rf_direction': 'UP' if predicted == 1 else 'DOWN',
+                'rf_confidence': float(proba.max()) * 100,
+                'rf_probability_up': float(proba[model_classes.index(1)]) * 100 if 1 in model_classes else 50.0,
+            })
+
+    def stats(self) -> Dict[str, Any]:
+        return {'pool': self.models.stats(), 'cached_symbols': len(self.features._frames)}
+
+
+def ml_score_boost(predicted_change: float, direction: str, confidence: float) -> float:
+    """Screener score adjustment: up to +15 for the predicted move, +/-10 for a confident direction"""
+    boost = 0.0
+    if predicted_change > 2:
+        boost += min(15, predicted_change * 2)
+    elif predicted_change > 0:
+        boost += predicted_change
+    if direction == 'UP':
+        boost += confidence * 10
+    elif direction == 'DOWN':
+        boost -= confidence * 10
+    return round(boost, 1)
+
+
+def enrich_with_ml_predictions(stocks_data: List[Dict]) -> List[Dict]:
+    """Add ml_* fields and enhanced_score to screener rows from one batched inference pass
+
+    Rows are returned unchanged when no symbol has a trained model.
+    """
+    predictions = inference_service.predict_many(stock['symbol'] for stock in stocks_data)
+    if not any('lstm_predictions' in p or 'rf_direction' in p for p in predictions.values()):
+        logger.info("ML models not available - skipping predictions")
+        return stocks_data
+
+    enriched = []
+    for stock in stocks_data:
+        prediction = predictions.get(stock['symbol'].upper(), {})
+        current_price = prediction.get('last_price') or 0
+        predicted_price = prediction.get('lstm_predictions', [0])[-1]
+        predicted_change = ((predicted_price - current_price) / current_price * 100
+                            if predicted_price and current_price else 0)
+        direction = prediction.get('rf_direction', prediction.get('lstm_direction', 'UNKNOWN'))
+        confidence = prediction.get('rf_confidence', 0) / 100
+        boost = ml_score_boost(predicted_change, direction, confidence)
+        enriched.append({
+            **stock,
+            'ml_predicted_price': round(predicted_price, 2),
+            'ml_predicted_change': round(predicted_change, 2),
+            'ml_direction': direction,
+            'ml_confidence': round(confidence * 100, 1),
+            'ml_up_probability': round(prediction.get('rf_probability_up', 50.0), 1),
+            'ml_score_boost': boost,
+            'enhanced_score': round(stock.get('score', 0) + boost, 1),
+        })
+
+    enriched.sort(key=lambda stock: stock['enhanced_score'], reverse=True)
+    return enriched
+
+
+# Global instance
+inference_service = InferenceService()
@@ -7,23 +7,30 @@ Trains models using real-time data feeds and updates predictions continuously
 
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from datetime import datetime, timedelta
 import logging
-import joblib
 import os
 import json
 from typing import Dict, List, Any, Optional, Tuple
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.metrics import mean_squared_error, accuracy_score, classification_report
-import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from tensorflow.keras.optimizers import Adam
 import warnings
 warnings.filterwarnings('ignore')
 
+from src.common_repository.utils.lazy_import import lazy_import
+
+# TensorFlow, scikit-learn and yfinance load on the first training call, not at import
+tf = lazy_import('tensorflow')
+yf = lazy_import('yfinance')
+joblib = lazy_import('joblib')
+ensemble = lazy_import('sklearn.ensemble')
+preprocessing = lazy_import('sklearn.preprocessing')
+metrics = lazy_import('sklearn.metrics')
+
+from src.data.ohlcv_store import ohlcv_store
+from src.ml.training_pool import ProgressCallback, model_threads, run_parallel, worker_count
+from src.ml.indicators import LSTM_FEATURES, RF_FEATURES, add_realtime_indicators
+from src.ml.inference_service import inference_service
+from src.ml.windowing import horizon_sequences
+
 logger = logging.getLogger(__name__)
 
 class RealTimeMLTrainer:
@@ -43,17 +50,13 @@ class RealTimeMLTrainer:
         
         # Real-time data cache
         self.data_cache = {}
-        self.model_cache = {}
         self.last_training = {}
         
     def fetch_realtime_training_data(self, symbol: str, period: str = "2y") -> pd.DataFrame:
         """Fetch real-time training data for a symbol"""
         try:
-            # Try to get fresh data from Yahoo Finance
-            ticker = yf.Ticker(f"{symbol}.NS")
-            
-            # Get historical data
-            hist_data = ticker.history(period=period)
+            # Daily history from the local store; only missing bars are downloaded
+            hist_data = ohlcv_store.get_history(symbol, period=period)
             
             if hist_data.empty:
                 logger.warning(f"No historical data for {symbol}")
@@ -61,8 +64,11 @@ class RealTimeMLTrainer:
             
             # Get real-time intraday data
             try:
+                ticker = yf.Ticker(f"{symbol}.NS")
                 intraday = ticker.history(period="1d", interval="1m")
                 if not intraday.empty:
+                    if intraday.index.tz is not None:
+                        intraday.index = intraday.index.tz_localize(None)
                     # Merge with historical data
                     latest_date = hist_data.index[-1].date()
                     today = datetime.now().date()
@@ -101,62 +107,16 @@ class RealTimeMLTrainer:
     def _add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add technical indicators to the dataframe"""
         try:
-            # Moving averages
-            df['SMA_5'] = df['Close'].rolling(window=5).mean()
-            df['SMA_10'] = df['Close'].rolling(window=10).mean()
-            df['SMA_20'] = df['Close'].rolling(window=20).mean()
-            df['SMA_50'] = df['Close'].rolling(window=50).mean()
-            
-            # Exponential moving averages
-            df['EMA_12'] = df['Close'].ewm(span=12).mean()
-            df['EMA_26'] = df['Close'].ewm(span=26).mean()
-            
-            # MACD
-            df['MACD'] = df['EMA_12'] - df['EMA_26']
-            df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
-            df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
-            
-            # RSI
-            delta = df['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['RSI'] = 100 - (100 / (1 + rs))
-            
-            # Bollinger Bands
-            df['BB_Middle'] = df['Close'].rolling(window=20).mean()
-            bb_std = df['Close'].rolling(window=20).std()
-            df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
-            df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
-            df['BB_Width'] = df['BB_Upper'] - df['BB_Lower']
-            df['BB_Position'] = (df['Close'] - df['BB_Lower']) / df['BB_Width']
-            
-            # Volume indicators
-            df['Volume_SMA'] = df['Volume'].rolling(window=20).mean()
-            df['Volume_Ratio'] = df['Volume'] / df['Volume_SMA']
-            
-            # Price change indicators
-            df['Price_Change'] = df['Close'].pct_change()
-            df['High_Low_Ratio'] = (df['High'] - df['Low']) / df['Close']
-            df['Open_Close_Ratio'] = (df['Close'] - df['Open']) / df['Open']
-            
-            return df.fillna(method='bfill').fillna(method='ffill')
-            
+            return add_realtime_indicators(df)
         except Exception as e:
             logger.error(f"Error adding technical indicators: {str(e)}")
             return df
     
-    def prepare_lstm_data(self, data: pd.DataFrame, symbol: str) -> Tuple[np.ndarray, np.ndarray, MinMaxScaler]:
+    def prepare_lstm_data(self, data: pd.DataFrame, symbol: str) -> Tuple[np.ndarray, np.ndarray, 'preprocessing.MinMaxScaler']:
         """Prepare data for LSTM training"""
         try:
-            # Select features for LSTM
-            feature_columns = [
-                'Close', 'Volume', 'SMA_5', 'SMA_10', 'SMA_20', 
-                'RSI', 'MACD', 'BB_Position', 'Volume_Ratio', 'Price_Change'
-            ]
-            
             # Filter available columns
-            available_columns = [col for col in feature_columns if col in data.columns]
+            available_columns = [col for col in LSTM_FEATURES if col in data.columns]
             
             if not available_columns:
                 logger.error(f"No valid features found for {symbol}")
@@ -166,16 +126,11 @@ class RealTimeMLTrainer:
             dataset = data[available_columns].values
             
             # Scale the data
-            scaler = MinMaxScaler(feature_range=(0, 1))
+            scaler = preprocessing.MinMaxScaler(feature_range=(0, 1))
             scaled_data = scaler.fit_transform(dataset)
             
-            # Create sequences
-            X, y = [], []
-            for i in range(self.lookback_days, len(scaled_data) - self.prediction_days + 1):
-                X.append(scaled_data[i-self.lookback_days:i])
-                y.append(scaled_data[i:i+self.prediction_days, 0])  # Predict Close price
-            
-            X, y = np.array(X), np.array(y)
+            # Strided window views; targets are the next prediction_days Close values
+            X, y = horizon_sequences(scaled_data, 0, self.lookback_days, self.prediction_days)
             
             # Save scaler
             scaler_path = os.path.join(self.scalers_dir, f"{symbol}_scaler.pkl")
@@ -188,7 +143,7 @@ class RealTimeMLTrainer:
             logger.error(f"Error preparing LSTM data for {symbol}: {str(e)}")
             return None, None, None
     
-    def train_lstm_model(self, symbol: str, X: np.ndarray, y: np.ndarray) -> Optional[tf.keras.Model]:
+    def train_lstm_model(self, symbol: str, X: np.ndarray, y: np.ndarray) -> Optional['tf.keras.Model']:
         """Train LSTM model for price prediction"""
         try:
             if X is None or y is None:
@@ -200,18 +155,19 @@ class RealTimeMLTrainer:
             y_train, y_test = y[:train_size], y[train_size:]
             
             # Build LSTM model
-            model = Sequential([
-                LSTM(50, return_sequences=True, input_shape=(X.shape[1], X.shape[2])),
-                Dropout(0.2),
-                LSTM(50, return_sequences=True),
-                Dropout(0.2),
-                LSTM(50, return_sequences=False),
-                Dropout(0.2),
-                Dense(25),
-                Dense(self.prediction_days)
+            layers = tf.keras.layers
+            model = tf.keras.models.Sequential([
+                layers.LSTM(50, return_sequences=True, input_shape=(X.shape[1], X.shape[2])),
+                layers.Dropout(0.2),
+                layers.LSTM(50, return_sequences=True),
+                layers.Dropout(0.2),
+                layers.LSTM(50, return_sequences=False),
+                layers.Dropout(0.2),
+                layers.Dense(25),
+                layers.Dense(self.prediction_days)
             ])
             
-            model.compile(optimizer=Adam(learning_rate=0.001), loss='mean_squared_error')
+            model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=0.001), loss='mean_squared_error')
             
             # Train model
             history = model.fit(
@@ -224,14 +180,14 @@ class RealTimeMLTrainer:
             
             # Test model
             predictions = model.predict(X_test)
-            mse = mean_squared_error(y_test.flatten(), predictions.flatten())
+            mse = metrics.mean_squared_error(y_test.flatten(), predictions.flatten())
             
             # Save model
             model_path = os.path.join(self.models_dir, f"{symbol}_lstm.keras")
             model.save(model_path)
             
-            # Cache model
-            self.model_cache[f"{symbol}_lstm"] = model
+            # Serving pool reloads the new weights on next use
+            inference_service.models.discard(symbol)
             
             logger.info(f"LSTM model trained for {symbol}, MSE: {mse:.6f}")
             return model
@@ -243,22 +199,14 @@ class RealTimeMLTrainer:
     def prepare_rf_data(self, data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
         """Prepare data for Random Forest training"""
         try:
-            # Select features
-            feature_columns = [
-                'SMA_5', 'SMA_10', 'SMA_20', 'SMA_50',
-                'EMA_12', 'EMA_26', 'MACD', 'RSI',
-                'BB_Position', 'BB_Width', 'Volume_Ratio',
-                'High_Low_Ratio', 'Open_Close_Ratio'
-            ]
-            
-            available_columns = [col for col in feature_columns if col in data.columns]
+            available_columns = [col for col in RF_FEATURES if col in data.columns]
             
             if not available_columns:
                 logger.error("No valid features found for Random Forest")
                 return None, None
             
             # Prepare features and targets
-            X = data[available_columns].fillna(method='bfill').fillna(method='ffill').values[:-self.prediction_days]
+            X = data[available_columns].bfill().ffill().values[:-self.prediction_days]
             
             # Target: direction of price movement (up/down)
             future_prices = data['Close'].shift(-self.prediction_days)
@@ -277,7 +225,7 @@ class RealTimeMLTrainer:
             logger.error(f"Error preparing RF data: {str(e)}")
             return None, None
     
-    def train_rf_model(self, symbol: str, X: np.ndarray, y: np.ndarray) -> Optional[RandomForestClassifier]:
+    def train_rf_model(self, symbol: str, X: np.ndarray, y: np.ndarray) -> Optional['ensemble.RandomForestClassifier']:
         """Train Random Forest model for direction prediction"""
         try:
             if X is None or y is None:
@@ -289,24 +237,24 @@ class RealTimeMLTrainer:
             y_train, y_test = y[:train_size], y[train_size:]
             
             # Train Random Forest
-            model = RandomForestClassifier(
+            model = ensemble.RandomForestClassifier(
                 n_estimators=self.rf_estimators,
                 random_state=42,
-                n_jobs=-1
+                n_jobs=model_threads()  # stays within the pool's per-worker thread cap
             )
             
             model.fit(X_train, y_train)
             
             # Test model
             predictions = model.predict(X_test)
-            accuracy = accuracy_score(y_test, predictions)
+            accuracy = metrics.accuracy_score(y_test, predictions)
             
             # Save model
             model_path = os.path.join(self.models_dir, f"{symbol}_rf.pkl")
             joblib.dump(model, model_path)
             
-            # Cache model
-            self.model_cache[f"{symbol}_rf"] = model
+            # Serving pool reloads the new model on next use
+            inference_service.models.discard(symbol)
             
             logger.info(f"RF model trained for {symbol}, Accuracy: {accuracy:.4f}")
             return model
@@ -366,29 +314,28 @@ class RealTimeMLTrainer:
                 'timestamp': datetime.now().isoformat()
             }
     
-    def train_multiple_symbols(self, symbols: List[str]) -> Dict[str, Any]:
-        """Train models for multiple symbols"""
+    def train_multiple_symbols(self, symbols: List[str], workers: Optional[int] = None,
+                               progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Train models for multiple symbols across a process pool"""
         results = {
             'training_started': datetime.now().isoformat(),
             'symbols': symbols,
             'results': {}
         }
         
-        for symbol in symbols:
-            try:
-                result = self.train_symbol(symbol)
-                results['results'][symbol] = result
-                
-                # Small delay between trainings
-                import time
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Error in batch training for {symbol}: {str(e)}")
-                results['results'][symbol] = {
-                    'success': False,
-                    'error': str(e)
-                }
+        # Top up daily bars in one batched download so workers only read the store
+        try:
+            ohlcv_store.refresh(symbols)
+        except Exception as e:
+            logger.warning(f"OHLCV prefetch before training failed: {str(e)}")
+        
+        workers = worker_count(len(symbols), workers)
+        task = self.train_symbol if workers == 1 else _train_symbol_task
+        results['workers'] = workers
+        results['results'] = run_parallel(task, symbols, workers, progress_callback=progress_callback)
+        for symbol, result in results['results'].items():
+            if result.get('success'):
+                self.last_training[symbol] = datetime.fromisoformat(result['timestamp'])
         
         # Summary
         successful = sum(1 for r in results['results'].values() if r.get('success'))
@@ -402,124 +349,20 @@ class RealTimeMLTrainer:
         return results
     
     def get_realtime_predictions(self, symbol: str) -> Dict[str, Any]:
-        """Get real-time predictions for a symbol"""
+        """Get predictions for a symbol from the shared batched inference service"""
         try:
-            # Load models if not cached
-            if f"{symbol}_lstm" not in self.model_cache:
-                lstm_path = os.path.join(self.models_dir, f"{symbol}_lstm.keras")
-                if os.path.exists(lstm_path):
-                    self.model_cache[f"{symbol}_lstm"] = tf.keras.models.load_model(lstm_path)
-            
-            if f"{symbol}_rf" not in self.model_cache:
-                rf_path = os.path.join(self.models_dir, f"{symbol}_rf.pkl")
-                if os.path.exists(rf_path):
-                    self.model_cache[f"{symbol}_rf"] = joblib.load(rf_path)
-            
-            # Get fresh data
-            data = self.fetch_realtime_training_data(symbol, period="1y")
-            
-            if data.empty:
-                return {'error': 'No data available for predictions'}
-            
-            predictions = {
-                'symbol': symbol,
-                'timestamp': datetime.now().isoformat(),
-                'data_freshness': 'real-time',
-                'last_price': float(data['Close'].iloc[-1])
-            }
-            
-            # LSTM predictions
-            if f"{symbol}_lstm" in self.model_cache:
-                lstm_predictions = self._get_lstm_predictions(symbol, data)
-                predictions.update(lstm_predictions)
-            
-            # RF predictions
-            if f"{symbol}_rf" in self.model_cache:
-                rf_predictions = self._get_rf_predictions(symbol, data)
-                predictions.update(rf_predictions)
-            
-            return predictions
-            
+            return inference_service.predict(symbol)
         except Exception as e:
             logger.error(f"Error getting predictions for {symbol}: {str(e)}")
             return {'error': str(e)}
-    
-    def _get_lstm_predictions(self, symbol: str, data: pd.DataFrame) -> Dict[str, Any]:
-        """Get LSTM model predictions"""
-        try:
-            model = self.model_cache[f"{symbol}_lstm"]
-            scaler_path = os.path.join(self.scalers_dir, f"{symbol}_scaler.pkl")
-            
-            if not os.path.exists(scaler_path):
-                return {}
-            
-            scaler = joblib.load(scaler_path)
-            
-            # Prepare recent data
-            feature_columns = [
-                'Close', 'Volume', 'SMA_5', 'SMA_10', 'SMA_20', 
-                'RSI', 'MACD', 'BB_Position', 'Volume_Ratio', 'Price_Change'
-            ]
-            
-            available_columns = [col for col in feature_columns if col in data.columns]
-            recent_data = data[available_columns].tail(self.lookback_days).values
-            
-            scaled_data = scaler.transform(recent_data)
-            X = scaled_data.reshape(1, self.lookback_days, len(available_columns))
-            
-            # Make prediction
-            lstm_pred = model.predict(X)[0]
-            
-            # Inverse transform predictions
-            dummy_array = np.zeros((len(lstm_pred), len(available_columns)))
-            dummy_array[:, 0] = lstm_pred
-            inverse_pred = scaler.inverse_transform(dummy_array)[:, 0]
-            
-            current_price = data['Close'].iloc[-1]
-            
-            return {
-                'lstm_predictions': inverse_pred.tolist(),
-                'lstm_direction': 'UP' if inverse_pred[-1] > current_price else 'DOWN',
-                'lstm_confidence': min(abs((inverse_pred[-1] - current_price) / current_price) * 100, 100)
-            }
-            
-        except Exception as e:
-            logger.error(f"LSTM prediction error for {symbol}: {str(e)}")
-            return {}
-    
-    def _get_rf_predictions(self, symbol: str, data: pd.DataFrame) -> Dict[str, Any]:
-        """Get Random Forest predictions"""
-        try:
-            model = self.model_cache[f"{symbol}_rf"]
-            
-            # Prepare recent data
-            feature_columns = [
-                'SMA_5', 'SMA_10', 'SMA_20', 'SMA_50',
-                'EMA_12', 'EMA_26', 'MACD', 'RSI',
-                'BB_Position', 'BB_Width', 'Volume_Ratio',
-                'High_Low_Ratio', 'Open_Close_Ratio'
-            ]
-            
-            available_columns = [col for col in feature_columns if col in data.columns]
-            recent_features = data[available_columns].tail(1).fillna(method='bfill').values
-            
-            # Make prediction
-            rf_pred = model.predict(recent_features)[0]
-            rf_proba = model.predict_proba(recent_features)[0]
-            
-            return {
-                'rf_direction': 'UP' if rf_pred == 1 else 'DOWN',
-                'rf_confidence': max(rf_proba) * 100,
-                'rf_probability_up': rf_proba[1] * 100 if len(rf_proba) > 1 else 50.0
-            }
-            
-        except Exception as e:
-            logger.error(f"RF prediction error for {symbol}: {str(e)}")
-            return {}
 
 # Global trainer instance
 realtime_trainer = RealTimeMLTrainer()
 
+def _train_symbol_task(symbol: str) -> Dict[str, Any]:
+    """Pool task: trains on the worker process's own trainer instance"""
+    return realtime_trainer.train_symbol(symbol)
+
 def train_realtime_models(symbols: List[str] = None) -> Dict[str, Any]:
     """Train models with real-time data"""
     if symbols is None:
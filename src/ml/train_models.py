@@ -28,9 +28,23 @@ except ImportError:
 
 from src.utils.file_utils import load_json_safe, save_json_safe
 from src.data.fetch_historical_data import HistoricalDataFetcher
+from src.data.ohlcv_store import ohlcv_store
+from src.ml.training_pool import ProgressCallback, iter_parallel, worker_count
+from src.ml.windowing import next_day_direction, next_value_sequences, tail_features
 
 logger = logging.getLogger(__name__)
 
+# Random Forest inputs: 5-day means / latest values of the indicator columns
+RF_FEATURE_SPEC = (
+    ('ATR', 'mean', 0),
+    ('RSI', 'last', 50),
+    ('Volume_Ratio', 'mean', 1),
+    ('Volatility', 'mean', 0),
+    ('Price_vs_MA20', 'last', 0),
+    ('Momentum_5d', 'mean', 0),
+    ('Momentum_20d', 'mean', 0),
+)
+
 class ModelTrainer:
     """Enhanced model training pipeline with 5-year data support"""
 
@@ -218,15 +232,9 @@ class ModelTrainer:
             # Scale features
             scaled_features = self.scaler.fit_transform(df_clean)
 
-            # Create sequences
-            X, y = [], []
-            for i in range(lookback_window, len(scaled_features)):
-                X.append(scaled_features[i-lookback_window:i])
-                # Predict next day's close price (normalized)
-                close_idx = available_cols.index('Close') if 'Close' in available_cols else 3
-                y.append(scaled_features[i, close_idx])
-
-            return np.array(X), np.array(y)
+            # Strided window views: predict next day's close price (normalized)
+            close_idx = available_cols.index('Close') if 'Close' in available_cols else 3
+            return next_value_sequences(scaled_features, close_idx, lookback_window)
 
         except Exception as e:
             logger.error(f"Error preparing LSTM data: {str(e)}")
@@ -239,34 +247,13 @@ class ModelTrainer:
                 logger.warning("Scikit-learn not available, skipping RF data preparation")
                 return None, None
 
-            # Calculate features for each day
-            features = []
-            targets = []
-
+            # Feature row t summarizes the 30-day window ending the day before t
             window_size = 30
-            for i in range(window_size, len(df) - 1):
-                window_data = df.iloc[i-window_size:i]
-
-                # Extract features
-                feature_vector = [
-                    window_data['ATR'].tail(5).mean() if 'ATR' in window_data.columns else 0,
-                    window_data['RSI'].iloc[-1] if 'RSI' in window_data.columns else 50,
-                    window_data['Volume_Ratio'].tail(5).mean() if 'Volume_Ratio' in window_data.columns else 1,
-                    window_data['Volatility'].tail(5).mean() if 'Volatility' in window_data.columns else 0,
-                    window_data['Price_vs_MA20'].iloc[-1] if 'Price_vs_MA20' in window_data.columns else 0,
-                    window_data['Momentum_5d'].tail(5).mean() if 'Momentum_5d' in window_data.columns else 0,
-                    window_data['Momentum_20d'].tail(5).mean() if 'Momentum_20d' in window_data.columns else 0,
-                ]
-
-                # Target: next day direction (1 = up, 0 = down)
-                current_price = df.iloc[i]['Close']
-                next_price = df.iloc[i + 1]['Close']
-                direction = 1 if next_price > current_price else 0
-
-                features.append(feature_vector)
-                targets.append(direction)
-
-            return np.array(features), np.array(targets)
+            features = tail_features(df, RF_FEATURE_SPEC, tail=5)
+            rows = np.arange(window_size, len(df) - 1)
+
+            # Target: next day direction (1 = up, 0 = down)
+            return features[rows - 1], next_day_direction(df['Close'].to_numpy(dtype=float), rows)
 
         except Exception as e:
             logger.error(f"Error preparing RF data: {str(e)}")
@@ -362,6 +349,20 @@ class ModelTrainer:
             logger.error(f"Error training RF for {symbol}: {str(e)}")
             return {'success': False, 'error': str(e)}
 
+    def load_training_history(self, symbol: str, normalized_symbol: str) -> Optional[pd.DataFrame]:
+        """Load history from the OHLCV store, importing the legacy CSV once if needed"""
+        if not ohlcv_store.info(normalized_symbol)['rows']:
+            csv_paths = [os.path.join(self.data_dir, f"{name}.csv") for name in (normalized_symbol, symbol)]
+            csv_path = next((path for path in csv_paths if os.path.exists(path)), None)
+            if csv_path:
+                ohlcv_store.import_csv(normalized_symbol, csv_path)
+            else:
+                # Fetch fresh data (the fetcher writes it to the store)
+                return self.data_fetcher.fetch_historical_data(symbol)
+
+        df = ohlcv_store.read(normalized_symbol)
+        return df.reset_index() if not df.empty else None
+
     def train_single_stock(self, symbol: str, data_path: Optional[str] = None) -> Dict:
         """Train models for a single stock"""
         try:
@@ -369,17 +370,15 @@ class ModelTrainer:
 
             # Normalize symbol if needed
             normalized_symbol = self.symbol_mapping.get(symbol, symbol)
-            effective_data_path = data_path if data_path else os.path.join(self.data_dir, f"{normalized_symbol}.csv")
 
             # Load data
-            if os.path.exists(effective_data_path):
-                df = pd.read_csv(effective_data_path)
+            if data_path and os.path.exists(data_path):
+                df = pd.read_csv(data_path)
                 # Convert Date column to datetime if needed
                 if 'Date' in df.columns:
                     df['Date'] = pd.to_datetime(df['Date'])
             else:
-                # Fetch fresh data
-                df = self.data_fetcher.fetch_historical_data(symbol)
+                df = self.load_training_history(symbol, normalized_symbol)
 
             if df is None:
                 logger.error(f"No data available for {symbol}")
@@ -432,14 +431,20 @@ class ModelTrainer:
             return results
 
         except FileNotFoundError:
-            logger.error(f"Data file not found for {symbol} at {effective_data_path}")
+            logger.error(f"Data file not found for {symbol} at {data_path or f'OHLCV store ({normalized_symbol})'}")
             return {'success': False, 'error': 'Data file not found', 'symbol': symbol}
         except Exception as e:
             logger.error(f"Error training {symbol}: {str(e)}")
             return {'success': False, 'error': str(e), 'symbol': symbol}
 
-    def train_all_models(self) -> Dict:
-        """Train models for all tracked stocks"""
+    def train_all_models(self, symbols: Optional[List[str]] = None, workers: Optional[int] = None,
+                         progress_callback: Optional[ProgressCallback] = None) -> Dict:
+        """Train models for all tracked stocks across a process pool
+
+        Symbols default to every CSV in the historical data directory. Results
+        stream back per symbol (progress_callback(symbol, result, done, total))
+        and the KPI registry is written once when the batch finishes.
+        """
         logger.info("🚀 Starting comprehensive model training")
 
         results = {
@@ -450,10 +455,11 @@ class ModelTrainer:
 
         # First, get list of stocks to train (from existing CSV files or predefined list)
         try:
-            # Get symbols from existing CSV files
-            if os.path.exists(self.data_dir):
-                csv_files = [f for f in os.listdir(self.data_dir) if f.endswith('.csv')]
-                symbols_to_train = [f.replace('.csv', '') for f in csv_files][:20]  # Limit to first 20
+            if symbols is not None:
+                symbols_to_train = list(symbols)
+            elif os.path.exists(self.data_dir) and any(f.endswith('.csv') for f in os.listdir(self.data_dir)):
+                # Get symbols from existing CSV files
+                symbols_to_train = sorted(f.replace('.csv', '') for f in os.listdir(self.data_dir) if f.endswith('.csv'))
             else:
                 # Default stock list if no CSV files exist
                 symbols_to_train = ['RELIANCE', 'TCS', 'INFY', 'HDFCBANK', 'ICICIBANK', 'SBIN', 'BHARTIARTL', 'ITC', 'HINDUNILVR', 'KOTAKBANK']
@@ -461,30 +467,28 @@ class ModelTrainer:
             logger.info(f"Training models for {len(symbols_to_train)} stocks.")
         except Exception as e:
             logger.error(f"Failed to get stock symbols: {str(e)}")
-            results['summary']['failed'] = 20  # Assume default count failed
             return results
         results['summary']['total'] = len(symbols_to_train)
 
-        for symbol in symbols_to_train:
-            try:
-                # Construct the expected data path using the normalized symbol
-                normalized_symbol = self.symbol_mapping.get(symbol, symbol)
-                data_path = os.path.join(self.data_dir, f"{normalized_symbol}.csv")
-
-                stock_results = self.train_single_stock(symbol, data_path)
-                results['stocks'][symbol] = stock_results
+        # One worker trains inline on this instance; more fan out to per-process trainers
+        workers = worker_count(len(symbols_to_train), workers)
+        task = self.train_single_stock if workers == 1 else _train_symbol_task
+        results['workers'] = workers
 
-                # Update summary based on actual training success
-                if stock_results.get('lstm', {}).get('success') or stock_results.get('rf', {}).get('success'):
-                    results['summary']['successful'] += 1
-                else:
-                    results['summary']['failed'] += 1
+        for symbol, stock_results in iter_parallel(task, symbols_to_train, workers):
+            results['stocks'][symbol] = stock_results
 
-            except Exception as e:
-                logger.error(f"Critical error in training pipeline for {symbol}: {str(e)}")
-                results['summary']['failed'] += 1
-                results['stocks'][symbol] = {'success': False, 'error': str(e), 'symbol': symbol}
+            # Update summary based on actual training success
+            trained = stock_results.get('lstm', {}).get('success') or stock_results.get('rf', {}).get('success')
+            results['summary']['successful' if trained else 'failed'] += 1
 
+            done = len(results['stocks'])
+            logger.info(f"Training progress {done}/{len(symbols_to_train)}: {symbol} {'ok' if trained else 'failed'}")
+            if progress_callback is not None:
+                try:
+                    progress_callback(symbol, stock_results, done, len(symbols_to_train))
+                except Exception as e:
+                    logger.warning(f"Training progress callback failed for {symbol}: {e}")
 
         results['training_end'] = datetime.now().isoformat()
 
@@ -531,6 +535,17 @@ class ModelTrainer:
         except Exception as e:
             logger.error(f"Error updating model KPI: {str(e)}")
 
+_worker_trainer: Optional[ModelTrainer] = None
+
+
+def _train_symbol_task(symbol: str) -> Dict:
+    """Pool task: one ModelTrainer per worker process, reused for every symbol it receives"""
+    global _worker_trainer
+    if _worker_trainer is None:
+        _worker_trainer = ModelTrainer()
+    return _worker_trainer.train_single_stock(symbol)
+
+
 def main():
     """Main training function"""
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
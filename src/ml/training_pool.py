@@ -0,0 +1,137 @@
+"""
+Parallel Training Pool
+
+Fans per-symbol training jobs out over worker processes:
+1. Worker count follows the CPUs this process may run on (sched_getaffinity),
+   not the host total, so containers and pinned jobs are not oversubscribed
+2. Each worker caps TF / BLAS / OpenMP thread pools before any model library
+   is imported, so N workers use ~N x threads cores instead of N x all cores;
+   estimators with their own thread pools take n_jobs=model_threads()
+3. Results stream back as each symbol finishes; callers aggregate them and
+   write registries once at the end
+
+Workers are spawned (not forked) so TensorFlow state is never copied into a
+child. Task functions must be module-level so they can be pickled.
+"""
+
+import os
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from src.common_repository.config.runtime import TRAINING_WORKERS, TRAINING_THREADS_PER_WORKER
+from src.common_repository.utils.telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+THREAD_ENV_VARS = (
+    'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'NUMEXPR_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS', 'TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS',
+)
+
+ProgressCallback = Callable[[str, Dict[str, Any], int, int], None]
+
+# Thread cap of this process when it is a pool worker (set by the pool initializer)
+_worker_threads: Optional[int] = None
+
+
+def available_cpus() -> int:
+    """CPUs this process is allowed to run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_count(jobs: int, requested: Optional[int] = None,
+                 threads_per_worker: int = TRAINING_THREADS_PER_WORKER) -> int:
+    """Workers for a batch: the configured count, or every allowed CPU but one, never more than jobs"""
+    requested = TRAINING_WORKERS if requested is None else requested
+    if requested <= 0:
+        requested = max(1, (available_cpus() - 1) // max(1, threads_per_worker))
+    return max(1, min(requested, jobs))
+
+
+def limit_threads(threads: int):
+    """Cap native thread pools; must run before numpy / sklearn / tensorflow are imported"""
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+
+def _init_worker(threads: int):
+    global _worker_threads
+    _worker_threads = threads
+    limit_threads(threads)
+
+
+def model_threads() -> int:
+    """n_jobs for estimators: the pool worker's thread cap, else TRAINING_THREADS_PER_WORKER"""
+    return max(1, _worker_threads or TRAINING_THREADS_PER_WORKER)
+
+
+def _run_task(task: Callable[[str], Dict[str, Any]], symbol: str) -> Tuple[Dict[str, Any], float]:
+    start_time = time.time()
+    try:
+        result = task(symbol)
+    except Exception as e:
+        result = {'success': False, 'error': str(e), 'symbol': symbol}
+    return result, time.time() - start_time
+
+
+def iter_parallel(task: Callable[[str], Dict[str, Any]], symbols: Iterable[str],
+                  workers: Optional[int] = None,
+                  threads_per_worker: int = TRAINING_THREADS_PER_WORKER) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (symbol, result) as each job finishes
+
+    A single worker runs jobs inline in this process (no pool, no pickling).
+    A job that raises, or whose worker dies, yields a {'success': False} result.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return
+    workers = worker_count(len(symbols), workers, threads_per_worker)
+    logger.info(f"Training {len(symbols)} symbols on {workers} worker(s) x {threads_per_worker} thread(s)")
+    telemetry.set_gauge('training.workers', workers)
+
+    if workers == 1:
+        for symbol in symbols:
+            result, elapsed = _run_task(task, symbol)
+            telemetry.record_histogram('training.symbol_sec', elapsed)
+            yield symbol, result
+        return
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(threads_per_worker,)) as pool:
+        futures = {pool.submit(_run_task, task, symbol): symbol for symbol in symbols}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                result, elapsed = future.result()
+                telemetry.record_histogram('training.symbol_sec', elapsed)
+            except BrokenProcessPool as e:
+                telemetry.increment('training.worker_crashes')
+                result = {'success': False, 'error': f"Training worker died: {e}", 'symbol': symbol}
+            except Exception as e:
+                result = {'success': False, 'error': str(e), 'symbol': symbol}
+            yield symbol, result
+
+
+def run_parallel(task: Callable[[str], Dict[str, Any]], symbols: Iterable[str],
+                 workers: Optional[int] = None, threads_per_worker: int = TRAINING_THREADS_PER_WORKER,
+                 progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Dict[str, Any]]:
+    """Collect every job's result keyed by symbol, reporting progress as they land"""
+    symbols = list(dict.fromkeys(symbols))
+    results = {}
+    for symbol, result in iter_parallel(task, symbols, workers, threads_per_worker):
+        results[symbol] = result
+        if progress_callback is not None:
+            try:
+                progress_callback(symbol, result, len(results), len(symbols))
+            except Exception as e:
+                logger.warning(f"Training progress callback failed for {symbol}: {e}")
+    return results
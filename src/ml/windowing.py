@@ -0,0 +1,86 @@
+"""
+Sliding-Window Feature Builder
+
+Shared, loop-free construction of model training inputs:
+1. LSTM sequences are strided views over the scaled feature matrix
+   (sliding_window_view), so (samples x lookback x features) tensors cost
+   no memory beyond the base array
+2. Multi-step targets are windows over the target column the same way
+3. RF "last N rows" statistics are rolling-aggregate columns computed once
+   per frame; a sample ending at row t just indexes row t
+
+Views are read-only; copy before writing into them.
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# (column, statistic, default): 'mean' averages the last `tail` rows, 'last' takes the row itself
+FeatureSpec = Sequence[Tuple[str, str, float]]
+
+
+def lstm_windows(values: np.ndarray, lookback: int, step: int = 1) -> np.ndarray:
+    """(windows, lookback, features) view; window k covers rows [k*step, k*step + lookback)"""
+    values = np.asarray(values)
+    if values.ndim == 1:
+        values = values[:, None]
+    if len(values) < lookback:
+        return np.empty((0, lookback, values.shape[1]), dtype=values.dtype)
+    return sliding_window_view(values, lookback, axis=0).transpose(0, 2, 1)[::step]
+
+
+def next_value_sequences(values: np.ndarray, target_col: int, lookback: int,
+                         step: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """X[k] = rows [i - lookback, i), y[k] = values[i, target_col] for i = lookback, lookback + step, ..."""
+    values = np.asarray(values)
+    if len(values) <= lookback:
+        return lstm_windows(values[:0], lookback), values[:0, target_col]
+    X = lstm_windows(values[:-1], lookback, step)
+    y = values[lookback::step, target_col]
+    return X, y
+
+
+def horizon_sequences(values: np.ndarray, target_col: int, lookback: int,
+                      horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+    """X[k] = rows [i - lookback, i), y[k] = values[i:i + horizon, target_col]"""
+    values = np.asarray(values)
+    samples = len(values) - lookback - horizon + 1
+    if samples <= 0:
+        return lstm_windows(values[:0], lookback), np.empty((0, horizon), dtype=values.dtype)
+    X = lstm_windows(values, lookback)[:samples]
+    y = sliding_window_view(values[lookback:, target_col], horizon)[:samples]
+    return X, y
+
+
+def tail_features(frame: pd.DataFrame, spec: FeatureSpec, tail: int = 5) -> np.ndarray:
+    """(rows, len(spec)) matrix where row t summarizes each column over the rows ending at t
+
+    Missing columns and NaN statistics take the spec default.
+    """
+    columns = []
+    for column, statistic, default in spec:
+        if column not in frame.columns:
+            columns.append(np.full(len(frame), float(default)))
+            continue
+        series = pd.to_numeric(frame[column], errors='coerce').reset_index(drop=True)
+        if statistic == 'mean':
+            series = series.rolling(tail, min_periods=1).mean()
+        columns.append(series.fillna(default).to_numpy(dtype=float))
+    return np.column_stack(columns) if columns else np.empty((len(frame), 0))
+
+
+def next_day_direction(close: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """1 where close[t + 1] > close[t] for each t in rows, else 0"""
+    close = np.asarray(close, dtype=float)
+    return (close[rows + 1] > close[rows]).astype(int)
+
+
+def window_end_rows(length: int, window_sizes: Sequence[int], step: int,
+                    limit: Optional[int] = None) -> np.ndarray:
+    """End row (exclusive) of every [start, start + size) window for starts 0, step, ... < length - size - 1"""
+    ends = [np.arange(0, max(length - size - 1, 0), step) + size for size in window_sizes]
+    ends = np.concatenate(ends) if ends else np.empty(0, dtype=int)
+    return ends if limit is None else ends[ends < limit]
@@ -7,6 +7,8 @@ from datetime import datetime, timedelta
 from flask import Blueprint, jsonify, request
 import logging
 
+from src.data.quote_snapshot import quote_snapshot
+
 logger = logging.getLogger(__name__)
 
 # Create the main options blueprint
@@ -137,19 +139,14 @@ def get_options_chain(symbol):
     try:
         logger.info(f"🔗 Getting options chain for {symbol}")
 
-        # Get spot price (with fallback if NSE provider unavailable)
+        # Spot price from the quote snapshot table (fallback until the poller has it)
         spot_price = 1500.0  # Default fallback
 
-        if NSEProvider:
-            try:
-                provider = NSEProvider()
-                spot_data = provider.get_live_price(symbol)
-                if spot_data and 'ltp' in spot_data:
-                    spot_price = float(spot_data['ltp'])
-                else:
-                    logger.warning(f"No live spot price for {symbol}, using fallback")
-            except Exception as e:
-                logger.warning(f"NSE provider error: {e}, using fallback price")
+        quote = quote_snapshot.get(symbol)
+        if quote and quote['current_price'] > 0:
+            spot_price = float(quote['current_price'])
+        else:
+            logger.warning(f"No snapshot spot price for {symbol} yet, using fallback")
 
         # Use symbol-based consistent pricing as fallback
         symbol_hash = abs(hash(symbol)) % 1000
@@ -216,6 +213,8 @@ def get_options_chain(symbol):
             'strikes': strikes,
             'iv': iv,
             'ivRank': iv_rank,
+            'spotAgeSec': quote['age_sec'] if quote else None,
+            'spotStale': quote['stale'] if quote else True,
             'timestamp': datetime.now().isoformat()
         }
 
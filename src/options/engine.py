@@ -11,6 +11,10 @@ import os
 from datetime import datetime, timedelta
 import logging
 
+import numpy as np
+
+from .pricing import black_scholes, implied_volatility as solve_implied_volatility
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -62,17 +66,13 @@ class OptionsEngine:
         try:
             if T <= 0:
                 return max(0, S - K) if option_type == 'call' else max(0, K - S)
-            
-            d1 = (math.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * math.sqrt(T))
-            d2 = d1 - sigma * math.sqrt(T)
-            
-            if option_type == 'call':
-                price = S * self.norm_cdf(d1) - K * math.exp(-r * T) * self.norm_cdf(d2)
-            else:  # put
-                price = K * math.exp(-r * T) * self.norm_cdf(-d2) - S * self.norm_cdf(-d1)
-            
+
+            price = float(black_scholes(S, K, T, r, sigma, option_type)['price'])
+            if not math.isfinite(price):
+                raise ValueError("non-finite price")
+
             return max(0.01, price)  # Minimum price of 1 paisa
-            
+
         except (ValueError, OverflowError, ZeroDivisionError):
             # Fallback to intrinsic value
             if option_type == 'call':
@@ -85,33 +85,34 @@ class OptionsEngine:
         try:
             if T <= 0:
                 return Greeks(delta=0.0, gamma=0.0, theta=0.0, vega=0.0, rho=0.0)
-            
-            d1 = (math.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * math.sqrt(T))
-            d2 = d1 - sigma * math.sqrt(T)
-            
-            if option_type == 'call':
-                delta = self.norm_cdf(d1)
-                rho = K * T * math.exp(-r * T) * self.norm_cdf(d2) / 100
-            else:  # put
-                delta = -self.norm_cdf(-d1)
-                rho = -K * T * math.exp(-r * T) * self.norm_cdf(-d2) / 100
-            
-            gamma = self.norm_pdf(d1) / (S * sigma * math.sqrt(T))
-            theta = -(S * self.norm_pdf(d1) * sigma / (2 * math.sqrt(T)) + 
-                     r * K * math.exp(-r * T) * self.norm_cdf(d2 if option_type == 'call' else -d2)) / 365
-            vega = S * self.norm_pdf(d1) * math.sqrt(T) / 100
-            
+
+            greeks = black_scholes(S, K, T, r, sigma, option_type)
+
             return Greeks(
-                delta=round(delta, 4),
-                gamma=round(gamma, 6),
-                theta=round(theta, 4),
-                vega=round(vega, 4),
-                rho=round(rho, 4)
+                delta=round(float(greeks['delta']), 4),
+                gamma=round(float(greeks['gamma']), 6),
+                theta=round(float(greeks['theta']), 4),
+                vega=round(float(greeks['vega']), 4),
+                rho=round(float(greeks['rho']), 4)
             )
-            
+
         except (ValueError, OverflowError, ZeroDivisionError):
             return Greeks(delta=0.0, gamma=0.0, theta=0.0, vega=0.0, rho=0.0)
 
+    def price_chain(self, spot, strikes, expiries, vols, option_types='call', rate=None) -> Dict[str, np.ndarray]:
+        """Price and Greeks for a whole chain in one vectorized call
+
+        Inputs broadcast against each other: expiries are in years, vols are
+        decimals and option_types is 'call'/'put' (or CE/PE) per element.
+        """
+        rate = self.risk_free_rate if rate is None else rate
+        return black_scholes(spot, strikes, expiries, rate, vols, option_types)
+
+    def implied_volatility(self, prices, spot, strikes, expiries, option_types='call', rate=None) -> np.ndarray:
+        """Implied volatility for every quote in a chain (NaN where no vol fits the price)"""
+        rate = self.risk_free_rate if rate is None else rate
+        return solve_implied_volatility(prices, spot, strikes, expiries, rate, option_types)
+
     def calculate_strangle_metrics(self, symbol: str, spot: float, call_strike: float, put_strike: float, 
                                  days_to_expiry: int, implied_vol: float = 0.25) -> Dict[str, Any]:
         """Calculate complete strangle strategy metrics"""
@@ -0,0 +1,174 @@
+"""
+Vectorized Black-Scholes pricing
+
+Prices whole option chains in one call:
+1. Inputs broadcast as NumPy arrays (spot, strike, expiry in years, rate, vol)
+2. Price plus delta, gamma, theta, vega and rho as arrays
+3. Implied volatility solver: Newton steps kept inside a bisection bracket
+
+Units follow OptionsEngine: theta per calendar day, vega and rho per 1% move.
+"""
+
+from typing import Dict, Union
+
+import numpy as np
+
+ArrayLike = Union[float, np.ndarray, list]
+
+_SQRT_2PI = np.sqrt(2.0 * np.pi)
+_IV_LOWER = 1e-4
+_IV_UPPER = 5.0
+
+
+def norm_cdf(x: ArrayLike) -> np.ndarray:
+    """Standard normal CDF to double precision (Hart 1968 / West 2005), no scipy needed"""
+    x = np.asarray(x, dtype=float)
+    z = np.abs(x)
+    exponential = np.exp(-0.5 * z * z)
+
+    numerator = 3.52624965998911e-02 * z + 0.700383064443688
+    for coef in (6.37396220353165, 33.912866078383, 112.079291497871,
+                 221.213596169931, 220.206867912376):
+        numerator = numerator * z + coef
+    denominator = 8.83883476483184e-02 * z + 1.75566716318264
+    for coef in (16.064177579207, 86.7807322029461, 296.564248779674,
+                 637.333633378831, 793.826512519948, 440.413735824752):
+        denominator = denominator * z + coef
+    central = exponential * numerator / denominator
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = z + 0.65
+        for coef in (4.0, 3.0, 2.0, 1.0):
+            fraction = z + coef / fraction
+        tail = exponential / fraction / _SQRT_2PI
+
+    lower = np.where(z < 7.07106781186547, central, tail)
+    lower = np.where(z > 37.0, 0.0, lower)
+    result = np.where(x > 0, 1.0 - lower, lower)
+    return np.where(np.isnan(x), np.nan, result)
+
+
+def norm_pdf(x: ArrayLike) -> np.ndarray:
+    x = np.asarray(x, dtype=float)
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def norm_ppf(p: ArrayLike) -> np.ndarray:
+    """Inverse standard normal CDF by Newton iteration on norm_cdf; NaN outside (0, 1)"""
+    p = np.asarray(p, dtype=float)
+    valid = (p > 0) & (p < 1)
+    target = np.where(valid, p, 0.5)
+    x = np.zeros_like(target)
+    for _ in range(50):
+        step = (norm_cdf(x) - target) / np.maximum(norm_pdf(x), 1e-300)
+        x = np.clip(x - step, -38.0, 38.0)
+        if np.all(np.abs(step) < 1e-12):
+            break
+    return np.where(valid, x, np.nan)
+
+
+def _is_call(option_type) -> np.ndarray:
+    """'call'/'CE' -> True, 'put'/'PE' -> False; accepts a scalar, list or bool array"""
+    types = np.asarray(option_type)
+    if types.dtype == bool:
+        return types
+    lowered = np.char.lower(types.astype(str))
+    return (lowered == 'call') | (lowered == 'ce') | (lowered == 'c')
+
+
+def black_scholes(spot: ArrayLike, strike: ArrayLike, expiry: ArrayLike, rate: ArrayLike,
+                  vol: ArrayLike, option_type='call') -> Dict[str, np.ndarray]:
+    """Price and Greeks for every broadcast combination of the inputs
+
+    expiry is in years and vol is a decimal (0.25 for 25%). Expired options
+    are worth intrinsic value with zero Greeks.
+    """
+    S, K, T, r, sigma, is_call = np.broadcast_arrays(
+        np.asarray(spot, dtype=float), np.asarray(strike, dtype=float),
+        np.asarray(expiry, dtype=float), np.asarray(rate, dtype=float),
+        np.asarray(vol, dtype=float), _is_call(option_type))
+
+    live = (T > 0) & (sigma > 0) & (S > 0) & (K > 0)
+    T_live = np.where(live, T, 1.0)
+    sigma_live = np.where(live, sigma, 1.0)
+    S_live = np.where(live, S, 1.0)
+    K_live = np.where(live, K, 1.0)
+
+    sqrt_T = np.sqrt(T_live)
+    vol_sqrt_T = sigma_live * sqrt_T
+    d1 = (np.log(S_live / K_live) + (r + 0.5 * sigma_live ** 2) * T_live) / vol_sqrt_T
+    d2 = d1 - vol_sqrt_T
+    discount = np.exp(-r * T_live)
+    pdf_d1 = norm_pdf(d1)
+    sign = np.where(is_call, 1.0, -1.0)
+    cdf_d1 = norm_cdf(sign * d1)
+    cdf_d2 = norm_cdf(sign * d2)
+
+    price = sign * (S_live * cdf_d1 - K_live * discount * cdf_d2)
+    delta = sign * cdf_d1
+    gamma = pdf_d1 / (S_live * vol_sqrt_T)
+    theta = (-S_live * pdf_d1 * sigma_live / (2 * sqrt_T)
+             - sign * r * K_live * discount * cdf_d2) / 365
+    vega = S_live * pdf_d1 * sqrt_T / 100
+    rho = sign * K_live * T_live * discount * cdf_d2 / 100
+
+    intrinsic = np.maximum(sign * (S - K), 0.0)
+    zero = np.zeros_like(price)
+    return {
+        'price': np.where(live, price, intrinsic),
+        'delta': np.where(live, delta, zero),
+        'gamma': np.where(live, gamma, zero),
+        'theta': np.where(live, theta, zero),
+        'vega': np.where(live, vega, zero),
+        'rho': np.where(live, rho, zero),
+    }
+
+
+def implied_volatility(price: ArrayLike, spot: ArrayLike, strike: ArrayLike, expiry: ArrayLike,
+                       rate: ArrayLike, option_type='call', initial: float = 0.25,
+                       tol: float = 1e-6, max_iter: int = 100) -> np.ndarray:
+    """Implied vol for a whole chain; NaN where the price breaks no-arbitrage bounds
+
+    Each element runs Newton on vega; whenever a step would leave the current
+    [low, high] bracket (or vega vanishes) it bisects instead, so deep ITM/OTM
+    strikes still converge.
+    """
+    P, S, K, T, r, is_call = np.broadcast_arrays(
+        np.asarray(price, dtype=float), np.asarray(spot, dtype=float),
+        np.asarray(strike, dtype=float), np.asarray(expiry, dtype=float),
+        np.asarray(rate, dtype=float), _is_call(option_type))
+
+    discounted_strike = K * np.exp(-r * np.maximum(T, 0.0))
+    lower_bound = np.where(is_call, np.maximum(S - discounted_strike, 0.0),
+                           np.maximum(discounted_strike - S, 0.0))
+    upper_bound = np.where(is_call, S, discounted_strike)
+    valid = (T > 0) & (S > 0) & (K > 0) & (P > lower_bound) & (P < upper_bound)
+
+    low = np.full(P.shape, _IV_LOWER)
+    high = np.full(P.shape, _IV_UPPER)
+    sigma = np.full(P.shape, float(initial))
+    active = valid.copy()
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.nonzero(active)
+        greeks = black_scholes(S[idx], K[idx], T[idx], r[idx], sigma[idx], is_call[idx])
+        diff = greeks['price'] - P[idx]
+
+        converged = np.abs(diff) < tol
+        # Price rises with vol: too expensive -> shrink the upper bound, else raise the lower
+        high[idx] = np.where(diff > 0, sigma[idx], high[idx])
+        low[idx] = np.where(diff < 0, sigma[idx], low[idx])
+
+        vega = greeks['vega'] * 100
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = sigma[idx] - diff / vega
+        inside = (vega > 1e-12) & (newton > low[idx]) & (newton < high[idx])
+        step = np.where(inside, newton, 0.5 * (low[idx] + high[idx]))
+
+        sigma[idx] = np.where(converged, sigma[idx], step)
+        narrow = (high[idx] - low[idx]) < tol
+        active[idx] = ~(converged | narrow)
+
+    return np.where(valid, sigma, np.nan)
@@ -23,6 +23,8 @@ import schedule
 import time
 import threading
 
+from src.common_repository.storage.prediction_log import prediction_log
+
 logger = logging.getLogger(__name__)
 
 class OptimizationAgent:
@@ -677,26 +679,19 @@ class OptimizationAgent:
     def _load_recent_predictions(self, days: int = 7) -> List[Dict]:
         """Load recent prediction data for analysis"""
         try:
-            history_path = "data/tracking/predictions_history.json"
-            if os.path.exists(history_path):
-                with open(history_path, 'r') as f:
-                    data = json.load(f)
-                    predictions = data.get('predictions', [])
-                    
-                    # Filter by date
-                    cutoff_date = datetime.now() - timedelta(days=days)
-                    recent_predictions = []
-                    
-                    for pred in predictions:
-                        try:
-                            pred_date = datetime.fromisoformat(pred.get('timestamp', ''))
-                            if pred_date >= cutoff_date:
-                                recent_predictions.append(pred)
-                        except:
-                            continue
-                    
-                    return recent_predictions
-            return []
+            cutoff_date = datetime.now() - timedelta(days=days)
+            recent_predictions = []
+
+            # The date index narrows to whole days; the timestamp check trims the first one
+            for pred in prediction_log.load(start=cutoff_date):
+                try:
+                    pred_date = datetime.fromisoformat(pred.get('timestamp', ''))
+                    if pred_date >= cutoff_date:
+                        recent_predictions.append(pred)
+                except:
+                    continue
+
+            return recent_predictions
         except Exception as e:
             logger.error(f"Error loading recent predictions: {str(e)}")
             return []
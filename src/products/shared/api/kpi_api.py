@@ -31,16 +31,12 @@ def get_kpi_summary():
                 'error': 'Invalid timeframe'
             }), 400
 
-        # Compute overall KPIs
-        overall_kpis = kpi_service.compute(timeframe=timeframe)
-
-        # Compute by-product KPIs
-        by_product = {}
-        products = ['equities', 'options', 'commodities']
-
-        for product in products:
-            if feature_flags.is_enabled(f'enable_{product}') or product == 'equities':
-                by_product[product] = kpi_service.compute(timeframe=timeframe, product=product)
+        # Compute overall and by-product KPIs from one shared snapshot
+        products = [product for product in ['equities', 'options', 'commodities']
+                    if feature_flags.is_enabled(f'enable_{product}') or product == 'equities']
+        results = kpi_service.compute_all([timeframe], [None] + products)[timeframe]
+        overall_kpis = results['all']
+        by_product = {product: results[product] for product in products}
 
         # Evaluate triggers
         triggers = []
@@ -139,10 +135,9 @@ def recompute_kpis():
 
         # Recompute KPIs
         if scope == 'overall':
-            kpis = kpi_service.compute(timeframe=timeframe)
-            by_product = {}
-            for prod in ['equities', 'options', 'commodities']:
-                by_product[prod] = kpi_service.compute(timeframe=timeframe, product=prod)
+            results = kpi_service.compute_all([timeframe])[timeframe]
+            kpis = results.pop('all')
+            by_product = results
 
             result_data = {
                 'overall': kpis,
@@ -264,10 +259,11 @@ def trigger_goahead_analysis():
         # Get current KPI data
         timeframes = ['3D', '5D', '10D', '15D', '30D']
         all_decisions = []
+        results = kpi_service.compute_all(timeframes, [None])
 
         for timeframe in timeframes:
             try:
-                kpi_result = kpi_service.compute(timeframe)
+                kpi_result = results[timeframe]['all']
                 if kpi_result.get('status') == 'success':
                     kpi_data = {timeframe: kpi_result['metrics']}
                     decisions = goahead_engine.analyze_kpis_and_decide(kpi_data)
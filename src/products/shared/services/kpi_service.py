@@ -6,17 +6,75 @@ Computes prediction quality, financial, and risk KPIs per timeframe
 import json
 import logging
 import os
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 
+import numpy as np
+
 from src.common_repository.storage.json_store import json_store
-from src.common_repository.utils.date_utils import get_ist_now
+from src.common_repository.utils.date_utils import IST, get_ist_now
 from src.common_repository.utils.math_utils import safe_divide
 from src.common_repository.config.feature_flags import feature_flags
 
 logger = logging.getLogger(__name__)
 
+TIMEFRAMES = ["3D", "5D", "10D", "15D", "30D", "All"]
+PRODUCTS = [None, "equities", "options", "commodities"]  # None = overall
+
+def _epoch_seconds(timestamps: List[Any]) -> np.ndarray:
+    """ISO timestamps to epoch seconds (naive ones are IST); NaN where missing or unparseable"""
+    seconds = np.full(len(timestamps), np.nan)
+    for i, value in enumerate(timestamps):
+        if not value:
+            continue
+        try:
+            parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            continue
+        if parsed.tzinfo is None:
+            parsed = IST.localize(parsed)
+        seconds[i] = parsed.timestamp()
+    return seconds
+
+@dataclass
+class KPISnapshot:
+    """Columnar view of prediction and trade history, parsed once per refresh"""
+    pred_time: np.ndarray
+    pred_product: np.ndarray
+    confidence: np.ndarray
+    predicted: np.ndarray
+    actual: np.ndarray
+    trade_time: np.ndarray
+    trade_product: np.ndarray
+    pnl: np.ndarray
+    entry_price: np.ndarray
+    exposure: np.ndarray
+
+    @classmethod
+    def from_records(cls, predictions: List[Dict], trades: List[Dict]) -> 'KPISnapshot':
+        predicted = [pred.get('predicted_direction', 'HOLD') for pred in predictions]
+        return cls(
+            pred_time=_epoch_seconds([pred.get('timestamp') for pred in predictions]),
+            pred_product=np.array([(pred.get('product') or '').lower() for pred in predictions], dtype=object),
+            confidence=np.array([pred.get('confidence', 50) for pred in predictions], dtype=float) / 100.0,
+            predicted=np.array(predicted, dtype=object),
+            actual=np.array([pred.get('actual_direction', direction)
+                             for pred, direction in zip(predictions, predicted)], dtype=object),
+            trade_time=_epoch_seconds([trade.get('timestamp') for trade in trades]),
+            trade_product=np.array([(trade.get('product') or '').lower() for trade in trades], dtype=object),
+            pnl=np.array([trade.get('pnl', 0.0) for trade in trades], dtype=float),
+            entry_price=np.array([trade.get('entry_price', 100.0) for trade in trades], dtype=float),
+            exposure=np.array([trade.get('exposure', 0.0) for trade in trades], dtype=float)
+        )
+
+    @classmethod
+    def load(cls) -> 'KPISnapshot':
+        """Read prediction and trade history once"""
+        return cls.from_records(json_store.load('predictions_history') or [],
+                                json_store.load('trades_history') or [])
+
 @dataclass
 class KPITrigger:
     """Represents a GoAhead trigger"""
@@ -34,6 +92,7 @@ class KPIService:
         self.name = "kpi_service"
         self.timeframes = ["3D", "5D", "10D", "15D", "30D"]
         self.thresholds = self._load_thresholds()
+        self._latest: Tuple[float, Dict] = (0.0, {})
 
     def _load_thresholds(self) -> Dict[str, Any]:
         """Load KPI thresholds from config"""
@@ -55,29 +114,62 @@ class KPIService:
                 "warn_bands": {"pct": 0.1}
             }
 
-    def compute(self, timeframe: str = "All", product: Optional[str] = None) -> Dict[str, Any]:
+    def compute(self, timeframe: str = "All", product: Optional[str] = None,
+                snapshot: Optional[KPISnapshot] = None) -> Dict[str, Any]:
         """Compute KPIs for given timeframe and product"""
-        try:
-            logger.info(f"Computing KPIs for timeframe={timeframe}, product={product}")
+        return self.compute_all([timeframe], [product], snapshot)[timeframe][product or "all"]
 
-            # Load prediction and trade data
-            predictions = self._load_predictions(timeframe, product)
-            trades = self._load_trades(timeframe, product)
+    def compute_all(self, timeframes: Optional[List[str]] = None, products: Optional[List[Optional[str]]] = None,
+                    snapshot: Optional[KPISnapshot] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Compute every timeframe x product cut from one snapshot in one grouped pass
 
-            # Compute KPI categories
-            prediction_kpis = self._compute_prediction_kpis(predictions, timeframe)
-            financial_kpis = self._compute_financial_kpis(trades, timeframe)
-            risk_kpis = self._compute_risk_kpis(trades, timeframe)
+        Returns {timeframe: {product or 'all': result}} with each result shaped like compute().
+        """
+        timeframes = list(timeframes or TIMEFRAMES)
+        products = list(products or PRODUCTS)
+
+        try:
+            logger.info(f"Computing KPIs for {len(timeframes)} timeframes x {len(products)} products")
+            snapshot = snapshot or KPISnapshot.load()
+            cuts = self._compute_cuts(snapshot, timeframes, products)
+        except Exception as e:
+            logger.error(f"Error computing KPIs: {e}")
+            return {timeframe: {product or "all": self._get_empty_kpis(timeframe, product) for product in products}
+                    for timeframe in timeframes}
+
+        results = {}
+        for (timeframe, product), cut in cuts.items():
+            results.setdefault(timeframe, {})[product or "all"] = self._package_kpis(cut, timeframe, product)
+
+        self._latest = (time.time(), results)
+        return results
+
+    def get_all_kpis(self, max_age_sec: int = 900) -> Dict[str, Dict[str, Any]]:
+        """Flat overall KPIs per timeframe, reusing the last compute_all() run while fresh"""
+        computed_at, results = self._latest
+        if time.time() - computed_at > max_age_sec or not all("all" in results.get(tf, {}) for tf in TIMEFRAMES):
+            results = self.compute_all(products=[None])
+
+        flat = {}
+        for timeframe, by_product in results.items():
+            metrics = by_product.get("all", {}).get("metrics", {})
+            flat[timeframe] = {
+                key: value
+                for section in ("prediction_quality", "financial", "risk")
+                for key, value in metrics.get(section, {}).items() if key != "status"
+            }
+            flat[timeframe]["sample_size"] = metrics.get("sample_size", 0)
+        return flat
 
+    def _package_kpis(self, cut: Dict[str, Any], timeframe: str, product: Optional[str]) -> Dict[str, Any]:
+        """Wrap one computed cut with trends and GoAhead decisions"""
+        try:
             # Combine results
             kpis = {
                 "timeframe": timeframe,
                 "product": product or "all",
                 "last_updated": get_ist_now().isoformat(),
-                "prediction_quality": prediction_kpis,
-                "financial": financial_kpis,
-                "risk": risk_kpis,
-                "sample_size": len(predictions)
+                **cut
             }
 
             # Add trend information
@@ -86,7 +178,6 @@ class KPIService:
             # Trigger GoAhead analysis if enabled
             goahead_decisions = []
             try:
-                # from src.common_repository.config.feature_flags import feature_flags # This line is duplicated and not needed here
                 if feature_flags.is_enabled('enable_goahead_triggers'):
                     from src.common_repository.agents.goahead_engine import goahead_engine
 
@@ -111,60 +202,6 @@ class KPIService:
             logger.error(f"Error computing KPIs: {e}")
             return self._get_empty_kpis(timeframe, product)
 
-    def _load_predictions(self, timeframe: str, product: Optional[str]) -> List[Dict]:
-        """Load predictions for KPI calculation"""
-        try:
-            # Load from predictions history or tracking data
-            predictions_data = json_store.load('predictions_history') or []
-
-            # Filter by timeframe and product if specified
-            filtered = []
-            cutoff_date = self._get_timeframe_cutoff(timeframe)
-
-            for pred in predictions_data:
-                if cutoff_date and pred.get('timestamp'):
-                    pred_date = datetime.fromisoformat(pred['timestamp'].replace('Z', '+00:00'))
-                    if pred_date < cutoff_date:
-                        continue
-
-                if product and pred.get('product', '').lower() != product.lower():
-                    continue
-
-                filtered.append(pred)
-
-            return filtered
-
-        except Exception as e:
-            logger.error(f"Error loading predictions: {e}")
-            return []
-
-    def _load_trades(self, timeframe: str, product: Optional[str]) -> List[Dict]:
-        """Load trade data for financial KPIs"""
-        try:
-            # Load from trade history (stubbed for now)
-            trades_data = json_store.load('trades_history') or []
-
-            # Filter similar to predictions
-            filtered = []
-            cutoff_date = self._get_timeframe_cutoff(timeframe)
-
-            for trade in trades_data:
-                if cutoff_date and trade.get('timestamp'):
-                    trade_date = datetime.fromisoformat(trade['timestamp'].replace('Z', '+00:00'))
-                    if trade_date < cutoff_date:
-                        continue
-
-                if product and trade.get('product', '').lower() != product.lower():
-                    continue
-
-                filtered.append(trade)
-
-            return filtered
-
-        except Exception as e:
-            logger.error(f"Error loading trades: {e}")
-            return []
-
     def _get_timeframe_cutoff(self, timeframe: str) -> Optional[datetime]:
         """Get cutoff date for timeframe filtering"""
         if timeframe == "All":
@@ -178,152 +215,201 @@ class KPIService:
 
         return None
 
-    def _compute_prediction_kpis(self, predictions: List[Dict], timeframe: str) -> Dict[str, Any]:
-        """Compute prediction quality KPIs"""
-        if not predictions:
-            return {
-                "brier_score": 0.0,
-                "hit_rate": 0.0,
-                "calibration_error": 0.0,
-                "top_decile_hit_rate": 0.0,
-                "top_decile_edge": 0.0,
-                "status": "insufficient_data"
-            }
-
-        # Calculate Brier Score (simplified)
-        brier_scores = []
-        correct_predictions = 0
-        high_confidence_correct = 0
-        high_confidence_total = 0
-
-        for pred in predictions:
-            confidence = pred.get('confidence', 50) / 100.0
-            actual = pred.get('actual_direction', pred.get('predicted_direction', 'HOLD'))
-            predicted = pred.get('predicted_direction', 'HOLD')
+    def _cut_masks(self, times: np.ndarray, row_products: np.ndarray, timeframes: List[str],
+                   products: List[Optional[str]]) -> np.ndarray:
+        """Row membership for every (timeframe, product) cut, shape (cuts, rows)"""
+        time_masks = []
+        for timeframe in timeframes:
+            cutoff = self._get_timeframe_cutoff(timeframe)
+            if cutoff is None:
+                time_masks.append(np.ones(len(times), dtype=bool))
+            else:
+                # Rows without a timestamp count towards every timeframe
+                with np.errstate(invalid='ignore'):
+                    time_masks.append(np.isnan(times) | (times >= cutoff.timestamp()))
 
-            # Brier score calculation (simplified)
-            if actual in ['BUY', 'SELL'] and predicted in ['BUY', 'SELL']:
-                prob = confidence if predicted == actual else (1 - confidence)
-                outcome = 1 if predicted == actual else 0
-                brier_scores.append((prob - outcome) ** 2)
+        product_masks = [np.ones(len(row_products), dtype=bool) if product is None
+                         else row_products == product.lower() for product in products]
 
-                if predicted == actual:
-                    correct_predictions += 1
+        masks = np.array(time_masks).reshape(len(timeframes), 1, -1) & \
+            np.array(product_masks).reshape(1, len(products), -1)
+        return masks.reshape(len(timeframes) * len(products), -1)
 
-                # Top decile (high confidence predictions)
-                if confidence >= 0.8:
-                    high_confidence_total += 1
-                    if predicted == actual:
-                        high_confidence_correct += 1
+    def _compute_cuts(self, snapshot: KPISnapshot, timeframes: List[str],
+                      products: List[Optional[str]]) -> Dict[Tuple[str, Optional[str]], Dict[str, Any]]:
+        """Prediction, financial and risk KPIs for all cuts at once"""
+        keys = [(timeframe, product) for timeframe in timeframes for product in products]
+        prediction_masks = self._cut_masks(snapshot.pred_time, snapshot.pred_product, timeframes, products)
+        trade_masks = self._cut_masks(snapshot.trade_time, snapshot.trade_product, timeframes, products)
 
-        brier_score = sum(brier_scores) / len(brier_scores) if brier_scores else 0.0
-        hit_rate = correct_predictions / len(predictions) if predictions else 0.0
-        top_decile_hit_rate = safe_divide(high_confidence_correct, high_confidence_total, 0.0)
+        prediction_kpis = self._compute_prediction_kpis(snapshot, prediction_masks)
+        financial_kpis = self._compute_financial_kpis(snapshot, trade_masks)
+        risk_kpis = self._compute_risk_kpis(snapshot, trade_masks)
+        sample_sizes = prediction_masks.sum(axis=1)
 
         return {
-            "brier_score": round(brier_score, 4),
-            "hit_rate": round(hit_rate, 4),
-            "calibration_error": 0.05,  # Stub for now
-            "top_decile_hit_rate": round(top_decile_hit_rate, 4),
-            "top_decile_edge": round(top_decile_hit_rate - hit_rate, 4),
-            "sample_size": len(predictions),
-            "status": "computed"
-        }
-
-    def _compute_financial_kpis(self, trades: List[Dict], timeframe: str) -> Dict[str, Any]:
-        """Compute financial performance KPIs"""
-        if not trades:
-            return {
-                "sharpe_ratio": 0.0,
-                "sortino_ratio": 0.0,
-                "win_loss_expectancy": 0.0,
-                "total_pnl": 0.0,
-                "win_rate": 0.0,
-                "status": "insufficient_data"
+            key: {
+                "prediction_quality": prediction_kpis[i],
+                "financial": financial_kpis[i],
+                "risk": risk_kpis[i],
+                "sample_size": int(sample_sizes[i])
             }
-
-        # Calculate returns and P&L
-        returns = []
-        pnl_values = []
-        wins = 0
-
-        for trade in trades:
-            pnl = trade.get('pnl', 0.0)
-            if pnl != 0:
-                pnl_values.append(pnl)
-                returns.append(pnl / trade.get('entry_price', 100.0))  # Normalized return
-                if pnl > 0:
-                    wins += 1
-
-        if not returns:
-            return self._get_empty_financial_kpis()
-
-        # Sharpe ratio (simplified)
-        avg_return = sum(returns) / len(returns)
-        return_std = (sum((r - avg_return) ** 2 for r in returns) / len(returns)) ** 0.5
-        sharpe = safe_divide(avg_return, return_std, 0.0) * (252 ** 0.5)  # Annualized
-
-        # Sortino ratio (downside deviation only)
-        downside_returns = [r for r in returns if r < 0]
-        downside_std = (sum(r ** 2 for r in downside_returns) / len(downside_returns)) ** 0.5 if downside_returns else 0.0
-        sortino = safe_divide(avg_return, downside_std, 0.0) * (252 ** 0.5)
-
-        return {
-            "sharpe_ratio": round(sharpe, 4),
-            "sortino_ratio": round(sortino, 4),
-            "win_loss_expectancy": round(avg_return, 4),
-            "total_pnl": round(sum(pnl_values), 2),
-            "win_rate": round(wins / len(trades), 4),
-            "avg_return": round(avg_return * 100, 2),
-            "status": "computed"
+            for i, key in enumerate(keys)
         }
 
-    def _compute_risk_kpis(self, trades: List[Dict], timeframe: str) -> Dict[str, Any]:
-        """Compute risk management KPIs"""
-        if not trades:
-            return {
-                "max_drawdown": 0.0,
-                "var_95": 0.0,
-                "var_99": 0.0,
-                "avg_exposure": 0.0,
-                "status": "insufficient_data"
-            }
+    def _compute_prediction_kpis(self, snapshot: KPISnapshot, masks: np.ndarray) -> List[Dict[str, Any]]:
+        """Compute prediction quality KPIs for each cut (row of masks)"""
+        predicted, actual, confidence = snapshot.predicted, snapshot.actual, snapshot.confidence
+
+        # Only BUY/SELL calls with a BUY/SELL outcome are scored
+        scored = ((predicted == 'BUY') | (predicted == 'SELL')) & ((actual == 'BUY') | (actual == 'SELL'))
+        correct = scored & (predicted == actual)
+
+        # Brier score calculation (simplified)
+        prob = np.where(correct, confidence, 1 - confidence)
+        brier = np.where(scored, (prob - correct) ** 2, 0.0)
+        # Top decile (high confidence predictions)
+        high_confidence = scored & (confidence >= 0.8)
+
+        weights = masks.astype(float)
+        totals = masks.sum(axis=1)
+        scored_count = weights @ scored
+        brier_sum = weights @ brier
+        correct_count = weights @ correct
+        high_confidence_total = weights @ high_confidence
+        high_confidence_correct = weights @ (high_confidence & correct)
+
+        results = []
+        for i, total in enumerate(totals):
+            if not total:
+                results.append({
+                    "brier_score": 0.0,
+                    "hit_rate": 0.0,
+                    "calibration_error": 0.0,
+                    "top_decile_hit_rate": 0.0,
+                    "top_decile_edge": 0.0,
+                    "status": "insufficient_data"
+                })
+                continue
 
-        # Calculate drawdowns
-        pnl_values = [trade.get('pnl', 0.0) for trade in trades]
-        cumulative_pnl = []
-        running_sum = 0
-
-        for pnl in pnl_values:
-            running_sum += pnl
-            cumulative_pnl.append(running_sum)
-
-        # Max drawdown
-        max_dd = 0.0
-        peak = 0.0
-        for pnl in cumulative_pnl:
-            peak = max(peak, pnl)
-            drawdown = (peak - pnl) / abs(peak) if peak != 0 else 0.0
-            max_dd = max(max_dd, drawdown)
-
-        # VaR calculation (simplified percentile)
-        if len(pnl_values) >= 20:
-            sorted_pnl = sorted(pnl_values)
-            var_95_idx = int(0.05 * len(sorted_pnl))
-            var_99_idx = int(0.01 * len(sorted_pnl))
-            var_95 = abs(sorted_pnl[var_95_idx]) if var_95_idx < len(sorted_pnl) else 0.0
-            var_99 = abs(sorted_pnl[var_99_idx]) if var_99_idx < len(sorted_pnl) else 0.0
-        else:
-            var_95 = var_99 = 0.0
+            brier_score = safe_divide(brier_sum[i], scored_count[i], 0.0)
+            hit_rate = correct_count[i] / total
+            top_decile_hit_rate = safe_divide(high_confidence_correct[i], high_confidence_total[i], 0.0)
+
+            results.append({
+                "brier_score": round(float(brier_score), 4),
+                "hit_rate": round(float(hit_rate), 4),
+                "calibration_error": 0.05,  # Stub for now
+                "top_decile_hit_rate": round(float(top_decile_hit_rate), 4),
+                "top_decile_edge": round(float(top_decile_hit_rate - hit_rate), 4),
+                "sample_size": int(total),
+                "status": "computed"
+            })
+        return results
+
+    def _compute_financial_kpis(self, snapshot: KPISnapshot, masks: np.ndarray) -> List[Dict[str, Any]]:
+        """Compute financial performance KPIs for each cut (row of masks)"""
+        pnl = snapshot.pnl
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.where(pnl != 0, pnl / snapshot.entry_price, 0.0)  # Normalized return
+
+        # Trades with zero P&L count towards win rate but not returns
+        traded = masks & (pnl != 0)
+        counts = traded.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_return = np.where(traded, returns, 0.0).sum(axis=1) / counts
+            return_std = np.sqrt(np.where(traded, (returns - avg_return[:, None]) ** 2, 0.0).sum(axis=1) / counts)
+
+            # Sortino ratio (downside deviation only)
+            downside = traded & (returns < 0)
+            downside_count = downside.sum(axis=1)
+            downside_std = np.sqrt(np.where(downside, returns ** 2, 0.0).sum(axis=1) / downside_count)
+
+        total_pnl = np.where(traded, pnl, 0.0).sum(axis=1)
+        wins = (traded & (pnl > 0)).sum(axis=1)
+        totals = masks.sum(axis=1)
+
+        results = []
+        for i, total in enumerate(totals):
+            if not total:
+                results.append({
+                    "sharpe_ratio": 0.0,
+                    "sortino_ratio": 0.0,
+                    "win_loss_expectancy": 0.0,
+                    "total_pnl": 0.0,
+                    "win_rate": 0.0,
+                    "status": "insufficient_data"
+                })
+                continue
+            if not counts[i]:
+                results.append(self._get_empty_financial_kpis())
+                continue
 
-        return {
-            "max_drawdown": round(max_dd, 4),
-            "var_95": round(var_95, 4),
-            "var_99": round(var_99, 4),
-            "avg_exposure": round(sum(trade.get('exposure', 0.0) for trade in trades) / len(trades), 2),
-            "sample_size": len(trades),
-            "status": "computed"
-        }
+            # Annualized Sharpe and Sortino ratios (simplified)
+            sharpe = safe_divide(avg_return[i], return_std[i], 0.0) * (252 ** 0.5)
+            sortino = safe_divide(avg_return[i], downside_std[i] if downside_count[i] else 0.0, 0.0) * (252 ** 0.5)
+
+            results.append({
+                "sharpe_ratio": round(float(sharpe), 4),
+                "sortino_ratio": round(float(sortino), 4),
+                "win_loss_expectancy": round(float(avg_return[i]), 4),
+                "total_pnl": round(float(total_pnl[i]), 2),
+                "win_rate": round(float(wins[i] / total), 4),
+                "avg_return": round(float(avg_return[i]) * 100, 2),
+                "status": "computed"
+            })
+        return results
+
+    def _compute_risk_kpis(self, snapshot: KPISnapshot, masks: np.ndarray) -> List[Dict[str, Any]]:
+        """Compute risk management KPIs for each cut (row of masks)"""
+        pnl = snapshot.pnl
+        totals = masks.sum(axis=1)
+
+        # Max drawdown over each cut's cumulative P&L (rows outside a cut repeat its last value)
+        cumulative_pnl = np.cumsum(np.where(masks, pnl, 0.0), axis=1)
+        peak = np.maximum.accumulate(np.maximum(cumulative_pnl, 0.0), axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = np.where(peak != 0, (peak - cumulative_pnl) / np.abs(peak), 0.0)
+        max_dd = drawdown.max(axis=1, initial=0.0)
+
+        # VaR calculation (simplified percentile): k-th smallest P&L within each cut
+        order = np.argsort(pnl, kind='stable')
+        sorted_pnl = pnl[order]
+        sorted_masks = masks[:, order]
+        rank = np.cumsum(sorted_masks, axis=1) - 1
+
+        def value_at_risk(quantile: float) -> np.ndarray:
+            if not len(pnl):
+                return np.zeros(len(masks))
+            target = (quantile * totals).astype(int)
+            position = (sorted_masks & (rank == target[:, None])).argmax(axis=1)
+            return np.where(totals >= 20, np.abs(sorted_pnl[position]), 0.0)
+
+        var_95 = value_at_risk(0.05)
+        var_99 = value_at_risk(0.01)
+        exposure = np.where(masks, snapshot.exposure, 0.0).sum(axis=1)
+
+        results = []
+        for i, total in enumerate(totals):
+            if not total:
+                results.append({
+                    "max_drawdown": 0.0,
+                    "var_95": 0.0,
+                    "var_99": 0.0,
+                    "avg_exposure": 0.0,
+                    "status": "insufficient_data"
+                })
+                continue
+
+            results.append({
+                "max_drawdown": round(float(max_dd[i]), 4),
+                "var_95": round(float(var_95[i]), 4),
+                "var_99": round(float(var_99[i]), 4),
+                "avg_exposure": round(float(exposure[i] / total), 2),
+                "sample_size": int(total),
+                "status": "computed"
+            })
+        return results
 
     def _add_trend_data(self, kpis: Dict[str, Any], timeframe: str, product: Optional[str]) -> Dict[str, Any]:
         """Add trend information"""
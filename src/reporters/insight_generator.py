@@ -21,6 +21,8 @@ from typing import Dict, List, Optional, Any, Tuple
 from collections import defaultdict
 import calendar
 
+from src.common_repository.storage.prediction_log import prediction_log
+
 logger = logging.getLogger(__name__)
 
 class InsightGenerator:
@@ -30,7 +32,6 @@ class InsightGenerator:
             'meta_config': "data/orchestration/meta_config.json",
             'personal_signals': "data/personal_signals",
             'evolution_data': "data/strategies/evolution_data.json",
-            'predictions_history': "data/tracking/predictions_history.json",
             'optimization_logs': "logs/goahead/orchestration"
         }
         
@@ -844,20 +845,15 @@ Based on this week's analysis, focus areas for next week:
     def _load_recent_predictions(self, target_date: datetime, days: int = 7) -> List[Dict]:
         """Load predictions from target week"""
         try:
-            predictions_path = self.data_sources['predictions_history']
-            if os.path.exists(predictions_path):
-                with open(predictions_path, 'r') as f:
-                    data = json.load(f)
-                    all_predictions = data.get('predictions', [])
-                    
-                    # Filter to target week
-                    week_predictions = []
-                    for pred in all_predictions:
-                        if self._is_in_week(pred.get('timestamp', ''), target_date):
-                            week_predictions.append(pred)
-                    
-                    return week_predictions
-            return []
+            week_range = self._get_week_date_range(target_date)
+
+            # Filter to target week
+            week_predictions = []
+            for pred in prediction_log.load(start=week_range['start'], end=week_range['end']):
+                if self._is_in_week(pred.get('timestamp', ''), target_date):
+                    week_predictions.append(pred)
+
+            return week_predictions
         except Exception as e:
             logger.error(f"Error loading recent predictions: {str(e)}")
             return []
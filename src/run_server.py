@@ -55,6 +55,10 @@ def main():
         from src.core.scheduler import scheduler
         scheduler.start()
 
+        # Start the background quote poller so API handlers read snapshots instead of fetching
+        from src.data.quote_snapshot import quote_snapshot
+        quote_snapshot.start()
+
         # Start the Flask application
         logger.info(f"🌐 Server will start on: http://0.0.0.0:{port}")
         logger.info("📊 Available endpoints:")
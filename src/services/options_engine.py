@@ -1,7 +1,9 @@
 import math
 import datetime as dt
 from typing import Dict, Any, List
+import numpy as np
 from src.live_data.provider import LiveProvider, Chain, LiveDataError
+from src.options.pricing import black_scholes
 
 # Create the main options blueprint
 from flask import Blueprint, jsonify, request
@@ -11,6 +13,8 @@ logger = logging.getLogger(__name__)
 
 options_bp = Blueprint('options_bp', __name__)
 
+RISK_FREE_RATE = 0.065  # 6.5% for Indian markets
+
 class OptionsEngine:
     """Options calculation and analysis engine"""
 
@@ -55,13 +59,13 @@ class OptionsEngine:
         try:
             # Generate expiry dates (next 3 Thursdays)
             expiries = []
-            current_date = datetime.now()
+            current_date = dt.datetime.now()
             for i in range(3):
                 # Find next Thursday
                 days_ahead = (3 - current_date.weekday()) % 7
                 if days_ahead == 0:
                     days_ahead = 7
-                next_thursday = current_date + timedelta(days=days_ahead + (i * 7))
+                next_thursday = current_date + dt.timedelta(days=days_ahead + (i * 7))
                 expiries.append(next_thursday.strftime('%Y-%m-%d'))
 
             # Generate strikes around spot price
@@ -70,29 +74,26 @@ class OptionsEngine:
             for i in range(-10, 11):  # ±10 strikes
                 strikes.append(base_strike + (i * 50))
 
-            # Generate CE and PE prices
-            ce_prices = {}
-            pe_prices = {}
-
-            for expiry in expiries:
-                expiry_date = datetime.strptime(expiry, '%Y-%m-%d')
-                dte = (expiry_date - current_date).days
-
-                ce_prices[expiry] = {}
-                pe_prices[expiry] = {}
-
-                for strike in strikes:
-                    ce_metrics = self.calculate_option_metrics(symbol, spot_price, strike, 'CE', dte)
-                    pe_metrics = self.calculate_option_metrics(symbol, spot_price, strike, 'PE', dte)
-
-                    ce_prices[expiry][str(strike)] = ce_metrics['premium']
-                    pe_prices[expiry][str(strike)] = pe_metrics['premium']
-
             # Calculate IV and IV Rank based on symbol
             symbol_hash = hash(symbol) % 100
             iv = 18 + (symbol_hash % 20)  # 18-38%
             iv_rank = 30 + (symbol_hash % 40)  # 30-70%
 
+            # Price every strike of every expiry, CE and PE, in one vectorized call
+            dte = np.array([(dt.datetime.strptime(expiry, '%Y-%m-%d') - current_date).days
+                            for expiry in expiries], dtype=float)
+            years = np.maximum(dte, 1.0)[:, None, None] / 365.0
+            strike_grid = np.asarray(strikes, dtype=float)[None, :, None]
+            option_types = np.array(['call', 'put'])[None, None, :]
+            premiums = black_scholes(spot_price, strike_grid, years, RISK_FREE_RATE,
+                                     iv / 100.0, option_types)['price'].round(2)
+
+            ce_prices = {}
+            pe_prices = {}
+            for i, expiry in enumerate(expiries):
+                ce_prices[expiry] = {str(strike): float(premiums[i, j, 0]) for j, strike in enumerate(strikes)}
+                pe_prices[expiry] = {str(strike): float(premiums[i, j, 1]) for j, strike in enumerate(strikes)}
+
             # Get lot size
             lot_sizes = {
                 'RELIANCE': 505, 'TCS': 300, 'HDFCBANK': 550, 'INFY': 300,
@@ -0,0 +1,297 @@
+"""
+Vectorized Strategy Backtester
+
+Replays stored prediction signals against local OHLCV history for a whole
+grid of strategy variants at once:
+1. Signals (prediction history, locked predictions, screener picks) are
+   normalized into flat arrays, sorted by entry date
+2. Forward close-to-close paths for every signal are gathered from the
+   OHLCV store with one fancy-indexing pass per symbol
+3. Each variant (confidence threshold, entry zone, holding timeframe, model,
+   stop-loss / take-profit, volatility filter) becomes a row of a
+   (variants x signals) eligibility mask; exits come from the first
+   stop/target breach along a (variants x signals x days) boolean cube
+4. Sharpe, win rate, max drawdown and monthly consistency are reduced per
+   variant with array operations
+
+Trades are equal-weight and compounded in entry order, so drawdown measures
+the sequence of signal outcomes rather than a capital-constrained portfolio.
+"""
+
+import itertools
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data.ohlcv_store import ohlcv_store
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+VOLATILITY_WINDOW = 20
+DEFAULT_HORIZON = 30
+MAX_CUBE_CELLS = 20_000_000  # variants x signals x days booleans evaluated per chunk
+
+METRIC_KEYS = ('trades', 'win_rate', 'sharpe_ratio', 'max_drawdown', 'consistency_score',
+               'total_return', 'avg_return', 'volatility', 'avg_holding_days')
+
+
+def parse_horizon(timeframe: Optional[str]) -> int:
+    """'5D' -> 5 trading days, '1M'/'1mo' -> 21; 0 for None or unparseable values"""
+    if not timeframe:
+        return 0
+    text = str(timeframe).strip().upper()
+    try:
+        if text.endswith('MO') or text.endswith('M'):
+            return int(text.rstrip('MO') or 1) * 21
+        return int(text.rstrip('D'))
+    except ValueError:
+        return 0
+
+
+def _confidence(value) -> float:
+    value = float(value or 0)
+    return value / 100.0 if value > 1 else value
+
+
+def _signal(symbol, date, predicted_pct, confidence, timeframe, model=None, source='') -> Optional[Dict[str, Any]]:
+    if not symbol or date is None or predicted_pct is None:
+        return None
+    try:
+        day = pd.Timestamp(date)
+        if day.tzinfo is not None:
+            day = day.tz_localize(None)
+        return {
+            'symbol': str(symbol).upper(),
+            'date': day.normalize(),
+            'predicted_return': float(predicted_pct) / 100.0,
+            'confidence': _confidence(confidence),
+            'horizon': parse_horizon(timeframe) or DEFAULT_HORIZON,
+            'model': model,
+            'source': source,
+        }
+    except (TypeError, ValueError):
+        return None
+
+
+def signals_from_predictions(records: Iterable[Dict]) -> List[Dict[str, Any]]:
+    """predictions_history rows: timestamp + predicted_1mo (%) + confidence (0-100)"""
+    signals = []
+    for record in records:
+        predicted = record.get('predicted_1mo', record.get('predicted_return'))
+        signals.append(_signal(record.get('symbol'), record.get('timestamp'), predicted,
+                               record.get('confidence'), record.get('timeframe', '30D'),
+                               record.get('model'), 'predictions_history'))
+    return [s for s in signals if s]
+
+
+def signals_from_locked(locked: Dict[str, Dict], confidence: float = 0.75) -> List[Dict[str, Any]]:
+    """locked_predictions entries carry one 5D and one 30D call per symbol"""
+    signals = []
+    for symbol, data in locked.items():
+        for suffix, timeframe in (('5d', '5D'), ('30d', '30D')):
+            signals.append(_signal(symbol, data.get(f'lock_start_date_{suffix}'),
+                                   data.get(f'predicted_roi_{suffix}'),
+                                   data.get('confidence', confidence), timeframe,
+                                   data.get('model'), 'locked_predictions'))
+    return [s for s in signals if s]
+
+
+def signals_from_screener(stocks: Iterable[Dict], as_of) -> List[Dict[str, Any]]:
+    """Screener picks (pred_5d / pred_1mo in %) issued at as_of"""
+    signals = []
+    for stock in stocks:
+        for key, timeframe in (('pred_5d', '5D'), ('pred_1mo', '30D')):
+            signals.append(_signal(stock.get('symbol'), as_of, stock.get(key), stock.get('confidence'),
+                                   timeframe, stock.get('model'), 'screener'))
+    return [s for s in signals if s]
+
+
+def variant_horizon(variants: Iterable[Dict[str, Any]]) -> int:
+    """Longest holding period (trading days) any variant's timeframe asks for; 0 if none set one"""
+    return max([parse_horizon(spec.get('timeframe')) for spec in variants] + [0])
+
+
+def parameter_grid(**axes: Iterable) -> List[Dict[str, Any]]:
+    """Cartesian product of variant axes, each combination tagged with a variant_id"""
+    names = list(axes)
+    variants = []
+    for values in itertools.product(*(list(axes[name]) for name in names)):
+        spec = dict(zip(names, values))
+        spec['variant_id'] = '|'.join(f"{name}={value}" for name, value in spec.items())
+        variants.append(spec)
+    return variants
+
+
+class VectorizedBacktester:
+    """Signal outcome arrays built once, then any number of variants evaluated together
+
+    Forward paths cover the longest signal horizon, DEFAULT_HORIZON and max_horizon,
+    whichever is longest; pass variant_horizon(variants) as max_horizon so every
+    variant's timeframe fits. run() rejects variants asking for a longer hold.
+    """
+
+    def __init__(self, signals: List[Dict[str, Any]], price_source=None,
+                 max_horizon: Optional[int] = None, max_cells: int = MAX_CUBE_CELLS):
+        self.price_source = price_source or ohlcv_store
+        self.max_cells = max_cells
+        self._load(signals, max_horizon)
+
+    def _load(self, signals: List[Dict[str, Any]], max_horizon: Optional[int]):
+        signals = sorted(signals, key=lambda s: (s['date'], s['symbol']))
+        count = len(signals)
+        horizon = max([s['horizon'] for s in signals] + [DEFAULT_HORIZON, max_horizon or 0])
+
+        self.symbols = [s['symbol'] for s in signals]
+        self.dates = pd.DatetimeIndex([s['date'] for s in signals])
+        self.predicted = np.array([s['predicted_return'] for s in signals], dtype=float)
+        self.confidence = np.array([s['confidence'] for s in signals], dtype=float)
+        self.horizon = np.minimum(np.array([s['horizon'] for s in signals], dtype=int), horizon)
+        self.direction = np.where(self.predicted < 0, -1.0, 1.0)
+        models = [s.get('model') for s in signals]
+        self.model_codes = {name: i for i, name in enumerate(sorted({m for m in models if m}))}
+        self.model = np.array([self.model_codes.get(m, -1) for m in models], dtype=int)
+
+        self.paths = np.full((count, horizon), np.nan)
+        self.volatility = np.full(count, np.nan)
+        by_symbol: Dict[str, List[int]] = {}
+        for i, symbol in enumerate(self.symbols):
+            by_symbol.setdefault(symbol, []).append(i)
+
+        steps = np.arange(1, horizon + 1)
+        for symbol, rows in by_symbol.items():
+            rows = np.array(rows)
+            first = self.dates[rows].min() - pd.Timedelta(days=VOLATILITY_WINDOW * 2)
+            closes = self.price_source.read(symbol, start=first)['Close'].dropna()
+            if len(closes) < 2:
+                continue
+            values = closes.to_numpy(dtype=float)
+            # Entry at the last close on or before the signal date
+            entry = np.searchsorted(closes.index.values, self.dates[rows].values, side='right') - 1
+            known = entry >= 0
+            rows, entry = rows[known], entry[known]
+            forward = entry[:, None] + steps[None, :]
+            inside = forward < len(values)
+            gathered = values[np.minimum(forward, len(values) - 1)]
+            self.paths[rows] = np.where(inside, gathered / values[entry][:, None] - 1.0, np.nan)
+
+            daily = np.concatenate([[np.nan], values[1:] / values[:-1] - 1.0])
+            rolling = pd.Series(daily).rolling(VOLATILITY_WINDOW, min_periods=5).std().to_numpy()
+            self.volatility[rows] = rolling[entry]
+
+        months = self.dates.year * 12 + self.dates.month
+        _, month_index = np.unique(np.asarray(months), return_inverse=True)
+        self.month_onehot = np.zeros((count, int(month_index.max()) + 1 if count else 0))
+        self.month_onehot[np.arange(count), month_index] = 1.0
+
+    def _grid(self, variants: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        def column(key, default, convert=float, *aliases):
+            values = []
+            for spec in variants:
+                value = spec.get(key)
+                for alias in aliases:
+                    value = spec.get(alias) if value is None else value
+                values.append(default if value is None else convert(value))
+            return np.array(values)
+
+        return {
+            'confidence_threshold': column('confidence_threshold', 0.0, _confidence, 'confidence_level'),
+            'entry_zone': column('entry_zone', 0.0, float, 'threshold'),
+            'horizon': column('timeframe', 0, parse_horizon).astype(int),
+            'model': column('model', -1, lambda m: self.model_codes.get(m, -2)).astype(int),
+            'stop_loss': column('stop_loss', np.inf),
+            'take_profit': column('take_profit', np.inf),
+            'volatility_filter': column('volatility_filter', np.inf),
+        }
+
+    def run(self, variants: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+        """Metrics for every variant spec, in input order"""
+        if not variants:
+            return []
+        count, horizon = self.paths.shape
+        if count == 0:
+            return [dict.fromkeys(METRIC_KEYS, 0.0) for _ in variants]
+
+        grid = self._grid(variants)
+        too_long = [spec.get('timeframe') for spec, days in zip(variants, grid['horizon']) if days > horizon]
+        if too_long:
+            raise ValueError(f"Timeframes {sorted(set(map(str, too_long)))} exceed the loaded {horizon}-day "
+                             f"price paths; build the backtester with max_horizon=variant_horizon(variants)")
+        chunk = max(1, self.max_cells // (count * horizon))
+        results = []
+        for start in range(0, len(variants), chunk):
+            part = {key: values[start:start + chunk] for key, values in grid.items()}
+            results.extend(self._evaluate(part))
+        return results
+
+    def _evaluate(self, grid: Dict[str, np.ndarray]) -> List[Dict[str, float]]:
+        count, horizon = self.paths.shape
+        columns = np.arange(count)[None, :]
+        signed = self.direction[:, None] * self.paths  # long/short return path per signal
+
+        hold = np.where(grid['horizon'][:, None] > 0, grid['horizon'][:, None], self.horizon[None, :])
+        hold = np.clip(hold, 1, horizon)
+        final = signed[columns, hold - 1]
+
+        in_window = np.arange(horizon)[None, None, :] < hold[:, :, None]
+        breach = ((signed[None] <= -grid['stop_loss'][:, None, None]) |
+                  (signed[None] >= grid['take_profit'][:, None, None])) & in_window
+        hit = breach.any(axis=2)
+        exit_step = np.where(hit, breach.argmax(axis=2), hold - 1)
+        trade = np.maximum(signed[columns, exit_step], -0.999)
+
+        volatility_limit = grid['volatility_filter'][:, None]
+        eligible = ((self.confidence[None] >= grid['confidence_threshold'][:, None]) &
+                    (np.abs(self.predicted)[None] >= grid['entry_zone'][:, None]) &
+                    ((grid['model'][:, None] == -1) | (self.model[None] == grid['model'][:, None])) &
+                    (np.isinf(volatility_limit) | (self.volatility[None] <= volatility_limit)) &
+                    ~np.isnan(final))
+
+        trades = eligible.sum(axis=1)
+        n = np.maximum(trades, 1)
+        returns = np.where(eligible, trade, 0.0)
+        mean = returns.sum(axis=1) / n
+        deviation = np.where(eligible, trade - mean[:, None], 0.0)
+        std = np.sqrt((deviation ** 2).sum(axis=1) / np.maximum(trades - 1, 1))
+        holding = np.where(eligible, exit_step + 1, 0).sum(axis=1) / n
+        periods = TRADING_DAYS / np.maximum(holding, 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = np.where((std > 0) & (trades > 1), mean / std * np.sqrt(periods), 0.0)
+
+        equity = np.cumsum(np.log1p(returns), axis=1)
+        peak = np.maximum(np.maximum.accumulate(equity, axis=1), 0.0)
+        drawdown = 1.0 - np.exp((equity - peak).min(axis=1))
+
+        monthly = returns @ self.month_onehot
+        active = (eligible.astype(float) @ self.month_onehot) > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            consistency = np.where(active.any(axis=1),
+                                   ((monthly >= 0) & active).sum(axis=1) / active.sum(axis=1), 0.0)
+
+        metrics = {
+            'trades': trades,
+            'win_rate': ((trade > 0) & eligible).sum(axis=1) / n,
+            'sharpe_ratio': sharpe,
+            'max_drawdown': drawdown,
+            'consistency_score': consistency,
+            'total_return': np.expm1(equity[:, -1]),
+            'avg_return': mean,
+            'volatility': std * np.sqrt(periods),
+            'avg_holding_days': holding,
+        }
+        return [{key: (int(values[i]) if key == 'trades' else float(values[i]))
+                 for key, values in metrics.items()} for i in range(len(trades))]
+
+
+def run_backtest(signals: List[Dict[str, Any]], variants: List[Dict[str, Any]],
+                 price_source=None) -> List[Dict[str, float]]:
+    """One-shot helper: build the signal arrays and evaluate every variant"""
+    start_time = datetime.now()
+    results = VectorizedBacktester(signals, price_source=price_source,
+                                   max_horizon=variant_horizon(variants)).run(variants)
+    logger.info(f"Backtested {len(variants)} variants over {len(signals)} signals "
+                f"in {(datetime.now() - start_time).total_seconds():.2f}s")
+    return results
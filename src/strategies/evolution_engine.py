@@ -8,6 +8,9 @@ This module analyzes historical prediction performance and recommends evolved st
 2. Recommends strategy variants (RF->LightGBM, threshold adjustments)
 3. Automatically simulates alternatives using backtest frameworks
 4. Scores variants using Sharpe ratio, Win%, Drawdown, and Consistency
+
+Variant simulation replays stored signals against local OHLCV history through
+the vectorized backtester (src/strategies/backtester.py).
 """
 
 import os
@@ -20,6 +23,12 @@ from typing import Dict, List, Optional, Any, Tuple
 from collections import defaultdict
 import sqlite3
 
+from src.common_repository.storage.prediction_log import prediction_log
+from .backtester import (
+    VectorizedBacktester, parameter_grid, signals_from_locked, signals_from_predictions,
+    signals_from_screener, variant_horizon
+)
+
 logger = logging.getLogger(__name__)
 
 class StrategyEvolutionEngine:
@@ -28,6 +37,9 @@ class StrategyEvolutionEngine:
         self.strategy_variants_path = "data/strategies/strategy_variants.json"
         self.performance_analysis_path = "data/strategies/performance_analysis.json"
         self.evolution_logs_path = "logs/goahead/strategy_evolution"
+        self.locked_predictions_path = "data/tracking/locked_predictions.json"
+        self.screener_results_path = "top10.json"
+        self.price_source = None  # OHLCV reader for backtests; None uses the shared store
         
         # Ensure directories exist
         os.makedirs(os.path.dirname(self.evolution_data_path), exist_ok=True)
@@ -464,7 +476,7 @@ class StrategyEvolutionEngine:
             return []
 
     def simulate_strategy_variants(self, variant_specs: List[Dict]) -> Dict[str, Any]:
-        """Simulate strategy variants using backtest framework"""
+        """Backtest every variant against stored prices in one vectorized pass"""
         try:
             simulation_results = {
                 'simulation_id': f"sim_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
@@ -477,19 +489,21 @@ class StrategyEvolutionEngine:
             best_score = 0
             best_variant = None
             
-            for variant_spec in variant_specs:
+            signals = self._load_backtest_signals()
+            simulation_results['signal_count'] = len(signals)
+            variant_metrics = VectorizedBacktester(signals, price_source=self.price_source,
+                                                   max_horizon=variant_horizon(variant_specs)).run(variant_specs)
+            
+            for variant_spec, variant_result in zip(variant_specs, variant_metrics):
                 variant_id = variant_spec.get('variant_id', f"variant_{len(simulation_results['variant_results'])}")
                 
-                # Simulate variant performance (placeholder - integrate with actual backtesting)
-                variant_result = self._simulate_single_variant(variant_spec)
-                
                 # Calculate composite score
                 composite_score = self._calculate_composite_score(variant_result)
                 variant_result['composite_score'] = composite_score
                 
                 simulation_results['variant_results'][variant_id] = variant_result
                 
-                if composite_score > best_score:
+                if variant_result['trades'] > 0 and composite_score > best_score:
                     best_score = composite_score
                     best_variant = variant_id
             
@@ -506,37 +520,33 @@ class StrategyEvolutionEngine:
             return {}
 
     def _simulate_single_variant(self, variant_spec: Dict) -> Dict[str, float]:
-        """Simulate a single strategy variant (placeholder implementation)"""
+        """Backtest a single strategy variant"""
         try:
-            # This would integrate with actual backtesting framework
-            # For now, generating realistic placeholder results
-            
-            base_performance = {
-                'sharpe_ratio': np.random.uniform(0.5, 1.5),
-                'win_rate': np.random.uniform(0.55, 0.85),
-                'max_drawdown': np.random.uniform(0.05, 0.25),
-                'consistency_score': np.random.uniform(0.60, 0.90),
-                'total_return': np.random.uniform(0.10, 0.30),
-                'volatility': np.random.uniform(0.15, 0.35)
-            }
-            
-            # Apply variant-specific adjustments
-            variant_type = variant_spec.get('type', 'unknown')
-            if variant_type == 'model_change':
-                # Model changes typically improve consistency and Sharpe ratio
-                base_performance['consistency_score'] *= 1.1
-                base_performance['sharpe_ratio'] *= 1.05
-            elif variant_type == 'threshold_adjustment':
-                # Threshold adjustments typically improve win rate
-                base_performance['win_rate'] *= 1.05
-                base_performance['max_drawdown'] *= 0.95
-            
-            return base_performance
-            
+            return VectorizedBacktester(self._load_backtest_signals(), price_source=self.price_source,
+                                        max_horizon=variant_horizon([variant_spec])).run([variant_spec])[0]
         except Exception as e:
             logger.error(f"Error simulating single variant: {str(e)}")
             return {}
 
+    def build_variant_grid(self) -> List[Dict]:
+        """Threshold x timeframe grid from the configured strategy variants"""
+        thresholds = self.strategy_variants['threshold_adjustments']
+        return parameter_grid(
+            confidence_threshold=thresholds['confidence_levels'],
+            entry_zone=thresholds['entry_zones'],
+            timeframe=[tf for group in self.strategy_variants['timeframe_optimizations'].values() for tf in group],
+            volatility_filter=thresholds['volatility_filters'] + [None],
+        )
+
+    def _load_backtest_signals(self) -> List[Dict]:
+        """Prediction history, locked predictions and the latest screener picks as backtest signals"""
+        signals = signals_from_predictions(self._load_prediction_history())
+        signals += signals_from_locked(self._load_json(self.locked_predictions_path))
+        screener = self._load_json(self.screener_results_path)
+        if screener.get('stocks') and screener.get('timestamp'):
+            signals += signals_from_screener(screener['stocks'], screener['timestamp'])
+        return signals
+
     def _calculate_composite_score(self, variant_result: Dict) -> float:
         """Calculate composite score for variant ranking"""
         try:
@@ -585,12 +595,7 @@ class StrategyEvolutionEngine:
     def _load_prediction_history(self) -> List[Dict]:
         """Load historical prediction data"""
         try:
-            history_path = "data/tracking/predictions_history.json"
-            if os.path.exists(history_path):
-                with open(history_path, 'r') as f:
-                    data = json.load(f)
-                    return data.get('predictions', [])
-            return []
+            return prediction_log.load()
         except Exception as e:
             logger.error(f"Error loading prediction history: {str(e)}")
             return []
@@ -12,15 +12,19 @@ This module handles:
 
 import os
 import logging
-import yfinance as yf
 import pandas as pd
 import numpy as np
-import requests
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-from bs4 import BeautifulSoup
 import time
 import json
+
+from src.common_repository.utils.http_transport import http_transport
+from src.common_repository.utils.lazy_import import lazy_import
+
+yf = lazy_import('yfinance')
+bs4 = lazy_import('bs4')
+
 try:
     from src.models.data_loader import MLDataLoader
     from src.models.models import MLModels
@@ -50,8 +54,7 @@ logger = logging.getLogger(__name__)
 
 class EnhancedDataTrainer:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = http_transport.client({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         self.data_loader = MLDataLoader()
@@ -160,7 +163,7 @@ class EnhancedDataTrainer:
             response = self.session.get(bse_search_url, timeout=15)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = bs4.BeautifulSoup(response.content, 'html.parser')
                 
                 # Extract price information (simplified)
                 price_elements = soup.find_all('span', class_='currentprice')
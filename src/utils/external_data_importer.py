@@ -9,20 +9,37 @@ import json
 import logging
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from src.models.data_loader import MLDataLoader
 from src.models.models import MLModels
-import yfinance as yf
-from sklearn.preprocessing import MinMaxScaler
+from src.ml.windowing import next_day_direction, next_value_sequences, tail_features, window_end_rows
+from src.common_repository.utils.lazy_import import lazy_import
+
+yf = lazy_import('yfinance')
+preprocessing = lazy_import('sklearn.preprocessing')
 
 logger = logging.getLogger(__name__)
 
+# RF window features: 5-day means or last values of each indicator, with fallbacks for gaps
+ENHANCED_RF_FEATURE_SPEC = (
+    ('Momentum_2d', 'mean', 0), ('Momentum_5d', 'mean', 0),
+    ('Momentum_10d', 'mean', 0), ('Momentum_20d', 'mean', 0),
+    ('ATR', 'mean', 0), ('ATR_21', 'mean', 0),
+    ('Price_vs_MA5', 'last', 0), ('Price_vs_MA10', 'last', 0),
+    ('Price_vs_MA20', 'last', 0), ('Price_vs_MA50', 'last', 0),
+    ('Volume_Ratio', 'mean', 1),
+    ('Volatility', 'mean', 0), ('Volatility_50', 'mean', 0),
+    ('RSI_14', 'last', 50), ('RSI_21', 'last', 50),
+    ('MACD', 'last', 0), ('MACD_Signal', 'last', 0), ('MACD_Histogram', 'last', 0),
+    ('BB_Position', 'last', 0.5),
+)
+
 class ExternalDataImporter:
     def __init__(self):
         self.data_loader = MLDataLoader()
         self.models = MLModels()
-        self.price_scaler = MinMaxScaler()
-        self.feature_scaler = MinMaxScaler()
+        self.price_scaler = preprocessing.MinMaxScaler()
+        self.feature_scaler = preprocessing.MinMaxScaler()
 
     def download_5year_data_for_all_stocks(self, symbols_list: List[str], output_folder: str = "downloaded_historical_data") -> Dict:
         """Download 5 years of historical data for all stocks"""
@@ -154,25 +171,22 @@ class ExternalDataImporter:
                         'promoter_buying': (hash(symbol) % 4) == 0  # 25% chance
                     }
 
-                    # Prepare LSTM data with multiple windows for better training
-                    lstm_samples = self.prepare_lstm_data_enhanced(df)
-                    if lstm_samples:
-                        for lstm_x, lstm_y_val in lstm_samples:
-                            if lstm_x is not None and lstm_y_val is not None:
-                                lstm_X.append(lstm_x)
-                                lstm_y.append(lstm_y_val)
-                        total_lstm_samples += len(lstm_samples)
-                        logger.info(f"  LSTM: Added {len(lstm_samples)} samples")
+                    # Prepare LSTM data with multiple windows for better training (views, copied once below)
+                    X_parts, y_parts = self._lstm_sample_views(df)
+                    if X_parts:
+                        lstm_X.extend(X_parts)
+                        lstm_y.extend(y_parts)
+                        symbol_samples = sum(len(part) for part in X_parts)
+                        total_lstm_samples += symbol_samples
+                        logger.info(f"  LSTM: Added {symbol_samples} samples")
 
                     # Prepare RF data (multiple samples from different time windows)
-                    rf_samples = self.prepare_rf_data_multiple_enhanced(df, fundamentals)
-                    if rf_samples:
-                        for rf_x, rf_y_val in rf_samples:
-                            if rf_x is not None and rf_y_val is not None:
-                                rf_X.append(rf_x.flatten())
-                                rf_y.append(rf_y_val)
-                        total_rf_samples += len(rf_samples)
-                        logger.info(f"  RF: Added {len(rf_samples)} samples")
+                    rf_x, rf_y_vals = self.prepare_rf_data_multiple_enhanced(df, fundamentals)
+                    if rf_x is not None and len(rf_x):
+                        rf_X.append(rf_x)
+                        rf_y.append(rf_y_vals)
+                        total_rf_samples += len(rf_x)
+                        logger.info(f"  RF: Added {len(rf_x)} samples")
 
                     symbols_processed += 1
 
@@ -181,10 +195,10 @@ class ExternalDataImporter:
                     continue
 
             # Convert to numpy arrays
-            lstm_X_array = np.array(lstm_X) if lstm_X else None
-            lstm_y_array = np.array(lstm_y) if lstm_y else None
-            rf_X_array = np.array(rf_X) if rf_X else None
-            rf_y_array = np.array(rf_y) if rf_y else None
+            lstm_X_array = np.concatenate(lstm_X) if lstm_X else None
+            lstm_y_array = np.concatenate(lstm_y) if lstm_y else None
+            rf_X_array = np.concatenate(rf_X) if rf_X else None
+            rf_y_array = np.concatenate(rf_y) if rf_y else None
 
             logger.info(f"5-year training dataset created:")
             logger.info(f"  Symbols processed: {symbols_processed}")
@@ -286,8 +300,15 @@ class ExternalDataImporter:
             logger.error(f"Error calculating enhanced technical indicators: {str(e)}")
             return df
 
-    def prepare_lstm_data_enhanced(self, df: pd.DataFrame, lookback_window: int = 60) -> List[tuple]:
+    def prepare_lstm_data_enhanced(self, df: pd.DataFrame, lookback_window: int = 60) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
         """Prepare enhanced LSTM training data with multiple samples"""
+        X_parts, y_parts = self._lstm_sample_views(df, lookback_window)
+        if not X_parts:
+            return None, None
+        return np.concatenate(X_parts), np.concatenate(y_parts)
+
+    def _lstm_sample_views(self, df: pd.DataFrame, lookback_window: int = 60) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """Strided window views (one per augmentation step size) and their targets"""
         try:
             # Select enhanced features for 5-year training
             feature_columns = ['Open', 'High', 'Low', 'Close', 'Volume', 'ATR', 'ATR_21',
@@ -300,147 +321,59 @@ class ExternalDataImporter:
             available_cols = [col for col in feature_columns if col in df.columns]
             if len(available_cols) < 10:
                 logger.warning(f"Insufficient feature columns: {len(available_cols)}")
-                return []
+                return [], []
 
             # Clean data
             df_clean = df[available_cols].dropna()
             if len(df_clean) < lookback_window + 1:
-                return []
+                return [], []
 
             # Normalize features
             scaled_features = self.feature_scaler.fit_transform(df_clean)
 
-            # Create multiple samples with different step sizes for better training
-            samples = []
-            step_sizes = [1, 2, 3, 5]  # Different step sizes for data augmentation
-            
-            for step_size in step_sizes:
-                for i in range(lookback_window, len(scaled_features), step_size):
-                    if i >= len(scaled_features):
-                        break
-                        
-                    X_sample = scaled_features[i-lookback_window:i]
-                    
+            # Different step sizes for data augmentation, all views over the same scaled array
+            close_idx = available_cols.index('Close') if 'Close' in available_cols else None
+            X_parts, y_parts = [], []
+            for step_size in (1, 2, 3, 5):
+                X_step, next_close = next_value_sequences(scaled_features, close_idx or 0, lookback_window, step_size)
+                if close_idx is None:
+                    y_step = np.zeros(len(X_step))
+                else:
                     # Target: next day's close price change
-                    if 'Close' in available_cols:
-                        close_idx = available_cols.index('Close')
-                        current_close = scaled_features[i-1, close_idx]
-                        next_close = scaled_features[i, close_idx]
-                        y_sample = next_close - current_close
-                    else:
-                        y_sample = 0
-                    
-                    samples.append((X_sample, y_sample))
+                    y_step = next_close - scaled_features[lookback_window - 1:-1:step_size, close_idx]
+                X_parts.append(X_step)
+                y_parts.append(y_step)
 
-            return samples
+            return X_parts, y_parts
 
         except Exception as e:
             logger.error(f"Error preparing enhanced LSTM data: {str(e)}")
-            return []
+            return [], []
 
-    def prepare_rf_data_multiple_enhanced(self, df: pd.DataFrame, fundamentals: Dict) -> List[tuple]:
+    def prepare_rf_data_multiple_enhanced(self, df: pd.DataFrame, fundamentals: Dict) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
         """Prepare multiple enhanced RF samples from different time windows"""
         try:
-            samples = []
-
             # Create samples from different window sizes for 5-year data
             window_sizes = [30, 45, 60, 90]  # Different analysis windows
             step_size = 15
 
-            for window_size in window_sizes:
-                for start_idx in range(0, len(df) - window_size - 1, step_size):
-                    end_idx = start_idx + window_size
-                    window_data = df.iloc[start_idx:end_idx]
-
-                    if len(window_data) < 20:
-                        continue
+            # Indicator statistics over the last rows of each window, read from rolling columns
+            ends = window_end_rows(len(df), window_sizes, step_size, limit=len(df) - 1)
+            technical = tail_features(df, ENHANCED_RF_FEATURE_SPEC, tail=5)[ends - 1]
+            fundamental = np.array([
+                fundamentals.get('pe_ratio', 20),
+                fundamentals.get('revenue_growth', 0),
+                fundamentals.get('earnings_growth', 0),
+                1 if fundamentals.get('promoter_buying', False) else 0
+            ], dtype=float)
+            X = np.hstack([technical, np.broadcast_to(fundamental, (len(ends), len(fundamental)))])
 
-                    # Enhanced technical features from this window
-                    features = []
-
-                    # Multiple momentum features
-                    for momentum_col in ['Momentum_2d', 'Momentum_5d', 'Momentum_10d', 'Momentum_20d']:
-                        if momentum_col in window_data.columns:
-                            momentum_val = window_data[momentum_col].tail(5).mean()
-                            features.append(momentum_val if not np.isnan(momentum_val) else 0)
-                        else:
-                            features.append(0)
-
-                    # ATR features
-                    for atr_col in ['ATR', 'ATR_21']:
-                        if atr_col in window_data.columns:
-                            atr_val = window_data[atr_col].tail(5).mean()
-                            features.append(atr_val if not np.isnan(atr_val) else 0)
-                        else:
-                            features.append(0)
-
-                    # Price vs MA features
-                    for ma_col in ['Price_vs_MA5', 'Price_vs_MA10', 'Price_vs_MA20', 'Price_vs_MA50']:
-                        if ma_col in window_data.columns:
-                            ma_val = window_data[ma_col].iloc[-1]
-                            features.append(ma_val if not np.isnan(ma_val) else 0)
-                        else:
-                            features.append(0)
-
-                    # Volume features
-                    if 'Volume_Ratio' in window_data.columns:
-                        volume_ratio = window_data['Volume_Ratio'].tail(5).mean()
-                        features.append(volume_ratio if not np.isnan(volume_ratio) else 1)
-                    else:
-                        features.append(1)
-
-                    # Volatility features
-                    for vol_col in ['Volatility', 'Volatility_50']:
-                        if vol_col in window_data.columns:
-                            vol_val = window_data[vol_col].tail(5).mean()
-                            features.append(vol_val if not np.isnan(vol_val) else 0)
-                        else:
-                            features.append(0)
-
-                    # RSI features
-                    for rsi_col in ['RSI_14', 'RSI_21']:
-                        if rsi_col in window_data.columns:
-                            rsi_val = window_data[rsi_col].iloc[-1]
-                            features.append(rsi_val if not np.isnan(rsi_val) else 50)
-                        else:
-                            features.append(50)
-
-                    # MACD features
-                    for macd_col in ['MACD', 'MACD_Signal', 'MACD_Histogram']:
-                        if macd_col in window_data.columns:
-                            macd_val = window_data[macd_col].iloc[-1]
-                            features.append(macd_val if not np.isnan(macd_val) else 0)
-                        else:
-                            features.append(0)
-
-                    # Bollinger Band position
-                    if 'BB_Position' in window_data.columns:
-                        bb_pos = window_data['BB_Position'].iloc[-1]
-                        features.append(bb_pos if not np.isnan(bb_pos) else 0.5)
-                    else:
-                        features.append(0.5)
-
-                    # Fundamental features
-                    features.extend([
-                        fundamentals.get('pe_ratio', 20),
-                        fundamentals.get('revenue_growth', 0),
-                        fundamentals.get('earnings_growth', 0),
-                        1 if fundamentals.get('promoter_buying', False) else 0
-                    ])
-
-                    # Target: next day direction (after the window)
-                    if end_idx < len(df) - 1:
-                        current_price = df.iloc[end_idx]['Close']
-                        next_price = df.iloc[end_idx + 1]['Close']
-                        direction = 1 if next_price > current_price else 0
-
-                        samples.append((np.array(features).reshape(1, -1), direction))
-
-            return samples
+            # Target: next day direction (after the window)
+            return X, next_day_direction(df['Close'].to_numpy(dtype=float), ends)
 
         except Exception as e:
             logger.error(f"Error preparing enhanced RF data: {str(e)}")
-            return []
+            return None, None
 
 def main():
     """Main function to download 5-year data and train models"""
@@ -11,7 +11,9 @@ import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
-import yfinance as yf
+from src.common_repository.utils.lazy_import import lazy_import
+
+yf = lazy_import('yfinance')
 
 logger = logging.getLogger(__name__)
 
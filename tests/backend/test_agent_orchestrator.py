@@ -0,0 +1,148 @@
+"""
+Tests for the agent orchestrator's priority queue, job coalescing and result reuse
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.agents import orchestrator as orchestrator_module
+from src.agents.core.contracts import AgentError, AgentOutput
+from src.agents.core.runner import AgentRunner
+from src.agents.orchestrator import PRIORITY_KPI_BREACH, PRIORITY_PERIODIC, AgentOrchestrator
+
+
+class FakeRunner:
+    _hash_input = AgentRunner._hash_input
+
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+
+    def run_agent(self, agent_name, agent_input):
+        self.gate.wait(5)
+        self.calls.append((agent_name, agent_input.context))
+        return AgentOutput(verdict='HOLD', confidence=50.0, reasons=['ok'])
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    outputs = []
+    monkeypatch.setattr(orchestrator_module.feature_flags, 'is_enabled', lambda name: True)
+    monkeypatch.setattr(orchestrator_module.agent_registry, 'is_agent_enabled', lambda name: True)
+    monkeypatch.setattr(orchestrator_module.agent_outputs_repo, 'save_output',
+                        lambda agent, scope, payload: outputs.append((agent, scope, payload)) or True)
+    return outputs
+
+
+def wait_idle(orchestrator, runs):
+    for _ in range(300):
+        if orchestrator.metrics['total_runs'] >= runs and not orchestrator.pending:
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"orchestrator did not finish {runs} runs")
+
+
+def test_burst_is_coalesced_and_breaches_run_before_periodic(saved):
+    runner = FakeRunner()
+    orchestrator = AgentOrchestrator(workers=1, runner=runner)
+
+    periodic = orchestrator.enqueue_agent_run('sentiment', {'n': 0}, 'hourly_scheduled', PRIORITY_PERIODIC)
+    ids = {orchestrator.enqueue_agent_run('trainer', {'n': i, 'timestamp': i}, 'kpi_change', PRIORITY_KPI_BREACH)
+           for i in range(20)}
+    assert len(ids) == 1 and periodic not in ids
+    assert orchestrator.get_metrics()['queue_size'] == 2
+    assert orchestrator.get_queue_status()['by_priority'] == {PRIORITY_KPI_BREACH: 1, PRIORITY_PERIODIC: 1}
+
+    runner.gate.set()
+    orchestrator.start()
+    wait_idle(orchestrator, 2)
+    orchestrator.stop()
+
+    assert runner.calls == [('trainer', {'n': 19, 'timestamp': 19}), ('sentiment', {'n': 0})]
+    metrics = orchestrator.get_metrics()
+    assert metrics['coalesced_jobs'] == 19 and metrics['max_queue_depth'] == 2
+
+
+def test_coalesced_job_moves_up_when_reenqueued_at_higher_priority(saved):
+    runner = FakeRunner()
+    runner.gate.set()
+    orchestrator = AgentOrchestrator(workers=1, runner=runner)
+
+    orchestrator.enqueue_agent_run('equity', {'n': 0}, 'a', PRIORITY_PERIODIC)
+    orchestrator.enqueue_agent_run('trainer', {'n': 1}, 'b', PRIORITY_PERIODIC)
+    orchestrator.enqueue_agent_run('trainer', {'n': 2}, 'b', PRIORITY_KPI_BREACH)
+    orchestrator.start()
+    wait_idle(orchestrator, 2)
+    orchestrator.stop()
+
+    assert [agent for agent, _ in runner.calls] == ['trainer', 'equity']
+    assert orchestrator.metrics['total_runs'] == 2
+
+
+def test_identical_input_reuses_output_and_queue_is_bounded(saved):
+    runner = FakeRunner()
+    runner.gate.set()
+    orchestrator = AgentOrchestrator(workers=2, max_pending=2, runner=runner)
+    orchestrator.start()
+
+    orchestrator.enqueue_agent_run('trainer', {'kpi': 1, 'timestamp': 'a'}, 'first')
+    wait_idle(orchestrator, 1)
+    orchestrator.enqueue_agent_run('trainer', {'kpi': 1, 'timestamp': 'b'}, 'second')
+    wait_idle(orchestrator, 2)
+    orchestrator.stop()
+
+    assert len(runner.calls) == 1 and orchestrator.metrics['cache_hits'] == 1
+    assert saved[-1][1] == 'second' and saved[-1][2]['metadata']['cached'] is True
+
+    orchestrator.enqueue_agent_run('trainer', {}, 'x')
+    orchestrator.enqueue_agent_run('trainer', {}, 'y')
+    with pytest.raises(AgentError):
+        orchestrator.enqueue_agent_run('trainer', {}, 'z')
+    assert orchestrator.get_metrics()['rejected_jobs'] == 1
+
+
+def test_trigger_for_running_job_does_not_start_a_second_run(saved):
+    runner = FakeRunner()
+    orchestrator = AgentOrchestrator(workers=2, runner=runner)
+    orchestrator.start()
+
+    first = orchestrator.enqueue_agent_run('trainer', {'kpi': 1, 'timestamp': 'a'}, 'kpi_change')
+    for _ in range(300):
+        if orchestrator.running:
+            break
+        time.sleep(0.01)
+    assert orchestrator.enqueue_agent_run('trainer', {'kpi': 1, 'timestamp': 'b'}, 'kpi_change') == first
+
+    # Changed input waits behind the running job (the idle worker leaves it alone) and absorbs repeats
+    follow_up = orchestrator.enqueue_agent_run('trainer', {'kpi': 2}, 'kpi_change')
+    assert orchestrator.enqueue_agent_run('trainer', {'kpi': 3}, 'kpi_change') == follow_up != first
+    time.sleep(0.1)
+    assert orchestrator.get_metrics()['busy_workers'] == 1 and runner.calls == []
+
+    runner.gate.set()
+    wait_idle(orchestrator, 2)
+    orchestrator.stop()
+    assert runner.calls == [('trainer', {'kpi': 1, 'timestamp': 'a'}), ('trainer', {'kpi': 3})]
+    assert orchestrator.metrics['coalesced_jobs'] == 2
+
+
+def test_scheduler_start_runs_the_agent_workers(saved, monkeypatch):
+    from src.core.scheduler import StockAnalystScheduler
+
+    runner = FakeRunner()
+    runner.gate.set()
+    orchestrator = AgentOrchestrator(workers=1, runner=runner)
+    monkeypatch.setattr(orchestrator_module, 'agent_orchestrator', orchestrator)
+
+    scheduler = StockAnalystScheduler()
+    assert scheduler.start_scheduler()
+    try:
+        orchestrator.on_kpi_change({'breaches': [{'metric': 'brier_score'}], 'affected_products': []})
+        wait_idle(orchestrator, 1)
+    finally:
+        scheduler.stop_scheduler()
+
+    assert runner.calls[0][0] == 'trainer' and saved[0][1] == 'kpi_change'
+    assert not orchestrator.is_running
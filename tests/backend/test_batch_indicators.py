@@ -0,0 +1,80 @@
+"""
+Tests for the vectorized batch indicator engine
+Batch output must match DailyTechnicalAnalyzer's per-symbol output
+"""
+
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analyzers.batch_indicators import BatchIndicatorEngine, build_panel
+from src.analyzers.daily_technical_analyzer import DailyTechnicalAnalyzer
+
+HISTORY_DIR = os.path.join('data', 'historical', 'downloaded_historical_data')
+SYMBOLS = ['SBIN', 'TCS', 'ITC', 'RELIANCE']
+
+
+def _load_frames():
+    frames = {}
+    for symbol in SYMBOLS:
+        path = os.path.join(HISTORY_DIR, f'{symbol}.csv')
+        if not os.path.exists(path):
+            continue
+        frame = pd.read_csv(path, index_col=0)
+        frame.index = pd.to_datetime(frame.index, utc=True).tz_convert('Asia/Kolkata')
+        frames[symbol] = frame
+    return frames
+
+
+def _per_symbol(frame):
+    analyzer = DailyTechnicalAnalyzer()
+    analyzer.fetch_daily_ohlc_data = lambda symbol, period='1y': frame.dropna().copy()
+    return analyzer.calculate_daily_technical_indicators('TEST')
+
+
+@pytest.fixture
+def frames():
+    frames = _load_frames()
+    if not frames:
+        pytest.skip("Historical CSV data not available")
+    # Mix history lengths so padding and short-history masks are exercised
+    first = next(iter(frames))
+    frames[first] = frames[first].tail(60)
+    return frames
+
+
+def test_batch_matches_per_symbol(frames):
+    batch = BatchIndicatorEngine().compute(build_panel(frames))
+
+    for symbol, frame in frames.items():
+        expected = _per_symbol(frame)
+        actual = batch[symbol]
+        assert set(actual) == set(expected), f"{symbol} key mismatch"
+
+        for key, value in expected.items():
+            if isinstance(value, (bool, np.bool_, str)):
+                assert actual[key] == value, f"{symbol}.{key}"
+            elif isinstance(value, float) and math.isnan(value):
+                assert math.isnan(actual[key]), f"{symbol}.{key}"
+            else:
+                assert math.isclose(float(actual[key]), float(value), rel_tol=1e-6, abs_tol=1e-6), \
+                    f"{symbol}.{key}: {actual[key]} != {value}"
+
+
+def test_short_history_returns_empty(frames):
+    symbol = next(iter(frames))
+    frames[symbol] = frames[symbol].tail(30)
+    batch = BatchIndicatorEngine().compute(build_panel(frames))
+    assert batch[symbol] == {}
+
+
+def test_panel_is_right_aligned(frames):
+    panel = build_panel(frames)
+    short = next(iter(frames))
+    j = panel.symbols.index(short)
+    assert panel.lengths[j] == 60
+    assert np.isnan(panel.close[: panel.close.shape[0] - 60, j]).all()
+    assert panel.close[-1, j] == pytest.approx(frames[short]['Close'].iloc[-1])
@@ -0,0 +1,119 @@
+"""
+Tests for columnar option-chain snapshots and the per-underlying snapshot store
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.live_data.chain_snapshot import ChainSnapshotStore, parse_nse_chain
+from src.live_data.nse_provider import NSEProvider
+from src.live_data.provider import LiveDataError
+from src.services.options_engine import select_atm_strangle
+
+
+def nse_payload(spot=22000.0):
+    data = []
+    for expiry in ('25-Jul-2024', '01-Aug-2024'):
+        for strike in (22200, 21800, 22000, 21900, 22100):
+            record = {'strikePrice': strike, 'expiryDate': expiry,
+                      'CE': {'impliedVolatility': 14.5, 'bidprice': 100 + (22200 - strike) / 2,
+                             'askPrice': 102 + (22200 - strike) / 2, 'openInterest': strike / 100}}
+            if strike != 22200:
+                record['PE'] = {'impliedVolatility': 15.5, 'bidprice': 80 + (strike - 21800) / 2,
+                                'askPrice': 82 + (strike - 21800) / 2, 'openInterest': 50}
+            data.append(record)
+    return {'records': {'underlyingValue': spot, 'expiryDates': ['25-Jul-2024', '01-Aug-2024'], 'data': data}}
+
+
+def test_snapshot_columns_are_sorted_and_slices_share_memory():
+    snapshot = parse_nse_chain('NIFTY', nse_payload())
+    assert snapshot.expiry_dates() == ['2024-07-25', '2024-08-01'] and snapshot.spot == 22000.0
+
+    expiry = snapshot.expiry('2024-07-25')
+    assert expiry.strikes.tolist() == [21800, 21900, 22000, 22100, 22200]
+    assert expiry.step == 100.0 and expiry.index_of(22100) == 3 and expiry.index_of(22150) is None
+    assert np.isnan(expiry.column('pe_iv')[4]) and expiry.column('ce_oi')[0] == 218
+
+    window = expiry.strike_range(21900, 22100)
+    assert window.strikes.tolist() == [21900, 22000, 22100]
+    assert np.shares_memory(window.columns, expiry.columns)
+    assert np.shares_memory(window.column('ce_bid'), expiry.columns)
+
+    chain = snapshot.to_chain('2024-07-25')
+    assert len(chain.calls) == 5 and len(chain.puts) == 4 and chain.step == 100.0
+    strangle = select_atm_strangle(chain)
+    assert strangle['call'] > 22000 > strangle['put'] and strangle['iv'] == 15.0
+    with pytest.raises(LiveDataError):
+        snapshot.expiry('2030-01-01')
+
+
+def test_store_loads_each_underlying_once_and_refreshes_in_one_batch():
+    batches = []
+
+    def loader(symbols):
+        batches.append(list(symbols))
+        time.sleep(0.05)
+        return {symbol: parse_nse_chain(symbol, nse_payload()) for symbol in symbols if symbol != 'BROKEN'}
+
+    store = ChainSnapshotStore(loader, ttl=60, underlyings=['NIFTY'])
+    provider = NSEProvider(snapshots=store)
+
+    threads = [threading.Thread(target=provider.get_chain, args=('BANKNIFTY', '2024-08-01')) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert provider.get_expiries('BANKNIFTY') == ['2024-07-25', '2024-08-01']
+    assert batches == [['BANKNIFTY']], "concurrent readers share one load, expiries reuse it"
+
+    assert store.refresh() == 2 and batches[-1] == ['BANKNIFTY', 'NIFTY']
+    assert set(store.stats()) == {'BANKNIFTY', 'NIFTY'}
+    with pytest.raises(LiveDataError):
+        provider.get_chain('BROKEN', '2024-07-25')
+    assert 'BROKEN' not in store.tracked, "a symbol that never loaded is not refreshed"
+
+
+def test_store_stops_refreshing_underlyings_that_keep_failing():
+    outage = {'MIDCAP', 'NIFTY'}
+
+    def loader(symbols):
+        return {symbol: parse_nse_chain(symbol, nse_payload()) for symbol in symbols if symbol not in outage}
+
+    store = ChainSnapshotStore(loader, ttl=0, underlyings=['NIFTY'], max_failures=2)
+    outage.discard('MIDCAP')
+    store.get('MIDCAP')
+    outage.add('MIDCAP')
+    assert store.tracked == {'MIDCAP', 'NIFTY'}
+
+    assert store.refresh() == 0 and 'MIDCAP' in store.tracked
+    assert store.refresh() == 0 and store.tracked == {'NIFTY'}, "configured underlyings stay tracked"
+
+    outage.clear()
+    store.get('MIDCAP')
+    assert store.refresh() == 2 and store.tracked == {'MIDCAP', 'NIFTY'}
+
+
+def test_provider_fetches_indices_and_equities_with_one_batch(monkeypatch):
+    provider = NSEProvider(snapshots=ChainSnapshotStore(lambda symbols: {}, underlyings=[]))
+    requested = []
+
+    class FakeResponse:
+        status_code = 200
+
+        def json(self):
+            return nse_payload()
+
+    def fetch_many(urls, **kwargs):
+        urls = list(urls)
+        requested.extend(urls)
+        return {url: FakeResponse() for url in urls}
+
+    monkeypatch.setattr(provider.session, 'fetch_many', fetch_many)
+    snapshots = provider.load_snapshots(['NIFTY', 'RELIANCE'])
+
+    assert set(snapshots) == {'NIFTY', 'RELIANCE'}
+    assert requested == ['https://www.nseindia.com/api/option-chain-indices?symbol=NIFTY',
+                         'https://www.nseindia.com/api/option-chain-equities?symbol=RELIANCE']
@@ -0,0 +1,124 @@
+"""
+Tests for the single-pass screener.in extractor and the quarter-aware fundamentals store
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.analyzers import fundamentals as fundamentals_module
+from src.analyzers.fundamentals import FundamentalsStore, extract_fundamentals, with_price_ratios
+from src.common_repository.storage.record_store import RecordStore
+
+PAGE = """
+<html><head><title>TCS share price</title><script>var pe = "Stock P/E 999";</script></head>
+<body>
+<ul id="top-ratios">
+  <li><span class="name">Market Cap</span><span class="nowrap value">&#8377; <span class="number">13,45,678</span> Cr.</span></li>
+  <li><span class="name">Current Price</span><span class="nowrap value">&#8377; <span class="number">4,260</span></span></li>
+  <li><span class="name">Stock P/E</span><span class="nowrap value"><span class="number">28.4</span></span></li>
+  <li><span class="name">ROE</span><span class="nowrap value"><span class="number">51.5</span> %</span></li>
+  <li><span class="name">Debt to equity</span><span class="nowrap value"><span class="number">0.09</span></span></li>
+</ul>
+<section id="quarters">
+  <table class="data-table">
+    <thead><tr><th></th><th>Mar 2024</th><th>Jun 2024</th><th>Sep 2024</th></tr></thead>
+    <tbody>
+      <tr><td class="text">Sales</td><td>64,259</td><td>62,613</td><td>64,259</td></tr>
+      <tr><td class="text">Net Profit</td><td>12,040</td><td>12,434</td><td>11,955</td></tr>
+    </tbody>
+  </table>
+</section>
+<section id="profit-loss">
+  <table class="data-table">
+    <thead><tr><th>Revenue</th><th>Mar 2023</th><th>Mar 2024</th></tr></thead>
+    <tbody>
+      <tr><td class="text">Sales</td><td>2,40,893</td><td>2,25,458</td></tr>
+      <tr><td class="text">Net Profit</td><td>46,099</td><td>42,303</td></tr>
+    </tbody>
+  </table>
+</section>
+<section id="shareholding"><p>Promoters 71.77%</p></section>
+</body></html>
+"""
+
+
+def test_single_pass_extraction_reads_ratios_growth_and_period():
+    data = extract_fundamentals(PAGE)
+
+    assert data['period'] == '2024-09'
+    assert data['pe_ratio'] == 28.4
+    assert data['eps'] == round(4260 / 28.4, 4)
+    assert data['roe'] == 51.5 and data['debt_to_equity'] == 0.09
+    assert 'current_ratio' not in data
+    assert data['revenue_growth'] == round((240893 - 225458) / 225458 * 100, 1)
+    assert data['earnings_growth'] == round((46099 - 42303) / 42303 * 100, 1)
+    assert data['promoter_buying'] is True
+
+
+def test_pe_falls_back_to_tables_then_number_spans():
+    table_page = "<table><tr><td>P/E</td><td>17.5</td></tr></table><span class='number'>42</span>"
+    assert extract_fundamentals(table_page)['pe_ratio'] == 17.5
+    assert extract_fundamentals("<span class='number'>3</span><span class='number'>42</span>")['pe_ratio'] == 42
+    # A P/E guessed from loose numbers is not trusted to back out EPS
+    guessed = extract_fundamentals("<li><span class='name'>Current Price</span><span class='number'>42</span></li>")
+    assert 'eps' not in guessed
+    assert 'pe_ratio' not in extract_fundamentals("<p>no ratios</p>")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FundamentalsStore(RecordStore(db_path=str(tmp_path / 'fundamentals.db')), recheck_sec=3600)
+
+
+def test_store_serves_record_until_next_quarter_and_skips_parsing_unchanged_pages(store, monkeypatch):
+    parses = []
+
+    def extract(content):
+        parses.append(content)
+        return extract_fundamentals(content.decode())
+
+    content = PAGE.encode()
+    stored = store.update('TCS', content, extract)
+    assert 'pe_ratio' not in stored, "P/E is derived from the current price, not cached for the quarter"
+    assert with_price_ratios(stored, 4260)['pe_ratio'] == 28.4
+    record = store.get('TCS')
+    assert record['period'] == '2024-09' and 'period' not in record['data']
+
+    # Sep 2024 quarter: no new results can exist before the December quarter ends
+    in_quarter = datetime(2024, 12, 15).timestamp()
+    after_quarter = datetime(2025, 1, 20).timestamp()
+    record['checked_at'] = in_quarter - 30 * 3600
+    assert store.is_fresh(record, now=in_quarter)
+    assert not store.is_fresh(record, now=after_quarter)
+    record['checked_at'] = after_quarter - 60
+    assert store.is_fresh(record, now=after_quarter)
+    record['checked_at'] = in_quarter - 40 * 86400
+    assert not store.is_fresh(record, now=in_quarter), "records older than the age cap are re-fetched"
+
+    monkeypatch.setattr(fundamentals_module.time, 'time', lambda: in_quarter)
+    store.update('TCS', content, extract)
+    assert len(parses) == 1, "an unchanged page is not parsed again"
+    assert store.get_fresh('TCS')['roe'] == 51.5
+
+    store.update('TCS', content.replace(b'28.4', b'30.1'), extract)
+    assert len(parses) == 2 and store.get('TCS')['data']['eps'] == round(4260 / 30.1, 4)
+
+
+def test_pe_follows_the_current_price_between_results(store):
+    stored = store.update('TCS', PAGE.encode(), lambda content: extract_fundamentals(content.decode()))
+    # Results unchanged, price down 10%: the screener sees the lower P/E without a refetch
+    assert with_price_ratios(stored, 4260 * 0.9)['pe_ratio'] == round(28.4 * 0.9, 2)
+    assert with_price_ratios(stored, None) is stored
+    assert with_price_ratios({'eps': -3.0}, 100)['eps'] == -3.0
+
+    # Without a price on the page the P/E has no EPS behind it: recheck on the normal TTL
+    no_price = PAGE.replace('Current Price', 'Book Value').encode()
+    store.update('INFY', no_price, lambda content: extract_fundamentals(content.decode()))
+    record = store.get('INFY')
+    assert record['data']['pe_ratio'] == 28.4
+    in_quarter = datetime(2024, 12, 15).timestamp()
+    record['checked_at'] = in_quarter - 2 * 3600
+    assert not store.is_fresh(record, now=in_quarter)
+    record['checked_at'] = in_quarter - 60
+    assert store.is_fresh(record, now=in_quarter)
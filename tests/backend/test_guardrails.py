@@ -4,6 +4,7 @@ import time
 import psutil
 from unittest.mock import patch, MagicMock
 from src.core.guardrails import PerformanceGuardrails, guardrails
+from src.common_repository.utils.telemetry import telemetry, REQUEST_LATENCY_METRIC
 
 class TestPerformanceGuardrails:
     
@@ -16,10 +17,14 @@ class TestPerformanceGuardrails:
         endpoint = "/api/test"
         latency = 150.0
         
+        histogram = telemetry.get_histogram(REQUEST_LATENCY_METRIC, {'endpoint': endpoint})
+        before = histogram.count if histogram else 0
+        
         self.guardrails.record_request_latency(endpoint, latency)
         
-        assert len(self.guardrails.latency_data[endpoint]) == 1
-        assert self.guardrails.latency_data[endpoint][0]['latency_ms'] == latency
+        histogram = telemetry.get_histogram(REQUEST_LATENCY_METRIC, {'endpoint': endpoint})
+        assert histogram.count == before + 1
+        assert histogram.max >= latency
 
     def test_record_cache_operations(self):
         """Test recording cache hits and misses"""
@@ -152,6 +157,21 @@ class TestPerformanceGuardrails:
         assert 'degraded' in degraded
         assert 'reason' in degraded
 
+    def test_performance_status_leaves_latency_window_for_enforcement(self):
+        """Polling the status endpoint must not consume the enforcement window"""
+        endpoint = "/api/status_window_probe"
+        for _ in range(10):
+            self.guardrails.record_request_latency(endpoint, 800)
+        self.guardrails.last_check = 0
+
+        for _ in range(3):
+            assert self.guardrails.get_performance_status()['budgets']['latency_ok'] is False
+        assert endpoint not in self.guardrails.latency_marks
+        assert self.guardrails.last_check == 0
+
+        assert self.guardrails.check_budgets()['latency_ok'] is False
+        assert self.guardrails.get_p95_latency(endpoint) == 0.0
+
     def test_banner_flag_simulation(self):
         """Test that banner flag is properly set based on degraded mode"""
         # Normal mode - banner should not show
@@ -0,0 +1,166 @@
+"""
+Tests for the shared HTTP transport against a local stub server
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.common_repository.cache.tiered_cache import TieredCache
+from src.common_repository.utils.http_transport import HttpTransport, RateLimitedError
+from src.common_repository.utils import network
+from src.common_repository.utils.network import (
+    CircuitBreaker, CircuitOpenError, CircuitState, HostRateLimiter,
+)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.ports.add(self.client_address[1])
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            hits = server.hits[self.path]
+        if self.path.startswith('/slow'):
+            time.sleep(0.2)
+            self._send(200, self.path.encode())
+        elif self.path == '/etag':
+            if self.headers.get('If-None-Match') == '"v1"':
+                self._send(304, headers={'ETag': '"v1"'})
+            else:
+                self._send(200, b'<html>fundamentals</html>', {'ETag': '"v1"', 'Content-Type': 'text/html'})
+        elif self.path == '/flaky':
+            self._send(503 if hits == 1 else 200, b'ok')
+        elif self.path == '/fail':
+            self._send(503, b'down')
+        else:
+            self._send(200, b'ok')
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.lock = threading.Lock()
+    server.ports = set()
+    server.hits = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def make_transport(**kwargs):
+    kwargs.setdefault('limiter', HostRateLimiter(default_limit=(1000, 1000.0)))
+    kwargs.setdefault('validator_cache', TieredCache())
+    return HttpTransport(**kwargs)
+
+
+def test_connections_are_reused_and_batches_run_concurrently(stub_server):
+    server, base = stub_server
+    transport = make_transport(workers=8)
+    client = transport.client({'User-Agent': 'stub-test'})
+
+    for _ in range(5):
+        assert client.get(f'{base}/ping').text == 'ok'
+    assert len(server.ports) == 1, "Sequential requests should share one keep-alive connection"
+
+    urls = [f'{base}/slow/{i}' for i in range(8)]
+    start = time.time()
+    results = client.fetch_many(urls + urls[:2])
+    elapsed = time.time() - start
+
+    assert list(results) == urls
+    assert all(results[url].text == url[len(base):] for url in urls)
+    # 8 sequential fetches would take ~1.6s
+    assert elapsed < 1.0, f"Batch fetch too slow: {elapsed:.2f}s"
+    transport.close()
+
+
+def test_conditional_get_replays_cached_body_on_304(stub_server):
+    server, base = stub_server
+    transport = make_transport()
+
+    first = transport.get(f'{base}/etag', conditional=True)
+    second = transport.get(f'{base}/etag', conditional=True)
+
+    assert server.hits['/etag'] == 2
+    assert second.status_code == 200 and second.content == first.content
+    assert getattr(second, 'from_cache', False) and not getattr(first, 'from_cache', False)
+    assert second.headers['Content-Type'] == 'text/html'
+    # Without conditional=True the body is downloaded again
+    assert not getattr(transport.get(f'{base}/etag'), 'from_cache', False)
+
+
+def test_retries_circuit_breaker_and_rate_limit(stub_server):
+    server, base = stub_server
+    transport = make_transport(retries=1, backoff=0)
+    assert transport.get(f'{base}/flaky').status_code == 200
+    assert server.hits['/flaky'] == 2
+
+    failing = make_transport(retries=0)
+    for _ in range(10):
+        assert failing.get(f'{base}/fail').status_code == 503
+    with pytest.raises(CircuitOpenError):
+        failing.get(f'{base}/fail')
+    assert server.hits['/fail'] == 10
+    assert failing.get_stats()['127.0.0.1']['circuit'] == 'open'
+
+    throttled = make_transport(limiter=HostRateLimiter({'127.0.0.1': (1, 0.01)}), rate_limit_wait=0.01)
+    throttled.get(f'{base}/ping')
+    with pytest.raises(RateLimitedError):
+        throttled.get(f'{base}/ping')
+
+
+def test_circuit_breaker_trips_on_recent_failures_after_long_success_run():
+    breaker = CircuitBreaker(window_size=20, min_calls=10)
+    for _ in range(200):
+        breaker.record_success()
+    for _ in range(9):
+        breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow()
+
+
+def test_circuit_breaker_half_open_closes_only_on_probe_success(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(network.time, 'time', lambda: clock[0])
+    breaker = CircuitBreaker(recovery_timeout=60, min_calls=10)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    clock[0] += 61
+    assert breaker.allow()
+    assert breaker.state == CircuitState.HALF_OPEN
+    # Only one probe at a time, and asking again does not close the circuit
+    assert not breaker.allow()
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow()
+
+    clock[0] += 61
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.failure_count == 0 and breaker.success_count == 0
+    assert breaker.allow() and breaker.allow()
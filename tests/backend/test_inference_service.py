@@ -0,0 +1,138 @@
+"""
+Tests for the batched inference service: warm model pool, feature cache and screener enrichment
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.ml import inference_service as service_module
+from src.ml.inference_service import FeatureCache, InferenceService, ModelPool, enrich_with_ml_predictions
+
+
+class FakeStore:
+    def __init__(self, symbols, bars=120):
+        index = pd.bdate_range('2025-01-01', periods=bars)
+        rng = np.random.default_rng(3)
+        self.frames = {}
+        for symbol in symbols:
+            close = 100 + np.cumsum(rng.normal(size=bars))
+            self.frames[symbol] = pd.DataFrame({
+                'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                'Volume': rng.integers(1000, 2000, bars).astype(float)
+            }, index=index)
+        self.refreshed, self.reads = [], 0
+
+    def refresh(self, symbols):
+        self.refreshed.append(list(symbols))
+
+    def last_date(self, symbol):
+        frame = self.frames.get(symbol)
+        return None if frame is None else frame.index[-1]
+
+    def read(self, symbol, last_n=None):
+        self.reads += 1
+        return self.frames[symbol].tail(last_n)
+
+
+class IdentityScaler:
+    def transform(self, values):
+        return np.asarray(values, dtype=float)
+
+    def inverse_transform(self, values):
+        return values
+
+
+class FakeLSTM:
+    def __init__(self, step):
+        self.step, self.calls = step, []
+
+    def predict_on_batch(self, X):
+        self.calls.append(X.shape)
+        return X[:, -1, :1] + self.step * np.arange(1, 6)
+
+
+class FakeRF:
+    classes_ = np.array([0, 1])
+
+    def predict_proba(self, X):
+        return np.tile([0.2, 0.8], (len(X), 1))
+
+
+def build_service(tmp_path, symbols, with_models, **pool_kwargs):
+    objects = {}
+    os.makedirs(tmp_path / 'scalers', exist_ok=True)
+    for symbol in with_models:
+        objects[f'{symbol}_lstm'] = FakeLSTM(step=1.0)
+        objects[f'{symbol}_rf'] = FakeRF()
+        objects[f'{symbol}_scaler'] = IdentityScaler()
+        (tmp_path / f'{symbol}_lstm.keras').write_bytes(b'x' * 100)
+        (tmp_path / f'{symbol}_rf.pkl').write_bytes(b'x' * 100)
+        (tmp_path / 'scalers' / f'{symbol}_scaler.pkl').write_bytes(b'x' * 10)
+
+    def loader(path):
+        return objects[os.path.basename(path).rsplit('.', 1)[0]]
+
+    pool = ModelPool(str(tmp_path), loaders={'lstm': loader, 'rf': loader, 'scaler': loader}, **pool_kwargs)
+    store = FakeStore(symbols)
+    return InferenceService(pool, FeatureCache(store)), store, objects
+
+
+def test_predict_many_batches_refresh_and_reuses_warm_models(tmp_path):
+    service, store, objects = build_service(tmp_path, ['AAA', 'BBB', 'CCC'], ['AAA', 'BBB'])
+
+    results = service.predict_many(['AAA', 'bbb', 'CCC', 'ZZZ'])
+    assert store.refreshed == [['AAA', 'BBB', 'CCC', 'ZZZ']]
+    assert results['ZZZ'] == {'error': 'No data available for predictions'}
+    assert 'lstm_predictions' not in results['CCC'] and 'rf_direction' not in results['CCC']
+
+    aaa = results['AAA']
+    assert objects['AAA_lstm'].calls == [(1, 60, 10)]
+    assert len(aaa['lstm_predictions']) == 5 and aaa['lstm_direction'] == 'UP'
+    assert aaa['rf_direction'] == 'UP' and aaa['rf_probability_up'] == 80.0
+
+    reads = store.reads
+    service.predict_many(['AAA', 'BBB'])
+    stats = service.models.stats()
+    assert store.reads == reads
+    assert stats['misses'] == 6 and stats['hits'] == 6 and stats['evictions'] == 0
+
+
+def test_pool_evicts_least_recently_used_and_reloads_changed_files(tmp_path):
+    service, _, objects = build_service(tmp_path, ['AAA', 'BBB'], ['AAA', 'BBB'], max_models=2)
+    pool = service.models
+
+    pool.get('AAA_rf')
+    pool.get('BBB_rf')
+    pool.get('AAA_rf')
+    pool.get('AAA_lstm')
+    assert [m['name'] for m in pool.stats()['models']] == ['AAA_rf', 'AAA_lstm']
+    assert pool.evictions == 1 and pool.stats()['total_bytes'] == 200
+
+    path = tmp_path / 'AAA_rf.pkl'
+    os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 10))
+    misses = pool.misses
+    pool.get('AAA_rf')
+    assert pool.misses == misses + 1
+
+    pool.discard('aaa')
+    assert pool.stats()['models'] == []
+
+
+def test_enrich_with_ml_predictions_adds_fields_and_resorts(tmp_path, monkeypatch):
+    service, _, _ = build_service(tmp_path, ['AAA', 'BBB'], ['BBB'])
+    monkeypatch.setattr(service_module, 'inference_service', service)
+
+    stocks = [{'symbol': 'AAA', 'score': 60}, {'symbol': 'BBB', 'score': 55}]
+    enriched = enrich_with_ml_predictions(stocks)
+
+    assert [s['symbol'] for s in enriched] == ['BBB', 'AAA']
+    bbb = enriched[0]
+    assert bbb['ml_direction'] == 'UP' and bbb['ml_confidence'] == 80.0
+    assert bbb['ml_predicted_change'] > 2
+    assert bbb['ml_score_boost'] == round(min(15, bbb['ml_predicted_change'] * 2) + 8, 1)
+    assert enriched[1]['ml_direction'] == 'UNKNOWN' and enriched[1]['enhanced_score'] == 60
+
+    monkeypatch.setattr(service_module, 'inference_service', build_service(tmp_path / 'none', ['AAA'], [])[0])
+    assert enrich_with_ml_predictions(stocks) is stocks
@@ -0,0 +1,144 @@
+"""
+Tests for incremental KPI maintenance (running statistics + resolution watermark)
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.common_repository.storage.json_store import JsonStore
+from src.common_repository.storage.record_store import RecordStore
+from src.core.kpi import calculator as calculator_module
+from src.core.kpi.calculator import KPICalculator
+from src.core.kpi.incremental import QuantileSketch, RunningKPIStats
+
+
+def make_predictions(n, seed=0, start=datetime(2025, 1, 1), timeframe='5D'):
+    rng = np.random.default_rng(seed)
+    predictions = []
+    for i in range(n):
+        start_value = float(rng.uniform(100, 1000))
+        predictions.append({
+            'symbol': f"SYM{i % 17}",
+            'timeframe': timeframe,
+            'start_date': (start + timedelta(hours=i)).isoformat(),
+            'due_date': (start + timedelta(hours=i, days=5)).isoformat(),
+            'start_value': start_value,
+            'predicted_value': start_value * float(rng.uniform(0.95, 1.08)),
+            'actual_value': start_value * float(rng.uniform(0.9, 1.1)),
+            'confidence': float(rng.uniform(50, 95)),
+            'exposure': float(rng.uniform(1e4, 1e5)),
+            'resolved': True,
+        })
+    return predictions
+
+
+@pytest.fixture
+def calculator(tmp_path, monkeypatch):
+    store = RecordStore(db_path=str(tmp_path / 'tracking.db'), mirrors={})
+    monkeypatch.setattr(calculator_module, 'json_store', JsonStore(
+        str(tmp_path / 'runtime'), record_store=store,
+        record_collections=['interactive_tracking', 'predictions_history']))
+    calc = KPICalculator()
+    calc.kpi_file = str(tmp_path / 'kpi_metrics.json')
+    calc.state_file = str(tmp_path / 'kpi_state.json')
+    calc.backup_dir = str(tmp_path / 'backup')
+    calc.predictions = []
+
+    def add(predictions):
+        calc.predictions.extend(predictions)
+        store.append_many('predictions_history', predictions)
+
+    calc.add = add
+    yield calc
+    store.close()
+
+
+def test_running_stats_match_batch_calculation():
+    calc = KPICalculator()
+    predictions = make_predictions(300)
+    stats = RunningKPIStats()
+    for pred in predictions:
+        stats.add(pred)
+    running = stats.metrics()
+
+    financial = calc.calculate_financial_metrics(predictions)
+    risk = calc.calculate_risk_metrics(predictions)
+    assert running['brier_score'] == pytest.approx(calc.calculate_brier_score(predictions))
+    assert running['directional_hit_rate'] == pytest.approx(calc.calculate_directional_hit_rate(predictions))
+    assert running['sharpe_ratio'] == pytest.approx(financial['sharpe'])
+    assert running['sortino_ratio'] == pytest.approx(financial['sortino'])
+    assert running['win_loss_expectancy'] == pytest.approx(financial['win_loss_expectancy'])
+    assert running['max_drawdown'] == pytest.approx(financial['max_drawdown'])
+    assert running['var_95'] == pytest.approx(risk['var_95'])
+    assert running['var_99'] == pytest.approx(risk['var_99'])
+    assert running['exposure_per_trade'] == pytest.approx(risk['exposure_per_trade'])
+
+
+def test_quantile_sketch_stays_accurate_after_compression():
+    rng = np.random.default_rng(1)
+    values = rng.standard_t(4, 50000) * 0.02
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+
+    restored = QuantileSketch.from_dict(sketch.to_dict())
+    assert len(restored.centroids) < 2000  # vs 50000 raw values
+    for q in (0.01, 0.05, 0.5, 0.95):
+        assert restored.quantile(q) == pytest.approx(np.percentile(values, q * 100), abs=5e-4)
+
+
+def test_incremental_update_folds_only_new_resolutions(calculator):
+    calculator.add(make_predictions(40))
+    assert calculator.full_recompute()
+    assert calculator.load_state()['timeframes']['5D'].closed == 40
+
+    # Nothing new: nothing folded, numbers unchanged
+    assert calculator.incremental_update()
+    first = calculator_module.json.load(open(calculator.kpi_file))
+    assert first['incremental']['folded'] == 0
+    assert first['incremental']['read'] == 0, "history already folded is not re-read"
+    assert first['timeframes']['5D']['closed_predictions'] == 40
+
+    later = make_predictions(10, seed=5, start=datetime(2025, 3, 1))
+    calculator.add(later + [dict(later[0], resolved=False, start_date='2025-04-01T00:00:00')])
+    assert calculator.incremental_update()
+    updated = calculator_module.json.load(open(calculator.kpi_file))
+    assert updated['incremental']['read'] == 11
+    assert updated['incremental']['folded'] == 10
+    assert updated['timeframes']['5D']['closed_predictions'] == 50
+    assert updated['timeframes']['5D']['total_predictions'] == 51
+
+    # Same numbers as a from-scratch calculation over everything resolved
+    batch = calculator.calculate_timeframe_metrics('5D', calculator.predictions)
+    assert updated['timeframes']['5D']['sharpe_ratio'] == pytest.approx(batch.sharpe_ratio)
+    assert updated['timeframes']['5D']['var_95'] == pytest.approx(batch.var_95)
+
+
+def test_incremental_update_bootstraps_without_state(calculator):
+    calculator.add(make_predictions(12, timeframe='10D'))
+    assert calculator.incremental_update()
+    data = calculator_module.json.load(open(calculator.kpi_file))
+    assert data['timeframes']['10D']['closed_predictions'] == 12
+    assert not data['timeframes']['10D']['insufficient_data']
+    assert data['timeframes']['10D']['status'] in ('green', 'amber', 'red')
+
+
+def test_incremental_update_reads_only_changed_tracking_records(calculator):
+    tracked = {'predicted_5d': [101.0] * 5, 'actual_progress_5d': [100.0, None, None, None, None],
+               'lock_start_date_5d': '2025-02-03T09:15:00', 'confidence': 80.0}
+    store = calculator_module.json_store
+    for symbol in ('TCS', 'INFY', 'SBIN'):
+        store.update_record('interactive_tracking', symbol, dict(tracked))
+    calculator.add(make_predictions(8))
+    assert calculator.incremental_update()
+
+    # TCS's 5-day window closes; only its record is read back
+    store.update_record('interactive_tracking', 'TCS', dict(tracked, actual_progress_5d=[100.0] * 4 + [103.0]))
+    assert calculator.incremental_update()
+    data = calculator_module.json.load(open(calculator.kpi_file))
+    assert data['incremental']['read'] == 1 and data['incremental']['folded'] == 1
+    assert data['timeframes']['5D']['closed_predictions'] == 9
+    assert data['timeframes']['5D']['total_predictions'] == 9
+    assert data['summary']['total_predictions'] == 9
@@ -0,0 +1,115 @@
+"""
+Tests for the shared-snapshot KPI service (all timeframe x product cuts in one pass)
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from src.common_repository.storage.json_store import json_store
+from src.common_repository.utils.date_utils import get_ist_now
+from src.products.shared.services.kpi_service import KPIService, KPISnapshot, PRODUCTS, TIMEFRAMES
+
+
+@pytest.fixture
+def history(monkeypatch):
+    now = get_ist_now()
+    predictions = [
+        # Recent, correct, high-confidence equities call
+        {'timestamp': (now - timedelta(days=1)).isoformat(), 'product': 'equities',
+         'confidence': 90, 'predicted_direction': 'BUY', 'actual_direction': 'BUY'},
+        # Recent, wrong options call
+        {'timestamp': (now - timedelta(days=2)).isoformat(), 'product': 'options',
+         'confidence': 70, 'predicted_direction': 'SELL', 'actual_direction': 'BUY'},
+        # Old correct equities call (only in 10D+)
+        {'timestamp': (now - timedelta(days=8)).isoformat(), 'product': 'Equities',
+         'confidence': 60, 'predicted_direction': 'SELL', 'actual_direction': 'SELL'},
+        # No timestamp: part of every timeframe
+        {'product': 'commodities', 'confidence': 50, 'predicted_direction': 'HOLD'},
+    ]
+    trades = [
+        {'timestamp': (now - timedelta(days=1)).isoformat(), 'product': 'equities',
+         'pnl': 100.0, 'entry_price': 1000.0, 'exposure': 5000.0},
+        {'timestamp': (now - timedelta(days=2)).isoformat(), 'product': 'equities',
+         'pnl': -50.0, 'entry_price': 1000.0, 'exposure': 3000.0},
+        {'timestamp': (now - timedelta(days=20)).isoformat(), 'product': 'options',
+         'pnl': 0.0, 'entry_price': 200.0, 'exposure': 1000.0},
+    ]
+    store = {'predictions_history': predictions, 'trades_history': trades}
+    loads = []
+
+    def fake_load(key, default=None):
+        loads.append(key)
+        return store.get(key, default)
+
+    monkeypatch.setattr(json_store, 'load', fake_load)
+    monkeypatch.setattr(json_store, 'save', lambda key, data: True)
+    return loads
+
+
+def test_compute_all_reads_history_once(history):
+    results = KPIService().compute_all()
+
+    assert history.count('predictions_history') == 1
+    assert history.count('trades_history') == 1
+    assert set(results) == set(TIMEFRAMES)
+    for by_product in results.values():
+        assert set(by_product) == {product or 'all' for product in PRODUCTS}
+
+
+def test_cuts_filter_by_timeframe_and_product(history):
+    results = KPIService().compute_all()
+
+    assert results['3D']['all']['metrics']['sample_size'] == 3
+    assert results['10D']['all']['metrics']['sample_size'] == 4
+    assert results['All']['equities']['metrics']['sample_size'] == 2
+    assert results['3D']['equities']['metrics']['sample_size'] == 1
+
+    quality = results['All']['all']['metrics']['prediction_quality']
+    assert quality['hit_rate'] == 0.5
+    assert quality['top_decile_hit_rate'] == 1.0
+    # Brier over the three scored calls: (0.9-1)^2, (0.3-0)^2, (0.6-1)^2
+    assert quality['brier_score'] == pytest.approx(round((0.01 + 0.09 + 0.16) / 3, 4))
+
+    financial = results['5D']['equities']['metrics']['financial']
+    assert financial['total_pnl'] == 50.0
+    assert financial['win_rate'] == 0.5
+    risk = results['5D']['equities']['metrics']['risk']
+    assert risk['max_drawdown'] == 0.5
+    assert risk['avg_exposure'] == 4000.0
+
+    # Only a zero-P&L trade: no returns to score
+    assert results['All']['options']['metrics']['financial']['status'] == 'no_data'
+    assert results['3D']['commodities']['metrics']['financial']['status'] == 'insufficient_data'
+
+
+def test_compute_matches_compute_all_cut(history):
+    service = KPIService()
+    single = service.compute(timeframe='10D', product='equities')
+    batch = service.compute_all(['10D'], ['equities'])['10D']['equities']
+
+    for section in ('prediction_quality', 'financial', 'risk', 'sample_size'):
+        assert single['metrics'][section] == batch['metrics'][section]
+
+
+def test_var_uses_percentile_within_each_cut():
+    trades = [{'product': 'options' if i % 2 else 'equities', 'pnl': float(i - 30), 'entry_price': 100.0}
+              for i in range(60)]
+    snapshot = KPISnapshot.from_records([], trades)
+    cuts = KPIService()._compute_cuts(snapshot, ['All'], [None, 'equities', 'options'])
+
+    assert cuts[('All', None)]['risk']['var_95'] == 27.0  # 4th smallest of 60
+    assert cuts[('All', 'equities')]['risk']['var_95'] == 28.0  # 2nd smallest of 30 even values
+    assert cuts[('All', 'options')]['risk']['var_95'] == 27.0
+
+
+def test_get_all_kpis_flattens_overall_metrics(history):
+    service = KPIService()
+    flat = service.get_all_kpis()
+
+    assert set(flat) == set(TIMEFRAMES)
+    assert flat['All']['hit_rate'] == 0.5
+    assert 'sharpe_ratio' in flat['All'] and 'max_drawdown' in flat['All']
+    # A fresh compute_all() is reused rather than recomputed
+    service.get_all_kpis()
+    assert history.count('predictions_history') == 1
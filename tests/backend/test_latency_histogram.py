@@ -0,0 +1,69 @@
+"""
+Tests for the fixed-memory latency histogram and the request hook that feeds it
+"""
+
+import random
+
+import pytest
+from flask import Flask
+
+from src.common_repository.utils.histogram import LatencyHistogram
+from src.common_repository.utils.telemetry import REQUEST_LATENCY_METRIC, telemetry
+from src.core.logging import add_request_logging
+from src.core.metrics import metrics
+
+
+def test_quantiles_within_bucket_error_and_memory_is_fixed():
+    rng = random.Random(11)
+    values = [rng.lognormvariate(4, 1) for _ in range(50000)]
+    histogram = LatencyHistogram()
+    size = len(histogram._counts)
+    for value in values:
+        histogram.record(value)
+
+    values.sort()
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * len(values)) - 1]
+        assert histogram.quantile(q) == pytest.approx(exact, rel=0.05)
+    assert len(histogram._counts) == size
+    assert histogram.summary()['count'] == 50000 and histogram.quantile(1.0) <= histogram.max
+
+
+def test_merge_and_window_since_copy():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    for value in range(1, 101):
+        first.record(value)
+    mark = first.copy()
+    for value in range(1000, 1100):
+        first.record(value)
+        second.record(value)
+
+    window = first.since(mark)
+    assert window.count == 100 and window.quantile(0.5) == pytest.approx(1050, rel=0.05)
+
+    merged = LatencyHistogram()
+    merged.merge(mark)
+    merged.merge(second)
+    assert merged.count == first.count and merged.quantile(0.95) == pytest.approx(first.quantile(0.95))
+    with pytest.raises(ValueError):
+        merged.merge(LatencyHistogram(sub_buckets=8))
+
+
+def test_request_hook_records_one_series_per_route():
+    app = Flask(__name__)
+    add_request_logging(app)
+
+    @app.route('/api/histogram-test/<symbol>')
+    def quote(symbol):
+        return symbol
+
+    series = '/api/histogram-test/<symbol>'
+    before = getattr(telemetry.get_histogram(REQUEST_LATENCY_METRIC, {'endpoint': series}), 'count', 0)
+    client = app.test_client()
+    for symbol in ('AAA', 'BBB', 'CCC', 'DDD', 'EEE'):
+        assert client.get(f'/api/histogram-test/{symbol}').headers['X-Request-ID']
+
+    assert telemetry.get_histogram(REQUEST_LATENCY_METRIC, {'endpoint': series}).count == before + 5
+    assert telemetry.get_histogram(REQUEST_LATENCY_METRIC, {'endpoint': '/api/histogram-test/AAA'}) is None
+    collected = metrics.get_metrics()
+    assert collected['requests_total'][series] >= 5 and collected['latency_ms'][series]['count'] >= 5
@@ -0,0 +1,177 @@
+"""
+Tests for the local columnar OHLCV store
+"""
+
+import os
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import ohlcv_store as store_module
+from src.data.ohlcv_store import OHLCVStore, period_start, store_key
+
+CSV_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'historical',
+                       'downloaded_historical_data')
+
+
+def make_bars(start, days, base=100.0):
+    index = pd.bdate_range(start, periods=days, tz='Asia/Kolkata', name='Date')
+    close = base + np.arange(days, dtype=float)
+    return pd.DataFrame({'Open': close - 1, 'High': close + 2, 'Low': close - 2,
+                         'Close': close, 'Volume': np.full(days, 1000.0)}, index=index)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OHLCVStore(root=str(tmp_path), refresh_interval=3600)
+
+
+def test_append_and_read_roundtrip(store):
+    bars = make_bars('2024-01-01', 30)
+    assert store.append('SBIN', bars) == 30
+
+    frame = store.read('SBIN')
+    assert len(frame) == 30
+    assert frame.index.tz is None
+    assert frame.index[0] == pd.Timestamp('2024-01-01')
+    np.testing.assert_allclose(frame['Close'].to_numpy(), bars['Close'].to_numpy())
+    assert store.last_date('SBIN') == pd.Timestamp(bars.index[-1].date())
+
+
+def test_append_only_adds_missing_bars_and_replaces_last(store):
+    store.append('TCS', make_bars('2024-01-01', 10))
+    overlap = make_bars('2024-01-01', 12, base=200.0)
+
+    # Bars before the last stored date are ignored, the last one is replaced
+    assert store.append('TCS', overlap) == 2
+    frame = store.read('TCS')
+    assert len(frame) == 12
+    assert frame['Close'].iloc[0] == 100.0
+    assert frame['Close'].iloc[-3] == 209.0
+    assert store.append('TCS', make_bars('2024-01-01', 5)) == 0
+
+
+def test_read_slices_by_date_and_count(store):
+    store.append('ITC', make_bars('2024-01-01', 40))
+    assert len(store.read('ITC', last_n=5)) == 5
+    window = store.read('ITC', start='2024-01-08', end='2024-01-12')
+    assert list(window.index.day) == [8, 9, 10, 11, 12]
+    assert store.read('UNKNOWN').empty
+
+
+def test_uncommitted_tail_is_discarded(store):
+    store.append('INFY', make_bars('2024-01-01', 5))
+    # Simulate a crash after column bytes were written but before the index was saved
+    with open(os.path.join(store.root, 'INFY', 'close.f8'), 'ab') as f:
+        f.write(np.array([999.0]).tobytes())
+
+    assert len(store.read('INFY')) == 5
+    store.append('INFY', make_bars('2024-01-08', 1, base=150.0))
+    assert store.read('INFY')['Close'].iloc[-1] == 150.0
+    assert os.path.getsize(os.path.join(store.root, 'INFY', 'close.f8')) == 6 * 8
+
+
+def test_refresh_downloads_only_from_last_date(store, monkeypatch):
+    store.append('SBIN', make_bars('2024-01-01', 10))
+    calls = []
+
+    def fake_download(tickers, **kwargs):
+        calls.append((tickers, kwargs))
+        frames = {ticker: make_bars('2024-01-12', 3, base=300.0) for ticker in tickers}
+        return pd.concat(frames, axis=1)
+
+    monkeypatch.setattr(store_module.yf, 'download', fake_download)
+
+    assert store.refresh(['SBIN']) == {'SBIN': 2}
+    assert calls[0][0] == ['SBIN.NS']
+    assert calls[0][1]['start'] == '2024-01-12'
+    assert len(store.read('SBIN')) == 12
+
+    # Recently checked symbols are not downloaded again
+    assert store.refresh(['SBIN']) == {}
+    assert len(calls) == 1
+
+
+def test_store_key_and_period_start():
+    assert store_key('M&M') == store_key('M_M') == 'M_M'
+    assert store_key('sbin.ns') == 'SBIN'
+    assert period_start('60d', pd.Timestamp('2024-03-01 10:00')) == pd.Timestamp('2024-01-01')
+    assert period_start('max') is None
+
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(CSV_DIR, 'SBIN.csv')),
+                    reason="historical CSVs not available")
+def test_import_csv_matches_source(store):
+    csv_path = os.path.join(CSV_DIR, 'SBIN.csv')
+    source = pd.read_csv(csv_path)
+
+    assert store.import_csv('SBIN', csv_path) == len(source)
+    frame = store.read('SBIN')
+    np.testing.assert_allclose(frame['Close'].to_numpy(), source['Close'].to_numpy())
+    assert frame.index[-1] == pd.Timestamp(source['Date'].iloc[-1][:10])
+
+
+def test_reader_sees_bars_appended_by_another_instance(tmp_path):
+    reader = OHLCVStore(root=str(tmp_path), refresh_interval=3600)
+    writer = OHLCVStore(root=str(tmp_path), refresh_interval=3600)
+    writer.append('HDFC', make_bars('2024-01-01', 10))
+    assert len(reader.read('HDFC')) == 10
+
+    # e.g. the scheduler appending today's bar while a web worker holds a cached index
+    writer.append('HDFC', make_bars('2024-01-01', 13, base=300.0))
+    frame = reader.read('HDFC')
+    assert len(frame) == 13
+    assert frame['Close'].iloc[-1] == 312.0
+    assert reader.last_date('HDFC') == writer.last_date('HDFC')
+
+    writer.replace('HDFC', make_bars('2024-02-01', 4))
+    assert len(reader.read('HDFC')) == 4
+
+
+def test_interrupted_rewrite_leaves_committed_bars_intact(store, monkeypatch):
+    store.append('WIPRO', make_bars('2024-01-01', 10))
+
+    def crash(key, entry):
+        raise OSError('disk full')
+
+    # Replacing the last bar stages a new generation; nothing committed is touched before the index
+    monkeypatch.setattr(store, '_save_entry', crash)
+    with pytest.raises(OSError):
+        store.append('WIPRO', make_bars('2024-01-01', 12, base=200.0))
+    with pytest.raises(OSError):
+        store.replace('WIPRO', make_bars('2024-02-01', 3))
+
+    frame = OHLCVStore(root=store.root).read('WIPRO')
+    assert len(frame) == 10
+    np.testing.assert_allclose(frame['Close'].to_numpy(), 100.0 + np.arange(10))
+
+
+def _rewrite_loop(root, base, days, rounds):
+    store = OHLCVStore(root=root, refresh_interval=3600)
+    for i in range(rounds):
+        store.replace('LT', make_bars('2024-01-01', days + i % 2, base=base))
+
+
+def test_concurrent_writers_never_expose_partial_history(tmp_path):
+    root = str(tmp_path)
+    OHLCVStore(root=root).replace('LT', make_bars('2024-01-01', 30, base=100.0))
+    ctx = multiprocessing.get_context('fork')
+    writers = [ctx.Process(target=_rewrite_loop, args=(root, base, days, 40))
+               for base, days in ((100.0, 30), (500.0, 45))]
+    for writer in writers:
+        writer.start()
+
+    reader = OHLCVStore(root=root)
+    while any(writer.is_alive() for writer in writers):
+        close = reader.read('LT')['Close'].to_numpy()
+        # Every read is one writer's whole series, never empty, mixed or truncated
+        assert len(close) in (30, 31, 45, 46)
+        np.testing.assert_allclose(close, close[0] + np.arange(len(close)))
+    for writer in writers:
+        writer.join()
+        assert writer.exitcode == 0
+    assert sorted(os.listdir(os.path.join(root, 'LT'))) == sorted(
+        [store_module.LOCK_FILE, store_module.INDEX_FILE] +
+        [name.replace('.', f"-{reader.info('LT')['gen']}.") for name in store_module.COLUMN_FILES.values()])
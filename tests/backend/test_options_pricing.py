@@ -0,0 +1,87 @@
+"""
+Tests for vectorized Black-Scholes pricing and the implied volatility solver
+"""
+
+import math
+
+import numpy as np
+
+from src.options.engine import OptionsEngine
+from src.options.pricing import black_scholes, implied_volatility, norm_cdf
+
+
+def test_norm_cdf_matches_erf():
+    x = np.linspace(-12, 12, 4001)
+    expected = np.array([0.5 * math.erfc(-v / math.sqrt(2)) for v in x])
+    np.testing.assert_allclose(norm_cdf(x), expected, rtol=1e-12, atol=1e-15)
+
+
+def test_vectorized_matches_scalar_engine():
+    engine = OptionsEngine()
+    strikes = np.array([80.0, 95.0, 100.0, 105.0, 120.0])
+
+    for option_type in ('call', 'put'):
+        chain = engine.price_chain(100.0, strikes, 0.25, 0.2, option_type, rate=0.05)
+        for i, strike in enumerate(strikes):
+            price = engine.black_scholes_price(100.0, strike, 0.25, 0.05, 0.2, option_type)
+            greeks = engine.calculate_greeks(100.0, strike, 0.25, 0.05, 0.2, option_type)
+            assert abs(max(0.01, chain['price'][i]) - price) < 1e-9
+            assert abs(chain['delta'][i] - greeks.delta) < 1e-4
+            assert abs(chain['vega'][i] - greeks.vega) < 1e-4
+
+
+def test_chain_broadcasts_expiries_strikes_and_types():
+    expiries = np.array([7, 14, 28])[:, None, None] / 365.0
+    strikes = np.arange(900, 1101, 50)[None, :, None]
+    types = np.array(['CE', 'PE'])[None, None, :]
+
+    chain = black_scholes(1000.0, strikes, expiries, 0.065, 0.25, types)
+
+    assert chain['price'].shape == (3, 5, 2)
+    # Put-call parity on every strike and expiry
+    parity = chain['price'][..., 0] - chain['price'][..., 1]
+    expected = 1000.0 - strikes[..., 0] * np.exp(-0.065 * expiries[..., 0])
+    np.testing.assert_allclose(parity, expected, atol=1e-8)
+    assert np.all(chain['gamma'] > 0)
+
+
+def test_put_theta_matches_finite_difference():
+    dt = 1e-6
+    today = black_scholes(100.0, 110.0, 0.5, 0.065, 0.3, 'put')
+    tomorrow = black_scholes(100.0, 110.0, 0.5 - dt, 0.065, 0.3, 'put')
+    numeric_theta = (tomorrow['price'] - today['price']) / dt / 365
+    assert abs(today['theta'] - numeric_theta) < 1e-5
+
+
+def test_expired_options_are_intrinsic():
+    chain = black_scholes(100.0, [90.0, 110.0], 0.0, 0.065, 0.2, ['call', 'put'])
+    np.testing.assert_allclose(chain['price'], [10.0, 10.0])
+    assert np.all(chain['delta'] == 0)
+
+
+def test_implied_volatility_recovers_chain_vols():
+    rng = np.random.default_rng(7)
+    n = 2000
+    spot = rng.uniform(100, 3000, n)
+    strike = spot * rng.uniform(0.7, 1.3, n)
+    expiry = rng.uniform(5, 180, n) / 365.0
+    vol = rng.uniform(0.08, 0.9, n)
+    is_call = rng.random(n) < 0.5
+
+    prices = black_scholes(spot, strike, expiry, 0.065, vol, is_call)['price']
+    solved = implied_volatility(prices, spot, strike, expiry, 0.065, is_call)
+
+    solved_ok = ~np.isnan(solved)
+    repriced = black_scholes(spot, strike, expiry, 0.065, np.where(solved_ok, solved, 0.2), is_call)['price']
+    assert solved_ok.mean() > 0.95
+    assert np.max(np.abs(repriced - prices)[solved_ok]) < 1e-5
+    # Wherever the price is sensitive to vol, the vol itself is recovered
+    sensitive = solved_ok & (black_scholes(spot, strike, expiry, 0.065, vol, is_call)['vega'] > 0.01)
+    assert np.max(np.abs(solved - vol)[sensitive]) < 1e-4
+
+
+def test_implied_volatility_rejects_arbitrage_prices():
+    solved = implied_volatility([0.5, 150.0, 5.0], 100.0, [90.0, 100.0, 100.0], 0.25, 0.05, 'call')
+    assert np.isnan(solved[0])  # below intrinsic
+    assert np.isnan(solved[1])  # above spot
+    assert 0 < solved[2] < 1
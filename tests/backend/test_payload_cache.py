@@ -0,0 +1,179 @@
+"""
+Tests for the stale-while-revalidate payload cache and the fusion dashboard that serves it
+"""
+
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from src.analyzers import stock_screener
+from src.app.api import fusion
+from src.common_repository.cache.payload_cache import PayloadCache
+from src.common_repository.storage.json_store import JsonStore
+from src.common_repository.storage.record_store import RecordStore
+from src.managers import interactive_tracker_manager as tracker_module
+
+
+class SlowBuilder:
+    def __init__(self, delay=0.1):
+        self.delay, self.calls = delay, 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(5)
+        time.sleep(self.delay)
+        return {'version': self.calls}
+
+
+def test_cold_cache_builds_once_for_concurrent_readers():
+    builder = SlowBuilder()
+    cache = PayloadCache('test_payload', builder)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert builder.calls == 1
+    assert len({snapshot.etag for snapshot, _ in results}) == 1
+
+
+def test_expired_snapshot_is_served_while_one_background_rebuild_runs():
+    builder = SlowBuilder(delay=0)
+    ttl = [60.0]
+    cache = PayloadCache('test_payload', builder, ttl=lambda: ttl[0])
+    first, status = cache.get()
+    assert status == 'miss' and cache.get()[1] == 'hit'
+
+    ttl[0] = 0.0
+    builder.release.clear()
+    statuses = [cache.get() for _ in range(5)]
+    assert all(snapshot is first and status == 'stale' for snapshot, status in statuses)
+    builder.release.set()
+    for _ in range(100):
+        if cache._snapshot is not first and not cache._refreshing:
+            break
+        time.sleep(0.01)
+    assert builder.calls == 2 and cache._snapshot.body == b'{"version":2}'
+
+    ttl[0] = 60.0
+    cache.invalidate()
+    assert cache.get()[1] in ('stale', 'hit')
+    for _ in range(100):
+        if builder.calls == 3 and not cache._refreshing:
+            break
+        time.sleep(0.01)
+    assert builder.calls == 3 and cache.get()[1] == 'hit'
+
+
+def test_store_writes_notify_listeners(tmp_path):
+    store = JsonStore(storage_dir=str(tmp_path))
+    seen = []
+    store.add_listener(seen.append)
+    store.save('top10', {'stocks': []})
+    store.update_record('pinned_symbols', 'AAA', True)
+    store.delete('top10')
+    store.delete('missing')
+    assert seen == ['top10', 'pinned_symbols', 'top10']
+
+
+def test_fusion_dashboard_serves_precomputed_bytes_and_304(monkeypatch):
+    builder = SlowBuilder(delay=0)
+    monkeypatch.setattr(fusion, '_fusion_cache', PayloadCache('fusion_dashboard', builder))
+    monkeypatch.setattr(fusion.feature_flags, 'is_enabled', lambda name: True)
+    app = Flask(__name__)
+    app.register_blueprint(fusion.fusion_bp)
+    client = app.test_client()
+
+    response = client.get('/api/fusion/dashboard')
+    etag = response.headers['ETag']
+    assert response.status_code == 200 and response.get_json() == {'version': 1}
+    assert response.headers['X-Cache'] == 'MISS'
+
+    cached = client.get('/api/fusion/dashboard', headers={'If-None-Match': etag})
+    assert cached.status_code == 304 and cached.headers['X-Cache'] == 'HIT' and cached.data == b''
+
+    forced = client.get('/api/fusion/dashboard?forceRefresh=true', headers={'If-None-Match': etag})
+    assert forced.status_code == 200 and forced.get_json() == {'version': 2}
+    assert builder.calls == 2
+
+    fusion._on_store_change('unrelated_key')
+    assert not fusion._fusion_cache._dirty
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def fusion_sources(tmp_path, monkeypatch):
+    """Fusion cache over a temp record store and JSON dir, with a second store pair standing in for another process"""
+    monkeypatch.chdir(tmp_path)
+    db_path, storage_dir = str(tmp_path / 'tracking.db'), str(tmp_path / 'runtime')
+    records = RecordStore(db_path=db_path, mirrors={})
+    store = JsonStore(storage_dir=storage_dir, record_store=records, record_collections=['interactive_tracking'])
+    store.add_listener(fusion._on_store_change)
+    monkeypatch.setattr(fusion, 'json_store', store)
+    monkeypatch.setattr(stock_screener, 'json_store', store)
+    monkeypatch.setattr(tracker_module, 'record_store', records)
+
+    builder = SlowBuilder(delay=0)
+    cache = PayloadCache('fusion_dashboard', builder, source_version=fusion._source_version, hit_flag='cache_hit')
+    monkeypatch.setattr(fusion, '_fusion_cache', cache)
+    other_records = RecordStore(db_path=db_path, mirrors={})
+    other = JsonStore(storage_dir=storage_dir, record_store=other_records,
+                      record_collections=['interactive_tracking'])
+    return builder, cache, other
+
+
+def test_tracker_and_screener_writes_rebuild_fusion_cache(fusion_sources, monkeypatch):
+    builder, cache, _ = fusion_sources
+    monkeypatch.setattr(tracker_module.InteractiveTrackerManager, '_ensure_current_stocks_tracked', lambda self: None)
+    tracker = tracker_module.InteractiveTrackerManager()  # first load imports into the record store
+    cache.get()
+    assert cache.get()[1] == 'hit'
+
+    # Record store writes made by the tracker itself, not through json_store
+    tracker.tracking_data['TCS'] = {'symbol': 'TCS'}
+    tracker._save_stock('TCS')
+    assert wait_for(lambda: builder.calls == 2 and not cache._refreshing)
+
+    stock_screener.save_screening_results({'status': 'success', 'stocks': [{'symbol': 'TCS'}]})
+    assert wait_for(lambda: builder.calls == 3 and not cache._refreshing)
+    assert cache.get()[1] == 'hit'
+
+
+def test_writes_from_another_process_mark_fusion_cache_stale(fusion_sources, monkeypatch):
+    builder, cache, other = fusion_sources
+    cache.get()
+    assert cache.get()[1] == 'hit'
+
+    # e.g. the scheduler in the gunicorn master: no listener in this process fires
+    other.record_store.put('interactive_tracking', 'INFY', {'symbol': 'INFY'})
+    assert cache.get()[1] == 'stale'
+    assert wait_for(lambda: builder.calls == 2 and not cache._refreshing)
+    assert cache.get()[1] == 'hit'
+
+    monkeypatch.setattr(stock_screener, 'json_store', other)
+    stock_screener.save_screening_results({'status': 'success', 'stocks': []})
+    assert cache.get()[1] == 'stale'
+
+
+def test_fusion_dashboard_flags_cache_hits(fusion_sources, monkeypatch):
+    monkeypatch.setattr(fusion.feature_flags, 'is_enabled', lambda name: True)
+    app = Flask(__name__)
+    app.register_blueprint(fusion.fusion_bp)
+    client = app.test_client()
+
+    built = client.get('/api/fusion/dashboard')
+    assert built.headers['X-Cache'] == 'MISS' and 'cache_hit' not in built.get_json()
+    served = client.get('/api/fusion/dashboard')
+    assert served.headers['X-Cache'] == 'HIT' and served.get_json()['cache_hit'] is True
@@ -0,0 +1,136 @@
+"""
+Tests for the Prometheus text exporter, striped counters and labeled upstream/job metrics
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+import requests
+from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_SUBMITTED, JobExecutionEvent, JobSubmissionEvent
+from flask import Flask, Response
+
+from src.common_repository.cache.tiered_cache import TieredCache
+from src.common_repository.utils.network import instrument_session, track_upstream, upstream_source
+from src.common_repository.utils.telemetry import COUNTER_SHARDS, TelemetryCollector, telemetry
+from src.core.logging import add_request_logging
+from src.core.prometheus import CONTENT_TYPE, metric_name, render_metrics
+from src.core.scheduler import record_job_event
+
+
+def scrape(app) -> str:
+    response = app.test_client().get('/metrics')
+    assert response.status_code == 200 and response.content_type == CONTENT_TYPE
+    return response.get_data(as_text=True)
+
+
+def sample(text: str, line_start: str) -> float:
+    matches = [line for line in text.splitlines() if line.startswith(line_start + ' ')]
+    assert len(matches) == 1, line_start
+    return float(matches[0].rsplit(' ', 1)[1])
+
+
+def make_app():
+    app = Flask(__name__)
+    add_request_logging(app)
+
+    @app.route('/api/prom-test/<symbol>')
+    def quote(symbol):
+        return symbol
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+    return app
+
+
+def test_sharded_counters_sum_across_threads_including_finished_ones():
+    collector = TelemetryCollector()
+
+    def work():
+        for _ in range(5000):
+            collector.increment('hits', 1, {'source': 'nse'})
+            collector.increment('plain')
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert collector.get_counter('hits', {'source': 'nse'}) == 40000
+    assert dict(((name, tuple(labels.items())), value) for name, labels, value in collector.iter_counters()) == {
+        ('hits', (('source', 'nse'),)): 40000, ('plain', ()): 40000}
+    # Short-lived threads reuse the fixed stripes instead of leaving a shard each behind
+    for _ in range(100):
+        thread = threading.Thread(target=collector.increment, args=('plain',))
+        thread.start()
+        thread.join()
+    assert len(collector._counters._shards) == COUNTER_SHARDS
+    assert collector.get_counter('plain') == 40100 and collector.counter_total('hits') == 40000
+
+
+def test_scrape_exposes_routes_histogram_buckets_and_cache_hit_ratio():
+    app = make_app()
+    client = app.test_client()
+    for symbol in ('AAA', 'BBB', 'CCC'):
+        client.get(f'/api/prom-test/{symbol}')
+    client.get('/no-such-route')
+
+    cache = TieredCache()
+    cache.namespace('prom_ratio', ttl=60, max_entries=10)
+    cache.set('prom_ratio', 'k', 1)
+    for key in ('k', 'k', 'k', 'missing'):
+        cache.get('prom_ratio', key)
+
+    text = scrape(app)
+    requests_total = metric_name('http.requests') + '_total'
+    latency = metric_name('http.request_ms')
+    route = 'endpoint="/api/prom-test/<symbol>"'
+
+    assert f'# TYPE {requests_total} counter' in text and f'# TYPE {latency} histogram' in text
+    assert sample(text, f'{requests_total}{{{route},method="GET",status="200"}}') == 3
+    assert sample(text, f'{requests_total}{{endpoint="<unmatched>",method="GET",status="404"}}') >= 1
+    assert sample(text, f'{latency}_count{{{route}}}') == 3
+    assert sample(text, f'{latency}_bucket{{{route},le="+Inf"}}') == 3
+    buckets = [float(line.rsplit(' ', 1)[1]) for line in text.splitlines()
+               if line.startswith(f'{latency}_bucket{{{route},')]
+    assert buckets == sorted(buckets)
+    assert f'{latency}_quantiles{{{route},quantile="0.95"}}' in text
+    assert sample(text, metric_name('cache.hit_ratio') + '{namespace="prom_ratio"}') == 0.75
+    assert sample(text, metric_name('cache.entries') + '{namespace="prom_ratio"}') == 1
+
+
+def test_upstream_and_job_metrics_are_labeled_per_source_and_job():
+    assert upstream_source('https://query1.finance.yahoo.com/v8/chart') == 'yahoo'
+    assert upstream_source('https://www.nseindia.com/api/option-chain') == 'nse'
+    assert upstream_source('https://example.org/') == 'other'
+
+    session = instrument_session(requests.Session())
+    instrument_session(session)
+    assert len(session.hooks['response']) == 1
+
+    response = requests.Response()
+    response.url = 'https://www.screener.in/company/TCS/'
+    response.status_code = 200
+    response.elapsed = timedelta(milliseconds=40)
+    before = telemetry.get_counter('upstream.responses', {'source': 'screener', 'status': 200})
+    session.hooks['response'][0](response)
+    assert telemetry.get_counter('upstream.responses', {'source': 'screener', 'status': 200}) == before + 1
+
+    try:
+        with track_upstream('yahoo'):
+            raise ConnectionError('down')
+    except ConnectionError:
+        pass
+    assert telemetry.get_counter('upstream.errors', {'source': 'yahoo'}) >= 1
+
+    scheduled = datetime.now() - timedelta(seconds=2)
+    record_job_event(JobSubmissionEvent(EVENT_JOB_SUBMITTED, 'prom_job', 'default', [scheduled]))
+    record_job_event(JobExecutionEvent(EVENT_JOB_EXECUTED, 'prom_job', 'default', scheduled, retval=False))
+    assert telemetry.get_histogram('jobs.lag_ms', {'job': 'prom_job'}).quantile(0.5) >= 1500
+
+    text = ''.join(render_metrics())
+    assert sample(text, metric_name('jobs.runs') + '_total{job="prom_job",outcome="failed"}') == 1
+    assert sample(text, metric_name('upstream.fetch_ms') + '_count{source="screener"}') >= 1
+    assert sample(text, metric_name('upstream.errors') + '_total{source="yahoo"}') >= 1
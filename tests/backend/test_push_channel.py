@@ -0,0 +1,168 @@
+"""
+Tests for the server-sent events push channel: deltas, subscriptions and bounded client buffers
+"""
+
+import json
+import multiprocessing
+import time
+
+import pytest
+from flask import Flask
+
+from src.core import push
+from src.core.push import PushDisabledError, PushHub, PushLimitError, PushRelay, diff, publish_quotes
+
+
+def parse_frame(frame):
+    if isinstance(frame, bytes):
+        frame = frame.decode()
+    fields = dict(line.split(': ', 1) for line in frame.strip().split('\n'))
+    return fields['event'], json.loads(fields['data'])
+
+
+def test_publish_sends_only_changed_fields():
+    assert diff({'a': 1, 'b': {'x': 1, 'y': 2}, 'c': 3}, {'a': 1, 'b': {'x': 1, 'y': 5}}) == {'b': {'y': 5}, 'c': None}
+
+    hub = PushHub()
+    client = hub.subscribe(['kpi'])
+    assert hub.publish('kpi', {'win_rate': 0.6, 'timestamp': 't1'}, volatile=('timestamp',)) == {
+        'win_rate': 0.6, 'timestamp': 't1'}
+    assert hub.publish('kpi', {'win_rate': 0.6, 'timestamp': 't2'}, volatile=('timestamp',)) == {}, \
+        "a timestamp-only change is not pushed"
+    hub.publish('kpi', {'win_rate': 0.7, 'timestamp': 't3'}, volatile=('timestamp',))
+
+    frames, resync = client.drain(0)
+    assert not resync and len(frames) == 2
+    assert parse_frame(frames[1]) == ('delta', {'t': 'kpi', 'd': {'win_rate': 0.7, 'timestamp': 't3'}})
+    assert ',"' in frames[1] and ', "' not in frames[1], "deltas are compact JSON"
+    assert hub.snapshot(['kpi', 'fusion']) == (2, {'kpi': {'win_rate': 0.7, 'timestamp': 't3'}})
+
+
+def test_nested_volatile_fields_do_not_push():
+    volatile = ('generation_time_ms', 'last_updated')
+    before = {'metrics': {'5D': {'brier_score': 0.2, 'generation_time_ms': 12}}, 'last_updated': 'a'}
+    rerun = {'metrics': {'5D': {'brier_score': 0.2, 'generation_time_ms': 15}}, 'last_updated': 'b'}
+    changed = {'metrics': {'5D': {'brier_score': 0.3, 'generation_time_ms': 9}}, 'last_updated': 'c'}
+    assert diff(before, rerun, volatile) == {}
+    assert diff(before, changed, volatile) == {
+        'metrics': {'5D': {'brier_score': 0.3, 'generation_time_ms': 9}}, 'last_updated': 'c'}
+
+    hub = PushHub()
+    client = hub.subscribe(['kpi'])
+    hub.publish('kpi', before, volatile)
+    assert hub.publish('kpi', rerun, volatile) == {}
+    assert len(client.drain(0)[0]) == 1, "a job re-run that only refreshed timestamps sends nothing"
+
+
+def test_clients_get_their_topics_and_resync_after_overflow(monkeypatch):
+    hub = PushHub(buffer_size=3, max_clients=2)
+    monkeypatch.setattr(push, 'push_hub', hub)
+    watcher = hub.subscribe(['quotes:TCS'])
+    dashboard = hub.subscribe(['fusion'])
+    with pytest.raises(PushLimitError):
+        hub.subscribe(['kpi'])
+    assert hub.symbols() == ['TCS']
+
+    stream = hub.stream(watcher, heartbeat=0.01)
+    assert next(stream).startswith('retry:') and parse_frame(next(stream)) == ('snapshot', {})
+
+    for price in range(100, 106):
+        publish_quotes({'TCS': {'price': price, 'volume': 10, 'timestamp': 'now'}, 'INFY': {'price': price}})
+    publish_quotes({'TCS': {'price': 105, 'volume': 10, 'timestamp': 'later'}})
+
+    # Six deltas overflowed the three-frame buffer: the backlog is replaced by one snapshot
+    event, data = parse_frame(next(stream))
+    assert event == 'snapshot' and data == {'quotes:TCS': {'price': 105, 'volume': 10, 'timestamp': 'later'}}
+    assert watcher.dropped == 4 and hub.stats()['dropped_events'] == 4
+    assert next(stream) == ": ping\n\n"
+    assert dashboard.drain(0) == ([], False), "quote deltas only reach quote subscribers"
+
+    stream.close()
+    assert watcher.closed and hub.stats()['clients'] == 1
+
+
+def test_stream_endpoint_serves_event_stream(monkeypatch):
+    hub = PushHub()
+    monkeypatch.setattr(push, 'push_hub', hub)
+    hub.publish('fusion', {'pinned_summary': {'total_pinned': 1}})
+
+    app = Flask(__name__)
+    app.register_blueprint(push.push_bp, url_prefix='/api')
+    client = app.test_client()
+
+    assert client.get('/api/stream?topics=prices').status_code == 400
+    assert client.get('/api/stream').status_code == 400
+
+    response = client.get('/api/stream?symbols=tcs,TCS&topics=fusion', buffered=False)
+    assert response.status_code == 200 and response.mimetype == 'text/event-stream'
+    frames = iter(response.response)
+    next(frames)
+    assert parse_frame(next(frames)) == ('snapshot', {'fusion': {'pinned_summary': {'total_pinned': 1}}})
+    assert hub.symbols() == ['TCS']
+
+    hub.publish('fusion', {'pinned_summary': {'total_pinned': 2}})
+    assert parse_frame(next(frames)) == ('delta', {'t': 'fusion', 'd': {'pinned_summary': {'total_pinned': 2}}})
+    response.close()
+    assert hub.stats()['clients'] == 0
+
+
+def test_stream_is_sized_to_the_worker_and_off_on_sync_workers(monkeypatch):
+    threaded = PushHub(max_clients=200)
+    threaded.fit_worker('gthread', threads=64)
+    assert threaded.enabled and threaded.max_clients == 64 - push.PUSH_RESERVED_THREADS
+
+    hub = PushHub()
+    hub.fit_worker('sync')
+    assert not hub.enabled
+    with pytest.raises(PushDisabledError):
+        hub.subscribe(['kpi'])
+
+    monkeypatch.setattr(push, 'push_hub', hub)
+    app = Flask(__name__)
+    app.register_blueprint(push.push_bp, url_prefix='/api')
+    response = app.test_client().get('/api/stream?topics=kpi')
+    assert response.status_code == 503 and response.get_json()['success'] is False
+
+
+def _stream_worker(address, authkey, results):
+    """Child process standing in for a gunicorn worker with one dashboard open"""
+    hub = PushHub()
+    client = hub.subscribe(['quotes:TCS', 'kpi'])
+    PushRelay(retry_sec=0.05).attach(hub, address, authkey)
+    received = []
+    deadline = time.time() + 10
+    while len(received) < 2 and time.time() < deadline:
+        received.extend(parse_frame(frame) for frame in client.drain(0.1)[0])
+    results.send((received, hub.snapshot(['kpi'])[1]))
+
+
+def test_relay_carries_publishes_to_another_process(tmp_path, monkeypatch):
+    relay = PushRelay(address=str(tmp_path / 'relay.sock'))
+    monkeypatch.setattr(push, 'push_relay', relay)
+    monkeypatch.setattr(push, 'push_hub', PushHub())
+    relay.start()
+    # Published before the worker attached: replayed to it on connect
+    push.broadcast('kpi', {'win_rate': 0.5})
+
+    ctx = multiprocessing.get_context('fork')
+    parent_end, child_end = ctx.Pipe(duplex=False)
+    worker = ctx.Process(target=_stream_worker, args=(relay.address, relay.authkey, child_end))
+    worker.start()
+    try:
+        deadline = time.time() + 10
+        while push.watched_symbols() != ['TCS'] and time.time() < deadline:
+            time.sleep(0.02)
+        assert push.watched_symbols() == ['TCS'], "the worker's watched symbols reach the feed process"
+
+        publish_quotes({'TCS': {'price': 101, 'timestamp': 'now'}})
+        assert parent_end.poll(10)
+        received, kpi_state = parent_end.recv()
+    finally:
+        worker.join(5)
+        relay.stop()
+
+    assert received == [
+        ('delta', {'t': 'kpi', 'd': {'win_rate': 0.5}}),
+        ('delta', {'t': 'quotes:TCS', 'd': {'price': 101, 'timestamp': 'now'}}),
+    ]
+    assert kpi_state == {'kpi': {'win_rate': 0.5}}
@@ -0,0 +1,85 @@
+"""
+Tests for the background quote snapshot service
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import quote_snapshot as snapshot_module
+from src.data.quote_snapshot import QuoteSnapshotService
+
+
+def download(tickers, period, interval, **kwargs):
+    """Multi-ticker yf.download stand-in: daily bars end yesterday, intraday bars today"""
+    if interval == '1d':
+        index = pd.bdate_range(end=pd.Timestamp.now().normalize() - pd.Timedelta(days=1), periods=5)
+    else:
+        index = pd.date_range(end=pd.Timestamp.now(), periods=4, freq='5min')
+    frames = {}
+    for i, ticker in enumerate(tickers):
+        base = 100.0 * (i + 1) + (1.0 if interval != '1d' else 0.0)
+        values = np.full(len(index), base)
+        frames[ticker] = pd.DataFrame({'Open': values, 'High': values, 'Low': values, 'Close': values,
+                                       'Volume': np.full(len(index), 10.0)}, index=index)
+    download.calls.append((list(tickers), interval))
+    return pd.concat(frames, axis=1)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    download.calls = []
+    monkeypatch.setattr(snapshot_module.yf, 'download', download)
+    monkeypatch.setattr(snapshot_module.host_rate_limiter, 'acquire', lambda host, timeout=None: True)
+    return QuoteSnapshotService(stale_after=60, closed_poll_interval=15, poll_interval=15,
+                                watchlist=[], autostart=False)
+
+
+def test_reads_never_fetch_and_register_watches(service):
+    assert service.get_many(['tcs', 'INFY']) == {}
+    assert download.calls == []
+    assert service.watched_symbols() == ['INFY', 'TCS']
+
+    assert service.refresh() == 2
+    # One daily and one intraday request for every watched symbol
+    assert [interval for _, interval in download.calls] == ['1d', '5m']
+    assert all(len(tickers) == 2 for tickers, _ in download.calls)
+
+    quote = service.get('TCS')
+    assert quote['current_price'] == 201.0
+    assert quote['previous_close'] == 200.0
+    assert quote['change_percent'] == pytest.approx(0.5)
+    assert quote['stale'] is False and quote['age_sec'] >= 0
+
+
+def test_versions_increase_and_staleness_is_reported(service):
+    service.get('TCS')
+    service.refresh()
+    first = service.get('TCS')['version']
+    service.refresh()
+    assert service.get('TCS')['version'] > first
+
+    service._quotes['TCS']['updated_at'] = time.time() - 120
+    assert service.get('TCS')['stale'] is True
+    assert service.status()['max_age_sec'] >= 120
+
+
+def test_unread_symbols_expire_from_the_watch_list(service):
+    service.get_many(['TCS', 'INFY'])
+    service.refresh()
+    service._watched['INFY'] = time.time() - service.watch_ttl - 1
+
+    assert service.watched_symbols() == ['TCS']
+    assert service.get_many(['INFY']) == {}
+
+
+def test_background_poller_fills_the_table(service):
+    service.autostart = True
+    service.get('TCS')
+    deadline = time.time() + 5
+    while service.get('TCS') is None and time.time() < deadline:
+        time.sleep(0.01)
+    service.stop()
+    assert service.get('TCS')['current_price'] == 101.0
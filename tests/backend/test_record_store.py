@@ -0,0 +1,158 @@
+"""
+Tests for the SQLite record store behind json_store and the interactive tracker
+"""
+
+import json
+
+import pytest
+
+from src.agents import prediction_stability_manager as stability_module
+from src.agents.prediction_stability_manager import PredictionStabilityManager
+from src.common_repository.storage.json_store import JsonStore
+from src.common_repository.storage.prediction_log import PredictionLog
+from src.common_repository.storage.record_store import RecordStore
+from src.managers import backtesting_manager as backtesting_module
+from src.managers import interactive_tracker_manager as tracker_module
+from src.managers.backtesting_manager import BacktestingManager
+from src.managers.interactive_tracker_manager import InteractiveTrackerManager
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = RecordStore(db_path=str(tmp_path / 'tracking.db'), mirrors={})
+    yield store
+    store.close()
+
+
+def row_writes(store):
+    return store._connection().total_changes
+
+
+def test_dict_save_only_writes_changed_records(store):
+    data = {f"SYM{i}": {'symbol': f"SYM{i}", 'price': i} for i in range(100)}
+    store.save('tracking', data)
+    assert store.load('tracking') == data
+
+    before = row_writes(store)
+    data['SYM5']['price'] = -1
+    del data['SYM7']
+    store.save('tracking', data)
+    # One update, one delete, plus the collection timestamp
+    assert row_writes(store) - before == 3
+    assert store.load('tracking') == data
+    assert list(store.load('tracking')) == list(data)
+
+
+def test_list_save_appends_and_trims_without_rewriting(store):
+    history = [{'symbol': 'TCS', 'n': i} for i in range(50)]
+    store.save('history', history)
+
+    before = row_writes(store)
+    history = history[2:] + [{'symbol': 'TCS', 'n': 50}]
+    store.save('history', history)
+    assert row_writes(store) - before == 4  # two trimmed, one appended, timestamp
+    assert store.load('history') == history
+
+    # Reordering falls back to a full rewrite but stays correct
+    store.save('history', list(reversed(history)))
+    assert store.load('history') == list(reversed(history))
+
+
+def test_indexed_query_by_symbol_timeframe_and_date(store):
+    for day in range(1, 11):
+        for symbol in ('TCS', 'INFY'):
+            store.append('predictions', {'symbol': symbol, 'timeframe': '5D' if day % 2 else '30D',
+                                         'timestamp': f"2024-01-{day:02d}T15:30:00"})
+
+    tcs = store.query('predictions', symbol='TCS', start='2024-01-03', end='2024-01-06')
+    assert [p['timestamp'][:10] for p in tcs] == ['2024-01-03', '2024-01-04', '2024-01-05', '2024-01-06']
+    assert len(store.query('predictions', symbol='INFY', timeframe='5D')) == 5
+    assert len(store.query('predictions', limit=3)) == 3
+
+
+def test_json_store_migrates_legacy_file_and_updates_records(tmp_path, store):
+    runtime = tmp_path / 'runtime'
+    runtime.mkdir()
+    (runtime / 'trades_history.json').write_text(json.dumps({'key': 'trades_history', 'data': [{'pnl': 1.0}]}))
+
+    json_store = JsonStore(str(runtime), record_store=store, record_collections=['trades_history', 'tracking'])
+    assert json_store.load('trades_history') == [{'pnl': 1.0}]
+    assert json_store.append_record('trades_history', {'pnl': 2.0})
+    assert json_store.load('trades_history') == [{'pnl': 1.0}, {'pnl': 2.0}]
+
+    assert json_store.update_record('tracking', 'TCS', {'symbol': 'TCS', 'locked_5d': True})
+    assert json_store.load('tracking') == {'TCS': {'symbol': 'TCS', 'locked_5d': True}}
+    assert json_store.query_records('tracking', symbol='TCS')[0]['locked_5d'] is True
+    assert json_store.delete('tracking') and not json_store.exists('tracking')
+
+    # Keys outside the record collections still use per-key JSON files
+    json_store.save('other', {'a': 1})
+    assert (runtime / 'other.json').exists()
+
+
+def test_tracker_updates_single_stock_and_exports_snapshot(tmp_path, store, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'interactive_tracking.json').write_text(json.dumps({
+        'TCS': {'symbol': 'TCS', 'actual_progress_5d': [None] * 5, 'actual_progress_30d': [None] * 30},
+        'INFY': {'symbol': 'INFY', 'actual_progress_5d': [None] * 5, 'actual_progress_30d': [None] * 30},
+    }))
+    monkeypatch.setattr(tracker_module, 'record_store', store)
+
+    tracker = InteractiveTrackerManager()
+    assert set(tracker.get_all_tracking_data()) == {'TCS', 'INFY'}
+
+    before = row_writes(store)
+    assert tracker.update_actual_price('TCS', 0, 3500.0)
+    assert row_writes(store) - before == 2  # the TCS row and the collection timestamp
+    assert store.get('interactive_tracking', 'TCS')['actual_progress_5d'][0] == 3500.0
+
+    # A fresh manager reads the store, not the (now stale) legacy file
+    assert InteractiveTrackerManager().get_stock_data('TCS')['actual_progress_5d'][0] == 3500.0
+    assert tracker.export_snapshot()
+    with open('interactive_tracking.json') as f:
+        assert json.load(f)['TCS']['actual_progress_5d'][0] == 3500.0
+
+
+def test_prediction_log_is_shared_by_writers_and_readers(tmp_path, store, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data' / 'tracking').mkdir(parents=True)
+    (tmp_path / 'predictions_history.json').write_text('{}')  # stale empty legacy file at the root
+    (tmp_path / 'data' / 'tracking' / 'predictions_history.json').write_text(json.dumps([
+        {'symbol': 'TCS', 'timestamp': '2024-01-02T10:00:00', 'predicted_1mo': 4.0}]))
+    log = PredictionLog(store=store, max_records=3)
+    monkeypatch.setattr(backtesting_module, 'prediction_log', log)
+    monkeypatch.setattr(stability_module, 'prediction_log', log)
+
+    BacktestingManager().record_prediction({'symbol': 'INFY', 'pred_1mo': 2.5, 'score': 80})
+    stability = PredictionStabilityManager()
+    stability.save_prediction_history([{'symbol': 'SBIN', 'timestamp': '2024-01-05T10:00:00', 'pred_1mo': 1.0},
+                                       {'symbol': 'ITC', 'timestamp': '2024-01-06T10:00:00', 'pred_1mo': 3.0}])
+
+    # The legacy list is imported once, both writers append, and the cap of 3 drops TCS
+    assert [p['symbol'] for p in log.load()] == ['INFY', 'SBIN', 'ITC']
+    assert log.load(symbol='ITC')[0]['predicted_1mo'] == 3.0
+    assert [p['symbol'] for p in log.load(start='2024-01-01', end='2024-01-05')] == ['SBIN']
+    assert BacktestingManager().predictions_history == log.load()
+
+    assert store.append_many('other', [{'n': 1}, {'n': 2}]) == 2 and store.trim('other', 1) == 1
+    assert store.load('other') == [{'n': 2}]
+
+
+def test_compact_exports_mirrors_for_writes_from_other_processes(tmp_path):
+    mirror = tmp_path / 'interactive_tracking.json'
+    db_path = str(tmp_path / 'tracking.db')
+    # Two instances on one database stand in for the scheduler and a web worker
+    writer = RecordStore(db_path=db_path, mirrors={'interactive_tracking': str(mirror)})
+    exporter = RecordStore(db_path=db_path, mirrors={'interactive_tracking': str(mirror)})
+
+    writer.put('interactive_tracking', 'TCS', {'symbol': 'TCS', 'price': 1.0})
+    assert exporter.compact()['mirrors_exported'] == ['interactive_tracking']
+    assert json.loads(mirror.read_text()) == {'TCS': {'symbol': 'TCS', 'price': 1.0}}
+    assert writer.compact()['mirrors_exported'] == [], "already exported by the other instance"
+
+    writer.put('interactive_tracking', 'TCS', {'symbol': 'TCS', 'price': 2.0})
+    assert exporter.compact()['mirrors_exported'] == ['interactive_tracking']
+    assert json.loads(mirror.read_text())['TCS']['price'] == 2.0
+    assert exporter.compact()['mirrors_exported'] == []
+    writer.close()
+    exporter.close()
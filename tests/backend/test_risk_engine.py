@@ -0,0 +1,100 @@
+"""
+Tests for the return-based portfolio risk engine and RiskManager correlation analysis
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.ohlcv_store import OHLCVStore
+from src.managers import risk_manager as risk_module
+from src.managers.risk_engine import (
+    align_returns, correlation_clusters, correlation_from_covariance, covariance_matrix, portfolio_risk
+)
+from src.managers.risk_manager import RiskManager
+
+
+def factor_returns(n_days=500, n_assets=200, seed=3):
+    """Two sector factors plus noise: assets 0-9 and 10-19 form tight clusters"""
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, n_days)
+    returns = market[:, None] + rng.normal(0, 0.015, (n_days, n_assets))
+    for block in (slice(0, 10), slice(10, 20)):
+        returns[:, block] = rng.normal(0, 0.02, n_days)[:, None] + rng.normal(0, 0.003, (n_days, 10))
+    return returns
+
+
+def test_covariance_matches_numpy_and_shrinkage_is_bounded():
+    returns = factor_returns(n_assets=30)
+    cov, intensity = covariance_matrix(returns)
+    assert intensity == 0.0
+    np.testing.assert_allclose(cov, np.cov(returns, rowvar=False))
+    np.testing.assert_allclose(correlation_from_covariance(cov), np.corrcoef(returns, rowvar=False), atol=1e-12)
+
+    shrunk, intensity = covariance_matrix(returns[:40], 'ledoit_wolf')
+    assert 0 < intensity < 1
+    assert np.all(np.linalg.eigvalsh(shrunk) > 0)
+
+
+def test_portfolio_risk_decomposes_volatility():
+    returns = factor_returns(n_assets=20)
+    weights = np.full(20, 1 / 20)
+    cov, _ = covariance_matrix(returns)
+    risk = portfolio_risk(weights, cov, returns, confidence=0.99)
+
+    assert risk['volatility_daily'] == pytest.approx(np.std(returns @ weights, ddof=1))
+    assert risk['component_contribution'].sum() == pytest.approx(risk['volatility_daily'])
+    assert risk['parametric_var'] == pytest.approx(
+        2.3263478740 * risk['volatility_daily'] - (returns @ weights).mean(), rel=1e-8)
+    assert risk['historical_es'] >= risk['historical_var'] > 0
+
+
+def test_clusters_recover_correlated_blocks():
+    corr = np.corrcoef(factor_returns(), rowvar=False)
+    clusters = correlation_clusters(corr, 0.7)
+    assert sorted(map(sorted, clusters)) == [list(range(10)), list(range(10, 20))]
+
+
+def test_align_returns_drops_short_histories():
+    dates = pd.bdate_range('2024-01-01', periods=60)
+    closes = {'A': pd.Series(np.linspace(100, 120, 60), index=dates),
+              'B': pd.Series(np.linspace(50, 40, 60), index=dates),
+              'NEW': pd.Series(np.linspace(10, 11, 5), index=dates[-5:])}
+    symbols, returns = align_returns(closes, min_observations=20)
+    assert symbols == ['A', 'B']
+    assert returns.shape == (59, 2)
+
+
+def test_risk_manager_screens_200_names_from_store(tmp_path, monkeypatch):
+    store = OHLCVStore(root=str(tmp_path / 'store'), refresh_interval=3600)
+    returns = factor_returns(n_days=251)
+    index = pd.bdate_range(end='2024-12-31', periods=252, name='Date')
+    for k in range(200):
+        close = 100 * np.concatenate([[1.0], np.cumprod(1 + returns[:, k])])
+        store.append(f"S{k}", pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                                           'Volume': np.ones(252)}, index=index))
+    monkeypatch.setattr(risk_module, 'ohlcv_store', store)
+
+    manager = RiskManager()
+    stocks = [{'symbol': f"S{k}"} for k in range(200)] + [{'symbol': 'NOHISTORY'}]
+    start = time.perf_counter()
+    analysis = manager.analyze_portfolio_correlation(stocks)
+    elapsed = time.perf_counter() - start
+
+    assert analysis['method'] == 'daily_returns'
+    assert analysis['observations'] == 250
+    assert analysis['symbols_without_history'] == ['NOHISTORY']
+    assert sorted(map(len, analysis['clusters'])) == [10, 10]
+    assert analysis['high_correlations'][0]['correlation'] > 0.8
+    assert sum(analysis['portfolio_risk']['risk_contribution_pct'].values()) == pytest.approx(100, abs=0.1)
+    assert elapsed < 2.0
+
+
+def test_falls_back_to_similarity_without_history(monkeypatch, tmp_path):
+    monkeypatch.setattr(risk_module, 'ohlcv_store', OHLCVStore(root=str(tmp_path / 'empty')))
+    analysis = RiskManager().analyze_portfolio_correlation([
+        {'symbol': 'A', 'market_cap': 'Large'}, {'symbol': 'B', 'market_cap': 'Large'}])
+    assert analysis['method'] == 'fundamental_similarity'
+    assert analysis['correlation_matrix']['A']['B'] == 0.8
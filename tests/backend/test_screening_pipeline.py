@@ -0,0 +1,113 @@
+"""
+Tests for the concurrent screening pipeline and per-host rate limiting
+"""
+
+import threading
+import time
+
+from src.analyzers.screening_pipeline import ScreeningPipeline
+from src.common_repository.utils.network import HostRateLimiter, TokenBucket
+
+
+class FakeScreener:
+    """Screener stand-in that records how many fetches overlap"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def _work(self, payload):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return payload
+
+    def scrape_screener_data(self, symbol):
+        if symbol == 'BROKEN':
+            raise RuntimeError("scrape failed")
+        return self._work({'pe_ratio': 10.0})
+
+    def calculate_enhanced_technical_indicators(self, symbol):
+        if symbol == 'BROKEN':
+            return {}
+        return self._work({'current_price': 100.0})
+
+
+def test_pipeline_collects_all_symbols_concurrently():
+    screener = FakeScreener()
+    limiter = HostRateLimiter(default_limit=(100, 100.0))
+    pipeline = ScreeningPipeline(screener, fundamental_workers=4, technical_workers=4,
+                                 limiter=limiter, run_timeout=10)
+    symbols = [f"SYM{i}" for i in range(16)]
+
+    start = time.time()
+    results = pipeline.run(symbols, bulk_deal_symbols=['SYM3'])
+    elapsed = time.time() - start
+
+    assert set(results) == set(symbols)
+    assert results['SYM3']['bulk_deals'] is True
+    assert results['SYM0']['fundamentals'] == {'pe_ratio': 10.0}
+    assert results['SYM0']['technical'] == {'current_price': 100.0}
+    assert screener.max_active > 1, "Fetches should overlap"
+    # 32 sequential calls would take ~1.6s
+    assert elapsed < 1.0, f"Pipeline too slow: {elapsed:.2f}s"
+
+
+def test_pipeline_skips_failed_symbols():
+    pipeline = ScreeningPipeline(FakeScreener(delay=0), limiter=HostRateLimiter(),
+                                 run_timeout=5)
+    results = pipeline.run(['GOOD', 'BROKEN'])
+    assert 'GOOD' in results
+    assert 'BROKEN' not in results
+
+
+def test_token_bucket_wait_blocks_until_refill():
+    bucket = TokenBucket(capacity=1, refill_rate=20.0)
+    assert bucket.wait(timeout=1)
+    start = time.time()
+    assert bucket.wait(timeout=1)
+    assert time.time() - start >= 0.03
+
+
+def test_token_bucket_wait_times_out():
+    bucket = TokenBucket(capacity=1, refill_rate=0.01)
+    assert bucket.acquire()
+    assert bucket.wait(timeout=0.05) is False
+
+
+def test_host_rate_limiter_uses_per_host_buckets():
+    limiter = HostRateLimiter({'slow.example': (1, 0.01)}, default_limit=(5, 5.0))
+    assert limiter.acquire('slow.example', timeout=0.01)
+    assert limiter.acquire('slow.example', timeout=0.01) is False
+    assert limiter.acquire('fast.example', timeout=0.01)
+    assert limiter.get_stats()['slow.example']['capacity'] == 1
+
+
+class FakeBatchScreener(FakeScreener):
+    """Screener that also offers a batch technicals path"""
+
+    def __init__(self):
+        super().__init__(delay=0)
+        self.per_symbol_calls = []
+
+    def calculate_batch_technical_indicators(self, symbols):
+        return {symbol: {'current_price': 50.0} for symbol in symbols if symbol != 'MISSING'}
+
+    def calculate_enhanced_technical_indicators(self, symbol):
+        self.per_symbol_calls.append(symbol)
+        return {'current_price': 1.0}
+
+
+def test_pipeline_prefers_batch_technicals():
+    screener = FakeBatchScreener()
+    pipeline = ScreeningPipeline(screener, limiter=HostRateLimiter(), run_timeout=5)
+    results = pipeline.run(['A', 'B', 'MISSING'])
+
+    assert results['A']['technical'] == {'current_price': 50.0}
+    assert results['MISSING']['technical'] == {'current_price': 1.0}
+    assert screener.per_symbol_calls == ['MISSING']
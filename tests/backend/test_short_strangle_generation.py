@@ -0,0 +1,90 @@
+"""
+Tests for batched, vectorized short strangle strategy generation
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analyzers import short_strangle_engine as engine_module
+from src.analyzers.short_strangle_engine import ShortStrangleEngine
+from src.data.ohlcv_store import OHLCVStore
+
+
+def random_walk(seed, days=60, base=1000.0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=days, name='Date')
+    close = base * np.exp(np.cumsum(rng.normal(0, 0.015, days)))
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                         'Volume': np.full(days, 1000.0)}, index=index)
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    store = OHLCVStore(root=str(tmp_path / 'store'), refresh_interval=3600)
+    monkeypatch.setattr(engine_module, 'ohlcv_store', store)
+    monkeypatch.setattr(store, 'refresh', lambda symbols, force=False: {})
+
+    engine = ShortStrangleEngine()
+    engine.cache_file = str(tmp_path / 'options_cache.json')
+    fetched = []
+
+    def fake_spots(symbols):
+        fetched.append(list(symbols))
+        return {}
+
+    monkeypatch.setattr(engine, '_fetch_spot_prices', fake_spots)
+    engine.store, engine.fetched = store, fetched
+    return engine
+
+
+def test_streams_every_symbol_and_timeframe(engine):
+    symbols = [f"SYM{i}" for i in range(150)]
+    for i, symbol in enumerate(symbols):
+        engine.store.append(symbol, random_walk(i, base=100.0 + i * 10))
+
+    stream = engine.iter_strategies(symbols, chunk_size=50)
+    first = next(stream)
+    # Results start flowing before the whole universe has been fetched
+    assert len(engine.fetched) <= 2
+    strategies = [first] + list(stream)
+
+    assert len(strategies) == 150 * 3
+    assert len(engine.fetched) == 3
+    assert {s['timeframe'] for s in strategies} == {'5D', '10D', '30D'}
+    for s in strategies:
+        assert s['put_strike'] < s['current_price'] < s['call_strike']
+        assert s['total_premium'] == pytest.approx(s['call_premium'] + s['put_premium'])
+        assert s['breakeven_lower'] < s['put_strike']
+
+
+def test_symbols_without_data_are_skipped(engine):
+    engine.store.append('SBIN', random_walk(1))
+    strategies = engine.generate_strategies('30D', symbols=['SBIN', 'NODATA'])
+    assert [s['symbol'] for s in strategies] == ['SBIN']
+
+
+def test_vectorized_volatility_matches_pandas(engine):
+    frames = [random_walk(seed, days=days) for seed, days in ((1, 42), (2, 30), (3, 8))]
+    width = max(len(f) for f in frames)
+    matrix = np.full((len(frames), width), np.nan)
+    for row, frame in enumerate(frames):
+        matrix[row, width - len(frame):] = frame['Close'].to_numpy()
+
+    vols = engine._historical_volatility(matrix)
+    for frame, vol in zip(frames[:2], vols[:2]):
+        expected = frame['Close'].pct_change().dropna().std() * np.sqrt(252) * 100
+        assert vol == pytest.approx(min(80.0, max(10.0, expected)))
+    assert vols[2] == 25.0  # too few bars
+
+
+def test_single_strategy_matches_batch_pricing(engine):
+    strategy = engine._calculate_strangle_strategy('TCS', 3500.0, '10D', 22.0)
+
+    call_premium, put_premium = engine._calculate_option_premium(
+        3500.0, [3500.0 * 1.035, 3500.0 * 0.965], 10, 22.0 * 1.15, 0.065, ['call', 'put'])
+    assert strategy['call_premium'] == pytest.approx(call_premium)
+    assert strategy['put_premium'] == pytest.approx(put_premium)
+    assert strategy['margin_required'] == pytest.approx(engine._calculate_margin_requirement(
+        'TCS', 3500.0, strategy['call_strike'], strategy['put_strike'], strategy['total_premium']))
+    assert strategy['lot_size'] == 300
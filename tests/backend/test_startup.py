@@ -0,0 +1,55 @@
+"""
+Tests for lazy heavy-module imports and the cold-start benchmark
+"""
+
+import os
+import sys
+
+from src.common_repository.utils.lazy_import import is_available, lazy_import, preload
+from src.common_repository.utils.telemetry import telemetry
+from src.core.startup import check_budget, measure_cold_start, parse_importtime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def test_lazy_module_imports_on_first_attribute(tmp_path, monkeypatch):
+    (tmp_path / 'lazy_probe_heavy.py').write_text("LOADS = []\nLOADS.append(1)\ndef answer():\n    return 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'lazy_probe_heavy', raising=False)
+
+    heavy = lazy_import('lazy_probe_heavy')
+    assert 'lazy_probe_heavy' not in sys.modules and 'deferred' in repr(heavy)
+    assert heavy.answer() == 42 and heavy.LOADS == [1]
+    assert sys.modules['lazy_probe_heavy'].LOADS is heavy.LOADS, "the real module is imported once"
+    assert telemetry.get_histogram('imports.load_ms', {'module': 'lazy_probe_heavy'}).count == 1
+    assert lazy_import('lazy_probe_heavy') is sys.modules['lazy_probe_heavy']
+
+    assert is_available('json') and not is_available('no_such_module_xyz')
+    timings = preload(['json', 'no_such_module_xyz'])
+    assert timings['json'] >= 0 and timings['no_such_module_xyz'] == -1
+
+
+def test_importtime_parsing_and_budget():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |     _json",
+        "import time:       900 |       1020 |   json",
+        "import time:      5000 |      60000 | src.core.app",
+        "some log line",
+    ])
+    timings = parse_importtime(stderr)
+    assert [(t.module, t.cumulative_us, t.depth) for t in timings] == [
+        ('_json', 120, 2), ('json', 1020, 1), ('src.core.app', 60000, 0)]
+
+    result = {'wall_ms': 1500.0, 'rss_mb': 90.0, 'heavy_loaded': ['tensorflow']}
+    violations = check_budget(result, budget_sec=1.0, rss_budget_mb=100)
+    assert len(violations) == 2 and 'tensorflow' in violations[1]
+    assert check_budget(dict(result, wall_ms=400.0, heavy_loaded=[]), budget_sec=1.0, rss_budget_mb=100) == []
+
+
+def test_app_cold_start_defers_heavy_modules():
+    result = measure_cold_start(runs=1, top=5, cwd=ROOT)
+
+    assert result['heavy_loaded'] == [], f"imported eagerly at startup: {result['heavy_loaded']}"
+    assert result['top_imports'][0]['module'] == 'src.core.app'
+    assert result['wall_ms'] > 0 and result['rss_mb'] > 0
@@ -0,0 +1,138 @@
+"""
+Tests for the vectorized strategy backtester
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.ohlcv_store import OHLCVStore
+from src.strategies import evolution_engine as engine_module
+from src.strategies.backtester import (
+    VectorizedBacktester, parameter_grid, parse_horizon, signals_from_locked, signals_from_predictions
+)
+
+DATES = pd.bdate_range('2025-01-01', periods=120, name='Date')
+
+
+def bars(closes):
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({'Open': closes, 'High': closes, 'Low': closes, 'Close': closes,
+                         'Volume': np.full(len(closes), 1000.0)}, index=DATES[:len(closes)])
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = OHLCVStore(root=str(tmp_path / 'ohlcv'), refresh_interval=3600)
+    store.append('UP', bars(100 * 1.01 ** np.arange(120)))      # +1% every day
+    store.append('DOWN', bars(100 * 0.99 ** np.arange(120)))    # -1% every day
+    store.append('SPIKE', bars(np.r_[np.full(10, 100.0), 80.0, np.full(109, 120.0)]))
+    return store
+
+
+def signal(symbol, day, predicted, confidence=80, timeframe='5D', model=None):
+    return signals_from_predictions([{'symbol': symbol, 'timestamp': str(DATES[day].date()),
+                                      'predicted_1mo': predicted, 'confidence': confidence,
+                                      'timeframe': timeframe, 'model': model}])[0]
+
+
+def test_forward_paths_and_directional_returns(store):
+    signals = [signal('UP', 0, 5.0), signal('DOWN', 0, -5.0), signal('UP', 0, -5.0)]
+    tester = VectorizedBacktester(signals, price_source=store)
+
+    result = tester.run([{}])[0]
+    assert result['trades'] == 3
+    long_gain = 1.01 ** 5 - 1
+    short_gain = 1 - 0.99 ** 5
+    assert result['avg_return'] == pytest.approx((long_gain + short_gain - long_gain) / 3)
+    assert result['win_rate'] == pytest.approx(2 / 3)
+    assert result['avg_holding_days'] == 5
+
+
+def test_variant_filters_are_independent_rows_of_one_run(store):
+    signals = [signal('UP', 0, 5.0, confidence=90, model='LSTM'),
+               signal('DOWN', 30, 2.0, confidence=60, model='RF')]
+    variants = [{}, {'confidence_threshold': 0.85}, {'entry_zone': 0.03}, {'model': 'RF'},
+                {'model': 'LightGBM'}, {'timeframe': '10D', 'confidence_threshold': 85}]
+    results = VectorizedBacktester(signals, price_source=store).run(variants)
+
+    assert [r['trades'] for r in results] == [2, 1, 1, 1, 0, 1]
+    assert results[1]['avg_return'] == pytest.approx(1.01 ** 5 - 1)
+    assert results[3]['avg_return'] == pytest.approx(0.99 ** 5 - 1)
+    assert results[5]['avg_return'] == pytest.approx(1.01 ** 10 - 1)
+    assert results[4]['sharpe_ratio'] == 0.0
+
+
+def test_stop_loss_and_take_profit_exit_at_first_breach(store):
+    signals = [signal('SPIKE', 8, 10.0, timeframe='10D')]
+    results = VectorizedBacktester(signals, price_source=store).run(
+        [{}, {'stop_loss': 0.1}, {'take_profit': 0.1}])
+
+    assert results[0]['avg_return'] == pytest.approx(0.2)
+    assert results[1]['avg_return'] == pytest.approx(-0.2)
+    assert results[1]['avg_holding_days'] == 2
+    assert results[1]['max_drawdown'] == pytest.approx(0.2)
+    assert results[2]['avg_return'] == pytest.approx(0.2)
+    assert results[2]['avg_holding_days'] == 3
+
+
+def test_chunked_grid_matches_single_pass(store):
+    signals = [signal(symbol, day, predicted, confidence=conf)
+               for symbol in ('UP', 'DOWN', 'SPIKE')
+               for day, predicted, conf in ((0, 4.0, 70), (25, -6.0, 85), (50, 12.0, 95))]
+    grid = parameter_grid(confidence_threshold=[0.7, 0.8, 0.9], timeframe=['5D', '20D'],
+                          stop_loss=[None, 0.05])
+    assert len(grid) == 12 and len({v['variant_id'] for v in grid}) == 12
+
+    whole = VectorizedBacktester(signals, price_source=store).run(grid)
+    chunked = VectorizedBacktester(signals, price_source=store, max_cells=1).run(grid)
+    assert whole == chunked
+    assert all(0.0 <= r['consistency_score'] <= 1.0 for r in whole)
+
+
+def test_signal_sources_normalize_units():
+    locked = signals_from_locked({'TCS': {'lock_start_date_5d': '2025-01-02', 'predicted_roi_5d': 12.5,
+                                          'lock_start_date_30d': '2025-01-01', 'predicted_roi_30d': 28.0}})
+    assert [(s['horizon'], s['predicted_return']) for s in locked] == [(5, 0.125), (30, 0.28)]
+    assert parse_horizon('1mo') == 21 and parse_horizon(None) == 0
+
+
+def test_evolution_engine_simulates_against_stored_prices(store, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    engine = engine_module.StrategyEvolutionEngine()
+    engine.price_source = store
+    history = [{'symbol': 'UP', 'timestamp': str(DATES[d].date()), 'predicted_1mo': 8.0, 'confidence': 80}
+               for d in (0, 40, 80)]
+    monkeypatch.setattr(engine, '_load_prediction_history', lambda: history)
+
+    results = engine.simulate_strategy_variants([
+        {'variant_id': 'all', 'timeframe': '10D'},
+        {'variant_id': 'strict', 'confidence_threshold': 0.9},
+    ])
+    assert results['signal_count'] == 3
+    assert results['variant_results']['all']['trades'] == 3
+    assert results['variant_results']['all']['win_rate'] == 1.0
+    assert results['variant_results']['strict']['trades'] == 0
+    assert results['best_variant'] == 'all'
+
+
+def test_long_timeframes_hold_for_their_full_horizon(store, tmp_path, monkeypatch):
+    signals = [signal('UP', 0, 5.0)]
+    with pytest.raises(ValueError):
+        VectorizedBacktester(signals, price_source=store).run([{'timeframe': '60D'}])
+
+    monkeypatch.chdir(tmp_path)
+    engine = engine_module.StrategyEvolutionEngine()
+    engine.price_source = store
+    monkeypatch.setattr(engine, '_load_prediction_history', lambda: [
+        {'symbol': 'UP', 'timestamp': str(DATES[0].date()), 'predicted_1mo': 8.0, 'confidence': 80}])
+    grid = [spec for spec in engine.build_variant_grid()
+            if spec['confidence_threshold'] == 0.7 and spec['entry_zone'] == 0.05
+            and spec['volatility_filter'] is None and spec['timeframe'] in ('30D', '60D')]
+    results = engine.simulate_strategy_variants(grid)['variant_results']
+    by_timeframe = {spec['timeframe']: results[spec['variant_id']] for spec in grid}
+
+    assert by_timeframe['30D']['avg_holding_days'] == 30
+    assert by_timeframe['60D']['avg_holding_days'] == 60
+    assert by_timeframe['60D']['avg_return'] == pytest.approx(1.01 ** 60 - 1)
+    assert by_timeframe['30D']['avg_return'] == pytest.approx(1.01 ** 30 - 1)
@@ -0,0 +1,154 @@
+"""
+Tests for the shared tiered cache
+"""
+
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from src.common_repository.cache.tiered_cache import TieredCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TieredCache(cache_dir=str(tmp_path), namespaces={
+        'small': (60, 3, False),
+        'short': (0.05, 10, False),
+        'persisted': (60, 10, True),
+    })
+
+
+def test_lru_evicts_least_recently_used(cache):
+    for key in ('a', 'b', 'c'):
+        cache.set('small', key, key.upper())
+    assert cache.get('small', 'a') == 'A'  # 'a' becomes most recent
+
+    cache.set('small', 'd', 'D')
+    assert cache.get('small', 'b') is None
+    assert cache.get('small', 'a') == 'A'
+    stats = cache.get_stats('small')
+    assert stats['evictions'] == 1
+    assert stats['entries'] == 3
+
+
+def test_entries_expire_after_namespace_ttl(cache):
+    cache.set('short', 'k', 1)
+    assert cache.get('short', 'k') == 1
+    time.sleep(0.08)
+    assert cache.get('short', 'k') is None
+    cache.set('short', 'k', 2, ttl=60)
+    time.sleep(0.08)
+    assert cache.get('short', 'k') == 2
+
+
+def test_disk_tier_survives_new_instance(cache, tmp_path):
+    cache.set('persisted', 'quote:SBIN', {'price': 800.5})
+
+    reopened = TieredCache(cache_dir=str(tmp_path), namespaces={'persisted': (60, 10, True)})
+    assert reopened.get('persisted', 'quote:SBIN') == {'price': 800.5}
+    assert reopened.get_stats('persisted')['disk_hits'] == 1
+
+    reopened.clear('persisted', prefix='quote:')
+    assert TieredCache(cache_dir=str(tmp_path), namespaces={'persisted': (60, 10, True)}) \
+        .get('persisted', 'quote:SBIN') is None
+
+
+def test_concurrent_misses_compute_once(cache):
+    calls = []
+    barrier = threading.Barrier(8)
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return 42
+
+    def worker():
+        barrier.wait()
+        results.append(cache.get_or_compute('small', 'slow', compute))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [42] * 8
+    assert len(calls) == 1
+    assert cache.get_stats('small')['coalesced'] == 7
+
+
+def test_compute_errors_are_not_cached(cache):
+    def compute():
+        raise ValueError("upstream down")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute('small', 'bad', compute)
+    assert cache.get('small', 'bad') is None
+
+
+def test_namespace_decorator_memoizes(cache):
+    calls = []
+
+    @cache.namespace('memo', ttl=60, max_entries=10)
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert square(3) == 9
+    assert square(3) == 9
+    assert square(4) == 16
+    assert calls == [3, 4]
+
+
+def test_legacy_ttl_cache_supports_get_set_and_decorator():
+    from src.core.cache import ttl_cache, TTLCache
+
+    fusion_cache = ttl_cache(ttl_sec=60, namespace="test_fusion")
+    fusion_cache.set("dashboard", {"ok": True})
+    assert fusion_cache.get("dashboard") == {"ok": True}
+
+    calls = []
+
+    @ttl_cache(ttl=60)
+    def lookup(symbol):
+        calls.append(symbol)
+        return symbol.lower()
+
+    assert lookup("TCS") == lookup("TCS") == "tcs"
+    assert calls == ["TCS"]
+    assert TTLCache(ttl_sec=30, namespace="test_agents").get("missing") is None
+
+
+def test_performance_cache_invalidates_by_pattern():
+    from src.managers.performance_cache import PerformanceCache
+
+    perf = PerformanceCache(namespace='test_performance')
+    perf.set('price_data_SBIN', {'p': 1})
+    perf.set('technical_SBIN', {'rsi': 50})
+    perf.set('technical_TCS', {'rsi': 40})
+
+    assert perf.invalidate('SBIN') == 2
+    assert perf.get('technical_TCS') == {'rsi': 40}
+    assert perf.get_stats()['cache_size'] == 1
+
+
+def test_disk_tier_keeps_non_json_values_memory_only(cache, tmp_path):
+    stamp = datetime(2024, 1, 2, 15, 30)
+    cache.set('persisted', 'plain', {'price': 800.5, 'tags': ['nse']})
+    cache.set('persisted', 'stamp', {'at': stamp})
+    cache.set('persisted', 'pair', (1, 2))
+    assert cache.get('persisted', 'stamp') == {'at': stamp}
+    assert cache.get_stats('persisted')['memory_only'] == 2
+
+    reopened = TieredCache(cache_dir=str(tmp_path), namespaces={'persisted': (60, 10, True)})
+    assert reopened.get('persisted', 'plain') == {'price': 800.5, 'tags': ['nse']}
+    assert reopened.get('persisted', 'stamp') is None, "no stringified datetime comes back from disk"
+    assert reopened.get('persisted', 'pair') is None
+
+    # Replacing a persisted value with a non-JSON one also drops the old disk copy
+    cache.set('persisted', 'plain', {'at': stamp})
+    assert TieredCache(cache_dir=str(tmp_path), namespaces={'persisted': (60, 10, True)}).get(
+        'persisted', 'plain') is None
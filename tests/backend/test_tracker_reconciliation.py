@@ -0,0 +1,108 @@
+"""
+Tests for batched end-of-day actual-price reconciliation in the interactive tracker
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.common_repository.storage.record_store import RecordStore
+from src.data.ohlcv_store import OHLCVStore
+from src.managers import interactive_tracker_manager as tracker_module
+from src.managers.interactive_tracker_manager import IST, InteractiveTrackerManager
+
+
+def bars(close, end=None):
+    # Ends on the trading day after_close() reconciles
+    end = end or pd.Timestamp(after_close().date())
+    index = pd.bdate_range(end=end, periods=3, name='Date')
+    values = np.full(3, close)
+    return pd.DataFrame({'Open': values, 'High': values, 'Low': values, 'Close': values,
+                         'Volume': np.full(3, 1000.0)}, index=index)
+
+
+def last_weekday():
+    day = datetime.now(IST) - timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+def after_close():
+    return last_weekday().replace(hour=18, minute=0) + timedelta(days=1)
+
+
+@pytest.fixture
+def tracker(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = RecordStore(db_path=str(tmp_path / 'tracking.db'), mirrors={})
+    ohlcv = OHLCVStore(root=str(tmp_path / 'ohlcv'), refresh_interval=3600)
+    refreshed = []
+    monkeypatch.setattr(ohlcv, 'refresh', lambda symbols, force=False: refreshed.append(list(symbols)) or {})
+    monkeypatch.setattr(tracker_module, 'record_store', store)
+    monkeypatch.setattr(tracker_module, 'ohlcv_store', ohlcv)
+
+    tracker = InteractiveTrackerManager()
+    start = (last_weekday() - timedelta(days=7)).strftime('%Y-%m-%d')
+    for i in range(200):
+        tracker.tracking_data[f"SYM{i}"] = {
+            'start_date': start, 'actual_progress_5d': [None] * 5, 'actual_progress_30d': [None] * 30,
+        }
+        ohlcv.append(f"SYM{i}", bars(100.0 + i))
+    tracker.tracking_data['NOSTART'] = {'actual_progress_5d': [None] * 5}
+    tracker.save_tracking_data()
+
+    per_symbol = []
+    monkeypatch.setattr(tracker, 'fetch_real_closing_price', lambda symbol: per_symbol.append(symbol))
+    tracker.refreshed, tracker.per_symbol, tracker.ohlcv = refreshed, per_symbol, ohlcv
+    return tracker
+
+
+def test_reconciles_all_symbols_with_one_download_and_one_write(tracker):
+    tracker.tracking_data['MISSING'] = {'start_date': tracker.tracking_data['SYM0']['start_date'],
+                                        'actual_progress_5d': [None] * 5, 'actual_progress_30d': [None] * 30}
+    writes = tracker.store._connection().total_changes
+
+    result = tracker.update_daily_actual_prices(now=after_close())
+
+    assert result['total_updated'] == 200
+    assert result['failed_stocks'] == ['MISSING']
+    assert len(tracker.refreshed) == 1 and len(tracker.refreshed[0]) == 201
+    assert tracker.per_symbol == ['MISSING']
+    # 200 rows plus the collection timestamp, all in one put_many call
+    assert tracker.store._connection().total_changes - writes == 201
+
+    day = result['updated_stocks'][0]['day']
+    stored = tracker.store.get('interactive_tracking', 'SYM7')
+    assert stored['actual_progress_30d'][day] == 107.0
+    assert stored['days_tracked'] == day + 1
+
+
+def test_single_update_still_matches_batch(tracker):
+    result = tracker.update_daily_actual_prices(now=after_close())
+    day = result['updated_stocks'][0]['day']
+    batch = tracker.tracking_data['SYM3']
+
+    tracker.tracking_data['SYM3'] = {'actual_progress_5d': [None] * 5, 'actual_progress_30d': [None] * 30}
+    assert tracker.update_actual_price('SYM3', day, 103.0)
+    single = tracker.store.get('interactive_tracking', 'SYM3')
+    assert single['actual_progress_30d'] == batch['actual_progress_30d']
+    assert single['days_tracked'] == batch['days_tracked']
+
+
+def test_stale_last_bar_falls_back_to_per_symbol_fetch(tracker):
+    trading_day = after_close().date()
+    while trading_day.weekday() >= 5:
+        trading_day -= timedelta(days=1)
+    for symbol in ('SYM1', 'SYM2'):
+        tracker.ohlcv.replace(symbol, bars(1.0, end=pd.Timestamp(trading_day) - pd.offsets.BDay(1)))
+    tracker.fetch_real_closing_price = lambda symbol: tracker.per_symbol.append(symbol) or 555.0
+
+    result = tracker.update_daily_actual_prices(now=after_close())
+
+    assert sorted(tracker.per_symbol) == ['SYM1', 'SYM2']
+    day = result['updated_stocks'][0]['day']
+    assert tracker.store.get('interactive_tracking', 'SYM1')['actual_progress_30d'][day] == 555.0
+    assert tracker.store.get('interactive_tracking', 'SYM3')['actual_progress_30d'][day] == 103.0
@@ -0,0 +1,52 @@
+"""
+Tests for the process-pool training orchestrator
+"""
+
+import os
+
+from src.ml import training_pool
+from src.ml.training_pool import model_threads, run_parallel, worker_count
+
+
+def report_worker(symbol):
+    """Module-level so spawned workers can unpickle it"""
+    if symbol == 'BAD':
+        raise ValueError('no data')
+    return {'success': True, 'symbol': symbol, 'pid': os.getpid(),
+            'threads': os.environ.get('OMP_NUM_THREADS'), 'n_jobs': model_threads()}
+
+
+def test_worker_count_follows_affinity_jobs_and_threads(monkeypatch):
+    monkeypatch.setattr(training_pool, 'available_cpus', lambda: 9)
+    assert worker_count(100, requested=0, threads_per_worker=1) == 8
+    assert worker_count(100, requested=0, threads_per_worker=2) == 4
+    assert worker_count(3, requested=0) == 3
+    assert worker_count(100, requested=5) == 5
+    monkeypatch.setattr(training_pool, 'available_cpus', lambda: 1)
+    assert worker_count(100, requested=0) == 1
+
+
+def test_single_worker_runs_inline_and_reports_progress():
+    progress = []
+    results = run_parallel(report_worker, ['TCS', 'BAD', 'TCS', 'INFY'], workers=1,
+                           progress_callback=lambda s, r, done, total: progress.append((s, done, total)))
+
+    assert set(results) == {'TCS', 'BAD', 'INFY'}
+    assert results['TCS']['pid'] == os.getpid()
+    assert results['TCS']['n_jobs'] == training_pool.TRAINING_THREADS_PER_WORKER
+    assert results['BAD'] == {'success': False, 'error': 'no data', 'symbol': 'BAD'}
+    assert progress == [('TCS', 1, 3), ('BAD', 2, 3), ('INFY', 3, 3)]
+
+
+def test_process_pool_limits_worker_threads_and_streams_results():
+    symbols = ['A', 'B', 'C', 'D', 'BAD']
+    progress = []
+    results = run_parallel(report_worker, symbols, workers=2, threads_per_worker=2,
+                           progress_callback=lambda s, r, done, total: progress.append(done))
+
+    assert set(results) == set(symbols)
+    assert not results['BAD']['success']
+    good = [results[s] for s in symbols if s != 'BAD']
+    assert all(r['threads'] == '2' and r['n_jobs'] == 2 for r in good)
+    assert os.getpid() not in {r['pid'] for r in good}
+    assert progress == [1, 2, 3, 4, 5]
@@ -0,0 +1,65 @@
+"""
+Tests for the sliding-window feature builder against the loop implementations it replaced
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.ml.windowing import (
+    horizon_sequences, lstm_windows, next_day_direction, next_value_sequences, tail_features, window_end_rows
+)
+
+rng = np.random.default_rng(7)
+VALUES = rng.normal(size=(400, 6))
+
+
+def test_next_value_sequences_match_loop_and_share_memory():
+    lookback = 60
+    for step in (1, 2, 3, 5):
+        X_loop = np.array([VALUES[i - lookback:i] for i in range(lookback, len(VALUES), step)])
+        y_loop = np.array([VALUES[i, 3] for i in range(lookback, len(VALUES), step)])
+
+        X, y = next_value_sequences(VALUES, 3, lookback, step)
+        np.testing.assert_array_equal(X, X_loop)
+        np.testing.assert_array_equal(y, y_loop)
+        assert np.shares_memory(X, VALUES)
+
+    X, y = next_value_sequences(VALUES[:60], 3, 60)
+    assert X.shape == (0, 60, 6) and len(y) == 0
+
+
+def test_horizon_sequences_match_loop():
+    lookback, horizon = 60, 5
+    starts = range(lookback, len(VALUES) - horizon + 1)
+    X, y = horizon_sequences(VALUES, 0, lookback, horizon)
+
+    np.testing.assert_array_equal(X, np.array([VALUES[i - lookback:i] for i in starts]))
+    np.testing.assert_array_equal(y, np.array([VALUES[i:i + horizon, 0] for i in starts]))
+    assert X.base is not None and np.shares_memory(X, VALUES)
+    assert lstm_windows(VALUES[:10], 20).shape == (0, 20, 6)
+
+
+def test_tail_features_match_windowed_iloc_loop():
+    frame = pd.DataFrame(VALUES[:, :3], columns=['ATR', 'RSI', 'Momentum_5d'])
+    frame.loc[100:104, 'RSI'] = np.nan
+    spec = (('ATR', 'mean', 0), ('RSI', 'last', 50), ('Missing', 'mean', 1), ('Momentum_5d', 'mean', 0))
+    features = tail_features(frame, spec, tail=5)
+
+    rows = np.arange(30, len(frame) - 1)
+    expected = []
+    for i in rows:
+        window = frame.iloc[i - 30:i]
+        rsi = window['RSI'].iloc[-1]
+        expected.append([window['ATR'].tail(5).mean(), 50 if np.isnan(rsi) else rsi, 1,
+                         window['Momentum_5d'].tail(5).mean()])
+    np.testing.assert_allclose(features[rows - 1], np.array(expected))
+
+    close = frame['ATR'].to_numpy()
+    np.testing.assert_array_equal(next_day_direction(close, rows),
+                                  [1 if close[i + 1] > close[i] else 0 for i in rows])
+
+
+def test_window_end_rows_match_nested_loops():
+    length, sizes, step = 400, [30, 45, 60, 90], 15
+    expected = [start + size for size in sizes for start in range(0, length - size - 1, step)]
+    np.testing.assert_array_equal(window_end_rows(length, sizes, step, limit=length - 1), expected)
@@ -13,8 +13,16 @@ class FusionDashboard {
         this.loadPageSpecificData();
         this.setupEventListeners();
 
-        // Auto-refresh every 30 seconds
-        setInterval(() => this.loadDashboardData(), 30000);
+        // Reload when the fusion topic changes; poll every 30 seconds when streaming is unavailable
+        const poll = () => setInterval(() => this.loadDashboardData(), 30000);
+        if (!window.LiveStream) {
+            poll();
+            return;
+        }
+        this.stream = LiveStream.open({ topics: ['fusion'], fallback: poll });
+        if (this.stream) {
+            this.stream.onChange('fusion', () => this.loadDashboardData());
+        }
     }
 
     async loadDashboardData(timeframe = 'all', forceRefresh = false) {
@@ -471,11 +471,24 @@ class KPIDashboard {
     }
 
     setupAutoRefresh() {
-        // Auto-refresh every 5 minutes
-        this.refreshInterval = setInterval(() => {
-            console.log('[KPI] Auto-refreshing data');
-            this.loadKPIData();
-        }, 5 * 60 * 1000);
+        // Reload when the KPI job pushes a change; poll every 5 minutes when streaming is unavailable
+        const poll = () => {
+            this.refreshInterval = setInterval(() => {
+                console.log('[KPI] Auto-refreshing data');
+                this.loadKPIData();
+            }, 5 * 60 * 1000);
+        };
+        if (!window.LiveStream) {
+            poll();
+            return;
+        }
+        this.stream = LiveStream.open({ topics: ['kpi'], fallback: poll });
+        if (this.stream) {
+            this.stream.onChange('kpi', () => {
+                console.log('[KPI] KPI metrics changed, reloading');
+                this.loadKPIData();
+            });
+        }
     }
 
     showLoading(show) {
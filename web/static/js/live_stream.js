@@ -0,0 +1,132 @@
+/**
+ * Live Stream
+ * Server-sent events from /api/stream: one connection per page, merged state per topic.
+ * Topics are 'quotes:<SYMBOL>' (via symbols), 'fusion' and 'kpi'. When the browser has no
+ * EventSource or the server refuses streams (503 when it cannot hold long-lived connections),
+ * the `fallback` passed to LiveStream.open() is called once so the page polls instead.
+ * LiveStream.reloadOnChange() wraps both for pages that simply re-fetch on any change.
+ */
+
+class LiveStream {
+    constructor({ symbols = [], topics = [], fallback = null } = {}) {
+        this.state = {};
+        this.handlers = {};
+        this.snapshots = 0;
+        this.fallback = fallback;
+
+        const params = new URLSearchParams();
+        if (symbols.length) params.set('symbols', symbols.join(','));
+        if (topics.length) params.set('topics', topics.join(','));
+
+        this.source = new EventSource(`/api/stream?${params}`);
+        this.source.addEventListener('snapshot', (e) => this.applySnapshot(JSON.parse(e.data)));
+        this.source.addEventListener('delta', (e) => this.applyDelta(JSON.parse(e.data)));
+        this.source.onerror = () => {
+            if (this.source.readyState === EventSource.CLOSED) {
+                this.unavailable();
+            } else {
+                console.log('[LiveStream] Connection lost, browser will reconnect');
+            }
+        };
+    }
+
+    // A stream, or null after calling options.fallback when streaming is unavailable
+    static open(options = {}) {
+        if (window.EventSource && !LiveStream.refused) return new LiveStream(options);
+        if (options.fallback) options.fallback();
+        return null;
+    }
+
+    // Call reload once per burst of changes to the topics / symbols' quotes, or every pollMs
+    // when streaming is unavailable. close() on the returned handle stops both.
+    static reloadOnChange({ symbols = [], topics = [], reload, pollMs = 30000, debounceMs = 1000 }) {
+        let poll = null;
+        let timer = null;
+        const stream = LiveStream.open({
+            symbols,
+            topics,
+            fallback: () => { if (!poll) poll = setInterval(reload, pollMs); },
+        });
+        if (stream) {
+            const schedule = () => {
+                clearTimeout(timer);
+                timer = setTimeout(reload, debounceMs);
+            };
+            topics.concat(symbols.map(symbol => `quotes:${symbol}`))
+                .forEach(topic => stream.onChange(topic, schedule));
+        }
+        return {
+            stream,
+            close() {
+                clearInterval(poll);
+                clearTimeout(timer);
+                if (stream) stream.close();
+            },
+        };
+    }
+
+    // The server refused the stream: stop retrying (also for later open() calls) and poll
+    unavailable() {
+        console.log('[LiveStream] Push channel unavailable, falling back to polling');
+        LiveStream.refused = true;
+        this.close();
+        if (this.fallback) {
+            const fallback = this.fallback;
+            this.fallback = null;
+            fallback();
+        }
+    }
+
+    static merge(target, delta) {
+        // null removes a field, nested objects merge, anything else replaces
+        for (const [key, value] of Object.entries(delta)) {
+            if (value === null) {
+                delete target[key];
+            } else if (typeof value === 'object' && !Array.isArray(value)
+                       && target[key] && typeof target[key] === 'object' && !Array.isArray(target[key])) {
+                LiveStream.merge(target[key], value);
+            } else {
+                target[key] = value;
+            }
+        }
+        return target;
+    }
+
+    // handler(state, delta, kind) for every snapshot and delta of a topic
+    on(topic, handler) {
+        (this.handlers[topic] = this.handlers[topic] || []).push(handler);
+        return this;
+    }
+
+    // Like on(), but skips the snapshot sent on first connect (the page has already loaded)
+    onChange(topic, handler) {
+        return this.on(topic, (state, delta, kind) => {
+            if (kind !== 'snapshot' || this.snapshots > 1) handler(state, delta, kind);
+        });
+    }
+
+    applySnapshot(snapshot) {
+        this.snapshots += 1;
+        for (const [topic, state] of Object.entries(snapshot)) {
+            this.state[topic] = state;
+            this.emit(topic, state, 'snapshot');
+        }
+    }
+
+    applyDelta({ t, d }) {
+        this.state[t] = LiveStream.merge(this.state[t] || {}, d);
+        this.emit(t, d, 'delta');
+    }
+
+    emit(topic, delta, kind) {
+        (this.handlers[topic] || []).forEach(handler => handler(this.state[topic], delta, kind));
+    }
+
+    close() {
+        this.source.close();
+    }
+}
+
+LiveStream.refused = false;
+
+window.LiveStream = LiveStream;